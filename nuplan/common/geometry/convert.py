@@ -65,6 +65,31 @@ def relative_to_absolute_poses(origin_pose: StateSE2, relative_poses: List[State
     return relative_poses
 
 
+def relative_to_absolute_pose_array(
+    origin_pose: StateSE2, relative_poses: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Converts an array of SE2 poses from relative to absolute coordinates using an origin pose.
+    Array counterpart of relative_to_absolute_poses, which avoids building a transformation matrix per pose.
+    :param origin_pose: Reference origin pose
+    :param relative_poses: <..., 3> array of relative poses (x, y, heading) to convert
+    :return: <..., 3> array of converted absolute poses, with headings wrapped to [-pi, pi]
+    """
+    assert relative_poses.shape[-1] == 3, f"Expected poses shape of (..., 3), got {relative_poses.shape}"
+    relative_poses = relative_poses.astype(np.float64)
+    cos_heading, sin_heading = np.cos(origin_pose.heading), np.sin(origin_pose.heading)
+    headings = origin_pose.heading + relative_poses[..., 2]
+
+    return np.stack(  # type: ignore
+        [
+            origin_pose.x + cos_heading * relative_poses[..., 0] - sin_heading * relative_poses[..., 1],
+            origin_pose.y + sin_heading * relative_poses[..., 0] + cos_heading * relative_poses[..., 1],
+            np.arctan2(np.sin(headings), np.cos(headings)),
+        ],
+        axis=-1,
+    )
+
+
 def numpy_array_to_absolute_velocity(
     origin_absolute_state: StateSE2, velocities: npt.NDArray[np.float32]
 ) -> List[StateVector2D]:
@@ -2,7 +2,6 @@ import unittest
 from unittest.mock import Mock, patch
 
 import numpy as np
-import numpy.typing as npt
 
 from nuplan.common.actor_state.state_representation import StateSE2
 from nuplan.common.geometry.convert import (
@@ -11,6 +10,7 @@ from nuplan.common.geometry.convert import (
     numpy_array_to_absolute_pose,
     numpy_array_to_absolute_velocity,
     pose_from_matrix,
+    relative_to_absolute_pose_array,
     relative_to_absolute_poses,
 )
 
@@ -99,6 +99,21 @@ class TestConvert(unittest.TestCase):
             self.assertAlmostEqual(result[i].y, expected_poses[i].y)
             self.assertAlmostEqual(result[i].heading, expected_poses[i].heading)
 
+    def test_relative_to_absolute_pose_array(self) -> None:
+        """Tests that the array conversion matches the conversion of a list of SE2 poses"""
+        # Setup
+        rng = np.random.default_rng(0)
+        origin = StateSE2(1.5, -2.0, 2.5)
+        relative_poses = rng.uniform(-np.pi, np.pi, (4, 6, 3))
+
+        # Function call
+        result = relative_to_absolute_pose_array(origin, relative_poses)
+
+        # Assertions
+        self.assertEqual(result.shape, relative_poses.shape)
+        expected_poses = relative_to_absolute_poses(origin, [StateSE2(*pose) for pose in relative_poses.reshape(-1, 3)])
+        np.testing.assert_allclose(result.reshape(-1, 3), [pose.serialize() for pose in expected_poses], atol=1e-12)
+
     def test_input_numpy_array_to_absolute_velocity(self) -> None:
         """Tests input validation of numpy_array_to_absolute_velocity"""
         # Setup
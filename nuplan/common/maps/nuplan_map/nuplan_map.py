@@ -90,6 +90,13 @@ class NuPlanMap(AbstractMap):
         """Inherited, see superclass."""
         return self._map_name
 
+    @property
+    def map_version(self) -> str:
+        """
+        :return: Version of the map data of the location, e.g. "9.17.1964".
+        """
+        return self._maps_db.get_version(self._map_name)
+
     def get_available_map_objects(self) -> List[SemanticMapLayer]:
         """Inherited, see superclass."""
         return list(self._map_object_getter.keys())
@@ -489,3 +496,18 @@ class NuPlanMap(AbstractMap):
             if carpark_area_id in self._get_vector_map_layer(SemanticMapLayer.CARPARK_AREA)["fid"].tolist()
             else None
         )
+
+
+# Version of maps that do not report the version of their data
+UNVERSIONED_MAP = 'unversioned'
+
+
+def get_map_version(map_api: AbstractMap) -> str:
+    """
+    :param map_api: Map api.
+    :return: Version of the map data, data cached for other versions of a map must not be reused.
+    """
+    if isinstance(map_api, NuPlanMap):
+        return map_api.map_version
+
+    return UNVERSIONED_MAP
@@ -0,0 +1,187 @@
+"""
+Compiled map layers.
+A compiled vector layer is an Arrow IPC file with the attribute columns of the layer and its geometries as WKB, in the
+projected coordinate system of the map. Loading it skips GeoPackage parsing and reprojection, which only speeds up
+loading: the layer is decoded into a GeoDataFrame owned by each process, so no memory is shared between workers.
+Compiled layers record the size and modification time of the GeoPackage they were compiled from, and are ignored once
+the GeoPackage changes.
+
+Usage:
+    python -m nuplan.database.maps_db.compiled_map --map_root $NUPLAN_MAPS_ROOT --map_version nuplan-maps-v1.0
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+import pyarrow
+import pyarrow.ipc
+
+from nuplan.common.utils.helpers import suppress_geopandas_warning
+
+suppress_geopandas_warning()
+import geopandas as gpd  # noqa: E402
+
+if TYPE_CHECKING:
+    from nuplan.database.maps_db.gpkg_mapsdb import GPKGMapsDB
+
+logger = logging.getLogger(__name__)
+
+# Folder with the compiled layers, next to the GeoPackage of a map version
+COMPILED_MAP_FOLDER = 'compiled'
+COMPILED_LAYER_EXTENSION = '.arrow'
+
+# Bumped whenever the layout of compiled layers changes, layers of other versions are ignored
+COMPILED_MAP_FORMAT_VERSION = '1'
+
+# Schema metadata keys
+FORMAT_VERSION_KEY = b'nuplan.compiled_map.format_version'
+CRS_KEY = b'nuplan.compiled_map.crs'
+GEOMETRY_COLUMN_KEY = b'nuplan.compiled_map.geometry_column'
+SOURCE_SIGNATURE_KEY = b'nuplan.compiled_map.source_signature'
+
+
+def get_compiled_layer_path(map_folder: str, layer_name: str) -> str:
+    """
+    Get the path of a compiled vector layer.
+    :param map_folder: Folder of a map version, which contains map.gpkg.
+    :param layer_name: Vector layer name.
+    :return: Path of the compiled layer.
+    """
+    return os.path.join(map_folder, COMPILED_MAP_FOLDER, f'{layer_name}{COMPILED_LAYER_EXTENSION}')
+
+
+def get_source_signature(source_path: str) -> bytes:
+    """
+    Get the signature of the GeoPackage a layer is compiled from, which changes whenever the GeoPackage is replaced.
+    :param source_path: Path of the GeoPackage.
+    :return: Size and modification time of the GeoPackage.
+    """
+    stat = os.stat(source_path)
+    return f'{stat.st_size}:{stat.st_mtime_ns}'.encode()
+
+
+def save_compiled_vector_layer(layer: gpd.GeoDataFrame, path: str, source_path: Optional[str] = None) -> None:
+    """
+    Save a vector layer as a compiled layer.
+    :param layer: Vector layer in the projected coordinate system of the map.
+    :param path: Path of the compiled layer.
+    :param source_path: Path of the GeoPackage the layer was loaded from, recorded to detect stale compiled layers.
+    """
+    geometry_column = layer.geometry.name
+    dataframe = layer.to_wkb()
+    table = pyarrow.Table.from_pandas(dataframe, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[FORMAT_VERSION_KEY] = COMPILED_MAP_FORMAT_VERSION.encode()
+    metadata[GEOMETRY_COLUMN_KEY] = geometry_column.encode()
+    if layer.crs is not None:
+        metadata[CRS_KEY] = layer.crs.to_wkt().encode()
+    if source_path is not None:
+        metadata[SOURCE_SIGNATURE_KEY] = get_source_signature(source_path)
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first, so that concurrent readers never see a partially written layer
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pyarrow.OSFile(tmp_path, 'wb') as sink:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def is_compiled_vector_layer(path: str, source_path: Optional[str] = None) -> bool:
+    """
+    Check if a compiled layer exists, has the current format version and is up to date with its GeoPackage.
+    :param path: Path of the compiled layer.
+    :param source_path: Path of the GeoPackage the layer should be compiled from, not checked if None.
+    :return: True if the compiled layer can be loaded.
+    """
+    if not os.path.exists(path):
+        return False
+
+    with pyarrow.memory_map(path, 'r') as source:
+        metadata = pyarrow.ipc.open_file(source).schema.metadata or {}
+
+    if metadata.get(FORMAT_VERSION_KEY) != COMPILED_MAP_FORMAT_VERSION.encode():
+        return False
+
+    if source_path is not None:
+        if not os.path.exists(source_path) or metadata.get(SOURCE_SIGNATURE_KEY) != get_source_signature(source_path):
+            logger.warning(f'Compiled map layer {path} is stale, loading {source_path} instead. Recompile the map.')
+            return False
+
+    return True
+
+
+def load_compiled_vector_layer(path: str) -> gpd.GeoDataFrame:
+    """
+    Load a compiled vector layer. The file is read through a memory map, but the attribute columns and the geometries
+    are copied into a new GeoDataFrame.
+    :param path: Path of the compiled layer.
+    :return: Vector layer, identical to the one loaded from the GeoPackage.
+    """
+    with pyarrow.memory_map(path, 'r') as source:
+        table = pyarrow.ipc.open_file(source).read_all()
+
+    metadata = table.schema.metadata
+    if metadata.get(FORMAT_VERSION_KEY) != COMPILED_MAP_FORMAT_VERSION.encode():
+        raise RuntimeError(f'Compiled map layer {path} has an unsupported format version!')
+
+    geometry_column = metadata[GEOMETRY_COLUMN_KEY].decode()
+    crs = metadata[CRS_KEY].decode() if CRS_KEY in metadata else None
+    dataframe = table.to_pandas()
+    dataframe[geometry_column] = gpd.GeoSeries.from_wkb(dataframe[geometry_column], index=dataframe.index, crs=crs)
+
+    return gpd.GeoDataFrame(dataframe, geometry=geometry_column, crs=crs)
+
+
+def compile_map(maps_db: GPKGMapsDB, location: str, layer_names: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Compile vector layers of a map location, the compiled layers are used by the maps db from then on.
+    :param maps_db: GPKGMapsDB of the map version.
+    :param location: Map location, e.g. "sg-one-north".
+    :param layer_names: Vector layers to compile, all layers with geometries if None.
+    :return: Paths of the compiled layers.
+    """
+    if layer_names is None:
+        layer_names = [
+            layer_name
+            for layer_name, geometry_type in maps_db.vector_layer_names(location)
+            if geometry_type is not None
+        ]
+
+    paths = []
+    for layer_name in layer_names:
+        path = maps_db.get_compiled_layer_path(location, layer_name)
+        layer = maps_db.load_gpkg_vector_layer(location, layer_name)
+        save_compiled_vector_layer(layer, path, source_path=maps_db.get_gpkg_path(location))
+        logger.info(f'Compiled layer {layer_name} of {location} to {path}')
+        paths.append(path)
+
+    return paths
+
+
+def main() -> None:
+    """Compile vector layers of the GeoPackage maps into Arrow files, which load faster than the GeoPackage."""
+    from nuplan.database.maps_db.gpkg_mapsdb import GPKGMapsDB
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--map_root', type=str, required=True, help='Root folder of the maps.')
+    parser.add_argument('--map_version', type=str, required=True, help='Version of the maps, e.g. nuplan-maps-v1.0.')
+    parser.add_argument('--locations', type=str, nargs='*', default=None, help='Locations to compile, all if unset.')
+    parser.add_argument('--layers', type=str, nargs='*', default=None, help='Layers to compile, all if unset.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    maps_db = GPKGMapsDB(map_version=args.map_version, map_root=args.map_root)
+    locations = args.locations if args.locations else list(maps_db.get_locations())
+    for location in locations:
+        paths = compile_map(maps_db=maps_db, location=location, layer_names=args.layers)
+        logger.info(f'Compiled {len(paths)} layers of {location} in {Path(paths[0]).parent if paths else "-"}')
+
+
+if __name__ == '__main__':
+    main()
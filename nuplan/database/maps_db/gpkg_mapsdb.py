@@ -17,6 +17,11 @@ from nuplan.common.utils.helpers import suppress_geopandas_warning
 from nuplan.database.common.blob_store.creator import BlobStoreCreator
 from nuplan.database.common.blob_store.local_store import LocalStore
 from nuplan.database.maps_db import layer_dataset_ops
+from nuplan.database.maps_db.compiled_map import (
+    get_compiled_layer_path,
+    is_compiled_vector_layer,
+    load_compiled_vector_layer,
+)
 from nuplan.database.maps_db.imapsdb import IMapsDB
 from nuplan.database.maps_db.layer import MapLayer
 from nuplan.database.maps_db.metadata import MapLayerMeta
@@ -230,10 +235,48 @@ class GPKGMapsDB(IMapsDB):
     #   on our cluster to balance memory usage and performance.
     @lru_cache(maxsize=16)
     def load_vector_layer(self, location: str, layer_name: str) -> gpd.geodataframe:
-        """Inherited, see superclass."""
+        """
+        Inherited, see superclass.
+        The layer is loaded from the compiled map if it was compiled, see compiled_map.py, else from the GeoPackage.
+        Compiled maps only speed up loading, the layer is a GeoDataFrame owned by the process in both cases.
+        """
         # TODO: Remove temporary workaround once map_version is cleaned
         location = location.replace('.gpkg', '')
 
+        compiled_layer_path = self.get_compiled_layer_path(location, layer_name)
+        if is_compiled_vector_layer(compiled_layer_path, source_path=self.get_gpkg_path(location)):
+            return load_compiled_vector_layer(compiled_layer_path)
+
+        return self.load_gpkg_vector_layer(location, layer_name)
+
+    def get_compiled_layer_path(self, location: str, layer_name: str) -> str:
+        """
+        Gets path to the compiled vector layer on disk.
+        :param location: Location of the layer.
+        :param layer_name: Vector layer name.
+        :return: Path to the compiled layer.
+        """
+        map_folder = os.path.dirname(self.get_gpkg_path(location))
+
+        return get_compiled_layer_path(map_folder, layer_name)
+
+    def get_gpkg_path(self, location: str) -> str:
+        """
+        Gets path to the GeoPackage of a location on disk.
+        :param location: Location of the map.
+        :return: Path to the GeoPackage.
+        """
+        return os.path.join(self._map_root, self._get_gpkg_file_path(location))
+
+    def load_gpkg_vector_layer(self, location: str, layer_name: str) -> gpd.geodataframe:
+        """
+        Loads a vector layer from the GeoPackage, bypassing compiled maps and the cache.
+        :param location: Location of the layer.
+        :param layer_name: Vector layer name.
+        :return: Vector layer in the projected coordinate system of the map.
+        """
+        location = location.replace('.gpkg', '')
+
         rel_path = self._get_gpkg_file_path(location)
         path_on_disk = os.path.join(self._map_root, rel_path)
 
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+from shapely.geometry import LineString
+
+from nuplan.common.utils.helpers import suppress_geopandas_warning
+from nuplan.database.maps_db.compiled_map import (
+    COMPILED_MAP_FOLDER,
+    compile_map,
+    is_compiled_vector_layer,
+    load_compiled_vector_layer,
+    save_compiled_vector_layer,
+)
+from nuplan.database.maps_db.gpkg_mapsdb import GPKGMapsDB
+
+suppress_geopandas_warning()
+import geopandas as gpd  # noqa: E402
+from geopandas.testing import assert_geodataframe_equal  # noqa: E402
+
+
+def _build_vector_layer(num_objects: int) -> gpd.GeoDataFrame:
+    """
+    Build a vector layer like the ones loaded from the GeoPackage, with a string index mirrored to the fid column.
+    :param num_objects: Number of map objects.
+    :return: Vector layer.
+    """
+    rng = np.random.default_rng(0)
+    geometries = [
+        LineString(rng.random((3, 2)) * 100.0).buffer(1.0) if index % 2 else LineString(rng.random((4, 2)) * 100.0)
+        for index in range(num_objects)
+    ]
+    layer = gpd.GeoDataFrame(
+        {
+            'lane_fid': rng.integers(0, 1000, size=num_objects),
+            'speed_limit_mps': rng.random(num_objects),
+            'type': ['lane' if index % 3 else None for index in range(num_objects)],
+            'geometry': geometries,
+        },
+        crs='EPSG:32631',
+    )
+    layer.index = layer.index.map(lambda index: str(index + 1))
+    layer['fid'] = layer.index
+    return layer
+
+
+class TestCompiledMap(unittest.TestCase):
+    """Test compiled map layers."""
+
+    def setUp(self) -> None:
+        """Set up a temporary map root."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """Clean up the temporary map root."""
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self) -> None:
+        """Test that a compiled layer loads identical to the original layer."""
+        layer = _build_vector_layer(num_objects=20)
+        path = os.path.join(self.tmp_dir.name, COMPILED_MAP_FOLDER, 'lanes_polygons.arrow')
+
+        self.assertFalse(is_compiled_vector_layer(path))
+        save_compiled_vector_layer(layer, path)
+        self.assertTrue(is_compiled_vector_layer(path))
+
+        loaded_layer = load_compiled_vector_layer(path)
+        assert_geodataframe_equal(loaded_layer, layer)
+        self.assertEqual(loaded_layer.crs, layer.crs)
+        self.assertEqual(loaded_layer.index.tolist(), layer['fid'].tolist())
+
+    def test_stale_layer(self) -> None:
+        """Test that a compiled layer is ignored once the GeoPackage it was compiled from changes."""
+        layer = _build_vector_layer(num_objects=5)
+        path = os.path.join(self.tmp_dir.name, COMPILED_MAP_FOLDER, 'lanes_polygons.arrow')
+        source_path = os.path.join(self.tmp_dir.name, 'map.gpkg')
+        with open(source_path, 'wb') as f:
+            f.write(b'gpkg')
+
+        save_compiled_vector_layer(layer, path, source_path=source_path)
+        self.assertTrue(is_compiled_vector_layer(path, source_path=source_path))
+
+        with open(source_path, 'ab') as f:
+            f.write(b' updated')
+        self.assertFalse(is_compiled_vector_layer(path, source_path=source_path))
+
+        os.remove(source_path)
+        self.assertFalse(is_compiled_vector_layer(path, source_path=source_path))
+
+    def test_empty_layer(self) -> None:
+        """Test that a layer without map objects can be compiled."""
+        layer = _build_vector_layer(num_objects=0)
+        path = os.path.join(self.tmp_dir.name, 'empty.arrow')
+        save_compiled_vector_layer(layer, path)
+        self.assertEqual(len(load_compiled_vector_layer(path)), 0)
+
+    def test_maps_db_uses_compiled_layers(self) -> None:
+        """Test that the maps db loads compiled layers instead of the GeoPackage once a map is compiled."""
+        layers = {'lanes_polygons': _build_vector_layer(num_objects=10), 'baseline_paths': _build_vector_layer(5)}
+
+        with patch.object(GPKGMapsDB, '_load_map_data'), patch(
+            'nuplan.database.maps_db.gpkg_mapsdb.BlobStoreCreator'
+        ) as blob_store_creator, patch('nuplan.database.maps_db.gpkg_mapsdb.json') as json:
+            json.load.return_value = {'sg-one-north': {'version': '9.17.1964'}}
+            blob_store_creator.create_mapsdb.return_value = Mock()
+            maps_db = GPKGMapsDB(map_version='nuplan-maps-v1.0', map_root=self.tmp_dir.name)
+
+        gpkg_path = maps_db.get_gpkg_path('sg-one-north')
+        os.makedirs(os.path.dirname(gpkg_path))
+        with open(gpkg_path, 'wb') as f:
+            f.write(b'gpkg')
+
+        load_gpkg_vector_layer = Mock(side_effect=lambda location, layer_name: layers[layer_name])
+        with patch.object(maps_db, 'load_gpkg_vector_layer', load_gpkg_vector_layer), patch.object(
+            maps_db, 'vector_layer_names', return_value=[['meta', None], ['lanes_polygons', 'Polygon']]
+        ):
+            paths = compile_map(maps_db, 'sg-one-north')
+            self.assertEqual(len(paths), 1)
+            self.assertEqual(
+                paths[0],
+                os.path.join(
+                    self.tmp_dir.name, 'sg-one-north', '9.17.1964', COMPILED_MAP_FOLDER, 'lanes_polygons.arrow'
+                ),
+            )
+            compile_map(maps_db, 'sg-one-north', layer_names=['baseline_paths'])
+            self.assertEqual(load_gpkg_vector_layer.call_count, 2)
+
+            for layer_name, layer in layers.items():
+                assert_geodataframe_equal(maps_db.load_vector_layer('sg-one-north', layer_name), layer)
+            self.assertEqual(load_gpkg_vector_layer.call_count, 2)
+
+            # Replacing the GeoPackage makes the maps db load from it again
+            with open(gpkg_path, 'ab') as f:
+                f.write(b' updated')
+            maps_db.load_vector_layer.cache_clear()
+            assert_geodataframe_equal(
+                maps_db.load_vector_layer('sg-one-north', 'lanes_polygons'), layers['lanes_polygons']
+            )
+            self.assertEqual(load_gpkg_vector_layer.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
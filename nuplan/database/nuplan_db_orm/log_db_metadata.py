@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from nuplan.database.common.blob_store.cache_store import CacheStore
+from nuplan.database.common.blob_store.creator import BlobStoreCreator
+from nuplan.database.nuplan_db.query_session import execute_one
+
+logger = logging.getLogger(__name__)
+
+LOG_DB_METADATA_SNAPSHOT_VERSION = 1  # Version of the snapshot format, snapshots of other versions are rebuilt
+LOG_DB_METADATA_SNAPSHOT_FILENAME = 'log_db_metadata.json'  # Default snapshot filename in the data root
+
+# Reads the metadata of a log database in a single query, without building any ORM tables
+LOG_DB_METADATA_QUERY = """
+    SELECT l.logfile AS log_name,
+           l.map_version AS map_version,
+           (SELECT MIN(timestamp) FROM lidar_pc) AS start_timestamp,
+           (SELECT MAX(timestamp) FROM lidar_pc) AS end_timestamp,
+           (SELECT COUNT(*) FROM scene) AS scene_count
+    FROM log AS l
+"""
+
+
+@dataclass(frozen=True)
+class LogDBMetadata:
+    """Metadata of a log database, stored in a snapshot to avoid opening the database at startup."""
+
+    load_path: str  # Local or remote (S3) filename the database is loaded from
+    log_name: str  # Name of the log contained within the database
+    map_version: str  # Name of the map associated with the log
+    start_timestamp: int  # [us] Timestamp of the first lidar pc of the log
+    end_timestamp: int  # [us] Timestamp of the last lidar pc of the log
+    scene_count: int  # Number of scenes in the log
+    file_size: int  # [B] Size of the local database file the metadata was read from
+    file_mtime_ns: int  # [ns] Modification time of the local database file the metadata was read from
+
+    def is_valid_for(self, stat: os.stat_result) -> bool:
+        """
+        Check whether the metadata still describes a database file.
+        :param stat: Status of the local database file.
+        :return: True if the file was not modified since the metadata was read.
+        """
+        return self.file_size == stat.st_size and self.file_mtime_ns == stat.st_mtime_ns
+
+
+def get_local_db_filename(data_root: str, load_path: str) -> Path:
+    """
+    Get the local filename of a log database, following the resolution of the database loader.
+    :param data_root: Local data root for loading (or storing downloaded) the log databases.
+    :param load_path: Local or remote (S3) filename of the database.
+    :return: The load path if it exists locally, otherwise the filename in the data root.
+    """
+    db_path = Path(load_path if load_path.endswith('.db') else f'{load_path}.db')
+    return db_path if db_path.exists() else Path(data_root) / db_path.name
+
+
+def read_log_db_metadata(data_root: str, load_path: str) -> LogDBMetadata:
+    """
+    Read the metadata of a log database directly from the file, downloading the database if it is not local.
+    :param data_root: Local data root for loading (or storing downloaded) the log databases.
+    :param load_path: Local or remote (S3) filename of the database.
+    :return: Metadata of the log database.
+    """
+    filename = get_local_db_filename(data_root, load_path)
+    if not filename.exists():
+        logger.debug(f'DB path not found, downloading db file to {filename}...')
+        CacheStore(data_root, BlobStoreCreator.create_nuplandb(data_root)).save_to_disk(filename.name)
+
+    # Stat before reading, such that a concurrent modification invalidates the metadata
+    stat = filename.stat()
+    row = execute_one(LOG_DB_METADATA_QUERY, (), str(filename))
+    assert row is not None, f'Log table of database is empty: {filename}'
+
+    return LogDBMetadata(
+        load_path=load_path,
+        log_name=row['log_name'],
+        map_version=row['map_version'],
+        start_timestamp=row['start_timestamp'] or 0,
+        end_timestamp=row['end_timestamp'] or 0,
+        scene_count=row['scene_count'],
+        file_size=stat.st_size,
+        file_mtime_ns=stat.st_mtime_ns,
+    )
+
+
+def load_log_db_metadata_snapshot(snapshot_path: Path) -> Dict[str, LogDBMetadata]:
+    """
+    Load a metadata snapshot of log databases.
+    :param snapshot_path: Filename of the snapshot.
+    :return: Mapping from load path to log database metadata, empty if the snapshot is missing or outdated.
+    """
+    if not snapshot_path.is_file():
+        return {}
+
+    try:
+        with open(snapshot_path, 'r') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as error:
+        logger.warning(f'Ignoring unreadable log DB metadata snapshot {snapshot_path}: {error}')
+        return {}
+
+    if snapshot.get('version') != LOG_DB_METADATA_SNAPSHOT_VERSION:
+        return {}
+
+    return {entry['load_path']: LogDBMetadata(**entry) for entry in snapshot['logs']}
+
+
+def save_log_db_metadata_snapshot(snapshot_path: Path, metadata: List[LogDBMetadata]) -> None:
+    """
+    Atomically save a metadata snapshot of log databases, such that concurrent readers never see a partial file.
+    :param snapshot_path: Filename of the snapshot.
+    :param metadata: Metadata of the log databases.
+    """
+    snapshot = {'version': LOG_DB_METADATA_SNAPSHOT_VERSION, 'logs': [asdict(entry) for entry in metadata]}
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=snapshot_path.parent, suffix='.tmp', delete=False) as f:
+        json.dump(snapshot, f)
+    os.replace(f.name, snapshot_path)
+
+
+def load_log_db_metadata(
+    data_root: str,
+    db_filenames: List[str],
+    snapshot_path: Optional[Path],
+    max_workers: int,
+) -> List[LogDBMetadata]:
+    """
+    Load the metadata of log databases from a snapshot, reading only new or modified databases.
+    A snapshot entry is reused as long as the size and modification time of its local database file are unchanged.
+    The snapshot is updated if any database had to be read.
+    :param data_root: Local data root for loading (or storing downloaded) the log databases.
+    :param db_filenames: Local or remote (S3) filenames of the databases.
+    :param snapshot_path: Filename of the snapshot, None to read all databases without a snapshot.
+    :param max_workers: Maximum number of threads to read databases with.
+    :return: Metadata of the log databases, in order of the filenames.
+    """
+    snapshot = load_log_db_metadata_snapshot(snapshot_path) if snapshot_path is not None else {}
+
+    metadata: Dict[str, LogDBMetadata] = {}
+    for load_path in db_filenames:
+        entry = snapshot.get(load_path)
+        filename = get_local_db_filename(data_root, load_path)
+        if entry is not None and filename.exists() and entry.is_valid_for(filename.stat()):
+            metadata[load_path] = entry
+
+    missing = [load_path for load_path in db_filenames if load_path not in metadata]
+    if missing:
+        logger.info(f'Reading metadata of {len(missing)} out of {len(db_filenames)} log DBs')
+        with ThreadPoolExecutor(max_workers=max(1, min(len(missing), max_workers))) as executor:
+            for entry in executor.map(lambda load_path: read_log_db_metadata(data_root, load_path), missing):
+                metadata[entry.load_path] = entry
+
+        if snapshot_path is not None:
+            try:
+                save_log_db_metadata_snapshot(snapshot_path, list({**snapshot, **metadata}.values()))
+            except OSError as error:
+                logger.warning(f'Could not save log DB metadata snapshot {snapshot_path}: {error}')
+
+    return [metadata[load_path] for load_path in db_filenames]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
@@ -10,6 +11,11 @@ from tqdm import tqdm
 
 from nuplan.common.utils.s3_utils import check_s3_path_exists, expand_s3_dir
 from nuplan.database.maps_db.gpkg_mapsdb import GPKGMapsDB
+from nuplan.database.nuplan_db_orm.log_db_metadata import (
+    LOG_DB_METADATA_SNAPSHOT_FILENAME,
+    LogDBMetadata,
+    load_log_db_metadata,
+)
 from nuplan.database.nuplan_db_orm.nuplandb import NuPlanDB
 from nuplan.database.nuplan_db_orm.scene import Scene
 
@@ -166,14 +172,21 @@ class NuPlanDBWrapper:
         logger.info('Loaded maps DB')
 
         # Load nuPlan log DBs
-        self._log_db_mapping = load_log_db_mapping(
+        self._log_db_mapping = self._load_log_db_mapping()
+        logger.info(f'Loaded {len(self.log_names)} log DBs')
+
+    def _load_log_db_mapping(self) -> Dict[str, NuPlanDB]:
+        """
+        Load the log databases.
+        :return: Mapping from log name to loaded log database object.
+        """
+        return load_log_db_mapping(
             data_root=self._data_root,
             db_files=self._db_files,
             maps_db=self._maps_db,
             max_workers=self._max_workers,
             verbose=self._verbose,
         )
-        logger.info(f'Loaded {len(self.log_dbs)} log DBs')
 
     def __reduce__(self) -> Tuple[Type[NuPlanDBWrapper], Tuple[Any, ...]]:
         """
@@ -252,3 +265,134 @@ class NuPlanDBWrapper:
     def get_all_scenario_types(self) -> List[str]:
         """Retrieve all unique scenario tags in the collection of databases."""
         return sorted({tag for log_db in self.log_dbs for tag in log_db.get_unique_scenario_tags()})
+
+
+class LazyNuPlanDBWrapper(NuPlanDBWrapper):
+    """
+    NuPlanDB wrapper that opens each log database only on first access.
+    At startup only a compact metadata snapshot of the log databases is loaded, which holds their log names,
+    map versions, time ranges and scene counts. Databases that are new or modified since the snapshot was taken,
+    detected by their file size and modification time, are read directly without building any ORM tables.
+    """
+
+    def __init__(
+        self,
+        data_root: str,
+        map_root: str,
+        db_files: Optional[Union[List[str], str]],
+        map_version: str,
+        max_workers: Optional[int] = None,
+        verbose: bool = True,
+        metadata_snapshot_path: Optional[str] = None,
+    ):
+        """
+        Initialize the database wrapper.
+        :param data_root: Local data root for loading (or storing downloaded) the log databases.
+        :param map_root: Local map root for loading (or storing downloaded) the map database.
+        :param db_files: Path to load the log databases from, see NuPlanDBWrapper.
+        :param map_version: Version of map database to load. The map database is passed to each loaded log database.
+        :param max_workers: Maximum number of threads to use when reading the metadata of new databases.
+        :param verbose: Whether to print progress and details during the database loading process.
+        :param metadata_snapshot_path: Filename of the metadata snapshot, shared by all wrappers loading from it.
+                                       If None, the snapshot is stored in the data root.
+        """
+        self._metadata_snapshot_path = metadata_snapshot_path
+        self._log_metadata: Dict[str, LogDBMetadata] = {}
+        self._log_db_lock = threading.Lock()
+
+        super().__init__(data_root, map_root, db_files, map_version, max_workers, verbose)
+
+    def _load_log_db_mapping(self) -> Dict[str, NuPlanDB]:
+        """
+        Load the metadata of the log databases, without opening any of them.
+        :return: Empty mapping, log databases are added once opened.
+        """
+        load_path = self._data_root if self._db_files is None else self._db_files
+        db_filenames = discover_log_dbs(load_path)
+
+        snapshot_path = Path(self._metadata_snapshot_path or Path(self._data_root) / LOG_DB_METADATA_SNAPSHOT_FILENAME)
+        max_workers = MAX_DB_LOADING_THREADS if self._max_workers is None else self._max_workers
+        log_metadata = load_log_db_metadata(self._data_root, db_filenames, snapshot_path, max_workers)
+
+        # Sort databases based on their log name, as the eagerly loading wrapper
+        self._log_metadata = {entry.log_name: entry for entry in sorted(log_metadata, key=lambda e: e.log_name)}
+
+        return {}
+
+    def __reduce__(self) -> Tuple[Type[NuPlanDBWrapper], Tuple[Any, ...]]:
+        """
+        Hints on how to reconstruct the object when pickling.
+        :return: Object type and constructor arguments to be used.
+        """
+        return self.__class__, (
+            self._data_root,
+            self._map_root,
+            self._db_files,
+            self._map_version,
+            self._max_workers,
+            self._verbose,
+            self._metadata_snapshot_path,
+        )
+
+    def __del__(self) -> None:
+        """
+        Called when the object is being garbage collected.
+        """
+        # Remove this object's reference to the included tables of the opened databases.
+        for log_db in self._log_db_mapping.values():
+            log_db.remove_ref()
+
+    @property
+    def log_metadata(self) -> Dict[str, LogDBMetadata]:
+        """Get the dictionary that maps log names to the metadata of their log databases."""
+        return self._log_metadata
+
+    @property
+    def log_db_mapping(self) -> Dict[str, NuPlanDB]:
+        """Get the dictionary that maps log names to log database objects, opening all databases."""
+        return {log_name: self.get_log_db(log_name) for log_name in self.log_names}
+
+    @property
+    def log_names(self) -> List[str]:
+        """Get the list of log names of all discovered log databases."""
+        return list(self._log_metadata.keys())
+
+    @property
+    def log_dbs(self) -> List[NuPlanDB]:
+        """Get the list of all log databases, opening all databases."""
+        return [self.get_log_db(log_name) for log_name in self.log_names]
+
+    @property
+    def opened_log_names(self) -> List[str]:
+        """Get the list of log names of the log databases opened so far."""
+        return list(self._log_db_mapping.keys())
+
+    def get_log_metadata(self, log_name: str) -> LogDBMetadata:
+        """
+        Retrieve the metadata of a log database by log name, without opening the database.
+        :param log_name: Log name to access the metadata hash table.
+        :return: Metadata of the log database.
+        """
+        return self._log_metadata[log_name]
+
+    def get_log_db(self, log_name: str) -> NuPlanDB:
+        """
+        Retrieve a log database by log name, opening it on first access.
+        :param log_name: Log name to access the database hash table.
+        :return: Retrieve database object.
+        """
+        with self._log_db_lock:
+            if log_name not in self._log_db_mapping:
+                load_path = self._log_metadata[log_name].load_path
+                self._log_db_mapping[log_name] = NuPlanDB(self._data_root, load_path, self._maps_db, self._verbose)
+
+            return self._log_db_mapping[log_name]
+
+    def get_all_scenes(self) -> Iterable[Scene]:
+        """
+        Retrieve and yield all scenes across all log databases, opening each database when reached.
+        :yield: Next scene from all scenes in the databases.
+        """
+        for log_name in self.log_names:
+            for scene in self.get_log_db(log_name).scene:
+                yield scene
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+from nuplan.database.nuplan_db_orm import log_db_metadata
+from nuplan.database.nuplan_db_orm.log_db_metadata import (
+    load_log_db_metadata,
+    load_log_db_metadata_snapshot,
+    read_log_db_metadata,
+)
+
+
+def _create_log_db(filename: Path, log_name: str, timestamps: List[int], num_scenes: int) -> None:
+    """
+    Create a log database holding the tables read for the metadata.
+    :param filename: Filename of the database.
+    :param log_name: Name of the log.
+    :param timestamps: [us] Timestamps of the lidar pcs.
+    :param num_scenes: Number of scenes.
+    """
+    connection = sqlite3.connect(str(filename))
+    connection.execute('CREATE TABLE log (token TEXT, logfile TEXT, map_version TEXT)')
+    connection.execute('CREATE TABLE lidar_pc (token TEXT, timestamp INTEGER)')
+    connection.execute('CREATE TABLE scene (token TEXT)')
+    connection.execute('INSERT INTO log VALUES (?, ?, ?)', ('log_token', log_name, 'us-nv-las-vegas-strip'))
+    connection.executemany('INSERT INTO lidar_pc VALUES (?, ?)', [(str(t), t) for t in timestamps])
+    connection.executemany('INSERT INTO scene VALUES (?)', [(str(i),) for i in range(num_scenes)])
+    connection.commit()
+    connection.close()
+
+
+class TestLogDBMetadata(unittest.TestCase):
+    """Test reading and snapshotting the metadata of log databases."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_root = Path(self.tmp_dir.name)
+        self.snapshot_path = self.data_root / 'snapshot' / 'metadata.json'
+        self.db_filenames = []
+        for index in range(3):
+            filename = self.data_root / f'log_{index}.db'
+            _create_log_db(filename, f'log_{index}', [100 * index + 5, 100 * index + 1], num_scenes=index)
+            self.db_filenames.append(str(filename))
+
+    def tearDown(self) -> None:
+        """Clean up test case."""
+        self.tmp_dir.cleanup()
+
+    def test_read_log_db_metadata(self) -> None:
+        """Test reading the metadata of a log database without the ORM."""
+        metadata = read_log_db_metadata(str(self.data_root), self.db_filenames[2])
+
+        self.assertEqual(metadata.log_name, 'log_2')
+        self.assertEqual(metadata.map_version, 'us-nv-las-vegas-strip')
+        self.assertEqual((metadata.start_timestamp, metadata.end_timestamp), (201, 205))
+        self.assertEqual(metadata.scene_count, 2)
+        self.assertEqual(metadata.file_size, os.path.getsize(self.db_filenames[2]))
+
+    def test_snapshot_reuse(self) -> None:
+        """Test that the snapshot is written once and reused while the databases are unchanged."""
+        metadata = load_log_db_metadata(str(self.data_root), self.db_filenames, self.snapshot_path, max_workers=2)
+
+        self.assertEqual([entry.log_name for entry in metadata], ['log_0', 'log_1', 'log_2'])
+        self.assertEqual(set(load_log_db_metadata_snapshot(self.snapshot_path)), set(self.db_filenames))
+
+        with patch.object(log_db_metadata, 'read_log_db_metadata') as read_mock:
+            reloaded = load_log_db_metadata(str(self.data_root), self.db_filenames, self.snapshot_path, max_workers=2)
+
+        read_mock.assert_not_called()
+        self.assertEqual(reloaded, metadata)
+
+    def test_snapshot_invalidation(self) -> None:
+        """Test that modified and new databases are read again, and the snapshot is updated."""
+        load_log_db_metadata(str(self.data_root), self.db_filenames[:2], self.snapshot_path, max_workers=1)
+
+        # Replace the first log with a larger database
+        os.remove(self.db_filenames[0])
+        _create_log_db(Path(self.db_filenames[0]), 'log_0_v2', list(range(1000)), num_scenes=4)
+
+        with patch.object(log_db_metadata, 'read_log_db_metadata', wraps=read_log_db_metadata) as read_mock:
+            metadata = load_log_db_metadata(str(self.data_root), self.db_filenames, self.snapshot_path, max_workers=1)
+
+        read_paths = sorted(call.args[1] for call in read_mock.call_args_list)
+        self.assertEqual(read_paths, [self.db_filenames[0], self.db_filenames[2]])
+        self.assertEqual(metadata[0].log_name, 'log_0_v2')
+        self.assertEqual(metadata[0].scene_count, 4)
+        self.assertEqual(load_log_db_metadata_snapshot(self.snapshot_path)[self.db_filenames[0]], metadata[0])
+
+    def test_unreadable_snapshot(self) -> None:
+        """Test that a corrupted or outdated snapshot is ignored."""
+        self.snapshot_path.parent.mkdir(parents=True)
+        self.snapshot_path.write_text('{"version": 1, "logs": [')
+        self.assertEqual(load_log_db_metadata_snapshot(self.snapshot_path), {})
+
+        self.snapshot_path.write_text('{"version": 0, "logs": []}')
+        self.assertEqual(load_log_db_metadata_snapshot(self.snapshot_path), {})
+
+        metadata = load_log_db_metadata(str(self.data_root), self.db_filenames, self.snapshot_path, max_workers=2)
+        self.assertEqual(len(metadata), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,19 @@
 import gc
 import pickle
+import tempfile
 import unittest
+from pathlib import Path
 
 import guppy
 
-from nuplan.database.nuplan_db_orm.nuplandb_wrapper import NuPlanDBWrapper
-from nuplan.database.tests.nuplan_db_test_utils import get_test_nuplan_db_wrapper_nocache
+from nuplan.database.nuplan_db_orm.nuplandb_wrapper import LazyNuPlanDBWrapper, NuPlanDBWrapper
+from nuplan.database.tests.nuplan_db_test_utils import (
+    NUPLAN_DATA_ROOT,
+    NUPLAN_DB_FILES,
+    NUPLAN_MAP_VERSION,
+    NUPLAN_MAPS_ROOT,
+    get_test_nuplan_db_wrapper_nocache,
+)
 
 
 class TestNuPlanDBWrapper(unittest.TestCase):
@@ -68,5 +76,57 @@ class TestNuPlanDBWrapper(unittest.TestCase):
         self.assertGreater(max_allowable_growth_mb, memory_difference_in_mb)
 
 
+class TestLazyNuPlanDBWrapper(unittest.TestCase):
+    """Test NuPlanDB wrapper which opens log databases on first access."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = str(Path(self.tmp_dir.name) / 'log_db_metadata.json')
+        self.db_wrapper = self._build_wrapper()
+
+    def tearDown(self) -> None:
+        """Clean up test case."""
+        self.tmp_dir.cleanup()
+
+    def _build_wrapper(self) -> LazyNuPlanDBWrapper:
+        """
+        :return: Lazy wrapper of the test databases, using the test case snapshot.
+        """
+        return LazyNuPlanDBWrapper(
+            data_root=NUPLAN_DATA_ROOT,
+            map_root=NUPLAN_MAPS_ROOT,
+            db_files=NUPLAN_DB_FILES,
+            map_version=NUPLAN_MAP_VERSION,
+            metadata_snapshot_path=self.snapshot_path,
+        )
+
+    def test_lazy_loading(self) -> None:
+        """Test that databases are opened on first access and match their metadata."""
+        self.assertEqual(self.db_wrapper.opened_log_names, [])
+
+        log_name = self.db_wrapper.log_names[0]
+        log_db = self.db_wrapper.get_log_db(log_name)
+        metadata = self.db_wrapper.get_log_metadata(log_name)
+
+        self.assertEqual(self.db_wrapper.opened_log_names, [log_name])
+        self.assertIs(self.db_wrapper.get_log_db(log_name), log_db)
+        self.assertEqual(log_db.log_name, log_name)
+        self.assertEqual(log_db.map_name, metadata.map_version)
+        self.assertEqual(len(log_db.scene), metadata.scene_count)
+
+    def test_same_logs_as_eager_wrapper(self) -> None:
+        """Test that the lazy wrapper discovers the same logs as the eagerly loading wrapper."""
+        self.assertEqual(self.db_wrapper.log_names, get_test_nuplan_db_wrapper_nocache().log_names)
+        self.assertEqual(self._build_wrapper().log_metadata, self.db_wrapper.log_metadata)
+
+    def test_serialization(self) -> None:
+        """Test whether the wrapper object can be serialized/deserialized correctly."""
+        re_db_wrapper: LazyNuPlanDBWrapper = pickle.loads(pickle.dumps(self.db_wrapper))
+
+        self.assertEqual(re_db_wrapper.log_names, self.db_wrapper.log_names)
+        self.assertEqual(re_db_wrapper.opened_log_names, [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,123 @@
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas
+
+from nuplan.planning.metrics.aggregator.abstract_metric_aggregator import AbstractMetricAggregator
+from nuplan.planning.metrics.aggregator.vectorized_weighted_average_metric_aggregator import (
+    VectorizedWeightedAverageMetricAggregator,
+)
+from nuplan.planning.metrics.aggregator.weighted_average_metric_aggregator import WeightedAverageMetricAggregator
+from nuplan.planning.metrics.metric_dataframe import MetricStatisticsDataFrame
+
+logger = logging.getLogger(__name__)
+
+
+def build_synthetic_metric_dataframes(
+    num_scenarios: int,
+    num_metrics: int,
+    num_planners: int,
+    num_scenario_types: int,
+    missing_ratio: float = 0.05,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, MetricStatisticsDataFrame]:
+    """
+    Build synthetic metric dataframes with num_scenarios x num_metrics x num_planners rows in total.
+    :param num_scenarios: Number of scenarios per planner.
+    :param num_metrics: Number of metrics.
+    :param num_planners: Number of planners.
+    :param num_scenario_types: Number of scenario types.
+    :param missing_ratio: Ratio of scenarios that are randomly dropped from each metric.
+    :param rng: Random generator.
+    :return A dictionary of metric name and dataframe.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    scenario_names = np.asarray([f'scenario_{index}' for index in range(num_scenarios)], dtype=np.object_)
+    log_names = np.asarray([f'log_{index // 20}' for index in range(num_scenarios)], dtype=np.object_)
+    scenario_types = np.asarray(
+        [f'scenario_type_{index}' for index in rng.integers(num_scenario_types, size=num_scenarios)], dtype=np.object_
+    )
+
+    metric_dataframes = {}
+    for metric_index in range(num_metrics):
+        metric_name = f'metric_{metric_index}'
+        dataframes = []
+        for planner_index in range(num_planners):
+            kept = rng.random(num_scenarios) >= missing_ratio
+            dataframes.append(
+                pandas.DataFrame(
+                    {
+                        'scenario_name': scenario_names[kept],
+                        'log_name': log_names[kept],
+                        'scenario_type': scenario_types[kept],
+                        'planner_name': f'planner_{planner_index}',
+                        'metric_score': rng.random(int(kept.sum())),
+                    }
+                )
+            )
+        metric_dataframes[metric_name] = MetricStatisticsDataFrame(
+            metric_statistic_name=metric_name, metric_statistics_dataframe=pandas.concat(dataframes, ignore_index=True)
+        )
+
+    return metric_dataframes
+
+
+def run_aggregator(
+    aggregator: AbstractMetricAggregator, metric_dataframes: Dict[str, MetricStatisticsDataFrame]
+) -> float:
+    """
+    Run an aggregator and measure its running time.
+    :param aggregator: Metric aggregator.
+    :param metric_dataframes: A dictionary of metric name and dataframe.
+    :return Elapsed time in seconds.
+    """
+    start_time = time.perf_counter()
+    aggregator(metric_dataframes=metric_dataframes)
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    """Benchmark the vectorized weighted average metric aggregator against the reference implementation."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--num_scenarios', type=int, default=25000, help='Number of scenarios per planner.')
+    parser.add_argument('--num_metrics', type=int, default=20, help='Number of metrics.')
+    parser.add_argument('--num_planners', type=int, default=2, help='Number of planners.')
+    parser.add_argument('--num_scenario_types', type=int, default=70, help='Number of scenario types.')
+    parser.add_argument('--skip_reference', action='store_true', help='Only run the vectorized aggregator.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    metric_dataframes = build_synthetic_metric_dataframes(
+        num_scenarios=args.num_scenarios,
+        num_metrics=args.num_metrics,
+        num_planners=args.num_planners,
+        num_scenario_types=args.num_scenario_types,
+        rng=np.random.default_rng(0),
+    )
+    num_rows = sum(len(dataframe.metric_statistics_dataframe) for dataframe in metric_dataframes.values())
+    logger.info(f'Synthetic metric tables: {num_rows} rows')
+
+    aggregator_classes = [VectorizedWeightedAverageMetricAggregator]
+    if not args.skip_reference:
+        aggregator_classes.append(WeightedAverageMetricAggregator)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for aggregator_class in aggregator_classes:
+            aggregator = aggregator_class(
+                name=aggregator_class.__name__,
+                metric_weights={'default': 1.0, 'metric_0': 5.0},
+                file_name=aggregator_class.__name__,
+                aggregator_save_path=Path(tmp_dir),
+                multiple_metrics=['metric_1'],
+            )
+            elapsed_time = run_aggregator(aggregator=aggregator, metric_dataframes=metric_dataframes)
+            logger.info(f'{aggregator_class.__name__}: {elapsed_time:.2f} seconds')
+
+
+if __name__ == '__main__':
+    main()
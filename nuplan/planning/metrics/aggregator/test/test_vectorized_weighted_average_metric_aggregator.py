@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas
+
+from nuplan.planning.metrics.aggregator.test.benchmark_weighted_average_metric_aggregator import (
+    build_synthetic_metric_dataframes,
+)
+from nuplan.planning.metrics.aggregator.vectorized_weighted_average_metric_aggregator import (
+    VectorizedWeightedAverageMetricAggregator,
+)
+from nuplan.planning.metrics.aggregator.weighted_average_metric_aggregator import WeightedAverageMetricAggregator
+from nuplan.planning.metrics.metric_dataframe import MetricStatisticsDataFrame
+
+
+class TestVectorizedWeightedAverageMetricAggregator(unittest.TestCase):
+    """Run vectorized weighted average metric aggregator unit tests."""
+
+    def setUp(self) -> None:
+        """Set up temporary folders."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.save_path = Path(self.tmpdir.name)
+
+    def tearDown(self) -> None:
+        """Clean up when unittests end."""
+        self.tmpdir.cleanup()
+
+    def _assert_same_aggregation(
+        self, metric_dataframes: Dict[str, MetricStatisticsDataFrame], multiple_metrics: List[str]
+    ) -> None:
+        """
+        Check that the vectorized and the reference aggregators produce identical parquet files.
+        :param metric_dataframes: A dictionary of metric name and dataframe.
+        :param multiple_metrics: A list of metric names used as multiple factors.
+        """
+        aggregators = [
+            aggregator_class(
+                name='weighted_average_metric_aggregator',
+                metric_weights={'default': 1.0, 'metric_1': 0.5, 'metric_2': 5.0},
+                file_name=file_name,
+                aggregator_save_path=self.save_path,
+                multiple_metrics=multiple_metrics,
+            )
+            for aggregator_class, file_name in [
+                (WeightedAverageMetricAggregator, 'reference'),
+                (VectorizedWeightedAverageMetricAggregator, 'vectorized'),
+            ]
+        ]
+        for aggregator in aggregators:
+            aggregator(metric_dataframes=metric_dataframes)
+
+        expected_dataframe = pandas.read_parquet(self.save_path / 'reference.parquet')
+        dataframe = pandas.read_parquet(self.save_path / 'vectorized.parquet')
+        pandas.testing.assert_frame_equal(dataframe, expected_dataframe, check_exact=True)
+        self.assertEqual(aggregators[0].final_metric_score, aggregators[1].final_metric_score)
+
+    def test_aggregation_with_overlapping_scenarios(self) -> None:
+        """Test aggregation when metrics cover different subsets of scenarios and planners."""
+        dummy_dataframes = {
+            'metric_1': pandas.DataFrame(
+                {
+                    'scenario_name': ['test_1', 'test_2', 'test_3'],
+                    'log_name': ['dummy', 'dummy', 'dummy_2'],
+                    'scenario_type': ['unknown', 'ego_stop_at_stop_line', 'unknown'],
+                    'planner_name': ['simple_planner', 'dummy_planner', 'dummy_planner'],
+                    'metric_score': [1, 0.5, 0.8],
+                }
+            ),
+            'metric_0': pandas.DataFrame(
+                {
+                    'scenario_name': ['test_1', 'test_3', 'test_4'],
+                    'log_name': ['dummy', 'dummy_3', 'dummy_4'],
+                    'scenario_type': ['unknown', 'unknown', 'lane_change'],
+                    'planner_name': ['simple_planner', 'dummy_planner', 'dummy_planner'],
+                    'metric_score': [0.1, 0.2, None],
+                }
+            ),
+            'metric_2': pandas.DataFrame(
+                {
+                    'scenario_name': ['test_2', 'test_4'],
+                    'log_name': ['dummy', 'dummy_4'],
+                    'scenario_type': ['ego_stop_at_stop_line', 'lane_change'],
+                    'planner_name': ['dummy_planner', 'dummy_planner'],
+                    'metric_score': [0.0, 1.0],
+                }
+            ),
+        }
+        metric_dataframes = {
+            metric_name: MetricStatisticsDataFrame(metric_statistic_name=metric_name, metric_statistics_dataframe=df)
+            for metric_name, df in dummy_dataframes.items()
+        }
+        self._assert_same_aggregation(metric_dataframes=metric_dataframes, multiple_metrics=[])
+        self._assert_same_aggregation(metric_dataframes=metric_dataframes, multiple_metrics=['metric_2'])
+
+    def test_aggregation_with_synthetic_metrics(self) -> None:
+        """Test aggregation on synthetic metric tables with missing scenarios."""
+        metric_dataframes = build_synthetic_metric_dataframes(
+            num_scenarios=500, num_metrics=8, num_planners=2, num_scenario_types=7, rng=np.random.default_rng(0)
+        )
+        self._assert_same_aggregation(metric_dataframes=metric_dataframes, multiple_metrics=['metric_3', 'metric_5'])
+
+
+if __name__ == '__main__':
+    unittest.main()
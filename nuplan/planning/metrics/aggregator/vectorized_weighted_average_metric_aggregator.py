@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pandas
+
+from nuplan.planning.metrics.aggregator.weighted_average_metric_aggregator import WeightedAverageMetricAggregator
+from nuplan.planning.metrics.metric_dataframe import MetricStatisticsDataFrame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScenarioMetricMatrix:
+    """Scenario x metric score matrix of a planner."""
+
+    scenario_names: List[str]  # Scenario names in order of first appearance
+    log_names: npt.NDArray[np.object_]  # <num_scenarios> log name of each scenario
+    scenario_types: npt.NDArray[np.object_]  # <num_scenarios> scenario type of each scenario
+    metric_names: List[str]  # Sorted metric names
+    scores: npt.NDArray[np.float64]  # <num_scenarios, num_metrics> metric scores, NaN if not available
+    available: npt.NDArray[np.bool_]  # <num_scenarios, num_metrics> True if a scenario has a score for a metric
+
+    @property
+    def num_scenarios(self) -> int:
+        """:return Number of scenarios in the matrix."""
+        return len(self.scenario_names)
+
+
+class VectorizedWeightedAverageMetricAggregator(WeightedAverageMetricAggregator):
+    """
+    Weighted average metric aggregator that works on a scenario x metric matrix with numpy instead of nested dicts.
+    It produces the same aggregated parquet file as WeightedAverageMetricAggregator.
+    """
+
+    def _build_scenario_metric_matrix(
+        self, metric_dataframes: Dict[str, MetricStatisticsDataFrame], planner_name: str
+    ) -> ScenarioMetricMatrix:
+        """
+        Pivot metric dataframes of a planner to a scenario x metric score matrix.
+        :param metric_dataframes: A dict of metric dataframes.
+        :param planner_name: A planner name.
+        :return Scenario metric matrix of the planner.
+        """
+        metric_names = sorted(list(metric_dataframes.keys()))
+        metric_indices = {metric_name: index for index, metric_name in enumerate(metric_names)}
+
+        columns = ['scenario_name', 'log_name', 'scenario_type', 'metric_score']
+        planner_dataframes = []
+        for metric_name, metric_dataframe in metric_dataframes.items():
+            # Get only dataframe with the planner names only
+            dataframe = metric_dataframe.query_scenarios(planner_names=tuple([planner_name]))
+            planner_dataframe = pandas.DataFrame(
+                {
+                    column: dataframe[column].to_numpy(dtype=np.object_ if column == 'metric_score' else None)
+                    for column in columns
+                }
+            )
+            planner_dataframe['metric_index'] = metric_indices[metric_name]
+            planner_dataframes.append(planner_dataframe)
+
+        # Rows are in the order of metric dataframes, later rows overwrite earlier rows of the same scenario
+        rows = pandas.concat(planner_dataframes, ignore_index=True)
+        scenario_codes, scenario_names = pandas.factorize(rows['scenario_name'])
+        num_scenarios = len(scenario_names)
+
+        last_scenario_rows = rows.assign(scenario_code=scenario_codes).drop_duplicates('scenario_code', keep='last')
+        last_scenario_rows = last_scenario_rows.sort_values('scenario_code')
+        log_names = last_scenario_rows['log_name'].to_numpy(dtype=np.object_)
+        scenario_types = last_scenario_rows['scenario_type'].to_numpy(dtype=np.object_)
+
+        metric_codes = rows['metric_index'].to_numpy()
+        cell_indices = pandas.Series(scenario_codes * len(metric_names) + metric_codes)
+        last_cells = ~cell_indices.duplicated(keep='last').to_numpy()
+        metric_scores = rows['metric_score'].to_numpy(dtype=np.object_)[last_cells]
+
+        # None means no score, NaN scores are kept as they are
+        available_scores = np.not_equal(metric_scores, None).astype(np.bool_)
+        scores: npt.NDArray[np.float64] = np.full((num_scenarios, len(metric_names)), np.nan, dtype=np.float64)
+        available: npt.NDArray[np.bool_] = np.zeros((num_scenarios, len(metric_names)), dtype=np.bool_)
+        cell_scenario_codes = scenario_codes[last_cells]
+        cell_metric_codes = metric_codes[last_cells]
+        scores[cell_scenario_codes, cell_metric_codes] = np.where(available_scores, metric_scores, np.nan).astype(
+            np.float64
+        )
+        available[cell_scenario_codes, cell_metric_codes] = available_scores
+
+        return ScenarioMetricMatrix(
+            scenario_names=list(scenario_names),
+            log_names=log_names,
+            scenario_types=scenario_types,
+            metric_names=metric_names,
+            scores=scores,
+            available=available,
+        )
+
+    def _compute_scenario_scores(self, matrix: ScenarioMetricMatrix) -> npt.NDArray[np.float64]:
+        """
+        Compute scenario scores for all scenarios at once.
+        :param matrix: Scenario metric matrix.
+        :return <num_scenarios> scenario scores.
+        """
+        metric_scores = np.zeros(matrix.num_scenarios, dtype=np.float64)
+        sum_weights = np.zeros(matrix.num_scenarios, dtype=np.float64)
+        multiple_factors = np.ones(matrix.num_scenarios, dtype=np.float64)
+
+        # Accumulate metric by metric in the same order as the scalar implementation, to get identical floating points
+        for metric_index, metric_name in enumerate(matrix.metric_names):
+            available = matrix.available[:, metric_index]
+            values = matrix.scores[:, metric_index]
+            if self._multiple_metrics and metric_name in self._multiple_metrics:
+                multiple_factors[available] *= values[available]
+            else:
+                weight = self._get_metric_weight(metric_name=metric_name)
+                sum_weights[available] += weight
+                metric_scores[available] += weight * values[available]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weighted_average_scores = np.where(sum_weights != 0.0, metric_scores / sum_weights, 1.0)
+
+        return multiple_factors * weighted_average_scores  # type: ignore
+
+    def _aggregate_planner(
+        self, metric_dataframes: Dict[str, MetricStatisticsDataFrame], planner_name: str
+    ) -> Dict[str, List[Any]]:
+        """
+        Aggregate metric scores of a planner into scenario, scenario type and final score rows.
+        :param metric_dataframes: A dict of metric dataframes.
+        :param planner_name: A planner name.
+        :return Aggregated dataframe columns of the planner.
+        """
+        matrix = self._build_scenario_metric_matrix(metric_dataframes=metric_dataframes, planner_name=planner_name)
+        scenario_scores = self._compute_scenario_scores(matrix=matrix)
+
+        # Scenario rows
+        dataframe_columns: Dict[str, List[Any]] = {
+            'scenario': list(matrix.scenario_names),
+            'log_name': matrix.log_names.tolist(),
+            'scenario_type': matrix.scenario_types.tolist(),
+            'num_scenarios': [None] * matrix.num_scenarios,
+            'planner_name': [planner_name] * matrix.num_scenarios,
+            'aggregator_type': [self._aggregator_type] * matrix.num_scenarios,
+        }
+        masked_scores = np.where(matrix.available, matrix.scores, None)
+        for metric_index, metric_name in enumerate(matrix.metric_names):
+            dataframe_columns[metric_name] = masked_scores[:, metric_index].tolist()
+        dataframe_columns['score'] = scenario_scores.tolist()
+
+        # Scenario type rows, sums are taken over the scenarios in the same order as the scalar implementation
+        scenario_type_codes, scenario_types = pandas.factorize(matrix.scenario_types)
+        scenario_indices = np.argsort(scenario_type_codes, kind='stable')
+        boundaries = np.searchsorted(scenario_type_codes[scenario_indices], np.arange(len(scenario_types) + 1))
+        sorted_scores = matrix.scores[scenario_indices]
+        sorted_available = matrix.available[scenario_indices]
+        sorted_scenario_scores = scenario_scores[scenario_indices]
+
+        num_scenarios: List[int] = []
+        scenario_type_metric_values: Dict[str, List[Optional[float]]] = {
+            metric_name: [] for metric_name in matrix.metric_names + ['score']
+        }
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            num_scenarios.append(int(end - start))
+            for metric_index, metric_name in enumerate(matrix.metric_names):
+                available_values = sorted_scores[start:end, metric_index][sorted_available[start:end, metric_index]]
+                value = float(np.sum(available_values)) if available_values.size > 0 else None
+                scenario_type_metric_values[metric_name].append(value)
+            scenario_type_metric_values['score'].append(
+                float(np.sum(sorted_scenario_scores[start:end])) / (end - start)
+            )
+
+        dataframe_columns['scenario'] += list(scenario_types)
+        dataframe_columns['log_name'] += [None] * len(scenario_types)
+        dataframe_columns['scenario_type'] += list(scenario_types)
+        dataframe_columns['num_scenarios'] += num_scenarios
+        dataframe_columns['planner_name'] += [planner_name] * len(scenario_types)
+        dataframe_columns['aggregator_type'] += [self._aggregator_type] * len(scenario_types)
+
+        # Final score row, weighted by the number of scenarios of each scenario type
+        total_scenarios = sum(num_scenarios)
+        for metric_name, values in scenario_type_metric_values.items():
+            available_values = [
+                value * num_scenario for value, num_scenario in zip(values, num_scenarios) if value is not None
+            ]
+            final_value = np.sum(np.asarray(available_values)) / total_scenarios if available_values else None
+            dataframe_columns[metric_name] += values + [final_value]
+
+        dataframe_columns['scenario'].append('final_score')
+        dataframe_columns['log_name'].append(None)
+        dataframe_columns['scenario_type'].append('final_score')
+        dataframe_columns['num_scenarios'].append(total_scenarios)
+        dataframe_columns['planner_name'].append(planner_name)
+        dataframe_columns['aggregator_type'].append(self._aggregator_type)
+
+        return dataframe_columns
+
+    def __call__(self, metric_dataframes: Dict[str, MetricStatisticsDataFrame]) -> None:
+        """
+        Run an aggregator to generate an aggregated parquet file.
+        :param metric_dataframes: A dictionary of metric name and dataframe.
+        """
+        # Get all planner names
+        planner_names = sorted(
+            list(
+                {
+                    planner_name
+                    for metric_statistic_dataframe in metric_dataframes.values()
+                    for planner_name in metric_statistic_dataframe.planner_names
+                }
+            )
+        )
+
+        weighted_average_dataframe_columns: Dict[str, List[Any]] = dict()
+        for planner_name in planner_names:
+            dataframe_columns = self._aggregate_planner(metric_dataframes=metric_dataframes, planner_name=planner_name)
+            if not weighted_average_dataframe_columns:
+                weighted_average_dataframe_columns.update(dataframe_columns)
+            else:
+                for column_name, value in weighted_average_dataframe_columns.items():
+                    value += dataframe_columns[column_name]
+
+        # Convert to pandas dataframe
+        self._aggregated_metric_dataframe = pandas.DataFrame(data=weighted_average_dataframe_columns)
+
+        # Save to a parquet file
+        self._save_parquet(dataframe=self._aggregated_metric_dataframe, save_path=self._parquet_file)
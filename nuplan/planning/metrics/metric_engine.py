@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import atexit
 import logging
-import pickle
+import os
+import socket
+import threading
 import time
+import uuid
 from collections import defaultdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+import pyarrow
+import pyarrow.ipc
+
 from nuplan.planning.metrics.abstract_metric import AbstractMetricBuilder
 from nuplan.planning.metrics.metric_file import MetricFile, MetricFileKey
 from nuplan.planning.metrics.metric_result import MetricStatistics
@@ -16,7 +23,8 @@ from nuplan.planning.simulation.history.simulation_history import SimulationHist
 logger = logging.getLogger(__name__)
 
 
-JSON_FILE_EXTENSION = '.pickle.temp'
+JSON_FILE_EXTENSION = '.pickle.temp'  # Legacy row-based scenario metric files
+ARROW_FILE_EXTENSION = '.arrow.temp'  # Columnar metric files, an Arrow stream per process and metric statistics name
 
 
 def construct_dataframe(
@@ -45,6 +53,142 @@ def construct_dataframe(
     return statistic_columns
 
 
+def construct_metric_table(dataframes: List[Dict[str, Any]]) -> pyarrow.Table:
+    """
+    Construct a columnar arrow table from a list of metric dataframes, each dataframe becomes a single row.
+    :param dataframes: A list of metric dataframes returned by construct_dataframe.
+    :return An arrow table with the union of all dataframe columns, missing values are set to None.
+    """
+    # Single-element lists are pandas column values, unwrap them to get the cell value
+    rows = [
+        {column: value[0] if isinstance(value, list) else value for column, value in dataframe.items()}
+        for dataframe in dataframes
+    ]
+    column_names = list(dict.fromkeys(column_name for row in rows for column_name in row))
+    return pyarrow.table({column_name: [row.get(column_name) for row in rows] for column_name in column_names})
+
+
+def conform_metric_table(table: pyarrow.Table, schema: pyarrow.Schema) -> Optional[pyarrow.Table]:
+    """
+    Cast a metric table to the schema of a metric file, columns missing in the table are set to None.
+    :param table: A metric table returned by construct_metric_table.
+    :param schema: Schema of the metric file.
+    :return The table with the given schema, or None if the table has other columns or types that can not be cast.
+    """
+    if not set(table.column_names).issubset(schema.names):
+        return None
+
+    columns = [
+        table.column(field.name) if field.name in table.column_names else pyarrow.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    try:
+        return pyarrow.Table.from_arrays(columns, names=schema.names).cast(schema)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError):
+        return None
+
+
+class MetricTableWriter:
+    """
+    Append-only writer of the metric tables of a single metric statistics name, shared by all the scenarios run in a
+    process. Tables are appended as record batches to an Arrow stream, which is readable without being closed.
+    """
+
+    def __init__(self, save_path: Path) -> None:
+        """
+        Initializer for MetricTableWriter class
+        :param save_path: Folder of the metric statistics name.
+        """
+        self._save_path = save_path
+        self._file_path: Optional[Path] = None
+        self._sink: Optional[pyarrow.OSFile] = None
+        self._writer: Optional[pyarrow.ipc.RecordBatchStreamWriter] = None
+        self._schema: Optional[pyarrow.Schema] = None
+
+    @property
+    def file_path(self) -> Optional[Path]:
+        """:return Path of the file being written, None if no table was written yet."""
+        return self._file_path
+
+    def _open(self, schema: pyarrow.Schema) -> None:
+        """
+        Start a new file, named after the host and the process so that workers never write to the same file.
+        :param schema: Schema of the file.
+        """
+        self._save_path.mkdir(parents=True, exist_ok=True)
+        file_name = f'{socket.gethostname()}_{os.getpid()}_{uuid.uuid4().hex}' + ARROW_FILE_EXTENSION
+        self._file_path = self._save_path / file_name
+        self._sink = pyarrow.OSFile(str(self._file_path), 'wb')
+        self._writer = pyarrow.ipc.new_stream(self._sink, schema)
+        self._schema = schema
+
+    def write(self, table: pyarrow.Table) -> None:
+        """
+        Append a metric table to the file. A new file is started when the table does not fit the schema of the
+        current file, or when the current file was integrated and deleted.
+        :param table: A metric table returned by construct_metric_table.
+        """
+        conformed_table = None
+        if self._schema is not None and self._file_path is not None and self._file_path.exists():
+            conformed_table = conform_metric_table(table, self._schema)
+
+        if conformed_table is None:
+            self.close()
+            self._open(table.schema)
+            conformed_table = table
+
+        assert self._writer is not None, "Metric file is not open!"
+        self._writer.write_table(conformed_table)
+
+    def close(self) -> None:
+        """Close the current file, if any."""
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        self._file_path = None
+        self._sink = None
+        self._writer = None
+        self._schema = None
+
+
+# Metric table writers of the current process, by folder of metric statistics name
+_metric_table_writers: Dict[Path, MetricTableWriter] = {}
+_metric_table_writers_pid = os.getpid()
+_metric_table_writers_lock = threading.Lock()
+
+
+def write_metric_table(save_path: Path, table: pyarrow.Table) -> None:
+    """
+    Append a metric table with the writer of the current process for a metric statistics name.
+    :param save_path: Folder of the metric statistics name.
+    :param table: A metric table returned by construct_metric_table.
+    """
+    global _metric_table_writers, _metric_table_writers_pid
+
+    with _metric_table_writers_lock:
+        # Forked workers inherit the writers of their parent, they must not write to the same files
+        if _metric_table_writers_pid != os.getpid():
+            _metric_table_writers = {}
+            _metric_table_writers_pid = os.getpid()
+
+        if save_path not in _metric_table_writers:
+            _metric_table_writers[save_path] = MetricTableWriter(save_path=save_path)
+        _metric_table_writers[save_path].write(table)
+
+
+def close_metric_table_writers() -> None:
+    """Close the metric table writers of the current process."""
+    with _metric_table_writers_lock:
+        if _metric_table_writers_pid == os.getpid():
+            for writer in _metric_table_writers.values():
+                writer.close()
+        _metric_table_writers.clear()
+
+
+atexit.register(close_metric_table_writers)
+
+
 class MetricsEngine:
     """The metrics engine aggregates and manages the instantiated metrics for a scenario."""
 
@@ -76,13 +220,12 @@ class MetricsEngine:
 
     def write_to_files(self, metric_files: Dict[str, List[MetricFile]]) -> None:
         """
-        Write to a file by constructing a dataframe
+        Append to columnar arrow files, one file per process in a folder per metric statistics name:
+        main_save_path -> metric_statistics_name -> <host>_<pid>_<uuid>.arrow.temp
         :param metric_files: A dictionary of scenario names and a list of their metric files.
         """
         for scenario_name, metric_files in metric_files.items():  # type: ignore
-            file_name = scenario_name + JSON_FILE_EXTENSION
-            save_path = self._main_save_path / file_name
-            dataframes = []
+            dataframes = defaultdict(list)
             for metric_file in metric_files:
                 metric_file_key = metric_file.key  # type: ignore
                 for metric_statistic in metric_file.metric_statistics:  # type: ignore
@@ -93,11 +236,13 @@ class MetricsEngine:
                         planner_name=metric_file_key.planner_name,
                         metric_statistics=metric_statistic,
                     )
-                    dataframes.append(dataframe)
+                    dataframes[metric_statistic.name].append(dataframe)
 
-            if len(dataframes):
-                with open(save_path, 'wb') as f:
-                    pickle.dump(dataframes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            for metric_statistics_name, metric_dataframes in dataframes.items():
+                write_metric_table(
+                    save_path=self._main_save_path / metric_statistics_name,
+                    table=construct_metric_table(metric_dataframes),
+                )
 
     def compute_metric_results(
         self, history: SimulationHistory, scenario: AbstractScenario
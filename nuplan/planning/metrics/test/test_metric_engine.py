@@ -1,7 +1,9 @@
+import tempfile
 import unittest
 from pathlib import Path
 
 import numpy as np
+import pyarrow
 
 from nuplan.common.actor_state.ego_state import EgoState
 from nuplan.common.actor_state.scene_object import SceneObject
@@ -10,7 +12,7 @@ from nuplan.common.actor_state.tracked_objects import TrackedObjects
 from nuplan.common.actor_state.vehicle_parameters import get_pacifica_parameters
 from nuplan.planning.metrics.evaluation_metrics.common.ego_acceleration import EgoAccelerationStatistics
 from nuplan.planning.metrics.evaluation_metrics.common.ego_jerk import EgoJerkStatistics
-from nuplan.planning.metrics.metric_engine import MetricsEngine
+from nuplan.planning.metrics.metric_engine import MetricsEngine, MetricTableWriter, conform_metric_table
 from nuplan.planning.metrics.metric_result import TimeSeries
 from nuplan.planning.scenario_builder.test.mock_abstract_scenario import MockAbstractScenario
 from nuplan.planning.simulation.history.simulation_history import SimulationHistory, SimulationHistorySample
@@ -171,6 +173,36 @@ class TestMetricEngine(unittest.TestCase):
                 self.assertEqual(time_series.time_stamps, expected_time_stamps)
                 self.assertEqual(np.round(time_series.values, 2).tolist(), expected_time_series_values[index])
 
+    def test_conform_metric_table(self) -> None:
+        """Test metric tables are cast to the schema of a metric file when possible."""
+        schema = pyarrow.schema([('scenario_name', pyarrow.string()), ('value', pyarrow.float64())])
+
+        table = conform_metric_table(pyarrow.table({'scenario_name': ['a']}), schema)
+        assert table is not None
+        self.assertEqual(table.schema, schema)
+        self.assertEqual(table.to_pylist(), [{'scenario_name': 'a', 'value': None}])
+
+        self.assertIsNone(conform_metric_table(pyarrow.table({'other': [1.0]}), schema))
+        self.assertIsNone(conform_metric_table(pyarrow.table({'value': ['not a number']}), schema))
+
+    def test_metric_table_writer(self) -> None:
+        """Test metric tables are appended to a file, and a new file is started for incompatible tables."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            writer = MetricTableWriter(save_path=Path(tmp_dir))
+            writer.write(pyarrow.table({'value': [1.0]}))
+            first_file_path = writer.file_path
+            writer.write(pyarrow.table({'value': [None]}))
+            self.assertEqual(writer.file_path, first_file_path)
+
+            writer.write(pyarrow.table({'value': ['not a number']}))
+            self.assertNotEqual(writer.file_path, first_file_path)
+            writer.close()
+
+            assert first_file_path is not None
+            with pyarrow.OSFile(str(first_file_path)) as source:
+                self.assertEqual(pyarrow.ipc.open_stream(source).read_all().column('value').to_pylist(), [1.0, None])
+            self.assertEqual(len(list(Path(tmp_dir).iterdir())), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from nuplan.common.actor_state.state_representation import Point2D
+from nuplan.common.maps.abstract_map import AbstractMap
+from nuplan.common.maps.maps_datatypes import SemanticMapLayer, StopLineType
+from nuplan.common.maps.nuplan_map.nuplan_map import get_map_version
+
+# Map layers rendered as polygons from their exterior in nuBoard
+DEFAULT_POLYGON_LAYERS = [
+    SemanticMapLayer.LANE,
+    SemanticMapLayer.INTERSECTION,
+    SemanticMapLayer.STOP_LINE,
+    SemanticMapLayer.CROSSWALK,
+    SemanticMapLayer.WALKWAYS,
+    SemanticMapLayer.CARPARK_AREA,
+]
+
+# Map layers rendered as lines from their baseline path in nuBoard
+DEFAULT_LINE_LAYERS = [SemanticMapLayer.LANE, SemanticMapLayer.LANE_CONNECTOR]
+
+TileIndex = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class MapLayerGeometry:
+    """Flattened coordinates of all map objects in a layer."""
+
+    object_ids: List[str]  # Map object ids
+    coords: npt.NDArray[np.float64]  # <num_points, 2> coordinates of all map objects
+    offsets: npt.NDArray[np.int64]  # <num_objects + 1> object i has coords[offsets[i]:offsets[i + 1]]
+    bounds: npt.NDArray[np.float64]  # <num_objects, 4> min x, min y, max x and max y of each map object
+
+    def __len__(self) -> int:
+        """:return Number of map objects."""
+        return len(self.object_ids)
+
+    @classmethod
+    def from_object_coords(
+        cls, object_ids: List[str], object_coords: List[npt.NDArray[np.float64]]
+    ) -> MapLayerGeometry:
+        """
+        Build flattened geometry from the coordinates of each map object.
+        :param object_ids: Map object ids.
+        :param object_coords: <num_points, 2> coordinates of each map object.
+        :return Flattened geometry.
+        """
+        if not object_coords:
+            return cls.empty()
+
+        lengths = [len(coords) for coords in object_coords]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        bounds = np.asarray(
+            [np.concatenate([coords.min(axis=0), coords.max(axis=0)]) for coords in object_coords], dtype=np.float64
+        )
+        return cls(
+            object_ids=list(object_ids),
+            coords=np.concatenate(object_coords).astype(np.float64),
+            offsets=offsets,
+            bounds=bounds,
+        )
+
+    @classmethod
+    def empty(cls) -> MapLayerGeometry:
+        """:return Geometry without map objects."""
+        return cls(
+            object_ids=[],
+            coords=np.zeros((0, 2), dtype=np.float64),
+            offsets=np.zeros(1, dtype=np.int64),
+            bounds=np.zeros((0, 4), dtype=np.float64),
+        )
+
+    @classmethod
+    def concatenate(cls, geometries: Iterable[MapLayerGeometry]) -> MapLayerGeometry:
+        """
+        Concatenate geometries, map objects that appear in more than one geometry are kept once.
+        :param geometries: Geometries of the same layer.
+        :return Concatenated geometry.
+        """
+        object_ids: List[str] = []
+        object_coords: List[npt.NDArray[np.float64]] = []
+        seen_object_ids = set()
+        for geometry in geometries:
+            for index, object_id in enumerate(geometry.object_ids):
+                if object_id in seen_object_ids:
+                    continue
+                seen_object_ids.add(object_id)
+                object_ids.append(object_id)
+                object_coords.append(geometry.object_coords(index))
+
+        return cls.from_object_coords(object_ids=object_ids, object_coords=object_coords)
+
+    def object_coords(self, index: int) -> npt.NDArray[np.float64]:
+        """
+        :param index: Map object index.
+        :return <num_points, 2> coordinates of a map object.
+        """
+        return self.coords[self.offsets[index] : self.offsets[index + 1]]  # type: ignore
+
+    def select_in_box(self, x_min: float, y_min: float, x_max: float, y_max: float) -> MapLayerGeometry:
+        """
+        Select map objects whose bounds intersect an axis aligned box.
+        :param x_min: Minimum x of the box.
+        :param y_min: Minimum y of the box.
+        :param x_max: Maximum x of the box.
+        :param y_max: Maximum y of the box.
+        :return Geometry of the selected map objects.
+        """
+        selected = (
+            (self.bounds[:, 0] <= x_max)
+            & (self.bounds[:, 2] >= x_min)
+            & (self.bounds[:, 1] <= y_max)
+            & (self.bounds[:, 3] >= y_min)
+        )
+        indices = np.flatnonzero(selected)
+        return MapLayerGeometry.from_object_coords(
+            object_ids=[self.object_ids[index] for index in indices],
+            object_coords=[self.object_coords(index) for index in indices],
+        )
+
+    @property
+    def line_xs(self) -> List[npt.NDArray[np.float64]]:
+        """:return A list of xs to render lines."""
+        return [self.object_coords(index)[:, 0] for index in range(len(self))]
+
+    @property
+    def line_ys(self) -> List[npt.NDArray[np.float64]]:
+        """:return A list of ys to render lines."""
+        return [self.object_coords(index)[:, 1] for index in range(len(self))]
+
+    @property
+    def polygon_xs(self) -> List[List[List[npt.NDArray[np.float64]]]]:
+        """:return A list of xs to render polygons."""
+        return [[[xs]] for xs in self.line_xs]
+
+    @property
+    def polygon_ys(self) -> List[List[List[npt.NDArray[np.float64]]]]:
+        """:return A list of ys to render polygons."""
+        return [[[ys]] for ys in self.line_ys]
+
+
+@dataclass(frozen=True)
+class MapRenderLayers:
+    """Flattened geometry of map layers to be rendered."""
+
+    polygons: Dict[SemanticMapLayer, MapLayerGeometry]  # Polygon exteriors of each layer
+    lines: Dict[SemanticMapLayer, MapLayerGeometry]  # Baseline paths of each layer
+
+
+class MapRenderCache:
+    """
+    Cache of map geometry for rendering maps in nuBoard.
+    Maps are split into square tiles, the geometry of a tile is extracted from the map api once and stored as flat
+    numpy arrays. Tiles can be persisted to disk, so that they are shared by nuBoard sessions and runs. The least
+    recently used tiles are evicted from memory beyond the maximum number of tiles.
+    """
+
+    def __init__(
+        self,
+        tile_size: float = 200.0,
+        cache_dir: Optional[Path] = None,
+        polygon_layers: Optional[List[SemanticMapLayer]] = None,
+        line_layers: Optional[List[SemanticMapLayer]] = None,
+        max_tiles: int = 256,
+    ):
+        """
+        Constructor of MapRenderCache.
+        :param tile_size: [m] Side length of a tile.
+        :param cache_dir: Folder to persist tiles, tiles are kept only in memory if None.
+        :param polygon_layers: Map layers rendered as polygons.
+        :param line_layers: Map layers rendered as lines.
+        :param max_tiles: Maximum number of tiles kept in memory.
+        """
+        assert tile_size > 0.0, f"Tile size has to be positive, got {tile_size}!"
+        assert max_tiles > 0, f"Maximum number of tiles has to be positive, got {max_tiles}!"
+
+        self._tile_size = tile_size
+        self._cache_dir = cache_dir
+        self._polygon_layers = polygon_layers if polygon_layers is not None else DEFAULT_POLYGON_LAYERS
+        self._line_layers = line_layers if line_layers is not None else DEFAULT_LINE_LAYERS
+        self._max_tiles = max_tiles
+        # Tiles by map name, map version and tile index, in order of use
+        self._tiles: OrderedDict[Tuple[str, str, TileIndex], MapRenderLayers] = OrderedDict()
+        # Locks of the tiles being loaded, such that a tile is loaded once while other tiles are served meanwhile
+        self._tile_locks: Dict[Tuple[str, str, TileIndex], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def num_tiles(self) -> int:
+        """:return Number of tiles in memory."""
+        return len(self._tiles)
+
+    def _tile_indices(self, x_min: float, y_min: float, x_max: float, y_max: float) -> List[TileIndex]:
+        """
+        Get indices of the tiles that cover an axis aligned box.
+        :param x_min: Minimum x of the box.
+        :param y_min: Minimum y of the box.
+        :param x_max: Maximum x of the box.
+        :param y_max: Maximum y of the box.
+        :return A list of tile indices.
+        """
+        i_min, i_max = math.floor(x_min / self._tile_size), math.floor(x_max / self._tile_size)
+        j_min, j_max = math.floor(y_min / self._tile_size), math.floor(y_max / self._tile_size)
+        return [(i, j) for i in range(i_min, i_max + 1) for j in range(j_min, j_max + 1)]
+
+    def _tile_path(self, map_name: str, map_version: str, tile_index: TileIndex) -> Optional[Path]:
+        """
+        :param map_name: Map name.
+        :param map_version: Version of the map data.
+        :param tile_index: Tile index.
+        :return Path of a persisted tile, None if tiles are not persisted.
+        """
+        if self._cache_dir is None:
+            return None
+
+        layer_names = ','.join([layer.name for layer in self._polygon_layers]) + ';'
+        layer_names += ','.join([layer.name for layer in self._line_layers])
+        layers_key = f'{self._tile_size:g}_{hashlib.md5(layer_names.encode()).hexdigest()[:8]}'
+        return self._cache_dir / map_name / map_version / layers_key / f'{tile_index[0]}_{tile_index[1]}.npz'
+
+    def _extract_tile(self, map_api: AbstractMap, tile_index: TileIndex) -> MapRenderLayers:
+        """
+        Extract geometry of a tile from the map api.
+        :param map_api: Map api.
+        :param tile_index: Tile index.
+        :return Geometry of the tile.
+        """
+        half_size = self._tile_size / 2
+        center = Point2D(x=tile_index[0] * self._tile_size + half_size, y=tile_index[1] * self._tile_size + half_size)
+        layers = list(dict.fromkeys(self._polygon_layers + self._line_layers))
+        map_objects = map_api.get_proximal_map_objects(center, half_size, layers)
+
+        polygons = {}
+        for layer in self._polygon_layers:
+            layer_objects = map_objects[layer]
+            # Filter out stop polygons in turn stop
+            if layer == SemanticMapLayer.STOP_LINE:
+                layer_objects = [
+                    map_object for map_object in layer_objects if map_object.stop_line_type != StopLineType.TURN_STOP
+                ]
+            polygons[layer] = MapLayerGeometry.from_object_coords(
+                object_ids=[str(map_object.id) for map_object in layer_objects],
+                object_coords=[
+                    np.asarray(map_object.polygon.exterior.coords, dtype=np.float64)[:, :2]
+                    for map_object in layer_objects
+                ],
+            )
+
+        lines = {}
+        for layer in self._line_layers:
+            layer_objects = map_objects[layer]
+            lines[layer] = MapLayerGeometry.from_object_coords(
+                object_ids=[str(map_object.id) for map_object in layer_objects],
+                object_coords=[
+                    np.asarray([[pose.x, pose.y] for pose in map_object.baseline_path.discrete_path], dtype=np.float64)
+                    for map_object in layer_objects
+                ],
+            )
+
+        return MapRenderLayers(polygons=polygons, lines=lines)
+
+    @staticmethod
+    def _save_tile(tile: MapRenderLayers, path: Path) -> None:
+        """
+        Persist a tile to disk.
+        :param tile: Geometry of the tile.
+        :param path: Path of the persisted tile.
+        """
+        arrays = {}
+        for kind, geometries in [('polygons', tile.polygons), ('lines', tile.lines)]:
+            for layer, geometry in geometries.items():
+                prefix = f'{kind}.{layer.name}'
+                arrays[f'{prefix}.object_ids'] = np.asarray(geometry.object_ids, dtype=np.str_)
+                arrays[f'{prefix}.coords'] = geometry.coords
+                arrays[f'{prefix}.offsets'] = geometry.offsets
+                arrays[f'{prefix}.bounds'] = geometry.bounds
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so that concurrent readers never see a partially written tile
+        tmp_path = path.with_name(f'{path.stem}.{threading.get_ident()}.tmp.npz')
+        np.savez(tmp_path, **arrays)
+        tmp_path.replace(path)
+
+    def _load_tile(self, path: Path) -> MapRenderLayers:
+        """
+        Load a persisted tile.
+        :param path: Path of the persisted tile.
+        :return Geometry of the tile.
+        """
+        with np.load(path) as arrays:
+            geometries: Dict[str, Dict[SemanticMapLayer, MapLayerGeometry]] = {}
+            for kind, layers in [('polygons', self._polygon_layers), ('lines', self._line_layers)]:
+                geometries[kind] = {}
+                for layer in layers:
+                    prefix = f'{kind}.{layer.name}'
+                    geometries[kind][layer] = MapLayerGeometry(
+                        object_ids=arrays[f'{prefix}.object_ids'].tolist(),
+                        coords=arrays[f'{prefix}.coords'].reshape(-1, 2),
+                        offsets=arrays[f'{prefix}.offsets'],
+                        bounds=arrays[f'{prefix}.bounds'].reshape(-1, 4),
+                    )
+
+        return MapRenderLayers(polygons=geometries['polygons'], lines=geometries['lines'])
+
+    def get_tile(self, map_api: AbstractMap, tile_index: TileIndex) -> MapRenderLayers:
+        """
+        Get geometry of a tile, from memory, from disk or from the map api in this order.
+        :param map_api: Map api.
+        :param tile_index: Tile index.
+        :return Geometry of the tile.
+        """
+        map_version = get_map_version(map_api)
+        key = (map_api.map_name, map_version, tile_index)
+        with self._lock:
+            tile = self._get_cached_tile(key)
+            if tile is not None:
+                return tile
+            tile_lock = self._tile_locks.setdefault(key, threading.Lock())
+
+        with tile_lock:
+            # The tile may have been loaded while waiting for its lock
+            with self._lock:
+                tile = self._get_cached_tile(key)
+            if tile is not None:
+                return tile
+
+            path = self._tile_path(map_name=map_api.map_name, map_version=map_version, tile_index=tile_index)
+            if path is not None and path.exists():
+                tile = self._load_tile(path)
+            else:
+                tile = self._extract_tile(map_api=map_api, tile_index=tile_index)
+                if path is not None:
+                    self._save_tile(tile=tile, path=path)
+
+            with self._lock:
+                self._tiles[key] = tile
+                while len(self._tiles) > self._max_tiles:
+                    self._tiles.popitem(last=False)
+                if self._tile_locks.get(key, None) is tile_lock:
+                    del self._tile_locks[key]
+
+        return tile
+
+    def _get_cached_tile(self, key: Tuple[str, str, TileIndex]) -> Optional[MapRenderLayers]:
+        """
+        Get a tile from memory and mark it as most recently used, the cache lock has to be held.
+        :param key: Map name, map version and tile index.
+        :return Geometry of the tile, None if it is not in memory.
+        """
+        tile = self._tiles.get(key, None)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+
+        return tile
+
+    def query(self, map_api: AbstractMap, center: Point2D, radius: float) -> MapRenderLayers:
+        """
+        Get geometry of the map objects around a point.
+        :param map_api: Map api.
+        :param center: Query point.
+        :param radius: [m] Half side length of the query box around the point.
+        :return Geometry of the map objects whose bounds intersect the query box.
+        """
+        x_min, x_max = center.x - radius, center.x + radius
+        y_min, y_max = center.y - radius, center.y + radius
+        tiles = [
+            self.get_tile(map_api=map_api, tile_index=tile_index)
+            for tile_index in self._tile_indices(x_min=x_min, y_min=y_min, x_max=x_max, y_max=y_max)
+        ]
+
+        # Objects crossing tile borders are stored in every tile they intersect, concatenate removes duplicates
+        polygons = {
+            layer: MapLayerGeometry.concatenate(
+                tile.polygons[layer].select_in_box(x_min=x_min, y_min=y_min, x_max=x_max, y_max=y_max) for tile in tiles
+            )
+            for layer in self._polygon_layers
+        }
+        lines = {
+            layer: MapLayerGeometry.concatenate(
+                tile.lines[layer].select_in_box(x_min=x_min, y_min=y_min, x_max=x_max, y_max=y_max) for tile in tiles
+            )
+            for layer in self._line_layers
+        }
+
+        return MapRenderLayers(polygons=polygons, lines=lines)
@@ -1,17 +1,18 @@
 from __future__ import annotations
 
 import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, NamedTuple, Optional, Union
 
 import numpy as np
+import numpy.typing as npt
 from bokeh.models import Button, ColumnDataSource, GlyphRenderer, HoverTool, LayoutDOM, Legend, Slider, Title
 from bokeh.plotting.figure import Figure
 
 from nuplan.common.actor_state.state_representation import Point2D, StateSE2
 from nuplan.common.actor_state.vehicle_parameters import VehicleParameters
 from nuplan.common.geometry.transform import translate_longitudinally
-from nuplan.common.maps.abstract_map_objects import LaneConnector
 from nuplan.common.maps.maps_datatypes import SemanticMapLayer
 from nuplan.planning.nuboard.style import (
     simulation_map_layer_color,
@@ -20,8 +21,9 @@ from nuplan.planning.nuboard.style import (
     simulation_tile_trajectory_style,
 )
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
-from nuplan.planning.simulation.history.simulation_history import SimulationHistory
+from nuplan.planning.simulation.history.simulation_history import SimulationHistory, SimulationHistorySample
 from nuplan.planning.simulation.observation.observation_type import DetectionsTracks
+from nuplan.planning.simulation.simulation_log import LazySimulationHistory
 from nuplan.planning.utils.serialization.to_scene import tracked_object_types
 
 
@@ -141,43 +143,54 @@ class TrafficLightPlot:
                 self.plot.data_source.data = data_sources
 
     def update_data_sources(
-        self, scenario: AbstractScenario, history: SimulationHistory, lane_connectors: Dict[str, LaneConnector]
+        self,
+        scenario: AbstractScenario,
+        history: SimulationHistory,
+        lane_connectors: Dict[str, npt.NDArray[np.float64]],
     ) -> None:
         """
         Update traffic light status datasource of each frame.
         :param scenario: Scenario traffic light status information.
         :param history: SimulationHistory time-series data.
-        :param lane_connectors: Lane connectors.
+        :param lane_connectors: Lane connector id: <num_points, 2> baseline path of the lane connector.
+        """
+        for frame_index, sample in enumerate(history.data):
+            self.update_data_source(frame_index=frame_index, sample=sample, lane_connectors=lane_connectors)
+
+    def update_data_source(
+        self, frame_index: int, sample: SimulationHistorySample, lane_connectors: Dict[str, npt.NDArray[np.float64]]
+    ) -> None:
+        """
+        Update traffic light status datasource of a frame.
+        :param frame_index: Frame index.
+        :param sample: Simulation history sample of the frame.
+        :param lane_connectors: Lane connector id: <num_points, 2> baseline path of the lane connector.
         """
         if not self.condition:
             return
 
         with self.condition:
-            for frame_index in range(len(history.data)):
-                traffic_light_status = history.data[frame_index].traffic_light_status
-
-                traffic_light_map_line = TrafficLightMapLine(point_2d=[], line_colors=[], line_color_alphas=[])
-                lane_connector_colors = simulation_map_layer_color[SemanticMapLayer.LANE_CONNECTOR]
-                for traffic_light in traffic_light_status:
-                    lane_connector = lane_connectors.get(str(traffic_light.lane_connector_id), None)
-
-                    if lane_connector is not None:
-                        path = lane_connector.baseline_path.discrete_path
-                        points = [Point2D(x=pose.x, y=pose.y) for pose in path]
-                        traffic_light_map_line.line_colors.append(traffic_light.status.name)
-                        traffic_light_map_line.line_color_alphas.append(lane_connector_colors["line_color_alpha"])
-                        traffic_light_map_line.point_2d.append(points)
-
-                line_source = ColumnDataSource(
-                    dict(
-                        xs=traffic_light_map_line.line_xs,
-                        ys=traffic_light_map_line.line_ys,
-                        line_colors=traffic_light_map_line.line_colors,
-                        line_color_alphas=traffic_light_map_line.line_color_alphas,
-                    )
+            traffic_light_map_line = TrafficLightMapLine(point_2d=[], line_colors=[], line_color_alphas=[])
+            lane_connector_colors = simulation_map_layer_color[SemanticMapLayer.LANE_CONNECTOR]
+            for traffic_light in sample.traffic_light_status:
+                lane_connector_path = lane_connectors.get(str(traffic_light.lane_connector_id), None)
+
+                if lane_connector_path is not None:
+                    points = [Point2D(x=x, y=y) for x, y in lane_connector_path]
+                    traffic_light_map_line.line_colors.append(traffic_light.status.name)
+                    traffic_light_map_line.line_color_alphas.append(lane_connector_colors["line_color_alpha"])
+                    traffic_light_map_line.point_2d.append(points)
+
+            line_source = ColumnDataSource(
+                dict(
+                    xs=traffic_light_map_line.line_xs,
+                    ys=traffic_light_map_line.line_ys,
+                    line_colors=traffic_light_map_line.line_colors,
+                    line_color_alphas=traffic_light_map_line.line_color_alphas,
                 )
-                self.data_sources[frame_index] = line_source
-                self.condition.notify()
+            )
+            self.data_sources[frame_index] = line_source
+            self.condition.notify()
 
 
 @dataclass
@@ -263,40 +276,48 @@ class EgoStatePlot:
         Update ego_pose state data sources.
         :param history: SimulationHistory time-series data.
         """
+        for frame_index, sample in enumerate(history.data):
+            self.update_data_source(frame_index=frame_index, sample=sample)
+
+    def update_data_source(self, frame_index: int, sample: SimulationHistorySample) -> None:
+        """
+        Update ego_pose state data source of a frame.
+        :param frame_index: Frame index.
+        :param sample: Simulation history sample of the frame.
+        """
         if not self.condition:
             return
 
         with self.condition:
-            for frame_index, sample in enumerate(history.data):
-                ego_pose = sample.ego_state.car_footprint
-                dynamic_car_state = sample.ego_state.dynamic_car_state
-                ego_corners = ego_pose.all_corners()
-
-                corner_xs = [corner.x for corner in ego_corners]
-                corner_ys = [corner.y for corner in ego_corners]
-
-                # Connect to the first point
-                corner_xs.append(corner_xs[0])
-                corner_ys.append(corner_ys[0])
-                source = ColumnDataSource(
-                    dict(
-                        center_x=[ego_pose.center.x],
-                        center_y=[ego_pose.center.y],
-                        velocity_x=[dynamic_car_state.rear_axle_velocity_2d.x],
-                        velocity_y=[dynamic_car_state.rear_axle_velocity_2d.y],
-                        speed=[dynamic_car_state.speed],
-                        acceleration_x=[dynamic_car_state.rear_axle_acceleration_2d.x],
-                        acceleration_y=[dynamic_car_state.rear_axle_acceleration_2d.y],
-                        acceleration=[dynamic_car_state.acceleration],
-                        heading=[ego_pose.center.heading],
-                        steering_angle=[sample.ego_state.tire_steering_angle],
-                        yaw_rate=[sample.ego_state.dynamic_car_state.angular_velocity],
-                        xs=[[[corner_xs]]],
-                        ys=[[[corner_ys]]],
-                    )
+            ego_pose = sample.ego_state.car_footprint
+            dynamic_car_state = sample.ego_state.dynamic_car_state
+            ego_corners = ego_pose.all_corners()
+
+            corner_xs = [corner.x for corner in ego_corners]
+            corner_ys = [corner.y for corner in ego_corners]
+
+            # Connect to the first point
+            corner_xs.append(corner_xs[0])
+            corner_ys.append(corner_ys[0])
+            source = ColumnDataSource(
+                dict(
+                    center_x=[ego_pose.center.x],
+                    center_y=[ego_pose.center.y],
+                    velocity_x=[dynamic_car_state.rear_axle_velocity_2d.x],
+                    velocity_y=[dynamic_car_state.rear_axle_velocity_2d.y],
+                    speed=[dynamic_car_state.speed],
+                    acceleration_x=[dynamic_car_state.rear_axle_acceleration_2d.x],
+                    acceleration_y=[dynamic_car_state.rear_axle_acceleration_2d.y],
+                    acceleration=[dynamic_car_state.acceleration],
+                    heading=[ego_pose.center.heading],
+                    steering_angle=[sample.ego_state.tire_steering_angle],
+                    yaw_rate=[sample.ego_state.dynamic_car_state.angular_velocity],
+                    xs=[[[corner_xs]]],
+                    ys=[[[corner_ys]]],
                 )
-                self.data_sources[frame_index] = source
-                self.condition.notify()
+            )
+            self.data_sources[frame_index] = source
+            self.condition.notify()
 
 
 @dataclass
@@ -343,22 +364,30 @@ class EgoStateTrajectoryPlot:
         Update ego_pose trajectory data sources.
         :param history: SimulationHistory time-series data.
         """
+        for frame_index, sample in enumerate(history.data):
+            self.update_data_source(frame_index=frame_index, sample=sample)
+
+    def update_data_source(self, frame_index: int, sample: SimulationHistorySample) -> None:
+        """
+        Update ego_pose trajectory data source of a frame.
+        :param frame_index: Frame index.
+        :param sample: Simulation history sample of the frame.
+        """
         if not self.condition:
             return
 
         with self.condition:
-            for frame_index, sample in enumerate(history.data):
-                trajectory = sample.trajectory.get_sampled_trajectory()
+            trajectory = sample.trajectory.get_sampled_trajectory()
 
-                x_coords = []
-                y_coords = []
-                for state in trajectory:
-                    x_coords.append(state.center.x)
-                    y_coords.append(state.center.y)
+            x_coords = []
+            y_coords = []
+            for state in trajectory:
+                x_coords.append(state.center.x)
+                y_coords.append(state.center.y)
 
-                source = ColumnDataSource(dict(xs=x_coords, ys=y_coords))
-                self.data_sources[frame_index] = source
-                self.condition.notify()
+            source = ColumnDataSource(dict(xs=x_coords, ys=y_coords))
+            self.data_sources[frame_index] = source
+            self.condition.notify()
 
 
 @dataclass
@@ -446,16 +475,23 @@ class AgentStatePlot:
         Update agents data sources.
         :param history: SimulationHistory time-series data.
         """
+        for frame_index, sample in enumerate(history.data):
+            if isinstance(sample.observation, DetectionsTracks):
+                self.update_data_source(frame_index=frame_index, sample=sample)
+
+    def update_data_source(self, frame_index: int, sample: SimulationHistorySample) -> None:
+        """
+        Update agents data source of a frame, it has no agents if the observation is not DetectionsTracks.
+        :param frame_index: Frame index.
+        :param sample: Simulation history sample of the frame.
+        """
         if not self.condition:
             return
 
         with self.condition:
-            for frame_index, sample in enumerate(history.data):
-                if not isinstance(sample.observation, DetectionsTracks):
-                    continue
-
+            frame_dict = {}
+            if isinstance(sample.observation, DetectionsTracks):
                 tracked_objects = sample.observation.tracked_objects
-                frame_dict = {}
                 for tracked_object_type_name, tracked_object_type in tracked_object_types.items():
                     corner_xs = []
                     corner_ys = []
@@ -503,8 +539,8 @@ class AgentStatePlot:
 
                     frame_dict[tracked_object_type_name] = ColumnDataSource(agent_states._asdict())
 
-                self.data_sources[frame_index] = frame_dict
-                self.condition.notify()
+            self.data_sources[frame_index] = frame_dict
+            self.condition.notify()
 
 
 @dataclass
@@ -557,16 +593,23 @@ class AgentStateHeadingPlot:
         Update agent heading data sources.
         :param history: SimulationHistory time-series data.
         """
+        for frame_index, sample in enumerate(history.data):
+            if isinstance(sample.observation, DetectionsTracks):
+                self.update_data_source(frame_index=frame_index, sample=sample)
+
+    def update_data_source(self, frame_index: int, sample: SimulationHistorySample) -> None:
+        """
+        Update agent heading data source of a frame, it has no agents if the observation is not DetectionsTracks.
+        :param frame_index: Frame index.
+        :param sample: Simulation history sample of the frame.
+        """
         if not self.condition:
             return
 
         with self.condition:
-            for frame_index, sample in enumerate(history.data):
-                if not isinstance(sample.observation, DetectionsTracks):
-                    continue
-
+            frame_dict: Dict[str, Any] = {}
+            if isinstance(sample.observation, DetectionsTracks):
                 tracked_objects = sample.observation.tracked_objects
-                frame_dict: Dict[str, Any] = {}
                 for tracked_object_type_name, tracked_object_type in tracked_object_types.items():
                     trajectory_xs = []
                     trajectory_ys = []
@@ -586,8 +629,8 @@ class AgentStateHeadingPlot:
                     )
                     frame_dict[tracked_object_type_name] = trajectories
 
-                self.data_sources[frame_index] = frame_dict
-                self.condition.notify()
+            self.data_sources[frame_index] = frame_dict
+            self.condition.notify()
 
 
 @dataclass
@@ -620,16 +663,24 @@ class SimulationFigure:
     agent_state_heading_plot: Optional[AgentStateHeadingPlot] = None  # Agent state heading plot
 
     # Optional simulation data
-    lane_connectors: Optional[Dict[str, LaneConnector]] = None  # Lane connector id: lane connector
+    lane_connectors: Optional[Dict[str, npt.NDArray[np.float64]]] = None  # Lane connector id: baseline path
 
     # Dataclass
     glyph_names_from_checkbox_group: Optional[Dict[str, str]] = None  # Correct glyph names from checkbox groups
 
+    # Lazy loading, only used when the simulation history is a LazySimulationHistory
+    frame_cache_size: int = 64  # Maximum number of frames whose data sources are kept in memory
+    prefetch_frames: int = 16  # Number of upcoming frames to decode in the background
+
     def __post_init__(self) -> None:
         """Initialize all plots and data sources."""
         if self.lane_connectors is None:
             self.lane_connectors = {}
 
+        self._frame_lock = threading.Lock()
+        self._cached_frames: OrderedDict[int, None] = OrderedDict()
+        self._prefetch_thread: Optional[threading.Thread] = None
+
         if self.time_us is None:
             self.time_us = []
 
@@ -673,18 +724,115 @@ class SimulationFigure:
         self.agent_state_plot.data_sources = other.agent_state_plot.data_sources  # type: ignore
         self.agent_state_heading_plot.data_sources = other.agent_state_heading_plot.data_sources  # type: ignore
 
+        if self.is_lazy:
+            # Frames are evicted independently in each figure, so data sources must not be shared
+            for plot in self._frame_plots:
+                plot.data_sources = dict(plot.data_sources)
+            self._cached_frames = OrderedDict(other._cached_frames)
+
+    @property
+    def is_lazy(self) -> bool:
+        """:return True if data sources are built on demand for each frame instead of for all frames at once."""
+        return isinstance(self.simulation_history, LazySimulationHistory)
+
+    @property
+    def _frame_plots(self) -> List[Any]:
+        """:return Plots with data sources for each frame."""
+        return [
+            self.traffic_light_plot,
+            self.ego_state_plot,
+            self.ego_state_trajectory_plot,
+            self.agent_state_plot,
+            self.agent_state_heading_plot,
+        ]
+
+    def _prefetch(self, frame_indices: List[int]) -> None:
+        """
+        Decode simulation history samples in the background, so that they are cached when they are rendered.
+        :param frame_indices: Frame indices to decode.
+        """
+        for frame_index in frame_indices:
+            # Accessing a sample decodes it into the cache of the simulation log reader
+            _ = self.simulation_history.data[frame_index]
+
+    def _start_prefetch(self, frame_index: int) -> None:
+        """
+        Start decoding the frames following a frame in a background thread, if no prefetch is running.
+        :param frame_index: Frame index.
+        """
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+            return
+
+        num_frames = len(self.simulation_history.data)
+        frame_indices = list(range(frame_index + 1, min(frame_index + 1 + self.prefetch_frames, num_frames)))
+        if not frame_indices:
+            return
+
+        self._prefetch_thread = threading.Thread(target=self._prefetch, args=(frame_indices,), daemon=True)
+        self._prefetch_thread.start()
+
+    def is_frame_prepared(self, frame_index: int) -> bool:
+        """
+        :param frame_index: Frame index.
+        :return True if the data sources of a frame are available without decoding it.
+        """
+        if not self.is_lazy:
+            return True
+
+        with self._frame_lock:
+            return frame_index in self._cached_frames
+
+    def prepare_frame(self, frame_index: int) -> None:
+        """
+        Build data sources of a frame if they are not available, and evict the least recently used frames when the
+        frame cache is full. It does nothing if data sources are built for all frames at once.
+        :param frame_index: Frame index.
+        """
+        if not self.is_lazy:
+            return
+
+        with self._frame_lock:
+            if frame_index in self._cached_frames:
+                self._cached_frames.move_to_end(frame_index)
+            else:
+                sample = self.simulation_history.data[frame_index]
+                if self.lane_connectors is not None and len(self.lane_connectors):
+                    self.traffic_light_plot.update_data_source(  # type: ignore
+                        frame_index=frame_index, sample=sample, lane_connectors=self.lane_connectors
+                    )
+                self.ego_state_plot.update_data_source(frame_index=frame_index, sample=sample)  # type: ignore
+                self.ego_state_trajectory_plot.update_data_source(  # type: ignore
+                    frame_index=frame_index, sample=sample
+                )
+                self.agent_state_plot.update_data_source(frame_index=frame_index, sample=sample)  # type: ignore
+                self.agent_state_heading_plot.update_data_source(frame_index=frame_index, sample=sample)  # type: ignore
+                self._cached_frames[frame_index] = None
+
+            while len(self._cached_frames) > max(self.frame_cache_size, 1):
+                evicted_frame_index, _ = self._cached_frames.popitem(last=False)
+                for plot in self._frame_plots:
+                    with plot.condition:
+                        plot.data_sources.pop(evicted_frame_index, None)
+
+        self._start_prefetch(frame_index=frame_index)
+
     def update_data_sources(self) -> None:
         """
         Update data sources in a multi-threading manner to speed up loading and initialization in
-        scenario rendering.
+        scenario rendering. For a LazySimulationHistory, only the first frame is built and the following frames are
+        decoded in the background, other frames are built on demand in prepare_frame.
         """
-        assert self.simulation_history.data, "SimulationHistory cannot be empty!"
+        assert len(self.simulation_history.data), "SimulationHistory cannot be empty!"
 
         # Update slider steps
         self.slider.end = len(self.simulation_history.data) - 1
 
         # Update time_us
-        self.time_us = [sample.ego_state.time_us for sample in self.simulation_history.data]
+        self.time_us = [ego_state.time_us for ego_state in self.simulation_history.extract_ego_state]
+
+        if self.is_lazy:
+            self.prepare_frame(frame_index=0)
+            return
 
         # Update ego pose states
         if not self.ego_state_plot:
@@ -3,10 +3,12 @@ import logging
 import lzma
 import pathlib
 import pickle
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import cv2
 import msgpack
@@ -16,23 +18,26 @@ from bokeh.document.document import Document
 from bokeh.events import PointEvent
 from bokeh.io.export import get_screenshot_as_png
 from bokeh.layouts import column, gridplot
-from bokeh.models import Button, ColumnDataSource, Slider, Title
+from bokeh.models import Button, ColumnDataSource, Div, Slider, Title
 from bokeh.plotting.figure import Figure
 from selenium import webdriver
 from tornado import gen
 from tqdm import tqdm
 
 from nuplan.common.actor_state.ego_state import EgoState
-from nuplan.common.actor_state.state_representation import Point2D
+from nuplan.common.actor_state.state_representation import Point2D, StateSE2
 from nuplan.common.actor_state.vehicle_parameters import VehicleParameters
 from nuplan.common.maps.abstract_map import AbstractMap
 from nuplan.common.maps.abstract_map_factory import AbstractMapFactory
-from nuplan.common.maps.maps_datatypes import SemanticMapLayer, StopLineType
+from nuplan.common.maps.maps_datatypes import SemanticMapLayer
 from nuplan.planning.nuboard.base.data_class import SimulationScenarioKey
 from nuplan.planning.nuboard.base.experiment_file_data import ExperimentFileData
-from nuplan.planning.nuboard.base.plot_data import MapPoint, SimulationData, SimulationFigure
+from nuplan.planning.nuboard.base.map_render_cache import MapRenderCache, MapRenderLayers
+from nuplan.planning.nuboard.base.plot_data import SimulationData, SimulationFigure
 from nuplan.planning.nuboard.style import simulation_map_layer_color, simulation_tile_style
-from nuplan.planning.simulation.simulation_log import SimulationLog
+from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
+from nuplan.planning.simulation.history.simulation_history import SimulationHistory
+from nuplan.planning.simulation.simulation_log import SimulationLogReader
 
 try:
     import chromedriver_binary
@@ -43,6 +48,16 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class LoadedSimulation:
+    """Simulation log of a figure, with the data its scenario is rendered from, loaded off the document thread."""
+
+    simulation_log: SimulationLogReader  # Simulation log, with its first frame decoded
+    map_layers: MapRenderLayers  # Map geometry around the initial ego pose
+    expert_ego_trajectory: List[EgoState]  # Expert ego states of the scenario
+    mission_goal: Optional[StateSE2]  # Mission goal of the scenario
+
+
 def extract_source_from_states(states: List[EgoState]) -> ColumnDataSource:
     """Helper function to get the xy coordinates into ColumnDataSource format from a list of states.
     :param states: List of states (containing the pose)
@@ -116,6 +131,7 @@ class SimulationTile:
         map_factory: AbstractMapFactory,
         period_milliseconds: int = 5000,
         radius: float = 300.0,
+        map_render_cache: Optional[MapRenderCache] = None,
     ):
         """
         Scenario simulation tile.
@@ -125,6 +141,7 @@ class SimulationTile:
         :param map_factory: Map factory for building maps.
         :param period_milliseconds: Milli seconds to update the tile.
         :param radius: Map radius.
+        :param map_render_cache: Cache of map geometry shared by simulation tiles, a new one is created if None.
         """
         self._doc = doc
         self._vehicle_parameters = vehicle_parameters
@@ -135,12 +152,21 @@ class SimulationTile:
         self._selected_scenario_keys: List[SimulationScenarioKey] = []
         self._executor = ThreadPoolExecutor(max_workers=4)
         self._maps: Dict[str, AbstractMap] = {}
-        self._figures: List[SimulationFigure] = []
+        self._maps_lock = threading.Lock()
+        self._map_render_cache = map_render_cache if map_render_cache is not None else MapRenderCache()
+        # Figures of the selected scenario keys by figure index, figures are added once their simulation log is loaded
+        self._figures: Dict[int, SimulationFigure] = {}
+        # Incremented on every initialization, such that logs still loading for previous selections are discarded
+        self._initialization_id = 0
+        # Loads of the simulation logs, done once the creation of their figures is scheduled
+        self._simulation_log_futures: List[Future[None]] = []
+        # Decoding of the frames selected with the slider of every figure, rendered once decoded
+        self._frame_futures: Dict[int, Future[None]] = {}
 
     @property
     def get_figure_data(self) -> List[SimulationFigure]:
         """Return figure data."""
-        return self._figures
+        return self.figures
 
     def _on_mouse_move(self, event: PointEvent, figure_index: int) -> None:
         """
@@ -155,14 +181,30 @@ class SimulationTile:
             f"y [m]: {np.round(event.y, simulation_tile_style['decimal_points'])}"
         )
 
+    def _load_simulation_log(self, figure_index: int) -> SimulationLogReader:
+        """
+        Load the simulation log of a selected scenario, frames are decoded on demand if the file supports it.
+        :param figure_index: Figure index.
+        :return: A simulation log reader.
+        """
+        selected_scenario_key = self._selected_scenario_keys[figure_index]
+        assert len(selected_scenario_key.files) == 1, "Expected one file containing the serialized SimulationLog."
+        simulation_file = next(iter(selected_scenario_key.files))
+        return SimulationLogReader(file_path=simulation_file)
+
     def _create_initial_figure(
-        self, figure_index: int, figure_sizes: List[int], backend: Optional[str] = "webgl"
+        self,
+        figure_index: int,
+        figure_sizes: List[int],
+        backend: Optional[str] = "webgl",
+        simulation_log: Optional[SimulationLogReader] = None,
     ) -> SimulationFigure:
         """
         Create an initial Bokeh figure.
         :param figure_index: Figure index.
         :param figure_sizes: width and height in pixels.
         :param backend: Bokeh figure backend.
+        :param simulation_log: Simulation log of the figure, loaded from the selected file if None.
         :return: A Bokeh figure.
         """
         selected_scenario_key = self._selected_scenario_keys[figure_index]
@@ -209,9 +251,8 @@ class SimulationTile:
         )
         video_button.on_click(partial(self._video_button_on_click, figure_index=figure_index))
 
-        assert len(selected_scenario_key.files) == 1, "Expected one file containing the serialized SimulationLog."
-        simulation_file = next(iter(selected_scenario_key.files))
-        simulation_log = SimulationLog.load_data(simulation_file)
+        if simulation_log is None:
+            simulation_log = self._load_simulation_log(figure_index=figure_index)
 
         simulation_figure_data = SimulationFigure(
             figure=simulation_figure,
@@ -234,67 +275,186 @@ class SimulationTile:
         :param map_name: Map name.
         :return Map api.
         """
-        if map_name not in self._maps:
-            self._maps[map_name] = self._map_factory.build_map_from_name(map_name)
+        # Maps are built from the background threads loading the simulation logs
+        with self._maps_lock:
+            if map_name not in self._maps:
+                self._maps[map_name] = self._map_factory.build_map_from_name(map_name)
 
-        return self._maps[map_name]
+            return self._maps[map_name]
 
-    def init_simulations(self, figure_sizes: List[int]) -> None:
+    def _load_simulation(self, figure_index: int) -> LoadedSimulation:
+        """
+        Load the simulation log of a figure and the data its scenario is rendered from.
+        :param figure_index: Figure index.
+        :return: Loaded simulation.
+        """
+        simulation_log = self._load_simulation_log(figure_index=figure_index)
+        map_layers = self._query_map_layers(
+            scenario=simulation_log.scenario, simulation_history=simulation_log.simulation_history
+        )
+        expert_ego_trajectory = list(simulation_log.scenario.get_expert_ego_trajectory())
+        mission_goal = simulation_log.scenario.get_mission_goal()
+
+        # Decode the first frame into the cache of the reader, it is rendered right away
+        _ = simulation_log.simulation_history.data[0]
+
+        return LoadedSimulation(
+            simulation_log=simulation_log,
+            map_layers=map_layers,
+            expert_ego_trajectory=expert_ego_trajectory,
+            mission_goal=mission_goal,
+        )
+
+    def init_simulations(
+        self,
+        figure_sizes: List[int],
+        on_figure_created: Optional[Callable[[int, SimulationFigure, LoadedSimulation], None]] = None,
+    ) -> None:
         """
         Initialization of the visualization of simulation panel.
+        Simulation logs are loaded in parallel without blocking the calling Bokeh callback, only headers are decoded
+        for files that support lazy loading. The map and the expert trajectory of every scenario are queried along.
+        The figure of every log is created on the next tick of the document once the log is loaded.
         :param figure_sizes: Width and height in pixels.
+        :param on_figure_created: Called on the document tick with the figure index, figure and loaded simulation of
+            every new figure.
+        """
+        self._figures = {}
+        self._frame_futures = {}
+        self._initialization_id += 1
+
+        self._simulation_log_futures = [
+            self._executor.submit(
+                self._load_simulation_log_next_tick,
+                figure_index=figure_index,
+                figure_sizes=figure_sizes,
+                initialization_id=self._initialization_id,
+                on_figure_created=on_figure_created,
+            )
+            for figure_index in range(len(self._selected_scenario_keys))
+        ]
+
+    def _load_simulation_log_next_tick(
+        self,
+        figure_index: int,
+        figure_sizes: List[int],
+        initialization_id: int,
+        on_figure_created: Optional[Callable[[int, SimulationFigure, LoadedSimulation], None]],
+    ) -> None:
         """
-        self._figures = []
-        for figure_index in range(len(self._selected_scenario_keys)):
-            simulation_figure = self._create_initial_figure(figure_index=figure_index, figure_sizes=figure_sizes)
-            self._figures.append(simulation_figure)
+        Load the simulation of a figure and schedule the creation of the figure on the next tick of the document.
+        Note that this function is run on a background thread.
+        :param figure_index: Figure index.
+        :param figure_sizes: Width and height in pixels.
+        :param initialization_id: Id of the initialization that requested the figure.
+        :param on_figure_created: Called with the figure index, figure and loaded simulation once the figure is created.
+        """
+        try:
+            loaded_simulation = self._load_simulation(figure_index=figure_index)
+        except Exception as e:
+            logger.warning(f"Failed to load simulation log of figure {figure_index}: {e}")
+            return
+
+        self._doc.add_next_tick_callback(
+            partial(
+                self._create_loaded_figure,
+                figure_index=figure_index,
+                figure_sizes=figure_sizes,
+                loaded_simulation=loaded_simulation,
+                initialization_id=initialization_id,
+                on_figure_created=on_figure_created,
+            )
+        )
+
+    def _create_loaded_figure(
+        self,
+        figure_index: int,
+        figure_sizes: List[int],
+        loaded_simulation: LoadedSimulation,
+        initialization_id: int,
+        on_figure_created: Optional[Callable[[int, SimulationFigure, LoadedSimulation], None]],
+    ) -> None:
+        """
+        Create the figure of a loaded simulation, unless the simulations were initialized again since.
+        :param figure_index: Figure index.
+        :param figure_sizes: Width and height in pixels.
+        :param loaded_simulation: Loaded simulation of the figure.
+        :param initialization_id: Id of the initialization that requested the figure.
+        :param on_figure_created: Called with the figure index, figure and loaded simulation once the figure is created.
+        """
+        if initialization_id != self._initialization_id:
+            return
+
+        simulation_figure = self._create_initial_figure(
+            figure_index=figure_index, figure_sizes=figure_sizes, simulation_log=loaded_simulation.simulation_log
+        )
+        self._figures[figure_index] = simulation_figure
+        if on_figure_created is not None:
+            on_figure_created(figure_index, simulation_figure, loaded_simulation)
 
     @property
     def figures(self) -> List[SimulationFigure]:
         """
         Access bokeh figures.
-        :return A list of bokeh figures.
+        :return A list of bokeh figures that are created so far, in the order of the selected scenario keys.
         """
-        return self._figures
+        return [self._figures[figure_index] for figure_index in sorted(self._figures)]
 
-    def _render_simulation_layouts(self) -> List[SimulationData]:
-        """
-        Render simulation layouts.
-        :return: A list of columns or rows.
-        """
-        grid_layouts: List[SimulationData] = []
-        for simulation_figure in self.figures:
-            grid_layouts.append(
-                SimulationData(
-                    planner_name=simulation_figure.planner_name,
-                    simulation_figure=simulation_figure,
-                    plot=gridplot(
-                        [[simulation_figure.slider], [simulation_figure.figure], [simulation_figure.video_button]],
-                        toolbar_location="left",
-                    ),
-                )
-            )
-        return grid_layouts
+    @staticmethod
+    def _render_simulation_layout(simulation_figure: SimulationFigure) -> SimulationData:
+        """
+        Render the layout of a simulation figure.
+        :param simulation_figure: Simulation figure.
+        :return: Simulation data with the layout of the figure.
+        """
+        return SimulationData(
+            planner_name=simulation_figure.planner_name,
+            simulation_figure=simulation_figure,
+            plot=gridplot(
+                [[simulation_figure.slider], [simulation_figure.figure], [simulation_figure.video_button]],
+                toolbar_location="left",
+            ),
+        )
 
     def render_simulation_tiles(
         self,
         selected_scenario_keys: List[SimulationScenarioKey],
         figure_sizes: List[int] = simulation_tile_style['figure_sizes'],
         hidden_glyph_names: Optional[List[str]] = None,
-    ) -> List[SimulationData]:
+        on_simulations_rendered: Optional[Callable[[List[SimulationData]], None]] = None,
+    ) -> List[column]:
         """
         Render simulation tiles.
+        The layouts are returned right away and show a loading message, the simulation of every layout is rendered on
+        a later tick of the document once its simulation log is loaded.
         :param selected_scenario_keys: A list of selected scenario keys.
         :param figure_sizes: Width and height in pixels.
         :param hidden_glyph_names: A list of glyph names to be hidden.
-        :return A list of bokeh layouts.
+        :param on_simulations_rendered: Called with the simulation data of all selected scenario keys once they are
+            rendered.
+        :return A list of bokeh layouts, one per selected scenario key.
         """
         self._selected_scenario_keys = selected_scenario_keys
-        self.init_simulations(figure_sizes=figure_sizes)
-        for main_figure in tqdm(self._figures, desc="Rendering a scenario"):
-            self._render_scenario(main_figure, hidden_glyph_names=hidden_glyph_names)
+        layouts = [column(Div(text="Loading simulation...")) for _ in selected_scenario_keys]
+        simulation_data: Dict[int, SimulationData] = {}
+
+        def on_figure_created(
+            figure_index: int, simulation_figure: SimulationFigure, loaded_simulation: LoadedSimulation
+        ) -> None:
+            """Render the simulation of a new figure into its layout."""
+            self._render_scenario(
+                simulation_figure,
+                hidden_glyph_names=hidden_glyph_names,
+                map_layers=loaded_simulation.map_layers,
+                expert_ego_trajectory=loaded_simulation.expert_ego_trajectory,
+                mission_goal=loaded_simulation.mission_goal,
+            )
+            simulation_data[figure_index] = self._render_simulation_layout(simulation_figure)
+            layouts[figure_index].children = [simulation_data[figure_index].plot]
+            if len(simulation_data) == len(layouts) and on_simulations_rendered is not None:
+                on_simulations_rendered([simulation_data[index] for index in sorted(simulation_data)])
 
-        layouts = self._render_simulation_layouts()
+        self.init_simulations(figure_sizes=figure_sizes, on_figure_created=on_figure_created)
         return layouts
 
     @gen.coroutine
@@ -315,8 +475,8 @@ class SimulationTile:
         Reset a video button after exporting is done.
         :param figure_index: Figure index.
         """
-        self.figures[figure_index].video_button.label = "Render video"
-        self.figures[figure_index].video_button.disabled = False
+        self._figures[figure_index].video_button.label = "Render video"
+        self._figures[figure_index].video_button.disabled = False
 
     def _update_video_button_label(self, figure_index: int, label: str) -> None:
         """
@@ -324,7 +484,7 @@ class SimulationTile:
         :param figure_index: Figure index.
         :param label: New video button text.
         """
-        self.figures[figure_index].video_button.label = label
+        self._figures[figure_index].video_button.label = label
 
     def _video_button_next_tick(self, figure_index: int) -> None:
         """
@@ -344,7 +504,7 @@ class SimulationTile:
             video_path.mkdir(parents=True, exist_ok=True)
         video_save_path = video_path / video_name
 
-        scenario = self.figures[figure_index].scenario
+        scenario = self._figures[figure_index].scenario
         database_interval = scenario.database_interval
         selected_simulation_figure = self._figures[figure_index]
 
@@ -360,7 +520,7 @@ class SimulationTile:
                 # Copy the data sources
                 simulation_figure.copy_datasources(selected_simulation_figure)
                 self._render_scenario(main_figure=simulation_figure)
-                length = len(selected_simulation_figure.ego_state_plot.data_sources)
+                length = len(selected_simulation_figure.simulation_history.data)
                 for frame_index in tqdm(range(length), desc="Rendering video"):
                     self._render_plots(main_figure=simulation_figure, frame_index=frame_index)
                     image = get_screenshot_as_png(column(simulation_figure.figure), driver=driver)
@@ -397,20 +557,68 @@ class SimulationTile:
         :param figure_index: Figure index.
         """
         selected_figure = self._figures[figure_index]
-        if new != len(self._figures[figure_index].simulation_history.data):
+        if new == len(selected_figure.simulation_history.data):
+            return
+
+        if selected_figure.is_frame_prepared(frame_index=new):
             self._render_plots(main_figure=selected_figure, frame_index=new)
+        else:
+            # Decode the frame off the document thread, it is rendered on a later tick
+            self._frame_futures[figure_index] = self._executor.submit(
+                self._prepare_frame_next_tick, simulation_figure=selected_figure, frame_index=new
+            )
+
+    def _prepare_frame_next_tick(self, simulation_figure: SimulationFigure, frame_index: int) -> None:
+        """
+        Build the data sources of a frame and schedule its rendering on the next tick of the document.
+        Note that this function is run on a background thread.
+        :param simulation_figure: Simulation figure.
+        :param frame_index: Frame index.
+        """
+        try:
+            simulation_figure.prepare_frame(frame_index=frame_index)
+        except Exception as e:
+            logger.warning(f"Failed to decode frame {frame_index}: {e}")
+            return
+
+        self._doc.add_next_tick_callback(
+            partial(self._render_prepared_frame, simulation_figure=simulation_figure, frame_index=frame_index)
+        )
+
+    def _render_prepared_frame(self, simulation_figure: SimulationFigure, frame_index: int) -> None:
+        """
+        Render a frame decoded in the background, unless the slider moved to another frame since.
+        :param simulation_figure: Simulation figure.
+        :param frame_index: Frame index.
+        """
+        if simulation_figure.slider.value != frame_index:
+            return
 
-    def _render_scenario(self, main_figure: SimulationFigure, hidden_glyph_names: Optional[List[str]] = None) -> None:
+        self._render_plots(main_figure=simulation_figure, frame_index=frame_index)
+
+    def _render_scenario(
+        self,
+        main_figure: SimulationFigure,
+        hidden_glyph_names: Optional[List[str]] = None,
+        map_layers: Optional[MapRenderLayers] = None,
+        expert_ego_trajectory: Optional[List[EgoState]] = None,
+        mission_goal: Optional[StateSE2] = None,
+    ) -> None:
         """
         Render scenario.
+        Data not loaded in the background is queried from the scenario.
         :param main_figure: Simulation figure object.
         :param hidden_glyph_names: A list of glyph names to be hidden.
+        :param map_layers: Map geometry around the initial ego pose, queried if None.
+        :param expert_ego_trajectory: Expert ego states of the scenario, queried if None.
+        :param mission_goal: Mission goal of the scenario, queried if None.
         """
-        self._render_map(main_figure=main_figure)
+        self._render_map(main_figure=main_figure, map_layers=map_layers)
 
-        self._render_expert_trajectory(main_figure=main_figure)
+        self._render_expert_trajectory(main_figure=main_figure, expert_ego_trajectory=expert_ego_trajectory)
 
-        mission_goal = main_figure.scenario.get_mission_goal()
+        if mission_goal is None:
+            mission_goal = main_figure.scenario.get_mission_goal()
         if mission_goal is not None:
             main_figure.render_mission_goal(mission_goal_state=mission_goal)
 
@@ -418,34 +626,31 @@ class SimulationTile:
         main_figure.update_data_sources()
         self._render_plots(main_figure=main_figure, frame_index=0, hidden_glyph_names=hidden_glyph_names)
 
-    def _render_map(self, main_figure: SimulationFigure) -> None:
+    def _query_map_layers(self, scenario: AbstractScenario, simulation_history: SimulationHistory) -> MapRenderLayers:
         """
-        Render a map.
-        :param main_figure: Simulation figure.
+        Query the map geometry around the initial ego pose of a simulation.
+        :param scenario: Scenario of the simulation.
+        :param simulation_history: Simulation history.
+        :return Map geometry to render.
         """
-        map_name = main_figure.scenario.map_api.map_name
-        map_api = self._map_api(map_name)
-        layer_names = [
-            SemanticMapLayer.LANE_CONNECTOR,
-            SemanticMapLayer.LANE,
-            SemanticMapLayer.CROSSWALK,
-            SemanticMapLayer.INTERSECTION,
-            SemanticMapLayer.STOP_LINE,
-            SemanticMapLayer.WALKWAYS,
-            SemanticMapLayer.CARPARK_AREA,
-        ]
+        map_api = self._map_api(scenario.map_api.map_name)
 
-        assert main_figure.simulation_history.data, "No simulation history samples, unable to render the map."
-        ego_pose = main_figure.simulation_history.data[0].ego_state.center
+        assert len(simulation_history.data), "No simulation history samples, unable to render the map."
+        ego_pose = simulation_history.extract_ego_state[0].center
         center = Point2D(ego_pose.x, ego_pose.y)
 
-        nearest_vector_map = map_api.get_proximal_map_objects(center, self._radius, layer_names)
-        # Filter out stop polygons in turn stop
-        if SemanticMapLayer.STOP_LINE in nearest_vector_map:
-            stop_polygons = nearest_vector_map[SemanticMapLayer.STOP_LINE]
-            nearest_vector_map[SemanticMapLayer.STOP_LINE] = [
-                stop_polygon for stop_polygon in stop_polygons if stop_polygon.stop_line_type != StopLineType.TURN_STOP
-            ]
+        return self._map_render_cache.query(map_api=map_api, center=center, radius=self._radius)
+
+    def _render_map(self, main_figure: SimulationFigure, map_layers: Optional[MapRenderLayers] = None) -> None:
+        """
+        Render a map.
+        :param main_figure: Simulation figure.
+        :param map_layers: Map geometry around the initial ego pose, queried if None.
+        """
+        if map_layers is None:
+            map_layers = self._query_map_layers(
+                scenario=main_figure.scenario, simulation_history=main_figure.simulation_history
+            )
 
         # Draw polygons
         polygon_layer_names = [
@@ -458,14 +663,7 @@ class SimulationTile:
         ]
 
         for layer_name, color in polygon_layer_names:
-            layer = nearest_vector_map[layer_name]
-            map_polygon = MapPoint(point_2d=[])
-
-            for map_obj in layer:
-                coords = map_obj.polygon.exterior.coords
-                points = [Point2D(x=x, y=y) for x, y in coords]
-                map_polygon.point_2d.append(points)
-
+            map_polygon = map_layers.polygons[layer_name]
             polygon_source = ColumnDataSource(
                 dict(
                     xs=map_polygon.polygon_xs,
@@ -487,13 +685,7 @@ class SimulationTile:
             (SemanticMapLayer.LANE_CONNECTOR, simulation_map_layer_color[SemanticMapLayer.LANE_CONNECTOR]),
         ]
         for layer_name, color in line_layer_names:
-            layer = nearest_vector_map[layer_name]
-            map_line = MapPoint(point_2d=[])
-            for map_obj in layer:
-                path = map_obj.baseline_path.discrete_path
-                points = [Point2D(x=pose.x, y=pose.y) for pose in path]
-                map_line.point_2d.append(points)
-
+            map_line = map_layers.lines[layer_name]
             line_source = ColumnDataSource(dict(xs=map_line.line_xs, ys=map_line.line_ys))
             main_figure.map_line_plots[layer_name.name] = main_figure.figure.multi_line(
                 xs="xs",
@@ -505,17 +697,23 @@ class SimulationTile:
                 source=line_source,
             )
 
+        lane_connector_lines = map_layers.lines[SemanticMapLayer.LANE_CONNECTOR]
         main_figure.lane_connectors = {
-            lane_connector.id: lane_connector for lane_connector in nearest_vector_map[SemanticMapLayer.LANE_CONNECTOR]
+            lane_connector_id: lane_connector_lines.object_coords(index)
+            for index, lane_connector_id in enumerate(lane_connector_lines.object_ids)
         }
 
     @staticmethod
-    def _render_expert_trajectory(main_figure: SimulationFigure) -> None:
+    def _render_expert_trajectory(
+        main_figure: SimulationFigure, expert_ego_trajectory: Optional[List[EgoState]] = None
+    ) -> None:
         """
         Render expert trajectory.
         :param main_figure: Main simulation figure.
+        :param expert_ego_trajectory: Expert ego states of the scenario, queried if None.
         """
-        expert_ego_trajectory = main_figure.scenario.get_expert_ego_trajectory()
+        if expert_ego_trajectory is None:
+            expert_ego_trajectory = list(main_figure.scenario.get_expert_ego_trajectory())
         source = extract_source_from_states(expert_ego_trajectory)
         main_figure.render_expert_trajectory(expert_ego_trajectory_state=source)
 
@@ -530,6 +728,9 @@ class SimulationTile:
         """
         main_figure.figure.title.text = main_figure.figure_title_name_with_timestamp(frame_index=frame_index)
 
+        # Build data sources of the frame if they are loaded on demand
+        main_figure.prepare_frame(frame_index=frame_index)
+
         if main_figure.lane_connectors is not None and len(main_figure.lane_connectors):
             main_figure.traffic_light_plot.update_plot(main_figure=main_figure.figure, frame_index=frame_index)
 
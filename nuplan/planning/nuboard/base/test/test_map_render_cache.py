@@ -0,0 +1,213 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import Mock, patch
+
+import numpy as np
+from shapely.geometry import LineString, box
+
+from nuplan.common.actor_state.state_representation import Point2D, StateSE2
+from nuplan.common.maps.abstract_map import AbstractMap
+from nuplan.common.maps.maps_datatypes import SemanticMapLayer, StopLineType
+from nuplan.planning.nuboard.base.map_render_cache import DEFAULT_LINE_LAYERS, DEFAULT_POLYGON_LAYERS, MapRenderCache
+
+MAP_RENDER_CACHE_MODULE = 'nuplan.planning.nuboard.base.map_render_cache'
+
+
+def _build_map_object(
+    object_id: str, x: float, y: float, stop_line_type: StopLineType = StopLineType.STOP_SIGN
+) -> Mock:
+    """
+    Build a map object with a square polygon and a baseline path along its x axis.
+    :param object_id: Map object id.
+    :param x: Minimum x of the polygon.
+    :param y: Minimum y of the polygon.
+    :param stop_line_type: Stop line type of the map object.
+    :return: A mocked map object.
+    """
+    map_object = Mock()
+    map_object.id = object_id
+    map_object.polygon = box(x, y, x + 10.0, y + 10.0)
+    map_object.baseline_path.discrete_path = [StateSE2(x + dx, y + 5.0, 0.0) for dx in np.linspace(0.0, 10.0, 5)]
+    map_object.stop_line_type = stop_line_type
+    return map_object
+
+
+class _MockMap:
+    """Map api returning the objects that intersect the query box."""
+
+    def __init__(self, map_objects: List[Mock]):
+        """
+        :param map_objects: Map objects of every layer.
+        """
+        self.map_name = 'mock_map'
+        self.map_objects = map_objects
+        self.num_queries = 0
+
+    def get_proximal_map_objects(
+        self, point: Point2D, radius: float, layers: List[SemanticMapLayer]
+    ) -> Dict[SemanticMapLayer, List[Mock]]:
+        """See AbstractMap."""
+        self.num_queries += 1
+        patch = box(point.x - radius, point.y - radius, point.x + radius, point.y + radius)
+        selected_objects = [
+            map_object
+            for map_object in self.map_objects
+            if map_object.polygon.intersects(patch)
+            or LineString([(pose.x, pose.y) for pose in map_object.baseline_path.discrete_path]).intersects(patch)
+        ]
+        return {layer: selected_objects for layer in layers}
+
+
+class TestMapRenderCache(unittest.TestCase):
+    """Test map render cache."""
+
+    def setUp(self) -> None:
+        """Set up a map with a grid of objects and a turn stop line."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        map_objects = [
+            _build_map_object(f'{i}_{j}', x=i * 37.0, y=j * 37.0) for i in range(-5, 5) for j in range(-5, 5)
+        ]
+        map_objects.append(_build_map_object('turn_stop', x=3.0, y=3.0, stop_line_type=StopLineType.TURN_STOP))
+        self.map_api = _MockMap(map_objects)
+
+    def tearDown(self) -> None:
+        """Clean up temporary folder."""
+        self.tmp_dir.cleanup()
+
+    def _assert_same_objects(self, map_render_cache: MapRenderCache, center: Point2D, radius: float) -> None:
+        """
+        Check that the cache returns the same objects and coordinates as querying the map api directly.
+        :param map_render_cache: Map render cache.
+        :param center: Query point.
+        :param radius: Query radius.
+        """
+        map_layers = map_render_cache.query(map_api=self.map_api, center=center, radius=radius)  # type: ignore
+        expected_objects = self.map_api.get_proximal_map_objects(center, radius, [SemanticMapLayer.LANE])
+        expected_objects_by_id = {map_object.id: map_object for map_object in expected_objects[SemanticMapLayer.LANE]}
+
+        for layer in DEFAULT_POLYGON_LAYERS:
+            geometry = map_layers.polygons[layer]
+            expected_ids = set(expected_objects_by_id.keys())
+            if layer == SemanticMapLayer.STOP_LINE:
+                expected_ids.discard('turn_stop')
+            self.assertEqual(set(geometry.object_ids), expected_ids)
+            for index, object_id in enumerate(geometry.object_ids):
+                expected_coords = np.asarray(expected_objects_by_id[object_id].polygon.exterior.coords)
+                np.testing.assert_allclose(geometry.object_coords(index), expected_coords)
+                np.testing.assert_allclose(geometry.polygon_xs[index][0][0], expected_coords[:, 0])
+
+        for layer in DEFAULT_LINE_LAYERS:
+            geometry = map_layers.lines[layer]
+            self.assertEqual(set(geometry.object_ids), set(expected_objects_by_id.keys()))
+            for index, object_id in enumerate(geometry.object_ids):
+                expected_path = expected_objects_by_id[object_id].baseline_path.discrete_path
+                np.testing.assert_allclose(geometry.line_ys[index], [pose.y for pose in expected_path])
+
+    def test_query(self) -> None:
+        """Test that queries spanning several tiles return the same objects as the map api."""
+        map_render_cache = MapRenderCache(tile_size=50.0)
+        self._assert_same_objects(map_render_cache, center=Point2D(0.0, 0.0), radius=60.0)
+        self._assert_same_objects(map_render_cache, center=Point2D(-42.0, 17.0), radius=25.0)
+        self.assertEqual(map_render_cache.num_tiles, self.map_api.num_queries - 2)
+
+        # Tiles are extracted from the map api only once
+        num_queries = self.map_api.num_queries
+        map_render_cache.query(map_api=self.map_api, center=Point2D(0.0, 0.0), radius=60.0)  # type: ignore
+        self.assertEqual(self.map_api.num_queries, num_queries)
+
+    def test_persisted_tiles(self) -> None:
+        """Test that tiles persisted to disk are reused by another cache."""
+        cache_dir = Path(self.tmp_dir.name)
+        map_render_cache = MapRenderCache(tile_size=50.0, cache_dir=cache_dir)
+        self._assert_same_objects(map_render_cache, center=Point2D(10.0, 10.0), radius=60.0)
+        self.assertGreater(len(list(cache_dir.rglob('*.npz'))), 0)
+
+        num_queries = self.map_api.num_queries
+        persisted_map_render_cache = MapRenderCache(tile_size=50.0, cache_dir=cache_dir)
+        map_layers = persisted_map_render_cache.query(
+            map_api=self.map_api, center=Point2D(10.0, 10.0), radius=60.0  # type: ignore
+        )
+        self.assertEqual(self.map_api.num_queries, num_queries)
+        self.assertGreater(len(map_layers.polygons[SemanticMapLayer.LANE]), 0)
+        self._assert_same_objects(persisted_map_render_cache, center=Point2D(10.0, 10.0), radius=60.0)
+
+    def test_max_tiles(self) -> None:
+        """Test that the least recently used tiles are evicted beyond the maximum number of tiles."""
+        map_render_cache = MapRenderCache(tile_size=50.0, max_tiles=2)
+        map_render_cache.get_tile(map_api=self.map_api, tile_index=(0, 0))  # type: ignore
+        map_render_cache.get_tile(map_api=self.map_api, tile_index=(1, 0))  # type: ignore
+        map_render_cache.get_tile(map_api=self.map_api, tile_index=(0, 0))  # type: ignore
+        map_render_cache.get_tile(map_api=self.map_api, tile_index=(2, 0))  # type: ignore
+        self.assertEqual(map_render_cache.num_tiles, 2)
+        self.assertEqual(self.map_api.num_queries, 3)
+
+        map_render_cache.get_tile(map_api=self.map_api, tile_index=(0, 0))  # type: ignore
+        self.assertEqual(self.map_api.num_queries, 3)
+        map_render_cache.get_tile(map_api=self.map_api, tile_index=(1, 0))  # type: ignore
+        self.assertEqual(self.map_api.num_queries, 4)
+
+    def test_persisted_tiles_of_other_map_version(self) -> None:
+        """Test that tiles persisted for another version of a map are not reused."""
+        cache_dir = Path(self.tmp_dir.name)
+        with patch(f'{MAP_RENDER_CACHE_MODULE}.get_map_version', return_value='1.0'):
+            MapRenderCache(tile_size=50.0, cache_dir=cache_dir).get_tile(
+                map_api=self.map_api, tile_index=(0, 0)  # type: ignore
+            )
+
+        with patch(f'{MAP_RENDER_CACHE_MODULE}.get_map_version', return_value='2.0'):
+            MapRenderCache(tile_size=50.0, cache_dir=cache_dir).get_tile(
+                map_api=self.map_api, tile_index=(0, 0)  # type: ignore
+            )
+
+        self.assertEqual(self.map_api.num_queries, 2)
+        self.assertEqual(len(list(cache_dir.rglob('*.npz'))), 2)
+
+    def test_concurrent_tiles(self) -> None:
+        """Test that a tile being extracted neither blocks other tiles nor is extracted twice."""
+        extracting = threading.Event()
+        release = threading.Event()
+        get_proximal_map_objects = self.map_api.get_proximal_map_objects
+
+        def slow_get_proximal_map_objects(
+            point: Point2D, radius: float, layers: List[SemanticMapLayer]
+        ) -> Dict[SemanticMapLayer, List[Mock]]:
+            """Block the extraction of the first tile until released."""
+            if point.x < 50.0:
+                extracting.set()
+                release.wait(timeout=10.0)
+            return get_proximal_map_objects(point, radius, layers)
+
+        self.map_api.get_proximal_map_objects = slow_get_proximal_map_objects  # type: ignore
+        map_render_cache = MapRenderCache(tile_size=50.0)
+        threads = [threading.Thread(target=map_render_cache.get_tile, args=(self.map_api, (0, 0))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(extracting.wait(timeout=10.0))
+
+        map_render_cache.get_tile(map_api=self.map_api, tile_index=(1, 0))  # type: ignore
+        self.assertFalse(release.is_set())
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.map_api.num_queries, 2)
+        self.assertEqual(map_render_cache.num_tiles, 2)
+
+    def test_empty_map(self) -> None:
+        """Test that an empty map returns empty layers."""
+        map_api = Mock(spec=AbstractMap)
+        map_api.map_name = 'empty_map'
+        map_api.get_proximal_map_objects.return_value = {
+            layer: [] for layer in DEFAULT_POLYGON_LAYERS + DEFAULT_LINE_LAYERS
+        }
+        map_layers = MapRenderCache().query(map_api=map_api, center=Point2D(0.0, 0.0), radius=10.0)
+        for geometry in list(map_layers.polygons.values()) + list(map_layers.lines.values()):
+            self.assertEqual(len(geometry), 0)
+            self.assertEqual(geometry.polygon_xs, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
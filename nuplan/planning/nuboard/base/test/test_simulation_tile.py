@@ -1,6 +1,8 @@
+import concurrent.futures
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import Mock
 
 from bokeh.document.document import Document
 
@@ -47,23 +49,98 @@ class TestSimulationTile(unittest.TestCase):
                 files=[simulation_log_path],
             )
         ]
-        doc = Document()
+        self.doc = Document()
         map_factory = MockMapFactory()
         experiment_file_data = ExperimentFileData(file_paths=[nuboard_file])
         self.simulation_tile = SimulationTile(
-            doc=doc,
+            doc=self.doc,
             map_factory=map_factory,
             vehicle_parameters=vehicle_parameters,
             radius=80,
             experiment_file_data=experiment_file_data,
         )
 
+    def run_next_tick_callbacks(self) -> None:
+        """Wait for the simulation logs and frames to load and run the callbacks they scheduled on the document."""
+        concurrent.futures.wait(self.simulation_tile._simulation_log_futures)
+        concurrent.futures.wait(self.simulation_tile._frame_futures.values())
+        for callback in list(self.doc.session_callbacks):
+            self.doc.remove_next_tick_callback(callback)
+            callback.callback()
+
     def test_simulation_tile_layout(self) -> None:
         """Test layout design."""
+        on_simulations_rendered = Mock()
+        layout = self.simulation_tile.render_simulation_tiles(
+            selected_scenario_keys=self.scenario_keys,
+            figure_sizes=[550, 550],
+            on_simulations_rendered=on_simulations_rendered,
+        )
+        self.assertEqual(len(layout), 1)
+        self.assertEqual(self.simulation_tile.figures, [])
+
+        self.run_next_tick_callbacks()
+
+        self.assertEqual(len(self.simulation_tile.figures), 1)
+        on_simulations_rendered.assert_called_once()
+        simulation_data = on_simulations_rendered.call_args[0][0]
+        self.assertEqual(len(simulation_data), 1)
+        self.assertIs(simulation_data[0].simulation_figure, self.simulation_tile.figures[0])
+        self.assertEqual(layout[0].children, [simulation_data[0].plot])
+
+    def test_stale_simulation_logs(self) -> None:
+        """Test that logs loaded for a previous selection do not create figures."""
+        self.simulation_tile.render_simulation_tiles(selected_scenario_keys=self.scenario_keys, figure_sizes=[550, 550])
+        concurrent.futures.wait(self.simulation_tile._simulation_log_futures)
+        self.simulation_tile.render_simulation_tiles(selected_scenario_keys=[], figure_sizes=[550, 550])
+
+        self.run_next_tick_callbacks()
+
+        self.assertEqual(self.simulation_tile.figures, [])
+
+    def test_simulation_tile_with_lazy_frames(self) -> None:
+        """Test that frames of a frames simulation log are built on demand and evicted from a bounded cache."""
+        simulation_log_path = Path(self.tmp_dir.name) / "test_simulation_tile_simulation_log.frames.xz"
+        self.set_up_simulation_log(simulation_log_path)
+        self.scenario_keys[0].files[0] = simulation_log_path
+
         layout = self.simulation_tile.render_simulation_tiles(
             selected_scenario_keys=self.scenario_keys, figure_sizes=[550, 550]
         )
         self.assertEqual(len(layout), 1)
+        self.run_next_tick_callbacks()
+
+        simulation_figure = self.simulation_tile.figures[0]
+        self.assertTrue(simulation_figure.is_lazy)
+        self.assertEqual(simulation_figure.slider.end, 1)
+        self.assertEqual(list(simulation_figure.ego_state_plot.data_sources.keys()), [0])
+
+        simulation_figure.frame_cache_size = 1
+        simulation_figure.slider.value = 1
+        # The frame is not decoded in the slider callback, it is rendered once decoded in the background
+        self.assertIn(0, self.simulation_tile._frame_futures)
+        self.run_next_tick_callbacks()
+        self.assertTrue(simulation_figure.is_frame_prepared(frame_index=1))
+        self.assertEqual(list(simulation_figure.ego_state_plot.data_sources.keys()), [1])
+        self.assertEqual(list(simulation_figure.agent_state_plot.data_sources.keys()), [1])
+
+    def test_stale_frame_is_not_rendered(self) -> None:
+        """Test that a frame decoded in the background is not rendered once the slider moved to another frame."""
+        simulation_log_path = Path(self.tmp_dir.name) / "test_simulation_tile_simulation_log.frames.xz"
+        self.set_up_simulation_log(simulation_log_path)
+        self.scenario_keys[0].files[0] = simulation_log_path
+
+        self.simulation_tile.render_simulation_tiles(selected_scenario_keys=self.scenario_keys, figure_sizes=[550, 550])
+        self.run_next_tick_callbacks()
+        simulation_figure = self.simulation_tile.figures[0]
+
+        simulation_figure.slider.value = 1
+        simulation_figure.slider.value = 0
+        rendered_title = simulation_figure.figure.title.text
+        self.run_next_tick_callbacks()
+
+        self.assertEqual(simulation_figure.figure.title.text, rendered_title)
+        self.assertEqual(rendered_title, simulation_figure.figure_title_name_with_timestamp(frame_index=0))
 
     def tearDown(self) -> None:
         """Clean up temporary folder and files."""
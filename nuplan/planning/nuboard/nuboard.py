@@ -14,6 +14,7 @@ from tornado.web import StaticFileHandler
 
 from nuplan.common.actor_state.vehicle_parameters import VehicleParameters
 from nuplan.planning.nuboard.base.experiment_file_data import ExperimentFileData
+from nuplan.planning.nuboard.base.map_render_cache import MapRenderCache
 from nuplan.planning.nuboard.tabs.configuration_tab import ConfigurationTab
 from nuplan.planning.nuboard.tabs.histogram_tab import HistogramTab
 from nuplan.planning.nuboard.tabs.overview_tab import OverviewTab
@@ -36,6 +37,7 @@ class NuBoard:
         port_number: int = 5006,
         profiler_path: Optional[Path] = None,
         resource_prefix: Optional[str] = None,
+        map_render_cache_dir: Optional[Path] = None,
     ):
         """
         Nuboard main class.
@@ -45,6 +47,7 @@ class NuBoard:
         :param port_number: Bokeh port number.
         :param profiler_path: Path to save the profiler.
         :param resource_prefix: Prefix to the resource path in HTML.
+        :param map_render_cache_dir: Folder to persist map geometry for rendering, kept only in memory if None.
         """
         self._profiler_path = profiler_path
         self._nuboard_paths = check_nuboard_file_paths(nuboard_paths)
@@ -56,6 +59,8 @@ class NuBoard:
         self._resource_path = Path(__file__).parents[0] / "resource"
         self._profiler_file_name = "nuboard"
         self._profiler: Optional[ProfileCallback] = None
+        # Map geometry is shared by all sessions
+        self._map_render_cache = MapRenderCache(cache_dir=map_render_cache_dir)
 
     def stop_handler(self, sig: Any, frame: Any) -> None:
         """Helper to handle stop signals."""
@@ -116,6 +121,7 @@ class NuBoard:
             scenario_builder=self._scenario_builder,
             doc=self._doc,
             vehicle_parameters=self._vehicle_parameters,
+            map_render_cache=self._map_render_cache,
         )
         configuration_tab = ConfigurationTab(
             experiment_file_data=experiment_file_data, doc=self._doc, tabs=[overview_tab, histogram_tab, scenario_tab]
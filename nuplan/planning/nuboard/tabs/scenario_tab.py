@@ -19,6 +19,7 @@ from nuplan.common.actor_state.ego_state import EgoState
 from nuplan.common.actor_state.vehicle_parameters import VehicleParameters
 from nuplan.planning.nuboard.base.base_tab import BaseTab
 from nuplan.planning.nuboard.base.experiment_file_data import ExperimentFileData
+from nuplan.planning.nuboard.base.map_render_cache import MapRenderCache
 from nuplan.planning.nuboard.base.plot_data import SimulationData
 from nuplan.planning.nuboard.base.simulation_tile import SimulationTile
 from nuplan.planning.nuboard.style import PLOT_PALETTE, default_div_style, scenario_tab_style
@@ -79,6 +80,7 @@ class ScenarioTab(BaseTab):
         experiment_file_data: ExperimentFileData,
         vehicle_parameters: VehicleParameters,
         scenario_builder: AbstractScenarioBuilder,
+        map_render_cache: Optional[MapRenderCache] = None,
     ):
         """
         Scenario tab to render metric results about a scenario.
@@ -86,6 +88,7 @@ class ScenarioTab(BaseTab):
         :param experiment_file_data: Experiment file data.
         :param vehicle_parameters: Vehicle parameters.
         :param scenario_builder: nuPlan scenario builder instance.
+        :param map_render_cache: Cache of map geometry for simulation tiles, a new one is created if None.
         """
         super().__init__(doc=doc, experiment_file_data=experiment_file_data)
         self._number_metrics_per_figure: int = 4
@@ -138,6 +141,12 @@ class ScenarioTab(BaseTab):
             margin=default_div_style['margin'],
             width=default_div_style['width'],
         )
+        self._loading_ego_expert_states_div = Div(
+            text=""" <p> Loading expert and ego states of the selected simulations...</p>""",
+            css_classes=['scenario-default-div'],
+            margin=default_div_style['margin'],
+            width=default_div_style['width'],
+        )
         self._ego_expert_states_layout = column(
             self._default_ego_expert_states_div,
             css_classes=["scenario-ego-expert-states-layout"],
@@ -168,6 +177,7 @@ class ScenarioTab(BaseTab):
             doc=self._doc,
             vehicle_parameters=vehicle_parameters,
             experiment_file_data=experiment_file_data,
+            map_render_cache=map_render_cache,
         )
 
         self._default_scenario_score_div = Div(
@@ -439,13 +449,9 @@ class ScenarioTab(BaseTab):
         )
         self._time_series_layout.children[0] = layout(time_series_figures)
 
-        # Render simulations.
+        # Render simulations, the ego and expert states are rendered once the simulations are loaded
         self._simulation_plots = self._render_simulations()
 
-        # render ego and expert states, call after rendering simulation
-        ego_expert_state_layout = self._render_ego_expert_states(simulation_figure_data=self._simulation_figure_data)
-        self._ego_expert_states_layout.children[0] = layout(ego_expert_state_layout)
-
         # Make sure the simulation plot upgrades at the last
         self._doc.add_next_tick_callback(self._update_simulation_layouts)
         end_time = time.perf_counter()
@@ -909,6 +915,8 @@ class ScenarioTab(BaseTab):
     def _render_simulations(self) -> column:
         """
         Render simulation plot.
+        The ego and expert states of the previous selection are replaced with a loading placeholder until the
+        simulations are loaded.
         :return: A list of Bokeh columns or rows.
         """
         selected_keys = [
@@ -921,19 +929,21 @@ class ScenarioTab(BaseTab):
         ]
         if not selected_keys:
             simulation_layouts = column(self._default_simulation_div)
+            self._ego_expert_states_layout.children[0] = layout(column(self._default_ego_expert_states_div))
         else:
+            self._ego_expert_states_layout.children[0] = layout(column(self._loading_ego_expert_states_div))
             hidden_glyph_names = [
                 label
                 for checkbox_group in [self._object_checkbox_group, self._traj_checkbox_group, self._map_checkbox_group]
                 for index, label in enumerate(checkbox_group.labels)
                 if index not in checkbox_group.active
             ]
-            self._simulation_figure_data = self.simulation_tile.render_simulation_tiles(
+            simulation_figures = self.simulation_tile.render_simulation_tiles(
                 selected_scenario_keys=selected_keys,
                 figure_sizes=self.simulation_figure_sizes,
                 hidden_glyph_names=hidden_glyph_names,
+                on_simulations_rendered=self._simulations_on_render,
             )
-            simulation_figures = [data.plot for data in self._simulation_figure_data]
             simulation_layouts = gridplot(
                 simulation_figures,
                 ncols=self.get_plot_cols(
@@ -944,6 +954,15 @@ class ScenarioTab(BaseTab):
 
         return simulation_layouts
 
+    def _simulations_on_render(self, simulation_figure_data: List[SimulationData]) -> None:
+        """
+        Render the ego and expert states once the simulations of the selected scenario are rendered.
+        :param simulation_figure_data: Simulation figure data of the selected scenario.
+        """
+        self._simulation_figure_data = simulation_figure_data
+        ego_expert_state_layout = self._render_ego_expert_states(simulation_figure_data=self._simulation_figure_data)
+        self._ego_expert_states_layout.children[0] = layout(ego_expert_state_layout)
+
     @staticmethod
     def _get_ego_expert_states(state_key: str, ego_state: EgoState) -> float:
         """
@@ -38,6 +38,12 @@ class TestScenarioTab(SkeletonTestTab):
         self.scenario_tab._scalar_scenario_name_select.value = self.scenario_tab._scalar_scenario_name_select.options[1]
         self.assertEqual(len(self.scenario_tab.simulation_tile_layout.children), 1)
         self.assertEqual(len(self.scenario_tab.time_series_layout.children), 1)
+        # Ego and expert states of the previous selection are not rendered while the simulations load
+        self.assertEqual(self.scenario_tab._simulation_figure_data, [])
+        self.assertIs(
+            self.scenario_tab.ego_expert_states_layout.children[0].children[0].children[0],
+            self.scenario_tab._loading_ego_expert_states_div,
+        )
 
     def test_file_paths_on_change(self) -> None:
         """Test file_paths_on_change function."""
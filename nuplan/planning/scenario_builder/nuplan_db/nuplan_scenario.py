@@ -198,6 +198,11 @@ class NuPlanScenario(AbstractScenario):
         """Get the map version."""
         return self._map_version
 
+    @property
+    def map_name(self) -> str:
+        """Get the map name, without loading the map."""
+        return self._map_name
+
     @property
     def database_interval(self) -> float:
         """Inherited, see superclass."""
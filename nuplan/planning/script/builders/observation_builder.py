@@ -7,7 +7,9 @@ from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.script.builders.model_builder import build_torch_module_wrapper
 from nuplan.planning.script.builders.utils.utils_type import is_TorchModuleWrapper_config
 from nuplan.planning.simulation.observation.abstract_observation import AbstractObservation
+from nuplan.planning.simulation.observation.ml_agents_inference_broker import get_ml_agents_inference_broker
 from nuplan.planning.training.modeling.lightning_module_wrapper import LightningModuleWrapper
+from nuplan.planning.training.modeling.torch_module_wrapper import TorchModuleWrapper
 
 
 def build_observations(observation_cfg: DictConfig, scenario: AbstractScenario) -> AbstractObservation:
@@ -18,20 +20,32 @@ def build_observations(observation_cfg: DictConfig, scenario: AbstractScenario)
     :return AbstractObservation
     """
     if is_TorchModuleWrapper_config(observation_cfg):
-        # Build model and feature builders needed to run an ML model in simulation
-        torch_module_wrapper = build_torch_module_wrapper(observation_cfg.model_config)
-        model = LightningModuleWrapper.load_from_checkpoint(
-            observation_cfg.checkpoint_path, model=torch_module_wrapper
-        ).model
+
+        def build_model() -> TorchModuleWrapper:
+            """Build model and feature builders needed to run an ML model in simulation."""
+            torch_module_wrapper = build_torch_module_wrapper(observation_cfg.model_config)
+            return LightningModuleWrapper.load_from_checkpoint(  # type: ignore
+                observation_cfg.checkpoint_path, model=torch_module_wrapper
+            ).model
 
         # Remove config elements that are redundant to MLPlanner
         config = observation_cfg.copy()
         OmegaConf.set_struct(config, False)
         config.pop('model_config')
         config.pop('checkpoint_path')
+        inference_broker_cfg = config.pop('inference_broker', None)
         OmegaConf.set_struct(config, True)
 
-        observation: AbstractObservation = instantiate(config, model=model, scenario=scenario)
+        if inference_broker_cfg is not None:
+            # The model is loaded once per worker and inferred in batches with the simulations sharing it
+            inference_broker = get_ml_agents_inference_broker(
+                observation_cfg.checkpoint_path, build_model, **OmegaConf.to_container(inference_broker_cfg)
+            )
+            observation: AbstractObservation = instantiate(
+                config, model=inference_broker.model, scenario=scenario, inference_broker=inference_broker
+            )
+        else:
+            observation = instantiate(config, model=build_model(), scenario=scenario)
     else:
         observation = cast(AbstractObservation, instantiate(observation_cfg, scenario=scenario))
 
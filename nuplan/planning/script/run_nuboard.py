@@ -45,6 +45,9 @@ def initialize_nuboard(cfg: DictConfig) -> NuBoard:
     profiler_path = None
     if cfg.profiler_path:
         profiler_path = Path(cfg.profiler_path)
+    map_render_cache_dir = None
+    if cfg.map_render_cache_dir:
+        map_render_cache_dir = Path(cfg.map_render_cache_dir)
 
     nuboard = NuBoard(
         profiler_path=profiler_path,
@@ -53,6 +56,7 @@ def initialize_nuboard(cfg: DictConfig) -> NuBoard:
         port_number=cfg.port_number,
         resource_prefix=cfg.resource_prefix,
         vehicle_parameters=vehicle_parameters,
+        map_render_cache_dir=map_render_cache_dir,
     )
 
     return nuboard
@@ -132,6 +132,7 @@ def run_runners(
         num_gpus=cfg.number_of_gpus_used_for_one_simulation,
         num_cpus=cfg.number_of_cpus_used_for_one_simulation,
         exit_on_failure=cfg.exit_on_failure,
+        use_cost_hints=cfg.use_cost_hints,
     )
     logger.info('Finished executing runners!')
 
@@ -44,9 +44,10 @@ class SimulationLogCallback(AbstractCallback):
         Construct simulation log callback.
         :param output_directory: where scenes should be serialized.
         :param simulation_log_dir: Folder where to save simulation logs.
-        :param serialization_type: A way to serialize output, options: ["json", "pickle", "msgpack"].
+        :param serialization_type: A way to serialize output, options: ["pickle", "msgpack", "frames"].
+            "frames" compresses each simulation history sample separately so that nuBoard can load them lazily.
         """
-        available_formats = ["pickle", "msgpack"]
+        available_formats = ["pickle", "msgpack", "frames"]
         if serialization_type not in available_formats:
             raise ValueError(
                 "The simulation log callback will not store files anywhere!"
@@ -59,6 +60,8 @@ class SimulationLogCallback(AbstractCallback):
             file_suffix = '.pkl.xz'
         elif serialization_type == "msgpack":
             file_suffix = '.msgpack.xz'
+        elif serialization_type == "frames":
+            file_suffix = '.frames.xz'
         else:
             raise ValueError(f"Unknown option: {serialization_type}")
         self._file_suffix = file_suffix
@@ -16,7 +16,7 @@ from nuplan.planning.simulation.history.simulation_history import SimulationHist
 from nuplan.planning.simulation.observation.abstract_observation import AbstractObservation
 from nuplan.planning.simulation.observation.observation_type import DetectionsTracks
 from nuplan.planning.simulation.planner.simple_planner import SimplePlanner
-from nuplan.planning.simulation.simulation_log import SimulationLog
+from nuplan.planning.simulation.simulation_log import LazySimulationHistory, SimulationLog, SimulationLogReader
 from nuplan.planning.simulation.simulation_setup import SimulationSetup
 from nuplan.planning.simulation.simulation_time_controller.abstract_simulation_time_controller import (
     AbstractSimulationTimeController,
@@ -147,10 +147,10 @@ class TestSimulationLogCallback(unittest.TestCase):
         """Clean up folder."""
         self.output_folder.cleanup()
 
-    def test_callback(self) -> None:
+    def _dump_simulation_log(self) -> SimulationHistory:
         """
-        Tests whether a scene can be dumped into a simulation log, checks that the keys are correct,
-        and checks that the log contains the expected data after being re-loaded from disk.
+        Dump a scene with two samples into a simulation log, and check that the scenario folder is correct.
+        :return: The dumped simulation history.
         """
         scenario = MockAbstractScenario()
 
@@ -218,6 +218,15 @@ class TestSimulationLogCallback(unittest.TestCase):
         # Simulate end of simulation
         self.callback.on_simulation_end(self.setup, planner, history)
 
+        return history
+
+    def test_callback(self) -> None:
+        """
+        Tests whether a scene can be dumped into a simulation log, checks that the keys are correct,
+        and checks that the log contains the expected data after being re-loaded from disk.
+        """
+        history = self._dump_simulation_log()
+
         # Compressed path
         path = pathlib.Path(
             self.output_folder.name
@@ -230,6 +239,33 @@ class TestSimulationLogCallback(unittest.TestCase):
 
         self.assertTrue(objects_are_equal(simulation_log.simulation_history, history))
 
+    def test_callback_with_frames(self) -> None:
+        """Tests that a simulation log dumped into frames can be re-loaded fully and frame by frame."""
+        self.callback = SimulationLogCallback(
+            output_directory=self.output_folder.name, simulation_log_dir='simulation_log', serialization_type='frames'
+        )
+        history = self._dump_simulation_log()
+
+        path = pathlib.Path(
+            self.output_folder.name
+            + "/simulation_log/SimplePlanner/mock_scenario_type/mock_log_name/mock_scenario_name/mock_scenario_name.frames.xz"
+        )
+        self.assertTrue(path.exists())
+        simulation_log = SimulationLog.load_data(file_path=path)
+        self.assertEqual(simulation_log.file_path, path)
+        self.assertTrue(objects_are_equal(simulation_log.simulation_history, history))
+
+        reader = SimulationLogReader(file_path=path, frame_cache_size=1)
+        lazy_history = reader.simulation_history
+        self.assertIsInstance(lazy_history, LazySimulationHistory)
+        self.assertEqual(len(reader), len(history.data))
+        self.assertTrue(iterator_is_equal(lazy_history.extract_ego_state, history.extract_ego_state))
+        for frame_index in [1, 0, -1]:
+            self.assertTrue(objects_are_equal(lazy_history.data[frame_index], history.data[frame_index]))
+        self.assertEqual(len(lazy_history.data[0:2]), 2)
+        with self.assertRaises(IndexError):
+            lazy_history.data[len(history.data)]
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,7 @@
+from enum import IntEnum
+
 import numpy as np
+import numpy.typing as npt
 
 from nuplan.common.actor_state.dynamic_car_state import DynamicCarState
 from nuplan.common.actor_state.ego_state import EgoState, EgoStateDot
@@ -6,7 +9,51 @@ from nuplan.common.actor_state.state_representation import StateSE2, StateVector
 from nuplan.common.actor_state.vehicle_parameters import VehicleParameters
 from nuplan.common.geometry.compute import principal_value
 from nuplan.planning.simulation.controller.motion_model.abstract_motion_model import AbstractMotionModel
-from nuplan.planning.simulation.controller.utils import forward_integrate
+
+
+class KinematicStateIndex(IntEnum):
+    """
+    Index mapping for the state arrays of the kinematic bicycle model, all quantities are at the rear axle.
+    """
+
+    X = 0  # [m] The x position in global coordinates.
+    Y = 1  # [m] The y position in global coordinates.
+    HEADING = 2  # [rad] The yaw in global coordinates.
+    VELOCITY = 3  # [m/s] The velocity along the longitudinal axis of the vehicle.
+    ACCELERATION = 4  # [m/s^2] The acceleration along the longitudinal axis of the vehicle.
+    STEERING_ANGLE = 5  # [rad] The tire steering angle.
+    STEERING_RATE = 6  # [rad/s] The tire steering rate.
+    ANGULAR_VELOCITY = 7  # [rad/s] The yaw rate.
+
+
+class KinematicCommandIndex(IntEnum):
+    """
+    Index mapping for the command arrays of the kinematic bicycle model.
+    """
+
+    ACCELERATION = 0  # [m/s^2] The ideal acceleration along the longitudinal axis of the vehicle.
+    STEERING_RATE = 1  # [rad/s] The ideal tire steering rate.
+
+
+def ego_state_to_state_array(state: EgoState) -> npt.NDArray[np.float64]:
+    """
+    Convert an ego state to a state array of the kinematic bicycle model.
+    :param state: Ego state.
+    :return: <len(KinematicStateIndex)> state array.
+    """
+    return np.array(
+        [
+            state.rear_axle.x,
+            state.rear_axle.y,
+            state.rear_axle.heading,
+            state.dynamic_car_state.rear_axle_velocity_2d.x,
+            state.dynamic_car_state.rear_axle_acceleration_2d.x,
+            state.tire_steering_angle,
+            state.dynamic_car_state.tire_steering_rate,
+            state.dynamic_car_state.angular_velocity,
+        ],
+        dtype=np.float64,
+    )
 
 
 class KinematicBicycleModel(AbstractMotionModel):
@@ -66,7 +113,7 @@ class KinematicBicycleModel(AbstractMotionModel):
         accel = state.dynamic_car_state.rear_axle_acceleration_2d.x
         steering_angle = state.tire_steering_angle
 
-        ideal_accel = (ideal_dynamic_state.rear_axle_acceleration_2d.x,)
+        ideal_accel = ideal_dynamic_state.rear_axle_acceleration_2d.x
         ideal_steering_angle = dt_control * ideal_dynamic_state.tire_steering_rate + steering_angle
 
         updated_accel = dt_control / (dt_control + self._accel_time_constant) * (ideal_accel - accel) + accel
@@ -91,59 +138,104 @@ class KinematicBicycleModel(AbstractMotionModel):
         )
         return propagating_state
 
-    def propagate_state(
-        self, state: EgoState, ideal_dynamic_state: DynamicCarState, sampling_time: TimePoint
-    ) -> EgoState:
-        """Inherited, see super class."""
-        propagating_state = self._update_commands(state, ideal_dynamic_state, sampling_time)
+    def get_state_dot_array(self, states: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Compute x_dot = f(x) for a batch of states, see get_state_dot.
+        :param states: <batch, len(KinematicStateIndex)> states.
+        :return: <batch, len(KinematicStateIndex)> state derivatives, the derivatives of the acceleration,
+            the steering rate and the angular velocity are zero.
+        """
+        velocity = states[:, KinematicStateIndex.VELOCITY]
+        heading = states[:, KinematicStateIndex.HEADING]
+
+        state_dots: npt.NDArray[np.float64] = np.zeros_like(states)
+        state_dots[:, KinematicStateIndex.X] = velocity * np.cos(heading)
+        state_dots[:, KinematicStateIndex.Y] = velocity * np.sin(heading)
+        state_dots[:, KinematicStateIndex.HEADING] = (
+            velocity * np.tan(states[:, KinematicStateIndex.STEERING_ANGLE]) / self._vehicle.wheel_base
+        )
+        state_dots[:, KinematicStateIndex.VELOCITY] = states[:, KinematicStateIndex.ACCELERATION]
+        state_dots[:, KinematicStateIndex.STEERING_ANGLE] = states[:, KinematicStateIndex.STEERING_RATE]
 
-        # Compute state derivatives
-        state_dot = self.get_state_dot(propagating_state)
+        return state_dots
 
-        # Integrate position and heading
-        next_x = forward_integrate(propagating_state.rear_axle.x, state_dot.rear_axle.x, sampling_time)
-        next_y = forward_integrate(propagating_state.rear_axle.y, state_dot.rear_axle.y, sampling_time)
-        next_heading = forward_integrate(
-            propagating_state.rear_axle.heading, state_dot.rear_axle.heading, sampling_time
-        )
-        # Wrap angle between [-pi, pi]
-        next_heading = principal_value(next_heading)
-
-        # Compute rear axle velocity in car frame
-        next_point_velocity_x = forward_integrate(
-            propagating_state.dynamic_car_state.rear_axle_velocity_2d.x,
-            state_dot.dynamic_car_state.rear_axle_velocity_2d.x,
-            sampling_time,
+    def propagate_state_array(
+        self, states: npt.NDArray[np.float64], commands: npt.NDArray[np.float64], sampling_time: float
+    ) -> npt.NDArray[np.float64]:
+        """
+        Propagate a batch of states with one vectorized low pass filter of the commands and forward Euler step.
+        :param states: <batch, len(KinematicStateIndex)> states.
+        :param commands: <batch, len(KinematicCommandIndex)> ideal commands, e.g. computed by a tracker.
+        :param sampling_time: [s] The time duration to propagate for.
+        :return: <batch, len(KinematicStateIndex)> propagated states.
+        """
+        assert states.ndim == 2 and states.shape[1] == len(KinematicStateIndex), "Invalid states shape."
+        assert commands.shape == (len(states), len(KinematicCommandIndex)), "Invalid commands shape."
+
+        # Apply the first order control delay to the commands, see _update_commands
+        accel = states[:, KinematicStateIndex.ACCELERATION]
+        steering_angle = states[:, KinematicStateIndex.STEERING_ANGLE]
+        ideal_accel = commands[:, KinematicCommandIndex.ACCELERATION]
+        ideal_steering_angle = sampling_time * commands[:, KinematicCommandIndex.STEERING_RATE] + steering_angle
+
+        updated_accel = sampling_time / (sampling_time + self._accel_time_constant) * (ideal_accel - accel) + accel
+        updated_steering_angle = (
+            sampling_time
+            / (sampling_time + self._steering_angle_time_constant)
+            * (ideal_steering_angle - steering_angle)
+            + steering_angle
         )
-        next_point_velocity_y = 0.0  # Lateral velocity is always zero in kinematic bicycle model
+        updated_steering_rate = (updated_steering_angle - steering_angle) / sampling_time
+
+        propagating_states = np.array(states, dtype=np.float64)
+        propagating_states[:, KinematicStateIndex.ACCELERATION] = updated_accel
+        propagating_states[:, KinematicStateIndex.STEERING_RATE] = updated_steering_rate
+
+        # Integrate the states and wrap the heading between [-pi, pi]
+        next_states = propagating_states + self.get_state_dot_array(propagating_states) * sampling_time
+        next_states[:, KinematicStateIndex.HEADING] = principal_value(next_states[:, KinematicStateIndex.HEADING])
 
-        # Integrate steering angle and clip to bounds
-        next_point_tire_steering_angle = np.clip(
-            forward_integrate(propagating_state.tire_steering_angle, state_dot.tire_steering_angle, sampling_time),
-            -self._max_steering_angle,
-            self._max_steering_angle,
+        # Clip the steering angle to bounds
+        next_states[:, KinematicStateIndex.STEERING_ANGLE] = np.clip(
+            next_states[:, KinematicStateIndex.STEERING_ANGLE], -self._max_steering_angle, self._max_steering_angle
         )
+        next_states[:, KinematicStateIndex.ANGULAR_VELOCITY] = (
+            next_states[:, KinematicStateIndex.VELOCITY]
+            * np.tan(next_states[:, KinematicStateIndex.STEERING_ANGLE])
+            / self._vehicle.wheel_base
+        )
+
+        return next_states
 
-        # Compute angular velocity
-        next_point_angular_velocity = (
-            next_point_velocity_x * np.tan(next_point_tire_steering_angle) / self._vehicle.wheel_base
+    def propagate_state(
+        self, state: EgoState, ideal_dynamic_state: DynamicCarState, sampling_time: TimePoint
+    ) -> EgoState:
+        """Inherited, see super class."""
+        commands = np.array(
+            [[ideal_dynamic_state.rear_axle_acceleration_2d.x, ideal_dynamic_state.tire_steering_rate]],
+            dtype=np.float64,
         )
+        next_state = self.propagate_state_array(
+            ego_state_to_state_array(state)[np.newaxis], commands, sampling_time.time_s
+        )[0]
 
-        rear_axle_accel = [
-            state_dot.dynamic_car_state.rear_axle_velocity_2d.x,
-            state_dot.dynamic_car_state.rear_axle_velocity_2d.y,
-        ]
-        angular_accel = (next_point_angular_velocity - state.dynamic_car_state.angular_velocity) / sampling_time.time_s
+        angular_accel = (
+            next_state[KinematicStateIndex.ANGULAR_VELOCITY] - state.dynamic_car_state.angular_velocity
+        ) / sampling_time.time_s
 
         return EgoState.build_from_rear_axle(
-            rear_axle_pose=StateSE2(next_x, next_y, next_heading),
-            rear_axle_velocity_2d=StateVector2D(next_point_velocity_x, next_point_velocity_y),
-            rear_axle_acceleration_2d=StateVector2D(rear_axle_accel[0], rear_axle_accel[1]),
-            tire_steering_angle=float(next_point_tire_steering_angle),
-            time_point=propagating_state.time_point + sampling_time,
+            rear_axle_pose=StateSE2(
+                next_state[KinematicStateIndex.X],
+                next_state[KinematicStateIndex.Y],
+                next_state[KinematicStateIndex.HEADING],
+            ),
+            rear_axle_velocity_2d=StateVector2D(next_state[KinematicStateIndex.VELOCITY], 0.0),
+            rear_axle_acceleration_2d=StateVector2D(next_state[KinematicStateIndex.ACCELERATION], 0.0),
+            tire_steering_angle=float(next_state[KinematicStateIndex.STEERING_ANGLE]),
+            time_point=state.time_point + sampling_time,
             vehicle_parameters=self._vehicle,
             is_in_auto_mode=True,
-            angular_vel=next_point_angular_velocity,
+            angular_vel=next_state[KinematicStateIndex.ANGULAR_VELOCITY],
             angular_accel=angular_accel,
-            tire_steering_rate=state_dot.tire_steering_angle,
+            tire_steering_rate=next_state[KinematicStateIndex.STEERING_RATE],
         )
@@ -1,6 +1,8 @@
+import math
 import unittest
 
 import numpy as np
+import numpy.typing as npt
 
 from nuplan.common.actor_state.car_footprint import CarFootprint
 from nuplan.common.actor_state.dynamic_car_state import DynamicCarState
@@ -10,8 +12,11 @@ from nuplan.common.actor_state.test.test_utils import get_sample_ego_state
 from nuplan.common.actor_state.vehicle_parameters import get_pacifica_parameters
 from nuplan.planning.simulation.controller.motion_model.kinematic_bicycle import (
     KinematicBicycleModel,
-    forward_integrate,
+    KinematicCommandIndex,
+    KinematicStateIndex,
+    ego_state_to_state_array,
 )
+from nuplan.planning.simulation.controller.utils import forward_integrate
 
 
 class TestKinematicMotionModel(unittest.TestCase):
@@ -161,6 +166,113 @@ class TestKinematicMotionModel(unittest.TestCase):
         )
         self.assertLess(propagating_state.dynamic_car_state.tire_steering_rate, ideal_dynamic_state.tire_steering_rate)
 
+    def _propagate_state_array_reference(
+        self, state: npt.NDArray[np.float64], command: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        """
+        Propagate a single state array with the scalar formulas of the kinematic bicycle model written out.
+        :param state: <len(KinematicStateIndex)> state.
+        :param command: <len(KinematicCommandIndex)> ideal command.
+        :return: <len(KinematicStateIndex)> expected propagated state.
+        """
+        x, y, heading, velocity, accel, steering_angle, _, _ = state
+        ideal_accel, ideal_steering_rate = command
+        dt = self.sampling_time.time_s
+        wheel_base = self.vehicle.wheel_base
+
+        # First order control delay
+        updated_accel = dt / (dt + self.motion_model._accel_time_constant) * (ideal_accel - accel) + accel
+        ideal_steering_angle = dt * ideal_steering_rate + steering_angle
+        updated_steering_angle = (
+            dt / (dt + self.motion_model._steering_angle_time_constant) * (ideal_steering_angle - steering_angle)
+            + steering_angle
+        )
+        updated_steering_rate = (updated_steering_angle - steering_angle) / dt
+
+        # Forward Euler integration
+        next_x = x + velocity * math.cos(heading) * dt
+        next_y = y + velocity * math.sin(heading) * dt
+        next_heading = heading + velocity * math.tan(steering_angle) / wheel_base * dt
+        next_heading = math.atan2(math.sin(next_heading), math.cos(next_heading))
+        next_velocity = velocity + updated_accel * dt
+        max_steering_angle = self.motion_model._max_steering_angle
+        next_steering_angle = min(
+            max(steering_angle + updated_steering_rate * dt, -max_steering_angle), max_steering_angle
+        )
+        next_angular_velocity = next_velocity * math.tan(next_steering_angle) / wheel_base
+
+        return np.array(
+            [
+                next_x,
+                next_y,
+                next_heading,
+                next_velocity,
+                updated_accel,
+                next_steering_angle,
+                updated_steering_rate,
+                next_angular_velocity,
+            ]
+        )
+
+    def test_propagate_state_array(self) -> None:
+        """
+        Test that propagating a batch of state arrays matches the scalar formulas of the model applied one by one.
+        """
+        rng = np.random.default_rng(0)
+        ego_states = []
+        ideal_dynamic_states = []
+        for _ in range(8):
+            ego_states.append(
+                EgoState.build_from_rear_axle(
+                    rear_axle_pose=StateSE2(*rng.uniform(-50.0, 50.0, 2), rng.uniform(-np.pi, np.pi)),
+                    rear_axle_velocity_2d=StateVector2D(rng.uniform(0.0, 15.0), 0.0),
+                    rear_axle_acceleration_2d=StateVector2D(rng.uniform(-2.0, 2.0), 0.0),
+                    tire_steering_angle=rng.uniform(-1.0, 1.0),
+                    time_point=TimePoint(0),
+                    vehicle_parameters=self.vehicle,
+                    angular_vel=rng.uniform(-0.5, 0.5),
+                    tire_steering_rate=rng.uniform(-0.5, 0.5),
+                )
+            )
+            ideal_dynamic_states.append(
+                DynamicCarState.build_from_rear_axle(
+                    self.vehicle.rear_axle_to_center,
+                    rear_axle_velocity_2d=StateVector2D(0.0, 0.0),
+                    rear_axle_acceleration_2d=StateVector2D(rng.uniform(-3.0, 3.0), 0.0),
+                    tire_steering_rate=rng.uniform(-1.0, 1.0),
+                )
+            )
+
+        states = np.stack([ego_state_to_state_array(ego_state) for ego_state in ego_states])
+        commands = np.array(
+            [
+                [dynamic_state.rear_axle_acceleration_2d.x, dynamic_state.tire_steering_rate]
+                for dynamic_state in ideal_dynamic_states
+            ]
+        )
+        self.assertEqual(commands.shape[1], len(KinematicCommandIndex))
+
+        next_states = self.motion_model.propagate_state_array(states, commands, self.sampling_time.time_s)
+        self.assertEqual(next_states.shape, states.shape)
+
+        for next_state, state, command in zip(next_states, states, commands):
+            np.testing.assert_allclose(next_state, self._propagate_state_array_reference(state, command))
+
+        # Steering angles are clipped to bounds
+        self.assertTrue(
+            np.all(np.abs(next_states[:, KinematicStateIndex.STEERING_ANGLE]) <= self.motion_model._max_steering_angle)
+        )
+
+        state_dots = self.motion_model.get_state_dot_array(states)
+        for state_dot, ego_state in zip(state_dots, ego_states):
+            expected_state_dot = self.motion_model.get_state_dot(ego_state)
+            np.testing.assert_allclose(
+                state_dot[: KinematicStateIndex.VELOCITY], expected_state_dot.rear_axle.serialize()
+            )
+            self.assertAlmostEqual(
+                state_dot[KinematicStateIndex.STEERING_ANGLE], expected_state_dot.tire_steering_angle
+            )
+
 
 if __name__ == '__main__':
     unittest.main()
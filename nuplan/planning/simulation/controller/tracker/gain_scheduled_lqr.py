@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from control import StateSpace, dlqr
+
+from nuplan.common.actor_state.ego_state import EgoState
+from nuplan.common.actor_state.vehicle_parameters import VehicleParameters, get_pacifica_parameters
+from nuplan.planning.simulation.controller.tracker.lqr import InputIndex, LQRTracker, StateIndex
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the computation of gain tables changes, persisted tables of other versions are ignored
+GAIN_TABLE_FORMAT_VERSION = '1'
+
+# [m/s] Velocities at which gains are computed, the linearized model is not stabilizable at zero velocity
+DEFAULT_VELOCITY_GRID = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12.5, 15.0, 20.0, 25.0, 30.0, 40.0)
+
+# [1/m] Curvatures at which gains are computed
+DEFAULT_CURVATURE_GRID = (-0.3, -0.2, -0.15, -0.1, -0.05, -0.02, 0.0, 0.02, 0.05, 0.1, 0.15, 0.2, 0.3)
+
+
+def _interpolate_bilinear(
+    grid_x: npt.NDArray[np.float64],
+    grid_y: npt.NDArray[np.float64],
+    values: npt.NDArray[np.float64],
+    x: float,
+    y: float,
+) -> npt.NDArray[np.float64]:
+    """
+    Bilinearly interpolate values tabulated on a rectilinear grid, queries outside of the grid are clamped to it.
+    :param grid_x: <num_x> increasing grid coordinates along the first axis.
+    :param grid_y: <num_y> increasing grid coordinates along the second axis.
+    :param values: <num_x, num_y, ...> values at the grid points.
+    :param x: Query coordinate along the first axis.
+    :param y: Query coordinate along the second axis.
+    :return: <...> interpolated value.
+    """
+    x = float(np.clip(x, grid_x[0], grid_x[-1]))
+    y = float(np.clip(y, grid_y[0], grid_y[-1]))
+    idx_x = int(np.clip(np.searchsorted(grid_x, x, side='right') - 1, 0, len(grid_x) - 2))
+    idx_y = int(np.clip(np.searchsorted(grid_y, y, side='right') - 1, 0, len(grid_y) - 2))
+    weight_x = (x - grid_x[idx_x]) / (grid_x[idx_x + 1] - grid_x[idx_x])
+    weight_y = (y - grid_y[idx_y]) / (grid_y[idx_y + 1] - grid_y[idx_y])
+
+    return (  # type: ignore
+        (1.0 - weight_x) * (1.0 - weight_y) * values[idx_x, idx_y]
+        + weight_x * (1.0 - weight_y) * values[idx_x + 1, idx_y]
+        + (1.0 - weight_x) * weight_y * values[idx_x, idx_y + 1]
+        + weight_x * weight_y * values[idx_x + 1, idx_y + 1]
+    )
+
+
+class GainScheduledLQRTracker(LQRTracker):
+    """
+    LQR tracker with gains precomputed offline on a grid of velocity and curvature linearization points.
+    LQRTracker linearizes the model and solves the discrete ARE at every step. Here the gains are interpolated
+    bilinearly from a table instead, which is built once per sampling time and optionally persisted to disk.
+
+    The linearized model is equivariant to rotations of the x, y plane, so with equal x and y weights the gain at
+    heading theta is the gain at zero heading applied to the position error rotated into the heading frame.
+    Gains are therefore only scheduled on velocity and curvature, curvature = tan(steering_angle) / wheel_base.
+    """
+
+    def __init__(
+        self,
+        q_diag: npt.NDArray[np.float64],
+        r_diag: npt.NDArray[np.float64],
+        proportional_gain: float,
+        look_ahead_seconds: float,
+        look_ahead_meters: float,
+        stopping_velocity: float,
+        vehicle: VehicleParameters = get_pacifica_parameters(),
+        velocity_grid: Sequence[float] = DEFAULT_VELOCITY_GRID,
+        curvature_grid: Sequence[float] = DEFAULT_CURVATURE_GRID,
+        gain_table_cache_dir: Optional[str] = None,
+    ):
+        """
+        Constructor for the gain scheduled LQR controller
+        :param q_diag: The diagonal terms of the Q matrix
+        :param r_diag: The diagonal terms of the R matrix
+        :param proportional_gain: The proportional_gain term for the P controller
+        :param look_ahead_seconds: [s] The lookahead time
+        :param look_ahead_meters: [m] The lookahead distance
+        :param stopping_velocity: [m/s] Velocity threshold for stopping
+        :param vehicle: Vehicle parameters
+        :param velocity_grid: [m/s] Increasing velocities at which gains are computed, queries are clamped to it.
+        :param curvature_grid: [1/m] Increasing curvatures at which gains are computed, queries are clamped to it.
+        :param gain_table_cache_dir: Folder in which gain tables are persisted, tables are kept in memory only if None.
+        """
+        super().__init__(
+            q_diag=q_diag,
+            r_diag=r_diag,
+            proportional_gain=proportional_gain,
+            look_ahead_seconds=look_ahead_seconds,
+            look_ahead_meters=look_ahead_meters,
+            stopping_velocity=stopping_velocity,
+            vehicle=vehicle,
+        )
+        assert (
+            q_diag[StateIndex.X_POS] == q_diag[StateIndex.Y_POS]
+        ), "Gain scheduling assumes equal weights on the x and y position errors"
+        assert len(velocity_grid) > 1 and np.all(np.diff(velocity_grid) > 0), "velocity_grid has to be increasing"
+        assert len(curvature_grid) > 1 and np.all(np.diff(curvature_grid) > 0), "curvature_grid has to be increasing"
+
+        self._velocity_grid: npt.NDArray[np.float64] = np.asarray(velocity_grid, dtype=np.float64)
+        self._curvature_grid: npt.NDArray[np.float64] = np.asarray(curvature_grid, dtype=np.float64)
+        self._gain_table_cache_dir = Path(gain_table_cache_dir) if gain_table_cache_dir is not None else None
+
+        # Gain tables by sampling time in microseconds
+        self._gain_tables: Dict[int, npt.NDArray[np.float64]] = {}
+
+    def _gain_table_path(self, sampling_time: float) -> Optional[Path]:
+        """
+        :param sampling_time: [s] The sampling interval.
+        :return: Path of the persisted gain table, None if gain tables are not persisted.
+        """
+        if self._gain_table_cache_dir is None:
+            return None
+
+        key = ';'.join(
+            [
+                GAIN_TABLE_FORMAT_VERSION,
+                ','.join(f'{value:.17g}' for value in np.diag(self._q_matrix)),
+                ','.join(f'{value:.17g}' for value in np.diag(self._r_matrix)),
+                f'{self._vehicle.wheel_base:.17g}',
+                ','.join(f'{value:.17g}' for value in self._velocity_grid),
+                ','.join(f'{value:.17g}' for value in self._curvature_grid),
+                f'{sampling_time:.17g}',
+            ]
+        )
+        return self._gain_table_cache_dir / f'lqr_gains_{hashlib.md5(key.encode()).hexdigest()}.npy'
+
+    def _compute_gain_table(self, sampling_time: float) -> npt.NDArray[np.float64]:
+        """
+        Solve the discrete LQR problem at every grid point, linearized at zero heading.
+        :param sampling_time: [s] The sampling interval.
+        :return: <num_velocities, num_curvatures, num_inputs, num_states> gain matrices.
+        """
+        num_states = len(self._q_matrix)
+        num_inputs = len(self._r_matrix)
+        gain_table = np.zeros((len(self._velocity_grid), len(self._curvature_grid), num_inputs, num_states))
+
+        for velocity_idx, velocity in enumerate(self._velocity_grid):
+            for curvature_idx, curvature in enumerate(self._curvature_grid):
+                a_matrix, b_matrix = self._linearize_model(
+                    heading=0.0, velocity=velocity, steering_angle=np.arctan(curvature * self._vehicle.wheel_base)
+                )
+                discrete_sys = StateSpace(a_matrix, b_matrix, np.zeros_like(a_matrix), np.zeros_like(b_matrix)).sample(
+                    sampling_time
+                )
+
+                try:
+                    gain_table[velocity_idx, curvature_idx], _, _ = dlqr(discrete_sys, self._q_matrix, self._r_matrix)
+                except np.linalg.LinAlgError:
+                    logger.warning(
+                        "Failed to solve for LQR gain matrix at velocity %0.2f and curvature %0.3f, using zero gains",
+                        velocity,
+                        curvature,
+                    )
+
+        return gain_table
+
+    def _get_gain_table(self, sampling_time: float) -> npt.NDArray[np.float64]:
+        """
+        Get the gain table of a sampling time, from memory, from disk or by computing it in this order.
+        :param sampling_time: [s] The sampling interval.
+        :return: <num_velocities, num_curvatures, num_inputs, num_states> gain matrices.
+        """
+        key = int(round(sampling_time * 1e6))
+        gain_table = self._gain_tables.get(key, None)
+        if gain_table is not None:
+            return gain_table
+
+        path = self._gain_table_path(sampling_time)
+        if path is not None and path.exists():
+            gain_table = np.load(path)
+        else:
+            gain_table = self._compute_gain_table(sampling_time)
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write to a temporary file first, so that concurrent readers never see a partially written table
+                tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp.npy')
+                np.save(tmp_path, gain_table)
+                tmp_path.replace(path)
+
+        self._gain_tables[key] = gain_table
+        return gain_table
+
+    def _compute_lqr_control_action(
+        self, tracking_error: npt.NDArray[np.float64], ego_state: EgoState, sampling_time: float
+    ) -> Tuple[float, float]:
+        """
+        Compute the control action using the LQR policy with gains interpolated from the gain table.
+        :param tracking_error: <np.ndarray: num_states> The tracking error vector.
+        :param ego_state: The ego state.
+        :param sampling_time: [s] The sampling interval.
+        :return: The control actions ([m/s^2] accel, [rad/s] steering rate)
+        """
+        gain_table = self._get_gain_table(sampling_time)
+        curvature = np.tan(ego_state.tire_steering_angle) / self._vehicle.wheel_base
+        gain_matrix = _interpolate_bilinear(
+            self._velocity_grid,
+            self._curvature_grid,
+            gain_table,
+            ego_state.dynamic_car_state.rear_axle_velocity_2d.x,
+            curvature,
+        )
+
+        # Gains are computed at zero heading, rotate the position error into the heading frame
+        heading = ego_state.rear_axle.heading
+        cos_heading, sin_heading = np.cos(heading), np.sin(heading)
+        rotated_error = np.copy(tracking_error)
+        rotated_error[StateIndex.X_POS] = (
+            cos_heading * tracking_error[StateIndex.X_POS] + sin_heading * tracking_error[StateIndex.Y_POS]
+        )
+        rotated_error[StateIndex.Y_POS] = (
+            -sin_heading * tracking_error[StateIndex.X_POS] + cos_heading * tracking_error[StateIndex.Y_POS]
+        )
+
+        # Control feedback law u[t+1] = -Ku[t]
+        control_action = -gain_matrix.dot(rotated_error)
+
+        return control_action[InputIndex.ACCEL], control_action[InputIndex.STEERING_RATE]
@@ -101,6 +101,25 @@ class ILQRWarmStartParameters:
             assert getattr(self, entry) > 0.0, f"Field {entry} should be positive."
 
 
+def _solve_positive_definite(matrices: DoubleMatrix, right_hand_sides: DoubleMatrix) -> DoubleMatrix:
+    """
+    Solve a stack of linear systems M X = Y with symmetric matrices M.
+    Uses a Cholesky factorization if all matrices are positive definite, else falls back to the pseudoinverse.
+    :param matrices: A (..., m, m) stack of symmetric matrices M.
+    :param right_hand_sides: A (..., m, n) stack of right hand sides Y.
+    :return: The (..., m, n) stack of solutions X.
+    """
+    try:
+        cholesky_factors = np.linalg.cholesky(matrices)
+    except np.linalg.LinAlgError:
+        # Positive semidefinite only, e.g. the augmented input cost matrix about a zero input.
+        return np.linalg.pinv(matrices) @ right_hand_sides  # type: ignore
+
+    # Forward and backward substitution with the lower triangular factor L, where M = L L^T.
+    forward_solution = np.linalg.solve(cholesky_factors, right_hand_sides)
+    return np.linalg.solve(np.swapaxes(cholesky_factors, -1, -2), forward_solution)  # type: ignore
+
+
 def _run_lqr_backward_recursion(
     a_matrices: DoubleMatrix,
     b_matrices: DoubleMatrix,
@@ -113,55 +132,86 @@ def _run_lqr_backward_recursion(
     compute the optimal LQR state feedback using dynamic programming / backward recursion.
     We opt to use generic math notation to emphasize this applies generally and not just for the bicycle model.
     The state index k runs from 0 to N-1.  The terminal state occurs at state index N.
-    :param a_matrices: A N-collection of n_states x n_states matrices for the LTV system.
-    :param b matrices: A N-collection of n_states x n_inputs matrices for the LTV system.
-    :param q_matrices: A N-collection of n_states x n_states matrices representing state stage cost.
-    :param r_matrices: A N-collection of n_inputs x n_inputs matrices representing input stage cost.
-    :param q_terminal: A terminal state cost matrix (n_states x n_states) from which we start the recursion.
-    :return: The optimal LQR state feedback matrices {K_k} and corresponding value function matrix {P_k}, k=0^{N-1}.
+    Several independent systems are solved at once by stacking their matrices along leading batch dimensions.
+    :param a_matrices: A (..., N, n_states, n_states) stack of state matrices for the LTV system.
+    :param b matrices: A (..., N, n_states, n_inputs) stack of input matrices for the LTV system.
+    :param q_matrices: A (..., N, n_states, n_states) stack of matrices representing state stage cost.
+    :param r_matrices: A (..., N, n_inputs, n_inputs) stack of matrices representing input stage cost.
+    :param q_terminal: A (..., n_states, n_states) terminal state cost matrix from which we start the recursion.
+    :return: The optimal LQR state feedback matrices {K_k} and corresponding value function matrix {P_k}, k=0^{N-1},
+             with shapes (..., N, n_inputs, n_states) and (..., N, n_states, n_states).
     """
+    a_matrices = np.asarray(a_matrices, dtype=np.float64)
+    b_matrices = np.asarray(b_matrices, dtype=np.float64)
+    q_matrices = np.asarray(q_matrices, dtype=np.float64)
+    r_matrices = np.asarray(r_matrices, dtype=np.float64)
+    q_terminal = np.asarray(q_terminal, dtype=np.float64)
+
     # Matrix Length Check.
-    assert len(a_matrices) == len(b_matrices), "Dynamics matrices should have the same length."
-    assert len(q_matrices) == len(r_matrices), "Cost matrices should have the same length."
-    assert len(a_matrices) == len(q_matrices), "Dynamics and cost matrices should have the same length."
+    assert a_matrices.shape[:-2] == b_matrices.shape[:-2], "Dynamics matrices should have the same length."
+    assert q_matrices.shape[:-2] == r_matrices.shape[:-2], "Cost matrices should have the same length."
+    assert a_matrices.shape[:-2] == q_matrices.shape[:-2], "Dynamics and cost matrices should have the same length."
 
     # Matrix Size Check.
-    state_dimension = a_matrices[0].shape[0]  # inferred state dimension
-    input_dimension = b_matrices[0].shape[1]  # inferred input dimension
+    state_dimension = a_matrices.shape[-1]  # inferred state dimension
+    input_dimension = b_matrices.shape[-1]  # inferred input dimension
 
-    for (a, b, q, r) in zip(a_matrices, b_matrices, q_matrices, r_matrices):
-        assert a.shape == (state_dimension, state_dimension), "Invalid state matrix shape."
-        assert b.shape == (state_dimension, input_dimension), "Invalid input matrix shape."
-        assert q.shape == (state_dimension, state_dimension), "Invalid state cost matrix shape."
-        assert r.shape == (input_dimension, input_dimension), "Invalid input cost matrix shape."
+    assert a_matrices.shape[-2:] == (state_dimension, state_dimension), "Invalid state matrix shape."
+    assert b_matrices.shape[-2:] == (state_dimension, input_dimension), "Invalid input matrix shape."
+    assert q_matrices.shape[-2:] == (state_dimension, state_dimension), "Invalid state cost matrix shape."
+    assert r_matrices.shape[-2:] == (input_dimension, input_dimension), "Invalid input cost matrix shape."
 
-    assert q_terminal.shape == (state_dimension, state_dimension), "Invalid terminal state cost matrix."
+    batch_shape = a_matrices.shape[:-3]
+    assert q_terminal.shape[-2:] == (state_dimension, state_dimension), "Invalid terminal state cost matrix."
+    assert q_terminal.shape[:-2] in [(), batch_shape], "Invalid terminal state cost matrix batch shape."
 
-    p_current = q_terminal  # Initiate the recursion with P_N = Q_N, terminal value function matrix.
-    horizon_length = len(a_matrices)  # Horizon length N.
+    # Initiate the recursion with P_N = Q_N, terminal value function matrix.
+    p_current = np.broadcast_to(q_terminal, batch_shape + (state_dimension, state_dimension))
+    horizon_length = a_matrices.shape[-3]  # Horizon length N.
 
-    k_matrices: List[DoubleMatrix] = []  # Optimal state feedback gain matrices found using LQR.
-    p_matrices: List[DoubleMatrix] = []  # Optimal value function matrices found using LQR.
+    # Optimal state feedback gain matrices and value function matrices found using LQR.
+    k_matrices: DoubleMatrix = np.empty(batch_shape + (horizon_length, input_dimension, state_dimension))
+    p_matrices: DoubleMatrix = np.empty(batch_shape + (horizon_length, state_dimension, state_dimension))
 
     for idx in reversed(range(horizon_length)):
-        a = a_matrices[idx]
-        b = b_matrices[idx]
-        q = q_matrices[idx]
-        r = r_matrices[idx]
+        a = a_matrices[..., idx, :, :]
+        b = b_matrices[..., idx, :, :]
+        q = q_matrices[..., idx, :, :]
+        r = r_matrices[..., idx, :, :]
+        b_transpose = np.swapaxes(b, -1, -2)
 
         # Derivation of this in the LQR Backward Recursion section of the following page:
         # https://confluence.ci.motional.com/confluence/x/VaOdCg
-        k = -np.linalg.pinv(r + b.T @ p_current @ b) @ b.T @ p_current @ a
-        p_current = q + k.T @ r @ k + (a + b @ k).T @ p_current @ (a + b @ k)
+        b_transpose_p = b_transpose @ p_current
+        k = -_solve_positive_definite(r + b_transpose_p @ b, b_transpose_p @ a)
+        a_closed_loop = a + b @ k
+        p_current = q + np.swapaxes(k, -1, -2) @ r @ k + np.swapaxes(a_closed_loop, -1, -2) @ p_current @ a_closed_loop
 
-        k_matrices.append(k)
-        p_matrices.append(p_current)
+        k_matrices[..., idx, :, :] = k
+        p_matrices[..., idx, :, :] = p_current
 
-    # Reverse so we get ordering (K_0, P_0), (K_1, P_1), ... , (K_{N-1}, P_{N-1}).
-    k_matrices.reverse()
-    p_matrices.reverse()
+    return k_matrices, p_matrices
 
-    return np.array(k_matrices), np.array(p_matrices)
+
+def _augmented_quadratic_cost_matrices(cost_matrix: DoubleMatrix, offsets: DoubleMatrix) -> DoubleMatrix:
+    """
+    Stack the matrices of the quadratic costs || delta + offset_k ||^C of perturbations delta, lifted to [delta, 1]:
+    | C             C offset_k              |
+    | offset_k^T C  offset_k^T C offset_k   |
+    :param cost_matrix: A symmetric (n x n) cost matrix C.
+    :param offsets: A (N x n) trajectory of offsets, e.g. tracking errors or linearization inputs.
+    :return: The (N x n+1 x n+1) augmented cost matrices.
+    """
+    dimension = cost_matrix.shape[0]
+    weighted_offsets = offsets @ cost_matrix
+
+    augmented_cost_matrices: DoubleMatrix = np.empty((len(offsets), dimension + 1, dimension + 1), dtype=np.float64)
+    augmented_cost_matrices[:, :dimension, :dimension] = cost_matrix
+    augmented_cost_matrices[:, :dimension, -1] = weighted_offsets
+    augmented_cost_matrices[:, -1, :dimension] = weighted_offsets
+    augmented_cost_matrices[:, -1, -1] = np.einsum('ki,ki->k', weighted_offsets, offsets)
+
+    return augmented_cost_matrices
 
 
 class ILQRSolver:
@@ -212,52 +262,100 @@ class ILQRSolver:
             reference_trajectory_state_dimension == self._n_states
         ), "The reference trajectory should have a matching state dimension."
 
-        input_trajectory = self._input_warm_start(current_state, reference_trajectory)
+        return self.solve_batch(current_state[np.newaxis], reference_trajectory[np.newaxis])[0]
+
+    def solve_batch(self, current_states: DoubleMatrix, reference_trajectories: DoubleMatrix) -> DoubleMatrix:
+        """
+        Run the main iLQR loop for several independent tracking problems, e.g. of parallel simulations.
+        The LQR backward recursion of all problems that have not converged yet runs batched in every iteration.
+        :param current_states: The (B, n_states) initial states from which we apply inputs.
+        :param reference_trajectories: The (B, N+1, n_states) state references we'd like to track,
+                                       inclusive of the initial timestep.
+        :return: The (B, N, n_inputs) optimal input sequences after iLQR converges or hits max iterations.
+        """
+        assert current_states.ndim == 2 and current_states.shape[1] == self._n_states, "Incorrect state shape."
+        assert reference_trajectories.ndim == 3, "Reference trajectories should be a B x M x N tensor."
+        assert len(reference_trajectories) == len(
+            current_states
+        ), "There should be one reference trajectory per current state."
+        assert (
+            reference_trajectories.shape[1] > 1
+        ), "The reference trajectory should be at least two timesteps (z_{r,0}, z_{r,1}) long."
+        assert (
+            reference_trajectories.shape[2] == self._n_states
+        ), "The reference trajectory should have a matching state dimension."
+
+        input_trajectories = np.array(
+            [
+                self._input_warm_start(current_state, reference_trajectory)
+                for current_state, reference_trajectory in zip(current_states, reference_trajectories)
+            ]
+        )
+
+        # Indices of the problems that have not converged yet.
+        active_indices = np.arange(len(current_states))
 
         # Main iLQR Loop.
         for _ in range(self._solver_params.max_ilqr_iterations):
-            # Run dynamics on the current input_trajectory iterate to get linearization states and Jacobians.
-            state_trajectory, state_jacobian_trajectory, input_jacobian_trajectory = self._run_forward_dynamics(
-                current_state, input_trajectory
-            )
-
-            # Lift the state and input according to the perturbed linear time varying (LTV) system dynamics.
-            (
-                state_jacobian_matrix_augmented_trajectory,
-                input_jacobian_matrix_augmented_trajectory,
-            ) = self._linear_augmented_dynamics_matrices(state_jacobian_trajectory, input_jacobian_trajectory)
+            if len(active_indices) == 0:
+                break
 
-            # Generate the cost matrices for the perturbed LTV system with trust region penalty.
-            (
-                state_cost_matrix_augmented_trajectory,
-                input_cost_matrix_augmented_trajectory,
-                state_cost_matrix_augmented_terminal,
-            ) = self._quadratic_augmented_cost_matrices(input_trajectory, state_trajectory, reference_trajectory)
+            state_trajectories = []
+            augmented_matrices: List[List[DoubleMatrix]] = [[], [], [], [], []]
+            for idx in active_indices:
+                # Run dynamics on the current input_trajectory iterate to get linearization states and Jacobians.
+                state_trajectory, state_jacobian_trajectory, input_jacobian_trajectory = self._run_forward_dynamics(
+                    current_states[idx], input_trajectories[idx]
+                )
+                state_trajectories.append(state_trajectory)
+
+                # Lift the state and input according to the perturbed linear time varying (LTV) system dynamics.
+                # Generate the cost matrices for the perturbed LTV system with trust region penalty.
+                problem_matrices = self._linear_augmented_dynamics_matrices(
+                    state_jacobian_trajectory, input_jacobian_trajectory
+                ) + self._quadratic_augmented_cost_matrices(
+                    input_trajectories[idx], state_trajectory, reference_trajectories[idx]
+                )
+                for matrices, problem_matrix in zip(augmented_matrices, problem_matrices):
+                    matrices.append(problem_matrix)
 
             # Use dynamic programming/backward recursion to compute the LQR state feedback gain matrices.
             # These gain matrices are applicable for the perturbed LTV system.
-            state_feedback_matrix_augmented_trajectory, _ = _run_lqr_backward_recursion(
-                a_matrices=state_jacobian_matrix_augmented_trajectory,
-                b_matrices=input_jacobian_matrix_augmented_trajectory,
-                q_matrices=state_cost_matrix_augmented_trajectory,
-                r_matrices=input_cost_matrix_augmented_trajectory,
-                q_terminal=state_cost_matrix_augmented_terminal,
+            (
+                state_jacobian_matrix_augmented_trajectories,
+                input_jacobian_matrix_augmented_trajectories,
+                state_cost_matrix_augmented_trajectories,
+                input_cost_matrix_augmented_trajectories,
+                state_cost_matrix_augmented_terminals,
+            ) = (np.array(matrices) for matrices in augmented_matrices)
+            state_feedback_matrix_augmented_trajectories, _ = _run_lqr_backward_recursion(
+                a_matrices=state_jacobian_matrix_augmented_trajectories,
+                b_matrices=input_jacobian_matrix_augmented_trajectories,
+                q_matrices=state_cost_matrix_augmented_trajectories,
+                r_matrices=input_cost_matrix_augmented_trajectories,
+                q_terminal=state_cost_matrix_augmented_terminals,
             )
 
-            # Determine locally optimal inputs by applying the feedback policy based on the LQR state feedback gain
-            # matrices from the previous step.
-            input_trajectory_next = self._update_input_sequence_with_feedback_policy(
-                input_trajectory, state_trajectory, state_feedback_matrix_augmented_trajectory
-            )
+            converged = np.zeros(len(active_indices), dtype=np.bool_)
+            for active_idx, idx in enumerate(active_indices):
+                # Determine locally optimal inputs by applying the feedback policy based on the LQR state feedback
+                # gain matrices from the previous step.
+                input_trajectory_next = self._update_input_sequence_with_feedback_policy(
+                    input_trajectories[idx],
+                    state_trajectories[active_idx],
+                    state_feedback_matrix_augmented_trajectories[active_idx],
+                )
 
-            # Check for convergence and terminate early if so.  Else update the input_trajectory iterate and continue.
-            input_trajectory_norm_difference = np.linalg.norm(input_trajectory_next - input_trajectory)
-            if input_trajectory_norm_difference < self._solver_params.convergence_threshold:
-                break
+                # Check for convergence and terminate early if so.  Else update the input_trajectory iterate.
+                input_trajectory_norm_difference = np.linalg.norm(input_trajectory_next - input_trajectories[idx])
+                if input_trajectory_norm_difference < self._solver_params.convergence_threshold:
+                    converged[active_idx] = True
+                else:
+                    input_trajectories[idx] = input_trajectory_next
 
-            input_trajectory = input_trajectory_next
+            active_indices = active_indices[~converged]
 
-        return input_trajectory
+        return input_trajectories  # type: ignore
 
     ####################################################################################################################
     # Helper methods.
@@ -514,27 +612,20 @@ class ILQRSolver:
         :param input_jacobian_trajectory: a trajectory of input Jacobian matrices evaluated at each timestep k
         :return: A trajectory of augmented state and input matrices matching the augmented linear time varying system.
         """
-        state_jacobian_matrix_augmented_trajectory: List[DoubleMatrix] = []
-        input_jacobian_matrix_augmented_trajectory: List[DoubleMatrix] = []
-
-        for state_jacobian, input_jacobian in zip(state_jacobian_trajectory, input_jacobian_trajectory):
-            state_jacobian_augmented: DoubleMatrix = np.zeros(
-                (self._n_states + 1, self._n_states + 1), dtype=np.float64
-            )
-            state_jacobian_augmented[: self._n_states, : self._n_states] = state_jacobian
-            state_jacobian_augmented[-1, -1] = 1.0
+        horizon_length = len(state_jacobian_trajectory)
 
-            input_jacobian_augmented: DoubleMatrix = np.zeros(
-                (self._n_states + 1, self._n_inputs + 1), dtype=np.float64
-            )
-            input_jacobian_augmented[: self._n_states, : self._n_inputs] = input_jacobian
-
-            state_jacobian_matrix_augmented_trajectory.append(state_jacobian_augmented)
-            input_jacobian_matrix_augmented_trajectory.append(input_jacobian_augmented)
+        state_jacobian_matrix_augmented_trajectory: DoubleMatrix = np.zeros(
+            (horizon_length, self._n_states + 1, self._n_states + 1), dtype=np.float64
+        )
+        state_jacobian_matrix_augmented_trajectory[:, : self._n_states, : self._n_states] = state_jacobian_trajectory
+        state_jacobian_matrix_augmented_trajectory[:, -1, -1] = 1.0
 
-        return np.array(state_jacobian_matrix_augmented_trajectory), np.array(
-            input_jacobian_matrix_augmented_trajectory
+        input_jacobian_matrix_augmented_trajectory: DoubleMatrix = np.zeros(
+            (horizon_length, self._n_states + 1, self._n_inputs + 1), dtype=np.float64
         )
+        input_jacobian_matrix_augmented_trajectory[:, : self._n_states, : self._n_inputs] = input_jacobian_trajectory
+
+        return state_jacobian_matrix_augmented_trajectory, input_jacobian_matrix_augmented_trajectory
 
     def _quadratic_augmented_cost_matrices(
         self,
@@ -559,9 +650,6 @@ class ILQRSolver:
             reference_trajectory
         ), "The state and reference trajectory should have the same length."
 
-        state_cost_matrix_augmented_trajectory: List[DoubleMatrix] = []
-        input_cost_matrix_augmented_trajectory: List[DoubleMatrix] = []
-
         # Trust region penalty term for states, constant throughout the time horizon.
         q_trust_region = np.zeros((self._n_states + 1, self._n_states + 1))
         q_trust_region[: self._n_states, : self._n_states] = np.eye(self._n_states)
@@ -576,53 +664,26 @@ class ILQRSolver:
 
         alpha_trust_region = self._solver_params.alpha_trust_region
 
-        for state_idx, (input_lin, state_error) in enumerate(
-            zip(input_linearization_trajectory, state_error_trajectory)
-        ):
-            q_cost: DoubleMatrix = np.zeros((self._n_states + 1, self._n_states + 1))
+        q_cost = _augmented_quadratic_cost_matrices(self._q, state_error_trajectory)
 
-            if state_idx > 0:
-                # Note: we do not penalize the first state error as our choice of control inputs cannot change this.
-                off_diagonal_q_cost = self._q @ state_error
-
-                q_cost = np.block(
-                    [
-                        [self._q, np.expand_dims(off_diagonal_q_cost, axis=-1)],
-                        [off_diagonal_q_cost, state_error.T @ self._q @ state_error],
-                    ]
-                )
-
-            state_cost_matrix_augmented = (1 - alpha_trust_region) * q_cost + alpha_trust_region * q_trust_region
-
-            off_diagonal_r_cost = self._r @ input_lin
-            r_cost: DoubleMatrix = np.block(
-                [
-                    [self._r, np.expand_dims(off_diagonal_r_cost, axis=-1)],
-                    [off_diagonal_r_cost, input_lin.T @ self._r @ input_lin],
-                ]
-            )
+        # Note: we do not penalize the first state error as our choice of control inputs cannot change this.
+        q_cost[0] = 0.0
 
-            input_cost_matrix_augmented = (1 - alpha_trust_region) * r_cost + alpha_trust_region * r_trust_region
-
-            state_cost_matrix_augmented_trajectory.append(state_cost_matrix_augmented)
-            input_cost_matrix_augmented_trajectory.append(input_cost_matrix_augmented)
-
-        state_error_terminal = state_error_trajectory[-1]
+        state_cost_matrix_augmented_trajectory = (1 - alpha_trust_region) * q_cost[:-1] + alpha_trust_region * (
+            q_trust_region
+        )
 
-        off_diagonal_q_cost = self._q @ state_error_terminal
-        q_cost_terminal: DoubleMatrix = np.block(
-            [
-                [self._q, np.expand_dims(off_diagonal_q_cost, axis=-1)],
-                [off_diagonal_q_cost, state_error_terminal.T @ self._q @ state_error_terminal],
-            ]
+        r_cost = _augmented_quadratic_cost_matrices(self._r, input_linearization_trajectory)
+        input_cost_matrix_augmented_trajectory = (1 - alpha_trust_region) * r_cost + alpha_trust_region * (
+            r_trust_region
         )
 
-        state_cost_matrix_augmented_terminal = (
-            1 - alpha_trust_region
-        ) * q_cost_terminal + alpha_trust_region * q_trust_region
+        state_cost_matrix_augmented_terminal = (1 - alpha_trust_region) * q_cost[-1] + alpha_trust_region * (
+            q_trust_region
+        )
 
         return (
-            np.array(state_cost_matrix_augmented_trajectory),
-            np.array(input_cost_matrix_augmented_trajectory),
+            state_cost_matrix_augmented_trajectory,
+            input_cost_matrix_augmented_trajectory,
             state_cost_matrix_augmented_terminal,
         )
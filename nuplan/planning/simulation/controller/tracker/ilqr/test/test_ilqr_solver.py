@@ -118,6 +118,57 @@ class TestILQRSolver(unittest.TestCase):
         with np_test.assert_raises(AssertionError):
             np_test.assert_allclose(inputs_tracking_error, 0.0, atol=self.atol, rtol=self.rtol)
 
+    def test__run_lqr_backward_recursion_batch(self) -> None:
+        """
+        Check that the batched recursion with a Cholesky solve matches the per-step pseudoinverse recursion,
+        including input cost matrices that are only positive semidefinite.
+        """
+        rng = np.random.default_rng(0)
+        batch_size = 3
+        a_matrices = np.eye(self.n_states) + 0.1 * rng.standard_normal(
+            (batch_size, self.n_horizon, self.n_states, self.n_states)
+        )
+        b_matrices = rng.standard_normal((batch_size, self.n_horizon, self.n_states, self.n_inputs))
+        q_factors = rng.standard_normal((batch_size, self.n_horizon, self.n_states, self.n_states))
+        q_matrices = q_factors @ np.swapaxes(q_factors, -1, -2)
+        r_factors = rng.standard_normal((batch_size, self.n_horizon, self.n_inputs, self.n_inputs))
+        r_matrices = r_factors @ np.swapaxes(r_factors, -1, -2)
+        q_terminal = np.eye(self.n_states)
+
+        # The last problem has a singular input cost and an input without effect on the dynamics.
+        r_matrices[-1, :, -1, :] = 0.0
+        r_matrices[-1, :, :, -1] = 0.0
+        b_matrices[-1, :, :, -1] = 0.0
+
+        k_matrices, p_matrices = _run_lqr_backward_recursion(a_matrices, b_matrices, q_matrices, r_matrices, q_terminal)
+        self.assertEqual(k_matrices.shape, (batch_size, self.n_horizon, self.n_inputs, self.n_states))
+        self.assertEqual(p_matrices.shape, (batch_size, self.n_horizon, self.n_states, self.n_states))
+
+        for batch_idx in range(batch_size):
+            p_current = q_terminal
+            for idx in reversed(range(self.n_horizon)):
+                a, b = a_matrices[batch_idx, idx], b_matrices[batch_idx, idx]
+                q, r = q_matrices[batch_idx, idx], r_matrices[batch_idx, idx]
+                k = -np.linalg.pinv(r + b.T @ p_current @ b) @ b.T @ p_current @ a
+                p_current = q + k.T @ r @ k + (a + b @ k).T @ p_current @ (a + b @ k)
+
+                np_test.assert_allclose(k_matrices[batch_idx, idx], k, atol=1e-8, rtol=1e-6)
+                np_test.assert_allclose(p_matrices[batch_idx, idx], p_current, atol=1e-8, rtol=1e-6)
+
+    def test_solve_batch(self) -> None:
+        """Check that solving several tracking problems at once matches solving them one by one."""
+        state_offsets = np.array(
+            [[0.0, 0.0, 0.0, 0.0, 0.0], [0.1, -0.1, 0.01, 0.5, 0.01], [-0.2, 0.3, -0.05, -0.3, 0.02]]
+        )
+        current_states = self.reference_trajectory[0] + state_offsets
+        reference_trajectories = np.tile(self.reference_trajectory, (len(current_states), 1, 1))
+
+        inputs_batch = self.solver.solve_batch(current_states, reference_trajectories)
+        self.assertEqual(inputs_batch.shape, (len(current_states), self.n_horizon - 1, self.n_inputs))
+
+        for current_state, inputs in zip(current_states, inputs_batch):
+            np_test.assert_allclose(inputs, self.solver.solve(current_state, self.reference_trajectory), atol=1e-10)
+
     def test__clip_inputs(self) -> None:
         """Check that we can clip inputs within constraints."""
         input_sinusoidal_array: DoubleMatrix = np.array(
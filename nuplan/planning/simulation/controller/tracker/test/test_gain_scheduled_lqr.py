@@ -0,0 +1,198 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from nuplan.common.actor_state.dynamic_car_state import DynamicCarState
+from nuplan.common.actor_state.ego_state import EgoState
+from nuplan.common.actor_state.state_representation import StateSE2, StateVector2D, TimePoint
+from nuplan.common.actor_state.vehicle_parameters import get_pacifica_parameters
+from nuplan.planning.simulation.controller.motion_model.kinematic_bicycle import KinematicBicycleModel
+from nuplan.planning.simulation.controller.tracker.abstract_tracker import AbstractTracker
+from nuplan.planning.simulation.controller.tracker.gain_scheduled_lqr import (
+    GainScheduledLQRTracker,
+    _interpolate_bilinear,
+)
+from nuplan.planning.simulation.controller.tracker.lqr import LQRTracker
+from nuplan.planning.simulation.simulation_time_controller.simulation_iteration import SimulationIteration
+from nuplan.planning.simulation.trajectory.interpolated_trajectory import InterpolatedTrajectory
+
+TRACKER_PARAMETERS = {
+    'q_diag': np.array([0.1, 0.1, 1.0, 10.0, 0.0, 1.0]),
+    'r_diag': np.array([1.0, 0.1]),
+    'proportional_gain': 0.5,
+    'look_ahead_seconds': 2.0,
+    'look_ahead_meters': 1.0,
+    'stopping_velocity': 0.2,
+}
+
+
+def _build_reference_trajectory(num_steps: int, sampling_time: float) -> InterpolatedTrajectory:
+    """
+    Build a feasible reference by driving the kinematic bicycle model with smooth, curving inputs.
+    :param num_steps: Number of steps of the reference.
+    :param sampling_time: [s] Time interval between steps.
+    :return: The reference trajectory.
+    """
+    vehicle = get_pacifica_parameters()
+    motion_model = KinematicBicycleModel(vehicle)
+    state = EgoState.build_from_rear_axle(
+        rear_axle_pose=StateSE2(10.0, -5.0, 0.3),
+        rear_axle_velocity_2d=StateVector2D(3.0, 0.0),
+        rear_axle_acceleration_2d=StateVector2D(0.0, 0.0),
+        tire_steering_angle=0.0,
+        time_point=TimePoint(0),
+        vehicle_parameters=vehicle,
+    )
+    states = [state]
+    for step in range(num_steps):
+        ideal_dynamic_state = DynamicCarState.build_from_rear_axle(
+            rear_axle_to_center_dist=state.car_footprint.rear_axle_to_center_dist,
+            rear_axle_velocity_2d=state.dynamic_car_state.rear_axle_velocity_2d,
+            rear_axle_acceleration_2d=StateVector2D(1.0 if step < num_steps // 2 else -0.5, 0.0),
+            tire_steering_rate=0.15 * np.cos(2.0 * np.pi * step / num_steps),
+        )
+        state = motion_model.propagate_state(state, ideal_dynamic_state, TimePoint(int(sampling_time * 1e6)))
+        states.append(state)
+
+    return InterpolatedTrajectory(states)
+
+
+def _run_closed_loop(
+    tracker: AbstractTracker, trajectory: InterpolatedTrajectory, num_steps: int, sampling_time: float
+) -> Tuple[npt.NDArray[np.float64], float]:
+    """
+    Track a trajectory in closed loop with the kinematic bicycle model, starting with a tracking error.
+    :param tracker: The tracker.
+    :param trajectory: The reference trajectory.
+    :param num_steps: Number of simulation steps.
+    :param sampling_time: [s] Time interval between steps.
+    :return: <num_steps> [m] position tracking errors and the mean [s] time spent in the tracker per step.
+    """
+    vehicle = get_pacifica_parameters()
+    motion_model = KinematicBicycleModel(vehicle)
+    initial_state = trajectory.get_state_at_time(TimePoint(0))
+    state = EgoState.build_from_rear_axle(
+        rear_axle_pose=StateSE2(
+            initial_state.rear_axle.x - 0.3, initial_state.rear_axle.y + 0.5, initial_state.rear_axle.heading + 0.05
+        ),
+        rear_axle_velocity_2d=StateVector2D(initial_state.dynamic_car_state.rear_axle_velocity_2d.x + 0.5, 0.0),
+        rear_axle_acceleration_2d=StateVector2D(0.0, 0.0),
+        tire_steering_angle=initial_state.tire_steering_angle,
+        time_point=TimePoint(0),
+        vehicle_parameters=vehicle,
+    )
+
+    tracker.initialize()
+    tracking_errors: List[float] = []
+    tracker_time = 0.0
+    for step in range(num_steps):
+        current_iteration = SimulationIteration(TimePoint(int(step * sampling_time * 1e6)), step)
+        next_iteration = SimulationIteration(TimePoint(int((step + 1) * sampling_time * 1e6)), step + 1)
+
+        start_time = time.perf_counter()
+        dynamic_state = tracker.track_trajectory(current_iteration, next_iteration, state, trajectory)
+        tracker_time += time.perf_counter() - start_time
+
+        state = motion_model.propagate_state(
+            state, dynamic_state, next_iteration.time_point - current_iteration.time_point
+        )
+        reference_state = trajectory.get_state_at_time(next_iteration.time_point)
+        tracking_errors.append(state.rear_axle.distance_to(reference_state.rear_axle))
+
+    return np.array(tracking_errors), tracker_time / num_steps
+
+
+class TestGainScheduledLQRTracker(unittest.TestCase):
+    """Tests the gain scheduled LQR tracker against the LQR tracker."""
+
+    def setUp(self) -> None:
+        """Inherited, see superclass."""
+        self.sampling_time = 0.1
+        self.num_steps = 100
+        # The reference extends beyond the simulation by the maximum lookahead
+        self.trajectory = _build_reference_trajectory(self.num_steps + 25, self.sampling_time)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """Clean up temporary folder."""
+        self.tmp_dir.cleanup()
+
+    def test_interpolate_bilinear(self) -> None:
+        """Test that bilinear interpolation reproduces affine functions and clamps queries to the grid."""
+        grid_x = np.array([0.0, 1.0, 3.0])
+        grid_y = np.array([-1.0, 0.0, 2.0, 5.0])
+        values = 2.0 * grid_x[:, None] - 3.0 * grid_y[None, :] + 1.0
+
+        self.assertAlmostEqual(_interpolate_bilinear(grid_x, grid_y, values, 2.2, 1.3), 2.0 * 2.2 - 3.0 * 1.3 + 1.0)
+        self.assertAlmostEqual(_interpolate_bilinear(grid_x, grid_y, values, 3.0, 5.0), values[-1, -1])
+        self.assertAlmostEqual(_interpolate_bilinear(grid_x, grid_y, values, -4.0, 9.0), values[0, -1])
+
+    def test_gains_match_lqr_tracker(self) -> None:
+        """Test that the gains at grid points match the gains LQRTracker computes at any heading."""
+        tracker = GainScheduledLQRTracker(**TRACKER_PARAMETERS)  # type: ignore
+        tracker.initialize()
+        gain_table = tracker._get_gain_table(self.sampling_time)
+        self.assertEqual(gain_table.shape[-2:], (2, 6))
+
+        wheel_base = get_pacifica_parameters().wheel_base
+        for velocity_idx, curvature_idx, heading in [(3, 6, 0.0), (10, 2, 1.2), (15, 11, -2.5)]:
+            velocity = tracker._velocity_grid[velocity_idx]
+            steering_angle = np.arctan(tracker._curvature_grid[curvature_idx] * wheel_base)
+            ego_state = EgoState.build_from_rear_axle(
+                rear_axle_pose=StateSE2(0.0, 0.0, heading),
+                rear_axle_velocity_2d=StateVector2D(velocity, 0.0),
+                rear_axle_acceleration_2d=StateVector2D(0.0, 0.0),
+                tire_steering_angle=steering_angle,
+                time_point=TimePoint(0),
+                vehicle_parameters=get_pacifica_parameters(),
+            )
+            tracking_error = np.array([0.3, -0.2, 0.05, 0.4, 0.01, 0.04])
+            np.testing.assert_allclose(
+                tracker._compute_lqr_control_action(tracking_error, ego_state, self.sampling_time),
+                LQRTracker._compute_lqr_control_action(tracker, tracking_error, ego_state, self.sampling_time),
+                atol=1e-8,
+            )
+
+    def test_persisted_gain_table(self) -> None:
+        """Test that gain tables are persisted per parameter set and reused by another tracker."""
+        cache_dir = Path(self.tmp_dir.name)
+        tracker = GainScheduledLQRTracker(**TRACKER_PARAMETERS, gain_table_cache_dir=cache_dir)  # type: ignore
+        tracker.initialize()
+        gain_table = tracker._get_gain_table(self.sampling_time)
+        tracker._get_gain_table(0.2)
+        self.assertEqual(len(list(cache_dir.glob('*.npy'))), 2)
+
+        persisted_tracker = GainScheduledLQRTracker(  # type: ignore
+            **TRACKER_PARAMETERS, gain_table_cache_dir=cache_dir
+        )
+        persisted_tracker._compute_gain_table = None  # type: ignore
+        np.testing.assert_array_equal(persisted_tracker._get_gain_table(self.sampling_time), gain_table)
+
+        other_parameters = dict(TRACKER_PARAMETERS, r_diag=np.array([2.0, 0.1]))
+        other_tracker = GainScheduledLQRTracker(**other_parameters, gain_table_cache_dir=cache_dir)  # type: ignore
+        self.assertNotEqual(other_tracker._gain_table_path(self.sampling_time), tracker._gain_table_path(0.1))
+
+    def test_closed_loop_tracking(self) -> None:
+        """Test that closed loop tracking errors match the LQR tracker, while each step is faster."""
+        lqr_tracker = LQRTracker(**TRACKER_PARAMETERS)  # type: ignore
+        lqr_errors, lqr_time = _run_closed_loop(lqr_tracker, self.trajectory, self.num_steps, self.sampling_time)
+
+        gain_scheduled_tracker = GainScheduledLQRTracker(**TRACKER_PARAMETERS)  # type: ignore
+        # Build the gain table ahead of time, as it is built once per process and sampling time
+        gain_scheduled_tracker.initialize()
+        gain_scheduled_tracker._get_gain_table(self.sampling_time)
+        gain_scheduled_errors, gain_scheduled_time = _run_closed_loop(
+            gain_scheduled_tracker, self.trajectory, self.num_steps, self.sampling_time
+        )
+
+        np.testing.assert_allclose(gain_scheduled_errors, lqr_errors, atol=0.02)
+        self.assertLess(gain_scheduled_time, lqr_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
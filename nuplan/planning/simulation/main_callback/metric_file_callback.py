@@ -3,16 +3,60 @@ import pathlib
 import pickle
 import time
 from collections import defaultdict
-from typing import List
+from typing import Dict, List, Optional
 
-import pandas
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet as pq
 
-from nuplan.planning.metrics.metric_engine import JSON_FILE_EXTENSION
+from nuplan.planning.metrics.metric_engine import (
+    ARROW_FILE_EXTENSION,
+    JSON_FILE_EXTENSION,
+    close_metric_table_writers,
+    construct_metric_table,
+)
 from nuplan.planning.simulation.main_callback.abstract_main_callback import AbstractMainCallback
 
 logger = logging.getLogger(__name__)
 
 
+def _concat_tables(tables: List[pyarrow.Table]) -> pyarrow.Table:
+    """
+    Concatenate tables, merging columns by name and promoting types when scenarios have missing (null) values.
+    :param tables: Tables to concatenate.
+    :return: Concatenated table.
+    """
+    # pyarrow<14 does not support promote_options
+    if int(pyarrow.__version__.split('.')[0]) < 14:
+        return pyarrow.concat_tables(tables, promote=True)
+
+    return pyarrow.concat_tables(tables, promote_options='permissive')
+
+
+def _read_metric_table(arrow_file: pathlib.Path) -> Optional[pyarrow.Table]:
+    """
+    Read the record batches of a columnar metric file. Files of workers that did not exit cleanly are not closed, and
+    may end with an incomplete record batch, which is skipped.
+    :param arrow_file: Columnar metric file.
+    :return: Table of the complete record batches, None if the file has no schema.
+    """
+    with pyarrow.OSFile(str(arrow_file)) as source:
+        try:
+            reader = pyarrow.ipc.open_stream(source)
+        except (OSError, pyarrow.ArrowInvalid) as e:
+            logger.warning(f"Skipping metric file {arrow_file} without a schema: {e}")
+            return None
+
+        batches = []
+        try:
+            for batch in reader:
+                batches.append(batch)
+        except (OSError, pyarrow.ArrowInvalid) as e:
+            logger.warning(f"Skipping an incomplete record batch of metric file {arrow_file}: {e}")
+
+        return pyarrow.Table.from_batches(batches, schema=reader.schema)
+
+
 class MetricFileCallback(AbstractMainCallback):
     """Callback to handle metric files at the end of process."""
 
@@ -34,35 +78,64 @@ class MetricFileCallback(AbstractMainCallback):
         ]
         self._delete_scenario_metric_files = delete_scenario_metric_files
 
-    def on_run_simulation_end(self) -> None:
-        """Callback before end of the main function."""
-        start_time = time.perf_counter()
+    def _load_scenario_metric_tables(self) -> Dict[str, List[pyarrow.Table]]:
+        """
+        Load columnar scenario metric files, and legacy pickle scenario metric files if there are any.
+        :return A dictionary of metric statistics names and a list of their scenario metric tables.
+        """
+        # Metric files written by this process, e.g. with a sequential worker, are completed before they are read
+        close_metric_table_writers()
 
-        # Integrate scenario metric files into metric statistic files
         metrics = defaultdict(list)
-
-        # Stop if no metric path exists
         for scenario_metric_path in self._scenario_metric_paths:
+            # Skip if no metric path exists
             if not scenario_metric_path.exists():
                 continue
 
             for scenario_metric_file in scenario_metric_path.iterdir():
-                if not scenario_metric_file.name.endswith(JSON_FILE_EXTENSION):
-                    continue
-                with open(scenario_metric_file, "rb") as f:
-                    json_dataframe = pickle.load(f)
+                if scenario_metric_file.is_dir():
+                    # Folder of columnar metric files of every process for a single metric statistics name
+                    arrow_files = [
+                        arrow_file
+                        for arrow_file in scenario_metric_file.iterdir()
+                        if arrow_file.name.endswith(ARROW_FILE_EXTENSION)
+                    ]
+                    for arrow_file in arrow_files:
+                        table = _read_metric_table(arrow_file)
+                        if table is not None:
+                            metrics[scenario_metric_file.name].append(table)
+
+                        # Delete the temp file
+                        if self._delete_scenario_metric_files:
+                            arrow_file.unlink(missing_ok=True)
+
+                    if arrow_files and self._delete_scenario_metric_files and not any(scenario_metric_file.iterdir()):
+                        scenario_metric_file.rmdir()
+                elif scenario_metric_file.name.endswith(JSON_FILE_EXTENSION):
+                    with open(scenario_metric_file, "rb") as f:
+                        json_dataframe = pickle.load(f)
+                    legacy_metrics = defaultdict(list)
                     for dataframe in json_dataframe:
-                        pandas_dataframe = pandas.DataFrame(dataframe)
-                        metrics[dataframe['metric_statistics_name']].append(pandas_dataframe)
+                        legacy_metrics[dataframe['metric_statistics_name']].append(dataframe)
+                    for metric_statistics_name, dataframes in legacy_metrics.items():
+                        metrics[metric_statistics_name].append(construct_metric_table(dataframes))
+
+                    # Delete the temp file
+                    if self._delete_scenario_metric_files:
+                        scenario_metric_file.unlink(missing_ok=True)
 
-                # Delete the temp file
-                if self._delete_scenario_metric_files:
-                    scenario_metric_file.unlink(missing_ok=True)
+        return metrics
 
-        for metric_statistics_name, dataframe in metrics.items():
+    def on_run_simulation_end(self) -> None:
+        """Callback before end of the main function."""
+        start_time = time.perf_counter()
+
+        # Integrate scenario metric files into metric statistic files
+        metrics = self._load_scenario_metric_tables()
+        for metric_statistics_name, tables in metrics.items():
             save_path = self._metric_file_output_path / (metric_statistics_name + '.parquet')
-            concat_pandas = pandas.concat([*dataframe], ignore_index=True)
-            concat_pandas.to_parquet(save_path)
+            concat_table = _concat_tables(tables)
+            pq.write_table(concat_table, save_path)
 
         end_time = time.perf_counter()
         elapsed_time_s = end_time - start_time
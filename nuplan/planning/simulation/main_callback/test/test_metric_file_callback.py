@@ -1,9 +1,23 @@
 import pathlib
+import pickle
 import tempfile
 import unittest
+from typing import List, Optional
 from unittest import TestCase
 from unittest.mock import MagicMock, Mock, call, patch
 
+import pandas
+import pyarrow
+
+from nuplan.planning.metrics.metric_engine import (
+    ARROW_FILE_EXTENSION,
+    JSON_FILE_EXTENSION,
+    MetricsEngine,
+    close_metric_table_writers,
+    construct_dataframe,
+)
+from nuplan.planning.metrics.metric_file import MetricFile, MetricFileKey
+from nuplan.planning.metrics.metric_result import MetricStatistics, MetricStatisticsType, Statistic, TimeSeries
 from nuplan.planning.simulation.main_callback.metric_file_callback import MetricFileCallback
 
 SCENARIO_NAME = "test_scenario"
@@ -23,8 +37,80 @@ class TestMetricFileCallback(TestCase):
 
     def tearDown(self) -> None:
         """Clean up tmp dir."""
+        close_metric_table_writers()
         self.tmp_dir.cleanup()
 
+    @staticmethod
+    def _build_metric_file(scenario_name: str, time_series: Optional[TimeSeries]) -> MetricFile:
+        """
+        Build a dummy metric file.
+        :param scenario_name: Scenario name.
+        :param time_series: Optional time series of the metric statistics.
+        :return A metric file with a single metric statistics.
+        """
+        statistics = [
+            Statistic(
+                name="ego_max_acceleration", unit="meters_per_second_squared", value=2.0, type=MetricStatisticsType.MAX
+            )
+        ]
+        metric_statistics = MetricStatistics(
+            metric_computator="ego_acceleration",
+            name="ego_acceleration_statistics",
+            statistics=statistics,
+            time_series=time_series,
+            metric_category="Dynamic",
+            metric_score=1.0,
+        )
+        key = MetricFileKey(
+            metric_name="ego_acceleration",
+            log_name="test_log",
+            scenario_name=scenario_name,
+            scenario_type="test_scenario_type",
+            planner_name=PLANNER_NAME,
+        )
+        return MetricFile(key=key, metric_statistics=[metric_statistics])
+
+    def _build_metric_files(self) -> List[MetricFile]:
+        """:return A list of dummy metric files, with and without time series."""
+        time_series = TimeSeries(unit="meters_per_second_squared", time_stamps=[0, 1, 2], values=[0.0, 1.0, 2.0])
+        return [
+            self._build_metric_file(scenario_name=SCENARIO_NAME + "_0", time_series=time_series),
+            self._build_metric_file(scenario_name=SCENARIO_NAME + "_1", time_series=None),
+        ]
+
+    def _expected_dataframe(self, metric_files: List[MetricFile]) -> pandas.DataFrame:
+        """
+        Build the expected integrated dataframe by concatenating one pandas dataframe per metric statistics row.
+        :param metric_files: A list of metric files.
+        :return The expected dataframe after a round trip through parquet.
+        """
+        dataframes = [
+            pandas.DataFrame(
+                construct_dataframe(
+                    log_name=metric_file.key.log_name,
+                    scenario_name=metric_file.key.scenario_name,
+                    scenario_type=metric_file.key.scenario_type,
+                    planner_name=metric_file.key.planner_name,
+                    metric_statistics=metric_statistics,
+                )
+            )
+            for metric_file in metric_files
+            for metric_statistics in metric_file.metric_statistics
+        ]
+        expected_path = self.path / "expected"
+        expected_path.mkdir()
+        pandas.concat(dataframes, ignore_index=True).to_parquet(expected_path / "expected.parquet")
+        return pandas.read_parquet(expected_path / "expected.parquet")
+
+    def _assert_integrated_dataframe(self, expected_dataframe: pandas.DataFrame) -> None:
+        """
+        Check the integrated metric parquet file against an expected dataframe.
+        :param expected_dataframe: Expected dataframe.
+        """
+        dataframe = pandas.read_parquet(self.path / "ego_acceleration_statistics.parquet")
+        dataframe = dataframe.sort_values("scenario_name", ignore_index=True)
+        pandas.testing.assert_frame_equal(dataframe, expected_dataframe)
+
     def test_metric_callback_init(self) -> None:
         """
         Tests if all the properties are set to the expected values in constructor.
@@ -52,6 +138,103 @@ class TestMetricFileCallback(TestCase):
         # Expectations check
         logger.info.assert_has_calls([call('Metric files integration: 00:00:00 [HH:MM:SS]')])
 
+    def test_on_run_simulation_end_with_metric_engine_files(self) -> None:
+        """
+        Tests if columnar scenario metric files are integrated into a metric parquet file and deleted.
+        """
+        metric_files = self._build_metric_files()
+        metric_engine = MetricsEngine(main_save_path=self.path, timestamp=0)
+        for metric_file in metric_files:
+            metric_engine.write_to_files(metric_files={metric_file.key.scenario_name: [metric_file]})
+
+        # Scenarios run in the same process are appended to the same file
+        arrow_files = list((self.path / "ego_acceleration_statistics").iterdir())
+        self.assertEqual(len(arrow_files), 1)
+        self.assertTrue(arrow_files[0].name.endswith(ARROW_FILE_EXTENSION))
+
+        metric_file_callback = MetricFileCallback(
+            metric_file_output_path=self.tmp_dir.name, scenario_metric_paths=[self.tmp_dir.name]
+        )
+        metric_file_callback.on_run_simulation_end()
+
+        self.assertEqual([file.name for file in self.path.iterdir()], ["ego_acceleration_statistics.parquet"])
+        self._assert_integrated_dataframe(self._expected_dataframe(metric_files))
+
+    def test_on_run_simulation_end_with_legacy_files(self) -> None:
+        """
+        Tests if legacy pickle scenario metric files are still integrated into a metric parquet file.
+        """
+        metric_files = self._build_metric_files()
+        for metric_file in metric_files:
+            dataframes = [
+                construct_dataframe(
+                    log_name=metric_file.key.log_name,
+                    scenario_name=metric_file.key.scenario_name,
+                    scenario_type=metric_file.key.scenario_type,
+                    planner_name=metric_file.key.planner_name,
+                    metric_statistics=metric_statistics,
+                )
+                for metric_statistics in metric_file.metric_statistics
+            ]
+            with open(self.path / (metric_file.key.scenario_name + JSON_FILE_EXTENSION), "wb") as f:
+                pickle.dump(dataframes, f)
+
+        metric_file_callback = MetricFileCallback(
+            metric_file_output_path=self.tmp_dir.name, scenario_metric_paths=[self.tmp_dir.name]
+        )
+        metric_file_callback.on_run_simulation_end()
+
+        self.assertFalse(any(file.name.endswith(JSON_FILE_EXTENSION) for file in self.path.iterdir()))
+        self._assert_integrated_dataframe(self._expected_dataframe(metric_files))
+
+    def test_on_run_simulation_end_with_legacy_pyarrow(self) -> None:
+        """
+        Tests if metric files are integrated with pyarrow versions predating promote_options.
+        """
+        metric_files = self._build_metric_files()
+        metric_engine = MetricsEngine(main_save_path=self.path, timestamp=0)
+        metric_engine.write_to_files(
+            metric_files={metric_file.key.scenario_name: [metric_file] for metric_file in metric_files}
+        )
+        concat_tables = pyarrow.concat_tables
+
+        def legacy_concat_tables(tables: List[pyarrow.Table], promote: bool = False) -> pyarrow.Table:
+            """Mocked concat_tables of pyarrow<14."""
+            return concat_tables(tables, promote_options='permissive' if promote else 'none')
+
+        metric_file_callback = MetricFileCallback(
+            metric_file_output_path=self.tmp_dir.name, scenario_metric_paths=[self.tmp_dir.name]
+        )
+        with patch('pyarrow.__version__', '13.0.0'), patch(
+            'pyarrow.concat_tables', side_effect=legacy_concat_tables
+        ) as mock_concat_tables:
+            metric_file_callback.on_run_simulation_end()
+
+        mock_concat_tables.assert_called_once()
+        self._assert_integrated_dataframe(self._expected_dataframe(metric_files))
+
+    def test_on_run_simulation_end_with_unclosed_files(self) -> None:
+        """
+        Tests if metric files of workers that did not close them are integrated, without an incomplete last batch.
+        """
+        metric_files = self._build_metric_files()
+        metric_engine = MetricsEngine(main_save_path=self.path, timestamp=0)
+        metric_engine.write_to_files(metric_files={metric_files[0].key.scenario_name: [metric_files[0]]})
+        arrow_file = next((self.path / "ego_acceleration_statistics").iterdir())
+        complete_size = arrow_file.stat().st_size
+        metric_engine.write_to_files(metric_files={metric_files[1].key.scenario_name: [metric_files[1]]})
+
+        # Simulate a worker killed while writing the second batch
+        truncated_data = arrow_file.read_bytes()[: complete_size + 16]
+        metric_file_callback = MetricFileCallback(
+            metric_file_output_path=self.tmp_dir.name, scenario_metric_paths=[self.tmp_dir.name]
+        )
+        with patch('nuplan.planning.simulation.main_callback.metric_file_callback.close_metric_table_writers'):
+            arrow_file.write_bytes(truncated_data)
+            metric_file_callback.on_run_simulation_end()
+
+        self._assert_integrated_dataframe(self._expected_dataframe(metric_files[:1]))
+
 
 if __name__ == '__main__':
     unittest.main()
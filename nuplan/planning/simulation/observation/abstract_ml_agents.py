@@ -5,6 +5,7 @@ from nuplan.common.actor_state.tracked_objects import TrackedObject, TrackedObje
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.simulation.history.simulation_history_buffer import SimulationHistoryBuffer
 from nuplan.planning.simulation.observation.abstract_observation import AbstractObservation
+from nuplan.planning.simulation.observation.ml_agents_inference_broker import MLAgentsInferenceBroker
 from nuplan.planning.simulation.observation.observation_type import DetectionsTracks, Observation
 from nuplan.planning.simulation.planner.abstract_planner import PlannerInitialization, PlannerInput
 from nuplan.planning.simulation.planner.ml_planner.model_loader import ModelLoader
@@ -19,13 +20,22 @@ class AbstractMLAgents(AbstractObservation):
     Simulate agents based on an ML model.
     """
 
-    def __init__(self, model: TorchModuleWrapper, scenario: AbstractScenario) -> None:
+    def __init__(
+        self,
+        model: TorchModuleWrapper,
+        scenario: AbstractScenario,
+        inference_broker: Optional[MLAgentsInferenceBroker] = None,
+    ) -> None:
         """
         Initializes the AbstractEgoCentricMLAgents class.
         :param model: Model to use for inference.
         :param scenario: scenario
+        :param inference_broker: Broker that batches the inference with the ML agents of other simulations running
+            in threads of the same process. The model of the broker is used if set, otherwise the model is inferred on
+            its own.
         """
-        self._model_loader = ModelLoader(model)
+        self._inference_broker = inference_broker
+        self._model_loader = inference_broker.model_loader if inference_broker is not None else ModelLoader(model)
         self._future_horizon = model.future_trajectory_sampling.time_horizon
         self._step_interval_us = model.future_trajectory_sampling.step_time * 1e6
         self._num_output_dim = model.future_trajectory_sampling.num_poses
@@ -45,6 +55,14 @@ class AbstractMLAgents(AbstractObservation):
         """
         pass
 
+    def _postprocess_predictions(self, predictions: TargetsType) -> TargetsType:
+        """
+        Extracts the predictions used to update the agents from the model output.
+        :param predictions: dictionary of target types with a batch size of 1
+        :return: predictions passed to _update_observation_with_predictions
+        """
+        return predictions
+
     @abstractmethod
     def _update_observation_with_predictions(self, agent_predictions: TargetsType) -> None:
         """
@@ -76,11 +94,22 @@ class AbstractMLAgents(AbstractObservation):
     def reset(self) -> None:
         """Inherited, see superclass."""
         self._initialize_agents()
+        self._unregister()
+
+    def _unregister(self) -> None:
+        """
+        Stop the inference broker from waiting for requests of this simulation, until it is initialized again.
+        """
+        if self._inference_broker is not None:
+            self._inference_broker.unregister(self)
 
     def initialize(self) -> None:
         """Inherited, see superclass."""
         self._initialize_agents()
-        self._model_loader.initialize()
+        if self._inference_broker is not None:
+            self._inference_broker.register(self)
+        else:
+            self._model_loader.initialize()
 
     def update_observation(
         self, iteration: SimulationIteration, next_iteration: SimulationIteration, history: SimulationHistoryBuffer
@@ -99,14 +128,22 @@ class AbstractMLAgents(AbstractObservation):
         )
         traffic_light_data = self._scenario.get_traffic_light_status_at_iteration(next_iteration.index)
         current_input = PlannerInput(next_iteration, history, traffic_light_data)
-        features = self._model_loader.build_features(current_input, initialization)
 
         # Infer model
-        predictions = self._infer_model(features)
+        if self._inference_broker is not None:
+            features = self._model_loader.build_feature_tensors(current_input, initialization)
+            predictions = self._postprocess_predictions(self._inference_broker.infer(features, self))
+        else:
+            features = self._model_loader.build_features(current_input, initialization)
+            predictions = self._infer_model(features)
 
         # Update observations
         self._update_observation_with_predictions(predictions)
 
+        # The simulation ends at the last iteration of the scenario, no further requests are submitted
+        if next_iteration.index >= self._scenario.get_number_of_iterations() - 1:
+            self._unregister()
+
     def get_observation(self) -> DetectionsTracks:
         """Inherited, see superclass."""
         assert self._agents, (
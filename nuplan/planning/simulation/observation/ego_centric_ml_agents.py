@@ -1,4 +1,4 @@
-from typing import List, cast
+from typing import Optional, cast
 
 import numpy as np
 import numpy.typing as npt
@@ -8,22 +8,28 @@ from nuplan.common.actor_state.oriented_box import OrientedBox
 from nuplan.common.actor_state.state_representation import StateSE2, StateVector2D, TimePoint
 from nuplan.common.actor_state.tracked_objects import TrackedObject
 from nuplan.common.actor_state.waypoint import Waypoint
-from nuplan.common.geometry.convert import numpy_array_to_absolute_pose, numpy_array_to_absolute_velocity
+from nuplan.common.geometry.compute import principal_value
+from nuplan.common.geometry.convert import relative_to_absolute_pose_array
+from nuplan.common.utils.split_state import SplitState
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.simulation.observation.abstract_ml_agents import AbstractMLAgents
+from nuplan.planning.simulation.observation.ml_agents_inference_broker import MLAgentsInferenceBroker
 from nuplan.planning.training.modeling.torch_module_wrapper import TorchModuleWrapper
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
 from nuplan.planning.training.preprocessing.features.agents_trajectories import AgentsTrajectories
 
 
 def _convert_prediction_to_predicted_trajectory(
-    agent: TrackedObject, poses: List[StateSE2], xy_velocities: List[StateVector2D], step_interval_us: float
+    agent: TrackedObject,
+    poses: npt.NDArray[np.float64],
+    xy_velocities: npt.NDArray[np.float64],
+    step_interval_us: float,
 ) -> PredictedTrajectory:
     """
     Convert each agent predictions into a PredictedTrajectory.
     :param agent: The agent the predictions are for.
-    :param poses: A list of poses that makes up the predictions
-    :param xy_velocities: A list of velocities in world frame corresponding to each pose.
+    :param poses: <num_frames, 3> poses in world frame that make up the predictions
+    :param xy_velocities: <num_frames, 2> velocities in world frame corresponding to each pose.
     :return: The predictions parsed into PredictedTrajectory.
     """
     waypoints = [Waypoint(TimePoint(0), agent.box, agent.velocity)]
@@ -31,26 +37,59 @@ def _convert_prediction_to_predicted_trajectory(
         Waypoint(
             # step + 1 because the first Waypoint is the current state.
             TimePoint(int((step + 1) * step_interval_us)),
-            OrientedBox.from_new_pose(agent.box, pose),
-            velocity,
+            OrientedBox.from_new_pose(agent.box, StateSE2(*pose)),
+            StateVector2D(*velocity),
         )
-        for step, (pose, velocity) in enumerate(zip(poses, xy_velocities))
+        for step, (pose, velocity) in enumerate(zip(poses.tolist(), xy_velocities.tolist()))
     ]
     return PredictedTrajectory(1.0, waypoints)
 
 
+def _interpolate_agent_states(
+    time_us: npt.NDArray[np.float64],
+    poses: npt.NDArray[np.float64],
+    xy_velocities: npt.NDArray[np.float64],
+    query_time_us: float,
+) -> npt.NDArray[np.float64]:
+    """
+    Interpolate the trajectories of all agents at a point in time, equivalent to InterpolatedTrajectory per agent.
+    :param time_us: <num_frames> increasing time of the frames shared by all agents.
+    :param poses: <num_agents, num_frames, 3> poses in world frame.
+    :param xy_velocities: <num_agents, num_frames, 2> velocities in world frame.
+    :param query_time_us: Time at which the trajectories are interpolated.
+    :return: <num_agents, 5> interpolated x, y, heading, x velocity and y velocity of the agents.
+    """
+    assert time_us[0] <= query_time_us <= time_us[-1], "Timeout exceeds trajectory!"
+
+    index = int(np.clip(np.searchsorted(time_us, query_time_us, side='right') - 1, 0, len(time_us) - 2))
+    weight = (query_time_us - time_us[index]) / (time_us[index + 1] - time_us[index])
+
+    states = np.concatenate([poses, xy_velocities], axis=-1)
+    states[..., 2] = np.unwrap(states[..., 2], axis=-1)
+    interpolated_states = (1.0 - weight) * states[:, index] + weight * states[:, index + 1]
+    interpolated_states[:, 2] = principal_value(interpolated_states[:, 2])
+
+    return interpolated_states  # type: ignore
+
+
 class EgoCentricMLAgents(AbstractMLAgents):
     """
     Simulate agents based on an ML model.
     """
 
-    def __init__(self, model: TorchModuleWrapper, scenario: AbstractScenario) -> None:
+    def __init__(
+        self,
+        model: TorchModuleWrapper,
+        scenario: AbstractScenario,
+        inference_broker: Optional[MLAgentsInferenceBroker] = None,
+    ) -> None:
         """
         Initializes the EgoCentricMLAgents class.
         :param model: Model to use for inference.
         :param scenario: scenario
+        :param inference_broker: Broker that batches the inference with the ML agents of other simulations.
         """
-        super().__init__(model, scenario)
+        super().__init__(model, scenario, inference_broker)
         self.prediction_type = 'agents_trajectory'
 
     @property
@@ -67,6 +106,10 @@ class EgoCentricMLAgents(AbstractMLAgents):
         # Propagate model
         predictions = self._model_loader.infer(features)
 
+        return self._postprocess_predictions(predictions)
+
+    def _postprocess_predictions(self, predictions: TargetsType) -> TargetsType:
+        """Inherited, see superclass."""
         # Extract trajectory prediction
         if self.prediction_type not in predictions:
             raise ValueError(f"Prediction does not have the output '{self.prediction_type}'")
@@ -89,21 +132,44 @@ class EgoCentricMLAgents(AbstractMLAgents):
         agent_predictions = cast(AgentsTrajectories, predictions[self.prediction_type])
 
         agent_predictions.reshape_to_agents()  # Reshape to [num_agents, num_frames, state_dim]
-        agent_poses = agent_predictions.poses[0]  # Fetch the first batch for the pose data
-        agent_velocities = agent_predictions.xy_velocity[0]
+        # Only agents both tracked and predicted are updated
+        num_agents = min(len(self._agents), len(agent_predictions.poses[0]))
+        agent_poses = agent_predictions.poses[0][:num_agents]  # Fetch the first batch for the pose data
+        agent_velocities = agent_predictions.xy_velocity[0][:num_agents]
+        agent_tokens = list(self._agents)[:num_agents]
+        agents = [self._agents[token] for token in agent_tokens]
+
+        # Convert the predictions of all agents to global coordinates at once, and prepend their current state
+        poses = relative_to_absolute_pose_array(self._ego_anchor_state.rear_axle, agent_poses)
+        xy_velocities = relative_to_absolute_pose_array(
+            self._ego_velocity_anchor_state, np.pad(agent_velocities, ((0, 0), (0, 0), (0, 1)))
+        )[..., :2]
+        current_poses = np.array([[agent.center.x, agent.center.y, agent.center.heading] for agent in agents])
+        current_velocities = np.array([[agent.velocity.x, agent.velocity.y] for agent in agents])
+        time_us = np.array([0] + [int((step + 1) * self._step_interval_us) for step in range(poses.shape[1])])
+
+        # Propagate agents according to simulation time
+        new_states = _interpolate_agent_states(
+            time_us,
+            np.concatenate([current_poses[:, None], poses], axis=1),
+            np.concatenate([current_velocities[:, None], xy_velocities], axis=1),
+            self.step_time.time_us,
+        )
 
-        for agent_token, agent, poses_horizon, xy_velocity_horizon in zip(
-            self._agents, self._agents.values(), agent_poses, agent_velocities
+        for agent_token, agent, agent_poses_horizon, agent_velocities_horizon, (x, y, heading, vx, vy) in zip(
+            agent_tokens, agents, poses, xy_velocities, new_states.tolist()
         ):
-            # Convert to global coordinates
-            poses = numpy_array_to_absolute_pose(self._ego_anchor_state.rear_axle, poses_horizon)
-            xy_velocities = numpy_array_to_absolute_velocity(self._ego_velocity_anchor_state, xy_velocity_horizon)
             future_trajectory = _convert_prediction_to_predicted_trajectory(
-                agent, poses, xy_velocities, self._step_interval_us
+                agent, agent_poses_horizon, agent_velocities_horizon, self._step_interval_us
+            )
+            # Built like InterpolatedTrajectory builds states, from the interpolated linear and angular states
+            new_state = Waypoint.from_split_state(
+                SplitState(
+                    linear_states=[self.step_time.time_us, x, y, vx, vy],
+                    angular_states=[heading],
+                    fixed_states=[agent.box.width, agent.box.length, agent.box.height],
+                )
             )
-
-            # Propagate agent according to simulation time
-            new_state = future_trajectory.trajectory.get_state_at_time(self.step_time)
 
             new_agent = Agent(
                 tracked_object_type=agent.tracked_object_type,
@@ -45,6 +45,7 @@ class IDMAgent:
         policy: IDMPolicy,
         minimum_path_length: float,
         max_route_len: int = 5,
+        edge_curvatures: Optional[Dict[str, float]] = None,
     ):
         """
         Constructor for IDMAgent.
@@ -54,6 +55,8 @@ class IDMAgent:
         :param policy: policy controlling the agent behavior
         :param minimum_path_length: [m] The minimum path length
         :param max_route_len: The max number of route elements to store
+        :param edge_curvatures: {edge_id: curvature} table of absolute curvatures at the start of lane graph edges,
+            shared by the agents on a map. The agent keeps a table of its own if None.
         """
         self._start_iteration = start_iteration  # scenario iteration where agent first appears
         self._initial_state = initial_state
@@ -63,6 +66,7 @@ class IDMAgent:
         self._policy = policy
         self._minimum_path_length = minimum_path_length
         self._size = (initial_state.box.width, initial_state.box.length, initial_state.box.height)
+        self._edge_curvatures: Dict[str, float] = edge_curvatures if edge_curvatures is not None else {}
 
     def propagate(self, lead_agent: IDMLeadAgentState, tspan: float) -> None:
         """
@@ -221,14 +225,26 @@ class IDMAgent:
             if not selected_outgoing_edges:
                 break
             # Select edge with the lowest curvature (prefer going straight)
-            curvatures = [abs(edge.baseline_path.get_curvature_at_arc_length(0.0)) for edge in selected_outgoing_edges]
-            idx = np.argmin(curvatures)
+            curvatures = self._get_edge_curvatures(outgoing_edges)
+            idx = np.argmin([curvatures[edge.id] for edge in selected_outgoing_edges])
             new_segment = selected_outgoing_edges[idx]
 
             self._route.append(new_segment)
             self._path = create_path_from_se2(self.get_path_to_go() + new_segment.baseline_path.discrete_path)
             self._state.progress = 0
 
+    def _get_edge_curvatures(self, edges: List[LaneGraphEdgeMapObject]) -> Dict[str, float]:
+        """
+        Get the absolute curvatures at the start of edges, they are estimated once per edge and kept in the table.
+        :param edges: Lane graph edges.
+        :return: {edge_id: curvature} table that contains all edges.
+        """
+        for edge in edges:
+            if edge.id not in self._edge_curvatures:
+                self._edge_curvatures[edge.id] = abs(edge.baseline_path.get_curvature_at_arc_length(0.0))
+
+        return self._edge_curvatures
+
     def _get_agent_at_progress(
         self, progress: float, num_samples: Optional[int] = None, sampling_time: Optional[float] = None
     ) -> Agent:
@@ -246,20 +262,27 @@ class IDMAgent:
             future_trajectory = None
 
             if num_samples and sampling_time:
-                progress_samples = [
-                    self._clamp_progress(progress + self.velocity * sampling_time * (step + 1))
-                    for step in range(num_samples)
-                ]
-                future_poses = [self._path.get_state_at_progress(progress) for progress in progress_samples]
-                time_stamps = [TimePoint(int(1e6 * sampling_time * (step + 1))) for step in range(num_samples)]
+                # Sample all future poses at once, the velocity is assumed to be constant
+                steps = np.arange(1, num_samples + 1)
+                progress_samples = np.clip(
+                    progress + self.velocity * sampling_time * steps,
+                    self._path.get_start_progress(),
+                    self._path.get_end_progress(),
+                )
+                future_states = self._path.get_state_array_at_progress(progress_samples)
+                headings = future_states[:, 3]
+                velocities = self.velocity * np.stack([np.cos(headings), np.sin(headings)], axis=-1)
+
                 init_way_point = [Waypoint(TimePoint(0), box, self._velocity_to_global_frame(init_pose.heading))]
                 waypoints = [
                     Waypoint(
-                        time,
-                        OrientedBox.from_new_pose(self._initial_state.box, pose),
-                        self._velocity_to_global_frame(pose.heading),
+                        TimePoint(int(1e6 * sampling_time * step)),
+                        OrientedBox.from_new_pose(self._initial_state.box, ProgressStateSE2.deserialize(state)),
+                        StateVector2D(velocity_x, velocity_y),
+                    )
+                    for step, state, (velocity_x, velocity_y) in zip(
+                        steps.tolist(), future_states.tolist(), velocities.tolist()
                     )
-                    for time, pose in zip(time_stamps, future_poses)
                 ]
                 future_trajectory = PredictedTrajectory(1.0, init_way_point + waypoints)
             return Agent(
@@ -10,10 +10,12 @@ from nuplan.common.actor_state.state_representation import StateSE2, StateVector
 from nuplan.common.actor_state.tracked_objects_types import TrackedObjectType
 from nuplan.common.maps.abstract_map import AbstractMap, SemanticMapLayer
 from nuplan.common.maps.abstract_map_objects import GraphEdgeMapObject
+from nuplan.common.maps.nuplan_map.nuplan_map import get_map_version
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.simulation.observation.idm.idm_agent import IDMAgent, IDMInitialState
 from nuplan.planning.simulation.observation.idm.idm_agent_manager import UniqueIDMAgents
 from nuplan.planning.simulation.observation.idm.idm_policy import IDMPolicy
+from nuplan.planning.simulation.observation.idm.utils import get_edge_start_curvatures
 from nuplan.planning.simulation.occupancy_map.abstract_occupancy_map import OccupancyMap
 from nuplan.planning.simulation.occupancy_map.strtree_occupancy_map import (
     STRTreeOccupancyMap,
@@ -79,6 +81,7 @@ def build_idm_agents_on_map_rails(
 
     detections = scenario.initial_tracked_objects
     map_api = scenario.map_api
+    edge_curvatures = get_edge_start_curvatures(map_api.map_name, get_map_version(map_api))
     ego_agent = scenario.get_ego_state_at_iteration(0).agent
 
     open_loop_detections = detections.tracked_objects.get_tracked_objects_of_types(open_loop_detections_types)
@@ -144,6 +147,7 @@ def build_idm_agents_on_map_rails(
                 route=[route],
                 policy=IDMPolicy(target_velocity, min_gap_to_lead_agent, headway_time, accel_max, decel_max),
                 minimum_path_length=minimum_path_length,
+                edge_curvatures=edge_curvatures,
             )
 
     return unique_agents, occupancy_map
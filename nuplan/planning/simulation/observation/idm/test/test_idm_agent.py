@@ -0,0 +1,109 @@
+import unittest
+from typing import List
+from unittest.mock import Mock
+
+import numpy as np
+
+from nuplan.common.actor_state.oriented_box import OrientedBox
+from nuplan.common.actor_state.scene_object import SceneObjectMetadata
+from nuplan.common.actor_state.state_representation import StateSE2, StateVector2D
+from nuplan.common.actor_state.tracked_objects_types import TrackedObjectType
+from nuplan.common.maps.maps_datatypes import TrafficLightStatusType
+from nuplan.planning.simulation.observation.idm.idm_agent import IDMAgent, IDMInitialState
+from nuplan.planning.simulation.observation.idm.idm_policy import IDMPolicy
+
+
+def _build_edge(edge_id: str, discrete_path: List[StateSE2], curvature: float) -> Mock:
+    """
+    Build a lane graph edge without traffic lights.
+    :param edge_id: Edge id.
+    :param discrete_path: Baseline path of the edge.
+    :param curvature: Curvature of the baseline path.
+    :return: Mocked lane graph edge.
+    """
+    edge = Mock()
+    edge.id = edge_id
+    edge.speed_limit_mps = 10.0
+    edge.outgoing_edges = []
+    edge.has_traffic_lights.return_value = False
+    edge.baseline_path.discrete_path = discrete_path
+    edge.baseline_path.get_curvature_at_arc_length.return_value = curvature
+    return edge
+
+
+class TestIDMAgent(unittest.TestCase):
+    """Tests IDMAgent path sampling and route planning."""
+
+    def setUp(self) -> None:
+        """Test setup."""
+        headings = np.linspace(0.0, 3.0, 20)
+        positions = np.cumsum(np.stack([np.cos(headings), np.sin(headings)], axis=-1), axis=0)
+        self.route = _build_edge(
+            'route', [StateSE2(x, y, heading) for (x, y), heading in zip(positions, headings)], curvature=0.1
+        )
+        self.initial_state = IDMInitialState(
+            metadata=SceneObjectMetadata(timestamp_us=0, token='token', track_id=0, track_token='track_token'),
+            tracked_object_type=TrackedObjectType.VEHICLE,
+            box=OrientedBox(StateSE2(0.0, 0.0, 0.0), length=4.0, width=2.0, height=1.5),
+            velocity=StateVector2D(2.0, 0.0),
+            path_progress=3.0,
+            predictions=None,
+        )
+        self.policy = IDMPolicy(
+            target_velocity=10.0, min_gap_to_lead_agent=1.0, headway_time=1.5, accel_max=1.0, decel_max=2.0
+        )
+
+    def _build_agent(self, **kwargs: object) -> IDMAgent:
+        """
+        :param kwargs: Additional arguments of IDMAgent.
+        :return: IDM agent on the test route.
+        """
+        return IDMAgent(
+            start_iteration=0,
+            initial_state=self.initial_state,
+            route=[self.route],
+            policy=self.policy,
+            minimum_path_length=5.0,
+            **kwargs,  # type: ignore
+        )
+
+    def test_get_agent_with_planned_trajectory(self) -> None:
+        """Test that the planned trajectory samples the path at a constant velocity, clamped to the path end."""
+        agent = self._build_agent()
+        num_samples, sampling_time = 20, 0.5
+        predicted_agent = agent.get_agent_with_planned_trajectory(num_samples, sampling_time)
+
+        waypoints = predicted_agent.predictions[0].waypoints
+        self.assertEqual(len(waypoints), num_samples + 1)
+        path = agent._path
+        for step, waypoint in enumerate(waypoints[1:], start=1):
+            progress = min(agent.progress + agent.velocity * sampling_time * step, path.get_end_progress())
+            expected_pose = path.get_state_at_progress(progress)
+            self.assertEqual(waypoint.time_point.time_us, int(1e6 * sampling_time * step))
+            self.assertEqual(waypoint.center.x, expected_pose.x)
+            self.assertEqual(waypoint.center.y, expected_pose.y)
+            self.assertEqual(waypoint.center.heading, expected_pose.heading)
+            self.assertAlmostEqual(waypoint.velocity.x, agent.velocity * np.cos(expected_pose.heading))
+            self.assertAlmostEqual(waypoint.velocity.y, agent.velocity * np.sin(expected_pose.heading))
+
+    def test_plan_route_edge_curvatures(self) -> None:
+        """Test that the straightest outgoing edge is selected and curvatures are estimated once per shared table."""
+        end = self.route.baseline_path.discrete_path[-1]
+        straight_edge = _build_edge('straight', [end, StateSE2(end.x - 20.0, end.y, end.heading)], curvature=0.0)
+        turning_edge = _build_edge('turning', [end, StateSE2(end.x - 10.0, end.y + 10.0, end.heading)], curvature=-0.2)
+        self.route.outgoing_edges = [turning_edge, straight_edge]
+        traffic_light_status = {TrafficLightStatusType.GREEN: [], TrafficLightStatusType.RED: []}
+
+        edge_curvatures = {'turning': 0.2}
+        for _ in range(2):
+            agent = self._build_agent(edge_curvatures=edge_curvatures)
+            agent.plan_route(traffic_light_status)
+            self.assertEqual(agent.get_route()[1].id, 'straight')
+
+        self.assertEqual(edge_curvatures, {'turning': 0.2, 'straight': 0.0})
+        turning_edge.baseline_path.get_curvature_at_arc_length.assert_not_called()
+        straight_edge.baseline_path.get_curvature_at_arc_length.assert_called_once_with(0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
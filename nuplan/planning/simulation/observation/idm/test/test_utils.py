@@ -4,6 +4,7 @@ import numpy as np
 import numpy.typing as npt
 
 from nuplan.planning.simulation.observation.idm.utils import (
+    get_edge_start_curvatures,
     transform_vector_global_to_local_frame,
     transform_vector_local_to_global_frame,
 )
@@ -48,3 +49,23 @@ class IDMPolicyTests(unittest.TestCase):
 
     if __name__ == '__main__':
         unittest.main()
+
+
+class EdgeStartCurvaturesTests(unittest.TestCase):
+    """
+    Tests the shared tables of edge start curvatures.
+    """
+
+    def test_tables_by_map_version(self) -> None:
+        """
+        Tests that tables are shared per map name and map version, and that the number of tables is bounded.
+        """
+        table = get_edge_start_curvatures('map', '1.0')
+        table['edge'] = 0.1
+        self.assertIs(get_edge_start_curvatures('map', '1.0'), table)
+        self.assertEqual(get_edge_start_curvatures('map', '2.0'), {})
+        self.assertEqual(get_edge_start_curvatures('other_map', '1.0'), {})
+
+        for index in range(get_edge_start_curvatures.cache_info().maxsize):
+            get_edge_start_curvatures(f'map_{index}', '1.0')
+        self.assertEqual(get_edge_start_curvatures('map', '1.0'), {})
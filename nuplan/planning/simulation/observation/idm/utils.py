@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Callable, List, Optional, Set, Tuple, cast
+from typing import Callable, Dict, List, Optional, Set, Tuple, cast
 
 import numpy as np
 import numpy.typing as npt
@@ -16,6 +16,19 @@ from nuplan.planning.simulation.path.interpolated_path import InterpolatedPath
 from nuplan.planning.simulation.path.utils import calculate_progress
 
 
+@lru_cache(maxsize=8)
+def get_edge_start_curvatures(map_name: str, map_version: str) -> Dict[str, float]:
+    """
+    Get the table of absolute curvatures at the start of lane graph edges of a map, filled by the IDM agents on it.
+    The table is shared by all agents on the map, so that every curvature is estimated once per process. Tables of the
+    least recently used maps are dropped.
+    :param map_name: Name of the map.
+    :param map_version: Version of the map data.
+    :return: {edge_id: curvature} table of the map.
+    """
+    return {}
+
+
 @lru_cache(maxsize=256)
 def get_agent_relative_angle(ego_state: StateSE2, agent_state: StateSE2) -> float:
     """
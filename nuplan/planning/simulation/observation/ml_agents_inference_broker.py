@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+from nuplan.planning.simulation.planner.ml_planner.model_loader import ModelLoader
+from nuplan.planning.training.modeling.torch_module_wrapper import TorchModuleWrapper
+from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
+
+
+@dataclass
+class _InferenceRequest:
+    """Features of a single sample waiting for inference, and the result once the batch it is part of ran."""
+
+    features: FeaturesType
+    targets: Optional[TargetsType] = None
+    error: Optional[BaseException] = None
+    done: bool = False
+    pending: bool = True
+
+
+class MLAgentsInferenceBroker:
+    """
+    Batches the model inference of ML agents of all simulations that run concurrently in a worker.
+    Every simulation submits the features of its current step and blocks. The submitting thread that completes a batch
+    collates the features of all pending requests with the collate function of each feature, runs a single forward
+    pass and scatters the unpacked targets back to the waiting requests. A batch is complete once every active
+    client submitted, once it reaches the maximum batch size or once the oldest request waited for the maximum wait
+    time, so a single simulation never waits longer than that for others. Clients are active from their registration
+    until they unregister or stop submitting requests for longer than the client timeout, e.g. once their simulation
+    finished.
+    Requests are only batched across the threads of a single process, e.g. simulations run by the thread pool of
+    SingleMachineParallelExecutor. Every process holds its own broker, so simulations run by Ray or process pool
+    workers each infer on their own and gain nothing from the broker.
+    """
+
+    def __init__(
+        self,
+        model: TorchModuleWrapper,
+        max_batch_size: int = 32,
+        max_wait_time: float = 0.01,
+        client_timeout: float = 1.0,
+    ) -> None:
+        """
+        :param model: Model shared by all clients.
+        :param max_batch_size: Maximum number of samples in a forward pass.
+        :param max_wait_time: [s] Maximum time a request waits for other requests before its batch is run anyway.
+        :param client_timeout: [s] Time without requests after which a client is no longer waited for.
+        """
+        assert max_batch_size > 0, f"Batch size has to be positive, got {max_batch_size}!"
+        assert max_wait_time >= 0.0, f"Wait time can't be negative, got {max_wait_time}!"
+        assert client_timeout > 0.0, f"Client timeout has to be positive, got {client_timeout}!"
+
+        self._model = model
+        self._model_loader = ModelLoader(model)
+        self._max_batch_size = max_batch_size
+        self._max_wait_time = max_wait_time
+        self._client_timeout = client_timeout
+
+        self._condition = threading.Condition()
+        self._forward_lock = threading.Lock()
+        self._pending: List[_InferenceRequest] = []
+        # Time of the last registration or request of every client, clients are referenced weakly
+        self._client_activity: weakref.WeakKeyDictionary[object, float] = weakref.WeakKeyDictionary()
+
+        self.num_forward_passes = 0
+        self.num_inferred_samples = 0
+
+    @property
+    def model(self) -> TorchModuleWrapper:
+        """:return: Model shared by all clients."""
+        return self._model
+
+    @property
+    def model_loader(self) -> ModelLoader:
+        """:return: Model loader of the shared model, which also builds the features of the clients."""
+        return self._model_loader
+
+    @property
+    def num_active_clients(self) -> int:
+        """:return: Number of clients that registered or submitted a request within the client timeout."""
+        min_activity_time = time.monotonic() - self._client_timeout
+        return sum(activity_time >= min_activity_time for activity_time in self._client_activity.values())
+
+    def register(self, client: object) -> None:
+        """
+        Register a client, a batch is complete without waiting once all active clients submitted a request.
+        :param client: Client that submits requests.
+        """
+        with self._condition:
+            if not self._model_loader.is_initialized:
+                self._model_loader.initialize()
+            self._client_activity[client] = time.monotonic()
+            self._condition.notify_all()
+
+    def unregister(self, client: object) -> None:
+        """
+        Unregister a client, e.g. once its simulation finished.
+        :param client: Client that submits requests.
+        """
+        with self._condition:
+            self._client_activity.pop(client, None)
+            self._condition.notify_all()
+
+    def _is_batch_complete(self) -> bool:
+        """:return: Whether the pending requests complete a batch."""
+        return len(self._pending) >= min(self._max_batch_size, max(self.num_active_clients, 1))
+
+    def _run_batch(self, batch: List[_InferenceRequest]) -> None:
+        """
+        Collate the features of a batch of requests, run a forward pass and scatter the targets to the requests.
+        :param batch: Requests with features of a single sample each.
+        """
+        try:
+            features = {
+                name: type(feature).collate([request.features[name] for request in batch])
+                for name, feature in batch[0].features.items()
+            }
+            with self._forward_lock:
+                predictions = self._model_loader.infer(features)
+                self.num_forward_passes += 1
+                self.num_inferred_samples += len(batch)
+
+            unpacked_predictions = {name: prediction.unpack() for name, prediction in predictions.items()}
+            for index, request in enumerate(batch):
+                request.targets = {name: unpacked[index] for name, unpacked in unpacked_predictions.items()}
+        except BaseException as error:
+            for request in batch:
+                request.error = error
+
+    def infer(self, features: FeaturesType, client: Optional[object] = None) -> TargetsType:
+        """
+        Infer the model on the features of a single sample, batched with the concurrent requests of other clients.
+        :param features: Features of a single sample, as built by ModelLoader.build_feature_tensors.
+        :param client: Client that submits the request, None for anonymous requests.
+        :return: Targets of the sample, with a batch size of 1.
+        """
+        request = _InferenceRequest(features=features)
+        with self._condition:
+            if client is not None:
+                self._client_activity[client] = time.monotonic()
+            self._pending.append(request)
+            self._condition.notify_all()
+            deadline = time.monotonic() + self._max_wait_time
+
+            while not request.done:
+                if request.pending and (self._is_batch_complete() or time.monotonic() >= deadline):
+                    batch = self._pending[: self._max_batch_size]
+                    del self._pending[: len(batch)]
+                    for batch_request in batch:
+                        batch_request.pending = False
+
+                    # Run the forward pass outside of the condition, so that other clients keep submitting
+                    self._condition.release()
+                    try:
+                        self._run_batch(batch)
+                    finally:
+                        self._condition.acquire()
+
+                    for batch_request in batch:
+                        batch_request.done = True
+                    self._condition.notify_all()
+                else:
+                    self._condition.wait(timeout=max(deadline - time.monotonic(), 0.0) if request.pending else None)
+
+        if request.error is not None:
+            raise request.error
+
+        assert request.targets is not None
+        return request.targets
+
+
+# Brokers shared by all simulations of a worker, by model key
+_INFERENCE_BROKERS: Dict[str, MLAgentsInferenceBroker] = {}
+_INFERENCE_BROKERS_LOCK = threading.Lock()
+
+
+def get_ml_agents_inference_broker(
+    key: str, model_factory: Callable[[], TorchModuleWrapper], **kwargs: Any
+) -> MLAgentsInferenceBroker:
+    """
+    Get the inference broker of a model, the model is built and the broker created on the first call in a process.
+    :param key: Unique key of the model, e.g. the path of its checkpoint.
+    :param model_factory: Function that builds the model.
+    :param kwargs: Additional arguments of MLAgentsInferenceBroker, only used when the broker is created.
+    :return: The inference broker.
+    """
+    with _INFERENCE_BROKERS_LOCK:
+        broker = _INFERENCE_BROKERS.get(key, None)
+        if broker is None:
+            broker = MLAgentsInferenceBroker(model_factory(), **kwargs)
+            _INFERENCE_BROKERS[key] = broker
+
+    return broker
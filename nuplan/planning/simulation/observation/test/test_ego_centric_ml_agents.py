@@ -2,10 +2,16 @@ import unittest
 from unittest.mock import Mock, patch
 
 import numpy as np
+import torch
 
+from nuplan.common.actor_state.oriented_box import OrientedBox
 from nuplan.common.actor_state.state_representation import TimePoint
+from nuplan.common.actor_state.waypoint import Waypoint
+from nuplan.common.geometry.convert import numpy_array_to_absolute_pose, numpy_array_to_absolute_velocity
 from nuplan.planning.scenario_builder.test.mock_abstract_scenario import MockAbstractScenario
 from nuplan.planning.simulation.observation.ego_centric_ml_agents import EgoCentricMLAgents
+from nuplan.planning.simulation.simulation_time_controller.simulation_iteration import SimulationIteration
+from nuplan.planning.simulation.trajectory.interpolated_trajectory import InterpolatedTrajectory
 from nuplan.planning.simulation.trajectory.trajectory_sampling import TrajectorySampling
 from nuplan.planning.training.modeling.torch_module_wrapper import TorchModuleWrapper
 from nuplan.planning.training.preprocessing.features.agents import Agents
@@ -46,6 +52,96 @@ class TestEgoCentricMLAgents(unittest.TestCase):
         self.assertAlmostEqual(obs._agents['0'].center.y, 1.0)
         self.assertAlmostEqual(obs._agents['0'].center.heading, 0.0)
 
+    def test_update_observation_with_predictions_multiple_agents(self) -> None:
+        """Test that the agents are updated like interpolating the predicted trajectory of every agent on its own."""
+        scenario = MockAbstractScenario(number_of_detections=3)
+        self.model.future_trajectory_sampling = TrajectorySampling(num_poses=4, time_horizon=2.0)
+        obs = EgoCentricMLAgents(model=self.model, scenario=scenario)
+        obs.initialize()
+        initial_agents = list(obs._agents.values())
+
+        rng = np.random.default_rng(0)
+        prediction = rng.uniform(-3.0, 3.0, (4, 3, 6))  # [num_frames, num_agents, state_dim]
+        obs.step_time = TimePoint(int(0.7e6))
+        obs._update_observation_with_predictions({'agents_trajectory': AgentsTrajectories(data=[prediction])})
+
+        ego_pose = scenario.initial_ego_state.rear_axle
+        for agent_index, (agent, new_agent) in enumerate(zip(initial_agents, obs._agents.values())):
+            # Previous conversion through a list of poses and an interpolated trajectory per agent
+            poses = numpy_array_to_absolute_pose(ego_pose, prediction[:, agent_index, :3])
+            xy_velocities = numpy_array_to_absolute_velocity(
+                obs._ego_velocity_anchor_state, prediction[:, agent_index, 3:5]
+            )
+            waypoints = [Waypoint(TimePoint(0), agent.box, agent.velocity)] + [
+                Waypoint(TimePoint(int((step + 1) * 0.5e6)), OrientedBox.from_new_pose(agent.box, pose), velocity)
+                for step, (pose, velocity) in enumerate(zip(poses, xy_velocities))
+            ]
+            expected_state = InterpolatedTrajectory(waypoints).get_state_at_time(obs.step_time)
+
+            self.assertAlmostEqual(new_agent.center.x, expected_state.center.x)
+            self.assertAlmostEqual(new_agent.center.y, expected_state.center.y)
+            self.assertAlmostEqual(new_agent.center.heading, expected_state.center.heading)
+            self.assertAlmostEqual(new_agent.velocity.x, expected_state.velocity.x)
+            self.assertAlmostEqual(new_agent.velocity.y, expected_state.velocity.y)
+            self.assertEqual(len(new_agent.predictions[0].waypoints), 5)
+            for waypoint, expected_waypoint in zip(new_agent.predictions[0].waypoints, waypoints):
+                self.assertEqual(waypoint.time_point, expected_waypoint.time_point)
+                self.assertAlmostEqual(waypoint.center.x, expected_waypoint.center.x)
+                self.assertAlmostEqual(waypoint.center.y, expected_waypoint.center.y)
+                self.assertAlmostEqual(waypoint.center.heading, expected_waypoint.center.heading)
+                self.assertAlmostEqual(waypoint.velocity.x, expected_waypoint.velocity.x)
+
+    def test_update_observation_with_more_predictions_than_agents(self) -> None:
+        """Test that predictions of agents that are not tracked are ignored."""
+        obs = EgoCentricMLAgents(model=self.model, scenario=self.scenario)
+        obs.initialize()
+
+        prediction = np.array([[[1.0, 1.0, 0.0, 0.0, 0.0, 0.0], [5.0, 5.0, 0.0, 0.0, 0.0, 0.0]]])
+        obs.step_time = TimePoint(1e6)
+        obs._update_observation_with_predictions({'agents_trajectory': AgentsTrajectories(data=[prediction])})
+
+        self.assertEqual(list(obs._agents), ['0'])
+        self.assertAlmostEqual(obs._agents['0'].center.x, 1.0)
+        self.assertAlmostEqual(obs._agents['0'].center.y, 1.0)
+
+    def test_initialize_keeps_gradients_enabled(self) -> None:
+        """Test that initializing the model for inference does not disable gradients globally."""
+        obs = EgoCentricMLAgents(model=self.model, scenario=self.scenario)
+        obs.initialize()
+
+        self.assertTrue(torch.is_grad_enabled())
+
+    def test_initialize_with_inference_broker(self) -> None:
+        """Test that the agents register with the inference broker and use its model loader."""
+        inference_broker = Mock()
+        obs = EgoCentricMLAgents(model=self.model, scenario=self.scenario, inference_broker=inference_broker)
+        obs.initialize()
+
+        inference_broker.register.assert_called_once_with(obs)
+        self.assertIs(obs._model_loader, inference_broker.model_loader)
+
+    def test_unregister_from_inference_broker(self) -> None:
+        """Test that the agents unregister from the inference broker on reset and once the simulation ends."""
+        inference_broker = Mock()
+        obs = EgoCentricMLAgents(model=self.model, scenario=self.scenario, inference_broker=inference_broker)
+        obs.initialize()
+
+        obs.reset()
+        inference_broker.unregister.assert_called_once_with(obs)
+
+        obs.initialize()
+        inference_broker.unregister.reset_mock()
+        history = Mock(current_state=(self.scenario.initial_ego_state, Mock()))
+        last_index = self.scenario.get_number_of_iterations() - 1
+        with patch.object(obs, '_postprocess_predictions'), patch.object(obs, '_update_observation_with_predictions'):
+            for index in range(1, last_index + 1):
+                iteration = SimulationIteration(self.scenario.get_time_point(index - 1), index - 1)
+                next_iteration = SimulationIteration(self.scenario.get_time_point(index), index)
+                obs.update_observation(iteration, next_iteration, history)
+                self.assertEqual(inference_broker.unregister.called, index == last_index)
+
+        inference_broker.unregister.assert_called_once_with(obs)
+
     @patch('nuplan.planning.simulation.planner.ml_planner.model_loader.ModelLoader.infer')
     def test_infer_model(self, mock_infer: Mock) -> None:
         """Test _infer_model function."""
@@ -0,0 +1,190 @@
+import threading
+import time
+import unittest
+from typing import List
+from unittest.mock import Mock
+
+import numpy as np
+import torch
+
+from nuplan.planning.simulation.observation.ml_agents_inference_broker import (
+    MLAgentsInferenceBroker,
+    get_ml_agents_inference_broker,
+)
+from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
+from nuplan.planning.training.preprocessing.features.agents_trajectories import AgentsTrajectories
+
+
+class _ScalingModel(torch.nn.Module):
+    """Model that scales its input trajectories and records the batch size of every forward pass."""
+
+    def __init__(self, fail: bool = False) -> None:
+        """
+        :param fail: Whether the forward pass raises.
+        """
+        super().__init__()
+        self.fail = fail
+        self.batch_sizes: List[int] = []
+
+    def get_list_of_required_feature(self) -> List[Mock]:
+        """:return: No feature builders, features are passed directly."""
+        return []
+
+    def forward(self, features: FeaturesType) -> TargetsType:
+        """
+        :param features: Batched input trajectories.
+        :return: Batched scaled trajectories.
+        """
+        if self.fail:
+            raise RuntimeError("Forward pass failed")
+
+        trajectories = features['trajectories']
+        self.batch_sizes.append(trajectories.batch_size)
+        return {'agents_trajectory': AgentsTrajectories(data=[2.0 * data for data in trajectories.data])}
+
+
+def _build_features(value: float, num_agents: int) -> FeaturesType:
+    """
+    :param value: Value of all states.
+    :param num_agents: Number of agents of the sample.
+    :return: Features of a single sample, with a different number of agents per sample.
+    """
+    return {'trajectories': AgentsTrajectories(data=[torch.full((1, num_agents, 6), value)])}
+
+
+class TestMLAgentsInferenceBroker(unittest.TestCase):
+    """Test batching of ML agents inference across clients."""
+
+    def _infer_concurrently(self, broker: MLAgentsInferenceBroker, num_clients: int) -> List[TargetsType]:
+        """
+        Infer the broker from a thread per client.
+        :param broker: Inference broker.
+        :param num_clients: Number of clients.
+        :return: Targets of every client.
+        """
+        results: List[TargetsType] = [{} for _ in range(num_clients)]
+
+        def infer(index: int) -> None:
+            results[index] = broker.infer(_build_features(float(index), num_agents=index + 1))
+
+        threads = [threading.Thread(target=infer, args=(index,)) for index in range(num_clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_batch_across_clients(self) -> None:
+        """Test that the requests of all registered clients are run in a single forward pass."""
+        model = _ScalingModel()
+        broker = MLAgentsInferenceBroker(model, max_wait_time=10.0)
+        clients = [Mock() for _ in range(4)]
+        for client in clients:
+            broker.register(client)
+
+        results = self._infer_concurrently(broker, num_clients=len(clients))
+
+        self.assertEqual(model.batch_sizes, [4])
+        self.assertEqual(broker.num_forward_passes, 1)
+        self.assertEqual(broker.num_inferred_samples, 4)
+        for index, result in enumerate(results):
+            prediction = result['agents_trajectory']
+            self.assertEqual(prediction.batch_size, 1)
+            self.assertEqual(prediction.data[0].shape, (1, index + 1, 6))
+            np.testing.assert_allclose(prediction.data[0].numpy(), 2.0 * index)
+
+    def test_max_batch_size(self) -> None:
+        """Test that batches are split to the maximum batch size."""
+        model = _ScalingModel()
+        broker = MLAgentsInferenceBroker(model, max_batch_size=2, max_wait_time=10.0)
+        clients = [Mock() for _ in range(4)]
+        for client in clients:
+            broker.register(client)
+
+        results = self._infer_concurrently(broker, num_clients=len(clients))
+
+        self.assertEqual(model.batch_sizes, [2, 2])
+        for index, result in enumerate(results):
+            np.testing.assert_allclose(result['agents_trajectory'].data[0].numpy(), 2.0 * index)
+
+    def test_max_wait_time(self) -> None:
+        """Test that a request does not wait for clients that do not submit beyond the maximum wait time."""
+        model = _ScalingModel()
+        broker = MLAgentsInferenceBroker(model, max_wait_time=0.05)
+        clients = [Mock() for _ in range(2)]
+        for client in clients:
+            broker.register(client)
+
+        start_time = time.perf_counter()
+        result = broker.infer(_build_features(1.0, num_agents=3))
+
+        self.assertGreaterEqual(time.perf_counter() - start_time, 0.05)
+        self.assertEqual(model.batch_sizes, [1])
+        np.testing.assert_allclose(result['agents_trajectory'].data[0].numpy(), 2.0)
+
+    def test_unregister(self) -> None:
+        """Test that a single remaining client does not wait for others."""
+        model = _ScalingModel()
+        broker = MLAgentsInferenceBroker(model, max_wait_time=10.0)
+        clients = [Mock() for _ in range(2)]
+        for client in clients:
+            broker.register(client)
+        broker.unregister(clients[1])
+
+        start_time = time.perf_counter()
+        broker.infer(_build_features(1.0, num_agents=1))
+
+        self.assertLess(time.perf_counter() - start_time, 5.0)
+        self.assertEqual(broker.num_active_clients, 1)
+
+    def test_client_timeout(self) -> None:
+        """Test that clients which stopped submitting requests are no longer waited for."""
+        model = _ScalingModel()
+        broker = MLAgentsInferenceBroker(model, max_wait_time=10.0, client_timeout=0.05)
+        clients = [Mock() for _ in range(2)]
+        for client in clients:
+            broker.register(client)
+        time.sleep(0.1)
+
+        start_time = time.perf_counter()
+        broker.infer(_build_features(1.0, num_agents=1), client=clients[0])
+
+        self.assertLess(time.perf_counter() - start_time, 5.0)
+        self.assertEqual(broker.num_active_clients, 1)
+
+    def test_forward_error(self) -> None:
+        """Test that an error in the forward pass is raised in every client of the batch."""
+        broker = MLAgentsInferenceBroker(_ScalingModel(fail=True), max_wait_time=10.0)
+        clients = [Mock() for _ in range(2)]
+        for client in clients:
+            broker.register(client)
+
+        errors: List[Exception] = []
+
+        def infer() -> None:
+            try:
+                broker.infer(_build_features(1.0, num_agents=1))
+            except RuntimeError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=infer) for _ in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 2)
+
+    def test_get_ml_agents_inference_broker(self) -> None:
+        """Test that brokers are shared by model key and the model is built once."""
+        model_factory = Mock(side_effect=_ScalingModel)
+
+        broker = get_ml_agents_inference_broker('test_model_a', model_factory, max_batch_size=8)
+        self.assertIs(get_ml_agents_inference_broker('test_model_a', model_factory), broker)
+        self.assertIsNot(get_ml_agents_inference_broker('test_model_b', model_factory), broker)
+        self.assertEqual(model_factory.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
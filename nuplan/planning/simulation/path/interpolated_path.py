@@ -1,10 +1,10 @@
-from typing import List
+from typing import List, Union
 
 import numpy as np
-import scipy.interpolate as sp_interp
+import numpy.typing as npt
 
 from nuplan.common.actor_state.state_representation import ProgressStateSE2
-from nuplan.common.geometry.compute import AngularInterpolator
+from nuplan.common.geometry.compute import principal_value
 from nuplan.planning.simulation.path.path import AbstractPath
 
 
@@ -21,19 +21,12 @@ class InterpolatedPath(AbstractPath):
         assert len(path) > 1, "Path has to has more than 1 element!"
         self._path = path
 
-        # Re-arrange to arrays for interpolation
-        progress = [point.progress for point in self._path]
-
-        linear_states = []
-        angular_states = []
-        for point in path:
-            linear_states.append([point.progress, point.x, point.y])
-            angular_states.append([point.heading])
-
-        linear_states = np.array(linear_states, dtype='float64')  # type: ignore
-        angular_states = np.array(angular_states, dtype='float64')  # type: ignore
-        self._function_interp_linear = sp_interp.interp1d(progress, linear_states, axis=0)
-        self._angular_interpolator = AngularInterpolator(progress, angular_states)
+        # Re-arrange to arrays for interpolation, headings are unwrapped to interpolate them linearly
+        self._progress: npt.NDArray[np.float64] = np.array([point.progress for point in path], dtype=np.float64)
+        self._states: npt.NDArray[np.float64] = np.array(
+            [[point.progress, point.x, point.y, point.heading] for point in path], dtype=np.float64
+        )
+        self._states[:, 3] = np.unwrap(self._states[:, 3])
 
     def get_start_progress(self) -> float:
         """Inherited, see superclass."""
@@ -45,21 +38,37 @@ class InterpolatedPath(AbstractPath):
 
     def get_state_at_progress(self, progress: float) -> ProgressStateSE2:
         """Inherited, see superclass."""
+        return ProgressStateSE2.deserialize(list(self.get_state_array_at_progress(progress)))
+
+    def get_state_array_at_progress(self, progress: Union[float, npt.NDArray[np.float64]]) -> npt.NDArray[np.float64]:
+        """
+        Interpolate the path at one or many progress values at once, with a single search of the enclosing samples.
+        :param progress: [m] <num_queries> or scalar progress along the path, within its start and end progress.
+        :return: <num_queries, 4> or <4> interpolated progress, x, y and heading, in the order of ProgressStateSE2.
+        """
+        progress = np.asarray(progress, dtype=np.float64)
         self._assert_progress(progress)
 
-        linear_states = list(self._function_interp_linear(progress))
-        angular_states = list(self._angular_interpolator.interpolate(progress))
+        # Same interpolation as scipy's interp1d, between the samples enclosing each query
+        upper_idx = np.clip(np.searchsorted(self._progress, progress), 1, len(self._progress) - 1)
+        lower_idx = upper_idx - 1
+        lower_states = self._states[lower_idx]
+        slope = (self._states[upper_idx] - lower_states) / (self._progress[upper_idx] - self._progress[lower_idx])[
+            ..., None
+        ]
+        states = slope * (progress - self._progress[lower_idx])[..., None] + lower_states
+        states[..., 3] = principal_value(states[..., 3])
 
-        return ProgressStateSE2.deserialize(linear_states + angular_states)
+        return states  # type: ignore
 
     def get_sampled_path(self) -> List[ProgressStateSE2]:
         """Inherited, see superclass."""
         return self._path
 
-    def _assert_progress(self, progress: float) -> None:
+    def _assert_progress(self, progress: Union[float, npt.NDArray[np.float64]]) -> None:
         """Check if queried progress is within bounds"""
         start_progress = self.get_start_progress()
         end_progress = self.get_end_progress()
-        assert start_progress <= progress <= end_progress, (
+        assert np.all((start_progress <= progress) & (progress <= end_progress)), (
             f"Progress exceeds path! " f"{start_progress} <= {progress} <= {end_progress}"
         )
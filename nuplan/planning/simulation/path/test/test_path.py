@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from nuplan.common.actor_state.state_representation import StateSE2
 from nuplan.planning.simulation.path.interpolated_path import InterpolatedPath
 from nuplan.planning.simulation.path.utils import (
@@ -57,6 +59,17 @@ class TestInterpolatedPath(unittest.TestCase):
         self.assertEqual(4, state.y)
         self.assertEqual(1, state.heading)
 
+    def test_get_state_array_at_progress(self) -> None:
+        """Check that interpolating many progress values at once matches interpolating them one by one"""
+        progress = np.array([0.0, 2.5, 5.0, 7.5, 12.0, self.interpolated_path.get_end_progress()])
+        states = self.interpolated_path.get_state_array_at_progress(progress)
+
+        self.assertEqual(states.shape, (len(progress), 4))
+        for state, single_progress in zip(states, progress):
+            self.assertEqual(list(self.interpolated_path.get_state_at_progress(single_progress)), list(state))
+        np.testing.assert_allclose(states[1], [2.5, 1.5, 2.0, 0.5])
+        self.assertRaises(AssertionError, self.interpolated_path.get_state_array_at_progress, np.array([1.0, 100.0]))
+
     def test_get_state_at_progress_expect_throw(self) -> None:
         """Check if assertion is raised for invalid calls"""
         self.assertRaises(AssertionError, self.interpolated_path.get_state_at_progress, 100)
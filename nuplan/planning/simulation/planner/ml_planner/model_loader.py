@@ -24,9 +24,6 @@ class ModelLoader:
         """
         Sets up torch/torchscript for inference.
         """
-        # We need only inference
-        torch.set_grad_enabled(False)
-
         # Move to device
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
@@ -37,6 +34,11 @@ class ModelLoader:
         self._model.eval()
         self._model = self._model.to(self.device)
 
+    @property
+    def is_initialized(self) -> bool:
+        """:return: Whether the ModelLoader has been initialized."""
+        return self._initialized
+
     def initialize(self) -> None:
         """
         Initializes the ModelLoader
@@ -45,9 +47,9 @@ class ModelLoader:
         self._initialize_model()
         self._initialized = True
 
-    def build_features(self, current_input: PlannerInput, initialization: PlannerInitialization) -> FeaturesType:
+    def build_feature_tensors(self, current_input: PlannerInput, initialization: PlannerInitialization) -> FeaturesType:
         """
-        Makes a single inference on a Pytorch/Torchscript model.
+        Builds the features of a single sample as tensors on the device, without collating them into a batch.
         :param current_input: Iteration specific inputs for building the feature.
         :param initialization: Additional data require for building the feature.
         :return: dictionary of FeaturesType types.
@@ -60,6 +62,16 @@ class ModelLoader:
         }
         features = {name: feature.to_feature_tensor() for name, feature in features.items()}
         features = {name: feature.to_device(self.device) for name, feature in features.items()}
+        return features
+
+    def build_features(self, current_input: PlannerInput, initialization: PlannerInitialization) -> FeaturesType:
+        """
+        Makes a single inference on a Pytorch/Torchscript model.
+        :param current_input: Iteration specific inputs for building the feature.
+        :param initialization: Additional data require for building the feature.
+        :return: dictionary of FeaturesType types.
+        """
+        features = self.build_feature_tensors(current_input, initialization)
         features = {name: feature.collate([feature]) for name, feature in features.items()}
         return features
 
@@ -71,4 +83,7 @@ class ModelLoader:
         :return: dictionary of target types
         """
         assert self._initialized is True, "The model loader has not been initialized!"
-        return self._model.forward(features)
+
+        # We need only inference, gradients are disabled for the forward pass only since the grad mode is global
+        with torch.no_grad():
+            return self._model.forward(features)
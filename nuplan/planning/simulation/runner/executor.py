@@ -64,12 +64,27 @@ def run_simulation(sim_runner: AbstractRunner, exit_on_failure: bool = False) ->
         return reports
 
 
+def estimate_runner_cost(runner: AbstractRunner) -> float:
+    """
+    Estimate the relative running time of a runner, as the duration of its scenarios times their number of agents.
+    :param runner: A simulation runner or metric runner.
+    :return: Estimated cost of the runner.
+    """
+    return sum(
+        scenario.get_number_of_iterations()
+        * scenario.database_interval
+        * (1 + len(scenario.initial_tracked_objects.tracked_objects))
+        for scenario in runner.scenarios
+    )
+
+
 def execute_runners(
     runners: List[AbstractRunner],
     worker: WorkerPool,
     num_gpus: Optional[Union[int, float]],
     num_cpus: Optional[int],
     exit_on_failure: bool = False,
+    use_cost_hints: bool = False,
 ) -> List[RunnerReport]:
     """
     Execute multiple simulation runners or metric runners.
@@ -78,6 +93,7 @@ def execute_runners(
     :param num_gpus: if None, no GPU will be used, otherwise number (also fractional) of GPU used per simulation.
     :param num_cpus: if None, all available CPU threads are used, otherwise number of threads used.
     :param exit_on_failure: If true, raises an exception when the simulation fails.
+    :param use_cost_hints: If true, the runners with the longest estimated running time are dispatched first.
     """
     # Validating
     assert len(runners) > 0, 'No scenarios found to simulate!'
@@ -85,8 +101,9 @@ def execute_runners(
     # Start simulations
     number_of_sims = len(runners)
     logger.info(f"Starting {number_of_sims} simulations using {worker.__class__.__name__}!")
+    item_costs = [estimate_runner_cost(runner) for runner in runners] if use_cost_hints else None
     reports: List[List[RunnerReport]] = worker.map(
-        Task(fn=run_simulation, num_gpus=num_gpus, num_cpus=num_cpus), runners, exit_on_failure
+        Task(fn=run_simulation, num_gpus=num_gpus, num_cpus=num_cpus), runners, exit_on_failure, item_costs=item_costs
     )
     # Store the results in a dictionary so we can easily store error tracebacks in the next step, if needed
     results: Dict[Tuple[str, str, str], RunnerReport] = {
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 from typing import Any, Optional, Tuple, Type
 
+from nuplan.common.actor_state.ego_state import EgoState
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.simulation.callback.abstract_callback import AbstractCallback
 from nuplan.planning.simulation.callback.multi_callback import MultiCallback
@@ -10,6 +11,7 @@ from nuplan.planning.simulation.history.simulation_history import SimulationHist
 from nuplan.planning.simulation.history.simulation_history_buffer import SimulationHistoryBuffer
 from nuplan.planning.simulation.planner.abstract_planner import PlannerInitialization, PlannerInput
 from nuplan.planning.simulation.simulation_setup import SimulationSetup
+from nuplan.planning.simulation.simulation_time_controller.simulation_iteration import SimulationIteration
 from nuplan.planning.simulation.trajectory.abstract_trajectory import AbstractTrajectory
 
 logger = logging.getLogger(__name__)
@@ -159,10 +161,12 @@ class Simulation:
         )
 
         # Propagate state to next iteration
+        self._time_controller.update_simulation_state(ego_state, trajectory)
         next_iteration = self._time_controller.next_iteration()
 
         # Propagate state
         if next_iteration:
+            self._add_skipped_iterations(iteration, next_iteration, ego_state, trajectory)
             self._ego_controller.update_state(iteration, next_iteration, ego_state, trajectory)
             self._observations.update_observation(iteration, next_iteration, self._history_buffer)
         else:
@@ -171,6 +175,52 @@ class Simulation:
         # Append new state into history buffer
         self._history_buffer.append(self._ego_controller.get_state(), self._observations.get_observation())
 
+    def _add_skipped_iterations(
+        self,
+        iteration: SimulationIteration,
+        next_iteration: SimulationIteration,
+        ego_state: EgoState,
+        trajectory: AbstractTrajectory,
+    ) -> None:
+        """
+        Fill in the database iterations skipped by the time controller, such that the history and the history buffer
+        keep the database rate expected by the metrics and the planners. Ego follows the planned trajectory, and the
+        observations, which are replayed from the log when iterations can be skipped (see SimulationSetup), are
+        stepped through the skipped iterations.
+        :param iteration: Current iteration.
+        :param next_iteration: Next iteration of the time controller.
+        :param ego_state: Ego state at the current iteration.
+        :param trajectory: Trajectory planned at the current iteration.
+        """
+        assert self._history_buffer is not None, "Simulation was not initialized!"
+
+        previous_iteration = iteration
+        for index in range(iteration.index + 1, next_iteration.index):
+            skipped_iteration = SimulationIteration(time_point=self._scenario.get_time_point(index), index=index)
+            self._observations.update_observation(previous_iteration, skipped_iteration, self._history_buffer)
+            observation = self._observations.get_observation()
+            previous_iteration = skipped_iteration
+
+            if trajectory.is_in_range(skipped_iteration.time_point):
+                skipped_ego_state = trajectory.get_state_at_time(skipped_iteration.time_point)
+            else:
+                skipped_ego_state = EgoState(
+                    car_footprint=ego_state.car_footprint,
+                    dynamic_car_state=ego_state.dynamic_car_state,
+                    tire_steering_angle=ego_state.tire_steering_angle,
+                    is_in_auto_mode=ego_state.is_in_auto_mode,
+                    time_point=skipped_iteration.time_point,
+                )
+            traffic_light_status = list(self._scenario.get_traffic_light_status_at_iteration(index))
+
+            logger.debug(f"Adding skipped iteration to history: {index}")
+            self._history.add_sample(
+                SimulationHistorySample(
+                    skipped_iteration, skipped_ego_state, trajectory, observation, traffic_light_status
+                )
+            )
+            self._history_buffer.append(skipped_ego_state, observation)
+
     @property
     def scenario(self) -> AbstractScenario:
         """
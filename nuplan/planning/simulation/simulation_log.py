@@ -2,16 +2,43 @@ from __future__ import annotations
 
 import lzma
 import pickle
+import struct
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, List, Sequence, Tuple, Union, overload
 
 import msgpack
+from cachetools import LRUCache
 
+from nuplan.common.actor_state.ego_state import EgoState
+from nuplan.common.actor_state.state_representation import StateSE2
+from nuplan.common.maps.abstract_map import AbstractMap
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
-from nuplan.planning.simulation.history.simulation_history import SimulationHistory
+from nuplan.planning.simulation.history.simulation_history import SimulationHistory, SimulationHistorySample
 from nuplan.planning.simulation.planner.abstract_planner import AbstractPlanner
 
+# Frames files end with the offset and the length of the header, see SimulationLog._dump_to_frames
+FRAMES_FOOTER_FORMAT = '<QQ'
+FRAMES_FOOTER_SIZE = struct.calcsize(FRAMES_FOOTER_FORMAT)
+
+
+@dataclass
+class SimulationLogHeader:
+    """Lightweight part of a simulation log, it can be loaded without decoding any simulation history sample."""
+
+    scenario: AbstractScenario
+    planner: AbstractPlanner
+    map_api: AbstractMap  # Map api of the simulation history
+    mission_goal: StateSE2  # Mission goal of the simulation history
+    ego_states: List[EgoState]  # Ego state of each frame
+    frame_offsets: List[Tuple[int, int]]  # Byte offset and byte length of each compressed frame in the file
+
+    @property
+    def num_frames(self) -> int:
+        """:return Number of simulation history samples."""
+        return len(self.frame_offsets)
+
 
 @dataclass
 class SimulationLog:
@@ -34,6 +61,32 @@ class SimulationLog:
         with lzma.open(self.file_path, "wb", preset=0) as f:
             f.write(msgpack.packb(pickle_object))
 
+    def _dump_to_frames(self) -> None:
+        """
+        Dump file into individually compressed frames followed by a header, so that the header and any single
+        frame can be read without decompressing the whole file.
+        File layout: [frame_0]...[frame_n][header][footer: header offset, header length].
+        """
+        frame_offsets = []
+        with open(self.file_path, "wb") as f:
+            for sample in self.simulation_history.data:
+                frame = lzma.compress(pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL), preset=0)
+                frame_offsets.append((f.tell(), len(frame)))
+                f.write(frame)
+
+            header = SimulationLogHeader(
+                scenario=self.scenario,
+                planner=self.planner,
+                map_api=self.simulation_history.map_api,
+                mission_goal=self.simulation_history.mission_goal,
+                ego_states=self.simulation_history.extract_ego_state,
+                frame_offsets=frame_offsets,
+            )
+            header_offset = f.tell()
+            header_bytes = lzma.compress(pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL), preset=0)
+            f.write(header_bytes)
+            f.write(struct.pack(FRAMES_FOOTER_FORMAT, header_offset, len(header_bytes)))
+
     def save_to_file(self) -> None:
         """Dump simulation log into file."""
         serialization_type = self.simulation_log_type(self.file_path)
@@ -41,6 +94,8 @@ class SimulationLog:
             self._dump_to_pickle()
         elif serialization_type == "msgpack":
             self._dump_to_msgpack()
+        elif serialization_type == "frames":
+            self._dump_to_frames()
         else:
             raise ValueError(f"Unknown option: {serialization_type}")
 
@@ -49,11 +104,12 @@ class SimulationLog:
         """
         Deduce the simulation log type.
         :param file_path: File path.
-        :return: one from ["msgpack", "pickle", "json"].
+        :return: one from ["msgpack", "pickle", "frames"].
         """
         msg_pack = file_path.suffixes == ['.msgpack', '.xz']
         msg_pickle = file_path.suffixes == ['.pkl', '.xz']
-        number_of_available_types = int(msg_pack) + int(msg_pickle)
+        msg_frames = file_path.suffixes == ['.frames', '.xz']
+        number_of_available_types = int(msg_pack) + int(msg_pickle) + int(msg_frames)
 
         # We can handle only conclusive serialization type
         if number_of_available_types != 1:
@@ -63,6 +119,8 @@ class SimulationLog:
             return "pickle"
         elif msg_pack:
             return "msgpack"
+        elif msg_frames:
+            return "frames"
         else:
             raise RuntimeError("Unknown condition!")
 
@@ -80,7 +138,178 @@ class SimulationLog:
         elif simulation_log_type == "pickle":
             with lzma.open(str(file_path), "rb") as f:
                 data = pickle.load(f)
+        elif simulation_log_type == "frames":
+            data = SimulationLogReader(file_path=file_path).to_simulation_log()
         else:
             raise ValueError(f"Unknown serialization type: {simulation_log_type}!")
 
         return data
+
+
+class SimulationLogReader:
+    """
+    Random access reader of a simulation log.
+    Frames files are read lazily: only the header is decoded at construction, and each simulation history sample is
+    decoded on demand and kept in a bounded cache. Other serialization types are loaded fully at construction.
+    """
+
+    def __init__(self, file_path: Path, frame_cache_size: int = 32):
+        """
+        Constructor of SimulationLogReader.
+        :param file_path: Path to a simulation log file.
+        :param frame_cache_size: Maximum number of decoded simulation history samples kept in memory.
+        """
+        self._file_path = file_path
+        self._lock = threading.Lock()
+        self._frame_cache: LRUCache = LRUCache(maxsize=frame_cache_size)
+
+        if SimulationLog.simulation_log_type(file_path=file_path) == "frames":
+            with open(self._file_path, "rb") as f:
+                f.seek(-FRAMES_FOOTER_SIZE, 2)
+                header_offset, header_length = struct.unpack(FRAMES_FOOTER_FORMAT, f.read(FRAMES_FOOTER_SIZE))
+                f.seek(header_offset)
+                self._header: SimulationLogHeader = pickle.loads(lzma.decompress(f.read(header_length)))
+            self._simulation_history: SimulationHistory = LazySimulationHistory(reader=self)
+        else:
+            simulation_log: SimulationLog = SimulationLog.load_data(file_path=file_path)
+            history = simulation_log.simulation_history
+            self._header = SimulationLogHeader(
+                scenario=simulation_log.scenario,
+                planner=simulation_log.planner,
+                map_api=history.map_api,
+                mission_goal=history.mission_goal,
+                ego_states=history.extract_ego_state,
+                frame_offsets=[],
+            )
+            self._simulation_history = history
+
+    @property
+    def file_path(self) -> Path:
+        """:return Path to the simulation log file."""
+        return self._file_path
+
+    @property
+    def header(self) -> SimulationLogHeader:
+        """:return Header of the simulation log."""
+        return self._header
+
+    @property
+    def scenario(self) -> AbstractScenario:
+        """:return Scenario of the simulation log."""
+        return self._header.scenario
+
+    @property
+    def planner(self) -> AbstractPlanner:
+        """:return Planner of the simulation log."""
+        return self._header.planner
+
+    @property
+    def simulation_history(self) -> SimulationHistory:
+        """:return Simulation history, lazily decoded for frames files."""
+        return self._simulation_history
+
+    def __len__(self) -> int:
+        """:return Number of simulation history samples."""
+        return len(self._simulation_history.data)
+
+    def get_frame(self, frame_index: int) -> SimulationHistorySample:
+        """
+        Get a simulation history sample, decoding it if it is not cached.
+        :param frame_index: Frame index.
+        :return Simulation history sample.
+        """
+        if not isinstance(self._simulation_history, LazySimulationHistory):
+            return self._simulation_history.data[frame_index]
+
+        with self._lock:
+            sample = self._frame_cache.get(frame_index, None)
+            if sample is None:
+                offset, length = self._header.frame_offsets[frame_index]
+                with open(self._file_path, "rb") as f:
+                    f.seek(offset)
+                    sample = pickle.loads(lzma.decompress(f.read(length)))
+                self._frame_cache[frame_index] = sample
+
+        return sample  # type: ignore
+
+    def to_simulation_log(self) -> SimulationLog:
+        """
+        Decode all frames into an in-memory simulation log.
+        :return Simulation log.
+        """
+        history = SimulationHistory(
+            map_api=self._header.map_api,
+            mission_goal=self._header.mission_goal,
+            data=[self.get_frame(frame_index) for frame_index in range(len(self))],
+        )
+        return SimulationLog(
+            file_path=self._file_path, scenario=self.scenario, planner=self.planner, simulation_history=history
+        )
+
+
+class SimulationHistoryFrames(Sequence[SimulationHistorySample]):
+    """Read-only sequence of simulation history samples that are decoded on access."""
+
+    def __init__(self, reader: SimulationLogReader):
+        """
+        Constructor of SimulationHistoryFrames.
+        :param reader: Simulation log reader.
+        """
+        self._reader = reader
+
+    @overload
+    def __getitem__(self, index: int) -> SimulationHistorySample:
+        """Inherited, see superclass."""
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[SimulationHistorySample]:
+        """Inherited, see superclass."""
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """Inherited, see superclass."""
+        if isinstance(index, slice):
+            return [self._reader.get_frame(frame_index) for frame_index in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame index {index} out of range!")
+
+        return self._reader.get_frame(index)
+
+    def __len__(self) -> int:
+        """Inherited, see superclass."""
+        return self._reader.header.num_frames
+
+    def __iter__(self) -> Iterator[SimulationHistorySample]:
+        """Inherited, see superclass."""
+        for frame_index in range(len(self)):
+            yield self._reader.get_frame(frame_index)
+
+
+class LazySimulationHistory(SimulationHistory):
+    """Read-only simulation history whose samples are decoded on demand by a SimulationLogReader."""
+
+    def __init__(self, reader: SimulationLogReader):
+        """
+        Constructor of LazySimulationHistory.
+        :param reader: Simulation log reader.
+        """
+        super().__init__(map_api=reader.header.map_api, mission_goal=reader.header.mission_goal)
+        self.data = SimulationHistoryFrames(reader=reader)  # type: ignore
+        self._ego_states = reader.header.ego_states
+
+    def add_sample(self, sample: SimulationHistorySample) -> None:
+        """Inherited, see superclass."""
+        raise RuntimeError("LazySimulationHistory is read-only!")
+
+    def reset(self) -> None:
+        """Inherited, see superclass."""
+        raise RuntimeError("LazySimulationHistory is read-only!")
+
+    @property
+    def extract_ego_state(self) -> List[EgoState]:
+        """Inherited, see superclass. Ego states are read from the header without decoding the samples."""
+        return self._ego_states
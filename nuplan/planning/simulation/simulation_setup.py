@@ -3,10 +3,15 @@ from dataclasses import dataclass
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.simulation.controller.abstract_controller import AbstractEgoController
 from nuplan.planning.simulation.observation.abstract_observation import AbstractObservation
+from nuplan.planning.simulation.observation.lidar_pc import LidarPcObservation
+from nuplan.planning.simulation.observation.tracks_observation import TracksObservation
 from nuplan.planning.simulation.planner.abstract_planner import AbstractPlanner
 from nuplan.planning.simulation.simulation_time_controller.abstract_simulation_time_controller import (
     AbstractSimulationTimeController,
 )
+from nuplan.planning.simulation.simulation_time_controller.adaptive_simulation_time_controller import (
+    AdaptiveSimulationTimeController,
+)
 
 
 @dataclass
@@ -31,6 +36,15 @@ class SimulationSetup:
             self.ego_controller, AbstractEgoController
         ), 'Error: ego_controller must inherit from AbstractEgoController!'
 
+        # Quiescence is checked on the log, simulated agents could move over skipped iterations
+        if (
+            isinstance(self.time_controller, AdaptiveSimulationTimeController)
+            and self.time_controller.can_skip_iterations
+        ):
+            assert isinstance(
+                self.observations, (TracksObservation, LidarPcObservation)
+            ), 'Error: skipping iterations requires observations replayed from the log!'
+
     def reset(self) -> None:
         """
         Reset all simulation controllers
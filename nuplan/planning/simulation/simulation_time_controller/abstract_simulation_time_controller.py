@@ -3,7 +3,9 @@ from __future__ import annotations  # Used to avoid circular dependency between
 import abc
 from typing import Optional
 
+from nuplan.common.actor_state.ego_state import EgoState
 from nuplan.planning.simulation.simulation_time_controller.simulation_iteration import SimulationIteration
+from nuplan.planning.simulation.trajectory.abstract_trajectory import AbstractTrajectory
 
 
 class AbstractSimulationTimeController(abc.ABC):
@@ -26,6 +28,15 @@ class AbstractSimulationTimeController(abc.ABC):
         """
         pass
 
+    def update_simulation_state(self, ego_state: EgoState, trajectory: AbstractTrajectory) -> None:
+        """
+        Provide the simulated state of the current iteration before moving to the next one, for controllers adapting
+        their steps to the simulation. Ignored by default.
+        :param ego_state: Simulated ego state at the current iteration.
+        :param trajectory: Trajectory planned at the current iteration.
+        """
+        pass
+
     @abc.abstractmethod
     def next_iteration(self) -> Optional[SimulationIteration]:
         """
@@ -0,0 +1,280 @@
+import logging
+from typing import Dict, List, Optional, Set, Tuple, cast
+
+import numpy as np
+
+from nuplan.common.actor_state.ego_state import EgoState
+from nuplan.common.maps.maps_datatypes import TrafficLightStatusType
+from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
+from nuplan.planning.simulation.simulation_time_controller.abstract_simulation_time_controller import (
+    AbstractSimulationTimeController,
+)
+from nuplan.planning.simulation.simulation_time_controller.simulation_iteration import SimulationIteration
+from nuplan.planning.simulation.trajectory.abstract_trajectory import AbstractTrajectory
+
+logger = logging.getLogger(__name__)
+
+
+class QuiescenceDetector:
+    """
+    Detects intervals of a scenario in which nothing relevant to the planner changes: ego is stopped and plans to stay
+    stopped, the agents around ego do not move and no traffic light changes.
+    """
+
+    def __init__(
+        self,
+        scenario: AbstractScenario,
+        ego_speed_threshold: float,
+        agent_displacement_threshold: float,
+        agent_radius: float,
+    ):
+        """
+        Initialize the detector.
+        :param scenario: Scenario the simulation runs on.
+        :param ego_speed_threshold: [m/s] Maximum speed of a stopped ego.
+        :param agent_displacement_threshold: [m] Maximum displacement of a static agent over an interval.
+        :param agent_radius: [m] Only agents within this distance of ego are checked.
+        """
+        self._scenario = scenario
+        self._ego_speed_threshold = ego_speed_threshold
+        self._agent_displacement_threshold = agent_displacement_threshold
+        self._agent_radius = agent_radius
+
+        # Nearby agent positions and traffic light statuses by iteration index, iterations are checked several times
+        self._agents_cache: Dict[int, Dict[str, Tuple[float, float]]] = {}
+        self._traffic_lights_cache: Dict[int, Set[Tuple[int, TrafficLightStatusType]]] = {}
+
+    def reset(self) -> None:
+        """Clear the cached scenario data."""
+        self._agents_cache.clear()
+        self._traffic_lights_cache.clear()
+
+    def is_quiescent(
+        self,
+        ego_state: EgoState,
+        trajectory: AbstractTrajectory,
+        iteration: SimulationIteration,
+        next_iteration: SimulationIteration,
+    ) -> bool:
+        """
+        Check whether the simulation can move from an iteration to a later one without missing any change.
+        The checks are ordered from cheapest to most expensive, such that moving ego is detected without any query.
+        :param ego_state: Simulated ego state at the iteration.
+        :param trajectory: Trajectory planned at the iteration.
+        :param iteration: Current iteration.
+        :param next_iteration: Candidate next iteration.
+        :return: True if nothing relevant changes between the iterations.
+        """
+        if ego_state.dynamic_car_state.speed > self._ego_speed_threshold:
+            return False
+
+        # Ego has to plan to stay stopped until the next iteration
+        if not trajectory.is_in_range(next_iteration.time_point):
+            return False
+        planned_state = trajectory.get_state_at_time(next_iteration.time_point)
+        if planned_state.dynamic_car_state.speed > self._ego_speed_threshold:
+            return False
+
+        # Every iteration of the interval is checked, such that changes starting and ending within it are not missed
+        traffic_lights = self._get_traffic_lights(iteration.index)
+        for index in range(iteration.index + 1, next_iteration.index + 1):
+            if self._get_traffic_lights(index) != traffic_lights:
+                return False
+            if not self._are_agents_static(ego_state, iteration.index, index):
+                return False
+
+        return True
+
+    def _get_traffic_lights(self, index: int) -> Set[Tuple[int, TrafficLightStatusType]]:
+        """
+        :param index: Iteration index.
+        :return: Lane connector ids and statuses of the traffic lights at the iteration.
+        """
+        if index not in self._traffic_lights_cache:
+            self._traffic_lights_cache[index] = {
+                (data.lane_connector_id, data.status)
+                for data in self._scenario.get_traffic_light_status_at_iteration(index)
+            }
+
+        return self._traffic_lights_cache[index]
+
+    def _get_agent_positions(self, index: int) -> Dict[str, Tuple[float, float]]:
+        """
+        :param index: Iteration index.
+        :return: Positions of the agents at the iteration, by track token.
+        """
+        if index not in self._agents_cache:
+            agents = self._scenario.get_tracked_objects_at_iteration(index).tracked_objects.get_agents()
+            self._agents_cache[index] = {agent.track_token: (agent.center.x, agent.center.y) for agent in agents}
+
+        return self._agents_cache[index]
+
+    def _are_agents_static(self, ego_state: EgoState, index: int, next_index: int) -> bool:
+        """
+        Check that the agents around ego neither move nor appear between two iterations.
+        :param ego_state: Simulated ego state at the first iteration.
+        :param index: First iteration index.
+        :param next_index: Second iteration index.
+        :return: True if the nearby agents are static.
+        """
+        ego_position = np.array([ego_state.center.x, ego_state.center.y])
+        positions = self._get_agent_positions(index)
+        next_positions = self._get_agent_positions(next_index)
+
+        for agent_positions in [positions, next_positions]:
+            for token, position in agent_positions.items():
+                if np.linalg.norm(np.array(position) - ego_position) > self._agent_radius:
+                    continue
+
+                if token not in positions or token not in next_positions:
+                    return False
+                displacement = np.linalg.norm(np.array(next_positions[token]) - np.array(positions[token]))
+                if displacement > self._agent_displacement_threshold:
+                    return False
+
+        return True
+
+
+class AdaptiveSimulationTimeController(AbstractSimulationTimeController):
+    """
+    Class handling simulation time and completion, moving several database iterations per step.
+    Steps are coarsened by the first step multiplier. While the simulation is quiescent (see QuiescenceDetector), the
+    following multipliers are used in turn, growing the step as long as nothing changes and going back to the first
+    multiplier as soon as something does. Iteration indices remain database iteration indices, and the simulation
+    fills in the skipped iterations, such that the history and the history buffer keep the database rate.
+    Only observations replayed from the log can be stepped through skipped iterations, see SimulationSetup.
+    """
+
+    def __init__(
+        self,
+        scenario: AbstractScenario,
+        step_multipliers: Optional[List[int]] = None,
+        ego_speed_threshold: float = 0.1,
+        agent_displacement_threshold: float = 0.2,
+        agent_radius: float = 50.0,
+    ):
+        """
+        Initialize simulation control.
+        :param scenario: Scenario the simulation runs on.
+        :param step_multipliers: Database iterations per step, the first one used always and the following ones in
+            turn while quiescent. Defaults to [1], stepping every iteration without skipping.
+        :param ego_speed_threshold: [m/s] Maximum speed of a stopped ego.
+        :param agent_displacement_threshold: [m] Maximum displacement of a static agent over a skipped interval.
+        :param agent_radius: [m] Only agents within this distance of ego are checked.
+        """
+        self._step_multipliers = step_multipliers if step_multipliers is not None else [1]
+        assert len(self._step_multipliers) > 0, 'At least one step multiplier is required'
+        assert all(multiplier > 0 for multiplier in self._step_multipliers), 'Step multipliers must be positive'
+
+        self.scenario = scenario
+        self._quiescence_detector = QuiescenceDetector(
+            scenario, ego_speed_threshold, agent_displacement_threshold, agent_radius
+        )
+
+        self.current_iteration_index = 0
+        self._multiplier_index = 0
+        self._ego_state: Optional[EgoState] = None
+        self._trajectory: Optional[AbstractTrajectory] = None
+        self._effective_iterations: List[SimulationIteration] = []
+
+    @property
+    def effective_iterations(self) -> List[SimulationIteration]:
+        """
+        :return: Iterations the simulation stepped through so far.
+        """
+        return self._effective_iterations
+
+    @property
+    def can_skip_iterations(self) -> bool:
+        """
+        :return: True if steps may move more than one database iteration.
+        """
+        return max(self._step_multipliers) > 1
+
+    @property
+    def number_of_skipped_iterations(self) -> int:
+        """
+        :return: Number of database iterations skipped between the iterations the simulation stepped through.
+        """
+        indices = [iteration.index for iteration in self._effective_iterations]
+        return sum(next_index - index - 1 for index, next_index in zip(indices[:-1], indices[1:]))
+
+    def reset(self) -> None:
+        """Inherited, see superclass."""
+        self.current_iteration_index = 0
+        self._multiplier_index = 0
+        self._ego_state = None
+        self._trajectory = None
+        self._effective_iterations = []
+        self._quiescence_detector.reset()
+
+    def get_iteration(self) -> SimulationIteration:
+        """Inherited, see superclass."""
+        scenario_time = self.scenario.get_time_point(self.current_iteration_index)
+        return SimulationIteration(time_point=scenario_time, index=self.current_iteration_index)
+
+    def update_simulation_state(self, ego_state: EgoState, trajectory: AbstractTrajectory) -> None:
+        """Inherited, see superclass."""
+        self._ego_state = ego_state
+        self._trajectory = trajectory
+
+    def next_iteration(self) -> Optional[SimulationIteration]:
+        """Inherited, see superclass."""
+        if not self._effective_iterations:
+            self._effective_iterations.append(self.get_iteration())
+
+        self.current_iteration_index = self._get_next_index()
+        if self.reached_end():
+            return None
+
+        iteration = self.get_iteration()
+        self._effective_iterations.append(iteration)
+        return iteration
+
+    def reached_end(self) -> bool:
+        """Inherited, see superclass."""
+        return self.current_iteration_index >= self.number_of_iterations() - 1
+
+    def number_of_iterations(self) -> int:
+        """Inherited, see superclass."""
+        return cast(int, self.scenario.get_number_of_iterations())
+
+    def _get_step_index(self, step: int) -> int:
+        """
+        :param step: Number of database iterations to move forward.
+        :return: Index of the iteration after the step. Steps stop at the second to last iteration, whose step to the
+            last iteration ends the simulation, such that the history ends at the same iteration as with the step
+            controller and no iteration of the tail is left unfilled.
+        """
+        last_index = self.number_of_iterations() - 1
+        if self.current_iteration_index >= last_index - 1:
+            return last_index
+
+        return min(self.current_iteration_index + step, last_index - 1)
+
+    def _get_next_index(self) -> int:
+        """
+        Select the index of the next iteration, skipping ahead while the simulation is quiescent.
+        :return: Index of the next iteration.
+        """
+        next_multiplier_index = min(self._multiplier_index + 1, len(self._step_multipliers) - 1)
+        skip_index = self._get_step_index(self._step_multipliers[next_multiplier_index])
+        base_index = self._get_step_index(self._step_multipliers[0])
+
+        if (
+            skip_index > base_index
+            and self._ego_state is not None
+            and self._trajectory is not None
+            and self._quiescence_detector.is_quiescent(
+                self._ego_state,
+                self._trajectory,
+                self.get_iteration(),
+                SimulationIteration(self.scenario.get_time_point(skip_index), skip_index),
+            )
+        ):
+            logger.debug(f'Skipping from iteration {self.current_iteration_index} to {skip_index}')
+            self._multiplier_index = next_multiplier_index
+            return skip_index
+
+        self._multiplier_index = 0
+        return base_index
@@ -0,0 +1,170 @@
+import unittest
+from typing import Dict, List, Optional, Tuple
+from unittest.mock import Mock
+
+from nuplan.common.actor_state.state_representation import TimePoint
+from nuplan.common.maps.maps_datatypes import TrafficLightStatusData, TrafficLightStatusType
+from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
+from nuplan.planning.simulation.simulation_time_controller.adaptive_simulation_time_controller import (
+    AdaptiveSimulationTimeController,
+)
+
+NUM_ITERATIONS = 40
+MOVING_FROM = 20  # Iteration from which the agent next to ego moves
+
+
+def _build_state(speed: float, x: float = 0.0, y: float = 0.0) -> Mock:
+    """
+    :param speed: [m/s] Speed of the state.
+    :param x: [m] X position of the state.
+    :param y: [m] Y position of the state.
+    :return: Mocked ego or agent state.
+    """
+    state = Mock()
+    state.dynamic_car_state.speed = speed
+    state.center.x = x
+    state.center.y = y
+    return state
+
+
+def _build_scenario(agents: Dict[int, List[Tuple[str, float, float]]], red_until: Optional[int] = None) -> Mock:
+    """
+    :param agents: Track tokens and positions of the agents by iteration, iterations missing have no agents.
+    :param red_until: Iteration at which the traffic light turns green, None for no traffic lights.
+    :return: Mocked scenario of 0.1s iterations.
+    """
+
+    def get_tracked_objects_at_iteration(iteration: int) -> Mock:
+        """Mocked tracked objects."""
+        detections = Mock()
+        detections.tracked_objects.get_agents.return_value = [
+            Mock(track_token=token, center=Mock(x=x, y=y)) for token, x, y in agents.get(iteration, [])
+        ]
+        return detections
+
+    def get_traffic_light_status_at_iteration(iteration: int) -> List[TrafficLightStatusData]:
+        """Mocked traffic lights."""
+        if red_until is None:
+            return []
+        status = TrafficLightStatusType.RED if iteration < red_until else TrafficLightStatusType.GREEN
+        return [TrafficLightStatusData(status, lane_connector_id=1, timestamp=iteration)]
+
+    scenario = Mock(spec=AbstractScenario)
+    scenario.get_number_of_iterations.return_value = NUM_ITERATIONS
+    scenario.get_time_point.side_effect = lambda iteration: TimePoint(iteration * 100000)
+    scenario.get_tracked_objects_at_iteration.side_effect = get_tracked_objects_at_iteration
+    scenario.get_traffic_light_status_at_iteration.side_effect = get_traffic_light_status_at_iteration
+    return scenario
+
+
+def _run(controller: AdaptiveSimulationTimeController, speed: float = 0.0) -> List[int]:
+    """
+    Step a controller through the whole scenario, as the simulation does.
+    :param controller: Controller to step.
+    :param speed: [m/s] Speed of ego, both simulated and planned.
+    :return: Indices of the iterations stepped through.
+    """
+    trajectory = Mock()
+    trajectory.is_in_range.return_value = True
+    trajectory.get_state_at_time.return_value = _build_state(speed)
+
+    indices = [controller.get_iteration().index]
+    while not controller.reached_end():
+        controller.update_simulation_state(_build_state(speed), trajectory)
+        iteration = controller.next_iteration()
+        if iteration is not None:
+            indices.append(iteration.index)
+
+    return indices
+
+
+class TestAdaptiveSimulationTimeController(unittest.TestCase):
+    """Test skipping ahead over quiescent intervals of a scenario."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        # A parked car next to ego that starts driving away, and a moving car far from ego
+        self.agents = {
+            iteration: [
+                ('parked', 5.0 + max(0, iteration - MOVING_FROM), 0.0),
+                ('far', 100.0 + iteration, 0.0),
+            ]
+            for iteration in range(NUM_ITERATIONS)
+        }
+
+    def test_default_steps_every_iteration(self) -> None:
+        """Test that without multipliers the controller steps like the step controller."""
+        controller = AdaptiveSimulationTimeController(_build_scenario(self.agents))
+
+        self.assertEqual(_run(controller), list(range(NUM_ITERATIONS - 1)))
+
+    def test_coarsened_steps(self) -> None:
+        """Test that the first multiplier always coarsens the steps."""
+        controller = AdaptiveSimulationTimeController(_build_scenario(self.agents), step_multipliers=[3])
+
+        # The last step is shortened to end on the last iteration stepped through by the step controller
+        self.assertEqual(_run(controller, speed=5.0), list(range(0, NUM_ITERATIONS - 1, 3)) + [NUM_ITERATIONS - 2])
+
+    def test_skip_while_quiescent(self) -> None:
+        """Test that steps grow while nothing changes near ego and return to single steps once the agent moves."""
+        controller = AdaptiveSimulationTimeController(_build_scenario(self.agents), step_multipliers=[1, 2, 4])
+
+        indices = _run(controller)
+
+        # The step from 18 would cover the start of the motion of the parked car
+        self.assertEqual(indices, [0, 2, 6, 10, 14, 18] + list(range(MOVING_FROM - 1, NUM_ITERATIONS - 1)))
+        self.assertEqual([iteration.index for iteration in controller.effective_iterations], indices)
+        self.assertEqual(
+            [iteration.time_us for iteration in controller.effective_iterations], [index * 100000 for index in indices]
+        )
+        self.assertEqual(controller.number_of_skipped_iterations, NUM_ITERATIONS - 1 - len(indices))
+
+    def test_agent_passing_within_skip(self) -> None:
+        """Test that an agent appearing and leaving between the ends of a skipped interval is not missed."""
+        self.agents[3] = self.agents[3] + [('passing', 10.0, 0.0)]
+        controller = AdaptiveSimulationTimeController(_build_scenario(self.agents), step_multipliers=[1, 2, 4])
+
+        indices = _run(controller)
+
+        self.assertEqual(indices, [0, 2, 3, 4, 6, 10, 14, 18] + list(range(MOVING_FROM - 1, NUM_ITERATIONS - 1)))
+
+    def test_scenario_ends_while_quiescent(self) -> None:
+        """Test that a skip does not jump over the end of a scenario that ends while quiescent."""
+        agents = {iteration: [('parked', 5.0, 0.0)] for iteration in range(NUM_ITERATIONS)}
+        controller = AdaptiveSimulationTimeController(_build_scenario(agents), step_multipliers=[1, 2, 4])
+
+        indices = _run(controller)
+
+        self.assertEqual(indices, [0, 2, 6, 10, 14, 18, 22, 26, 30, 34, NUM_ITERATIONS - 2])
+        self.assertEqual(controller.get_iteration().index, NUM_ITERATIONS - 1)
+
+    def test_no_skip_while_moving(self) -> None:
+        """Test that a moving ego is never skipped ahead."""
+        controller = AdaptiveSimulationTimeController(_build_scenario(self.agents), step_multipliers=[1, 4])
+
+        self.assertEqual(_run(controller, speed=2.0), list(range(NUM_ITERATIONS - 1)))
+
+    def test_traffic_light_change(self) -> None:
+        """Test that a traffic light change is never skipped over."""
+        scenario = _build_scenario({}, red_until=7)
+        controller = AdaptiveSimulationTimeController(scenario, step_multipliers=[1, 4])
+
+        indices = _run(controller)
+
+        self.assertIn(6, indices)
+        self.assertIn(7, indices)
+
+    def test_reset(self) -> None:
+        """Test that resetting restarts the simulation and its record."""
+        controller = AdaptiveSimulationTimeController(_build_scenario(self.agents), step_multipliers=[1, 2])
+        indices = _run(controller)
+
+        controller.reset()
+
+        self.assertEqual(controller.get_iteration().index, 0)
+        self.assertEqual(controller.effective_iterations, [])
+        self.assertEqual(_run(controller), indices)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,95 @@
 import unittest
-from unittest.mock import MagicMock, call
+from typing import List, Tuple, Type
+from unittest.mock import MagicMock, Mock, call
 
+import numpy as np
+
+from nuplan.common.actor_state.ego_state import EgoState
+from nuplan.common.actor_state.state_representation import StateSE2, StateVector2D, TimePoint
+from nuplan.planning.metrics.evaluation_metrics.common.ego_jerk import EgoJerkStatistics
+from nuplan.planning.metrics.evaluation_metrics.common.ego_lon_acceleration import EgoLonAccelerationStatistics
+from nuplan.planning.metrics.evaluation_metrics.common.ego_yaw_rate import EgoYawRateStatistics
+from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.scenario_builder.test.mock_abstract_scenario import MockAbstractScenario
 from nuplan.planning.simulation.callback.multi_callback import MultiCallback
 from nuplan.planning.simulation.controller.perfect_tracking import PerfectTrackingController
+from nuplan.planning.simulation.observation.abstract_observation import AbstractObservation
+from nuplan.planning.simulation.observation.observation_type import DetectionsTracks, Observation
 from nuplan.planning.simulation.observation.tracks_observation import TracksObservation
+from nuplan.planning.simulation.planner.abstract_planner import AbstractPlanner, PlannerInitialization, PlannerInput
 from nuplan.planning.simulation.planner.simple_planner import SimplePlanner
 from nuplan.planning.simulation.runner.simulations_runner import SimulationsRunner
 from nuplan.planning.simulation.simulation import Simulation
 from nuplan.planning.simulation.simulation_setup import SimulationSetup
+from nuplan.planning.simulation.simulation_time_controller.abstract_simulation_time_controller import (
+    AbstractSimulationTimeController,
+)
+from nuplan.planning.simulation.simulation_time_controller.adaptive_simulation_time_controller import (
+    AdaptiveSimulationTimeController,
+)
 from nuplan.planning.simulation.simulation_time_controller.step_simulation_time_controller import (
     StepSimulationTimeController,
 )
+from nuplan.planning.simulation.trajectory.abstract_trajectory import AbstractTrajectory
+from nuplan.planning.simulation.trajectory.interpolated_trajectory import InterpolatedTrajectory
+
+
+class StopAndGoPlanner(AbstractPlanner):
+    """Planner braking ego to a stop, waiting and driving off again, following a fixed speed profile over time."""
+
+    def __init__(self, scenario: AbstractScenario, stop_time: float = 2.0, go_time: float = 4.0):
+        """
+        :param scenario: Scenario to plan in, ego starts with a speed of stop_time [m/s] along the x-axis.
+        :param stop_time: [s] Time at which ego stops, braking at 1 m/s^2.
+        :param go_time: [s] Time at which ego drives off, accelerating at 1 m/s^2.
+        """
+        self._scenario = scenario
+        self._stop_time = stop_time
+        self._go_time = go_time
+
+    def name(self) -> str:
+        """Inherited, see superclass."""
+        return self.__class__.__name__
+
+    def initialize(self, initialization: List[PlannerInitialization]) -> None:
+        """Inherited, see superclass."""
+        pass
+
+    def observation_type(self) -> Type[Observation]:
+        """Inherited, see superclass."""
+        return DetectionsTracks  # type: ignore
+
+    def _get_profile(self, time: float) -> Tuple[float, float, float]:
+        """
+        :param time: [s] Time since the start of the scenario.
+        :return: Position [m], speed [m/s] and acceleration [m/s^2] of ego along the x-axis.
+        """
+        start_x = self._scenario.get_ego_state_at_iteration(0).rear_axle.x
+        if time < self._stop_time:
+            return start_x + self._stop_time * time - time**2 / 2, self._stop_time - time, -1.0
+        if time < self._go_time:
+            return start_x + self._stop_time**2 / 2, 0.0, 0.0
+        return start_x + self._stop_time**2 / 2 + (time - self._go_time) ** 2 / 2, time - self._go_time, 1.0
+
+    def compute_trajectory(self, current_input: List[PlannerInput]) -> List[AbstractTrajectory]:
+        """Inherited, see superclass."""
+        start_time_us = self._scenario.get_time_point(0).time_us
+        trajectory = []
+        for step in range(20):
+            time_point = current_input[0].iteration.time_point + TimePoint(int(step * 1e5))
+            x, speed, acceleration = self._get_profile((time_point.time_us - start_time_us) / 1e6)
+            trajectory.append(
+                EgoState.build_from_rear_axle(
+                    rear_axle_pose=StateSE2(x, 0.0, 0.0),
+                    rear_axle_velocity_2d=StateVector2D(speed, 0.0),
+                    rear_axle_acceleration_2d=StateVector2D(acceleration, 0.0),
+                    tire_steering_angle=0.0,
+                    time_point=time_point,
+                    vehicle_parameters=self._scenario.ego_vehicle_parameters,
+                )
+            )
+
+        return [InterpolatedTrajectory(trajectory)]
 
 
 class TestSimulation(unittest.TestCase):
@@ -88,5 +166,100 @@ class TestSimulation(unittest.TestCase):
         callback.on_simulation_end.assert_has_calls([call(stepper.setup, planner, stepper.history)])
 
 
+class TestSimulationWithSkippedIterations(unittest.TestCase):
+    """Tests Simulation with a time controller skipping database iterations."""
+
+    def setUp(self) -> None:
+        """Setup a scenario in which ego stops and drives off again."""
+        self.scenario = MockAbstractScenario(
+            time_step=0.1,
+            number_of_future_iterations=60,
+            number_of_past_iterations=20,
+            fixed_velocity=StateVector2D(x=2.0, y=0.0),
+        )
+        self.planner = StopAndGoPlanner(self.scenario)
+        self.metrics = [
+            EgoJerkStatistics('ego_jerk', 'Dynamics', max_abs_mag_jerk=8.37),
+            EgoLonAccelerationStatistics('ego_lon_acceleration', 'Dynamics', min_lon_accel=-4.05, max_lon_accel=2.4),
+            EgoYawRateStatistics('ego_yaw_rate', 'Dynamics', max_abs_yaw_rate=0.95),
+        ]
+
+    def _build_simulation(self, time_controller: AbstractSimulationTimeController) -> Simulation:
+        """
+        :param time_controller: Time controller of the simulation.
+        :return: Simulation of the scenario.
+        """
+        setup = SimulationSetup(
+            time_controller=time_controller,
+            observations=TracksObservation(self.scenario),
+            ego_controller=PerfectTrackingController(self.scenario),
+            scenario=self.scenario,
+        )
+        return Simulation(simulation_setup=setup, callback=MultiCallback([]))
+
+    def _assert_equal_to_step_controller(self, planner: AbstractPlanner) -> None:
+        """
+        Check that skipping quiescent intervals leaves the history and the metrics of the scenario unchanged.
+        :param planner: Planner to simulate.
+        """
+        time_controller = AdaptiveSimulationTimeController(self.scenario, step_multipliers=[1, 2, 4])
+        simulation = self._build_simulation(time_controller)
+        step_simulation = self._build_simulation(StepSimulationTimeController(self.scenario))
+        SimulationsRunner([simulation], planner).run()
+        SimulationsRunner([step_simulation], planner).run()
+
+        self.assertGreater(time_controller.number_of_skipped_iterations, 0)
+        self.assertEqual(
+            [sample.iteration.index for sample in simulation.history.data],
+            [sample.iteration.index for sample in step_simulation.history.data],
+        )
+        self.assertEqual(
+            [[agent.track_token for agent in sample.observation.tracked_objects] for sample in simulation.history.data],
+            [
+                [agent.track_token for agent in sample.observation.tracked_objects]
+                for sample in step_simulation.history.data
+            ],
+        )
+        for metric in self.metrics:
+            statistics = metric.compute(simulation.history, self.scenario)[0]
+            step_statistics = metric.compute(step_simulation.history, self.scenario)[0]
+            np.testing.assert_allclose(
+                [statistic.value for statistic in statistics.statistics],
+                [statistic.value for statistic in step_statistics.statistics],
+            )
+            np.testing.assert_allclose(statistics.time_series.values, step_statistics.time_series.values, atol=1e-6)
+
+    def test_metrics_equal_to_step_controller(self) -> None:
+        """Test that skipping the quiescent interval leaves the history and the metrics of the scenario unchanged."""
+        self._assert_equal_to_step_controller(self.planner)
+
+    def test_scenario_ends_while_quiescent(self) -> None:
+        """Test that the tail of a scenario ending while ego is stopped is filled as with the step controller."""
+        self._assert_equal_to_step_controller(StopAndGoPlanner(self.scenario, go_time=np.inf))
+
+    def test_skipping_requires_replayed_observations(self) -> None:
+        """Test that iterations can not be skipped with simulated observations."""
+        with self.assertRaises(AssertionError):
+            SimulationSetup(
+                time_controller=AdaptiveSimulationTimeController(self.scenario, step_multipliers=[1, 2]),
+                observations=Mock(spec=AbstractObservation),
+                ego_controller=PerfectTrackingController(self.scenario),
+                scenario=self.scenario,
+            )
+
+    def test_history_buffer_at_database_rate(self) -> None:
+        """Test that the planner sees the past at the database rate when iterations are skipped."""
+        simulation = self._build_simulation(AdaptiveSimulationTimeController(self.scenario, step_multipliers=[1, 2, 4]))
+        simulation.initialize()
+
+        while simulation.is_simulation_running():
+            planner_input = simulation.get_planner_input()
+            time_steps = np.diff([ego_state.time_point.time_us for ego_state in planner_input.history.ego_states])
+            np.testing.assert_allclose(time_steps / 1e6, self.scenario.database_interval)
+            simulation.propagate(self.planner.compute_trajectory([planner_input])[0])
+
+        self.assertEqual(len(simulation.history), self.scenario.get_number_of_iterations() - 1)
+
+
 if __name__ == '__main__':
     unittest.main()
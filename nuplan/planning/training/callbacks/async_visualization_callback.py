@@ -0,0 +1,296 @@
+import copy
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import pytorch_lightning as pl
+import torch
+import torch.utils.data
+
+from nuplan.planning.training.callbacks.visualization_callback import VisualizationCallback, get_images_from_batch
+from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VisualizationJob:
+    """Visualization of a fixed set of examples with a snapshot of the model weights."""
+
+    state_dict: Dict[str, torch.Tensor]  # Snapshot of the model weights, on cpu
+    batches: List[Tuple[FeaturesType, TargetsType]]  # Collated examples to visualize
+    loggers: List[Any]  # Loggers of the trainer
+    training_step: int  # Global step in training at the time of the snapshot
+    prefix: str  # Prefix to add to the log tag
+
+
+class AsyncVisualizationCallback(VisualizationCallback):
+    """
+    Callback that visualizes planner model inputs/outputs and logs them in Tensorboard, off the training loop.
+    At each epoch end only the model weights are copied to cpu, all the rest runs in the background: a thread runs a cpu
+    replica of the model with the copied weights, batches are rendered in a process pool and the images are logged
+    once rendered. The examples are collated once on the training thread, such that the background thread never runs
+    the datasets. Pending visualizations are held in a bounded queue; when it is full the new visualization is
+    dropped, so slow rendering never blocks training.
+    """
+
+    def __init__(
+        self,
+        images_per_tile: int,
+        num_train_tiles: int,
+        num_val_tiles: int,
+        pixel_size: float,
+        num_render_workers: int = 2,
+        max_queued_jobs: int = 2,
+        close_timeout: Optional[float] = 300.0,
+    ):
+        """
+        Initialize the class.
+
+        :param images_per_tile: number of images per tiles to visualize
+        :param num_train_tiles: number of tiles from the training set
+        :param num_val_tiles: number of tiles from the validation set
+        :param pixel_size: [m] size of pixel in meters
+        :param num_render_workers: number of processes rendering images, 0 to render in the background thread
+        :param max_queued_jobs: maximum number of visualizations waiting to be rendered, further ones are dropped
+        :param close_timeout: [s] maximum time to wait for pending visualizations at the end of training
+        """
+        super().__init__(images_per_tile, num_train_tiles, num_val_tiles, pixel_size)
+
+        assert num_render_workers >= 0, f"Number of render workers has to be non-negative, got {num_render_workers}!"
+        assert max_queued_jobs > 0, f"Maximum number of queued jobs has to be positive, got {max_queued_jobs}!"
+
+        self._num_render_workers = num_render_workers
+        self._max_queued_jobs = max_queued_jobs
+        self._close_timeout = close_timeout
+
+        # Background state, created on the first visualization
+        self._inference_model: Optional[torch.nn.Module] = None
+        self._jobs: Optional[queue.Queue[Optional[VisualizationJob]]] = None
+        self._worker: Optional[threading.Thread] = None
+        self._render_pool: Optional[Executor] = None
+
+        # Collated examples to visualize by prefix, the sampled examples are the same at every epoch
+        self._batches: Dict[str, List[Tuple[FeaturesType, TargetsType]]] = {}
+
+        self.num_dropped_jobs = 0
+
+    def _start(self, pl_module: pl.LightningModule, state_dict: Dict[str, torch.Tensor]) -> None:
+        """
+        Create the cpu replica of the model and start the background thread and render processes.
+
+        :param pl_module: lightning module, wrapping the model in its "model" attribute
+        :param state_dict: snapshot of the model weights, on cpu
+        """
+        assert hasattr(pl_module, 'model'), "Lightning module missing model attribute"
+
+        # Deep copying the model would copy its weights on the training device, the replica reuses the snapshot instead
+        model = pl_module.model
+        memo: Dict[int, Any] = {}
+        for name, tensor in itertools.chain(model.named_parameters(), model.named_buffers()):
+            if name in state_dict:
+                cpu_tensor = state_dict[name]
+                if isinstance(tensor, torch.nn.Parameter):
+                    cpu_tensor = torch.nn.Parameter(cpu_tensor, requires_grad=tensor.requires_grad)
+                memo[id(tensor)] = cpu_tensor
+
+        self._inference_model = copy.deepcopy(model, memo).cpu()
+        self._inference_model.eval()
+        self._jobs = queue.Queue(maxsize=self._max_queued_jobs)
+
+        if self._num_render_workers > 0:
+            # Forking a training process with threads and device contexts is unsafe
+            self._render_pool = ProcessPoolExecutor(
+                max_workers=self._num_render_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+
+        self._worker = threading.Thread(target=self._run_jobs, name='visualization', daemon=True)
+        self._worker.start()
+
+    def _run_jobs(self) -> None:
+        """Run the queued visualizations until the stop sentinel is received."""
+        assert self._jobs is not None, "Job queue has to be created before running jobs"
+
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                self._run_job(job)
+            except Exception as error:
+                logger.exception(f'Failed to visualize {job.prefix} examples: {error}')  # type: ignore
+            finally:
+                self._jobs.task_done()
+
+    def _render(self, features: FeaturesType, targets: TargetsType, predictions: TargetsType) -> Future:  # type: ignore
+        """
+        Render a batch of images, in the process pool if available.
+
+        :param features: tensor of model features
+        :param targets: tensor of model targets
+        :param predictions: tensor of model predictions
+        :return: future of the rendered images, None if the batch can not be visualized
+        """
+        if self._render_pool is not None:
+            return self._render_pool.submit(get_images_from_batch, features, targets, predictions, self.pixel_size)
+
+        future: Future = Future()  # type: ignore
+        future.set_result(get_images_from_batch(features, targets, predictions, self.pixel_size))
+        return future
+
+    def _run_job(self, job: VisualizationJob) -> None:
+        """
+        Infer the model with the snapshot weights on all examples, render them and log the images.
+
+        :param job: visualization to run
+        """
+        assert self._inference_model is not None, "Inference model has to be created before running jobs"
+
+        self._inference_model.load_state_dict(job.state_dict)
+
+        # Infer all batches first, such that batches are rendered in parallel
+        rendered_batches: List[Tuple[int, Future]] = []  # type: ignore
+        for batch_idx, (features, targets) in enumerate(job.batches):
+            with torch.no_grad():
+                predictions = self._inference_model(features)
+            rendered_batches.append((batch_idx, self._render(features, targets, predictions)))
+
+        for batch_idx, rendered_batch in rendered_batches:
+            image_batch: Optional[npt.NDArray[np.uint8]] = rendered_batch.result()
+            if image_batch is not None:
+                self._log_images(job.loggers, image_batch, batch_idx, job.training_step, job.prefix)
+
+    def _submit(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        dataloader: Optional[torch.utils.data.DataLoader],
+        prefix: str,
+    ) -> None:
+        """
+        Queue the visualization of examples with a snapshot of the current model weights, without waiting for it.
+
+        :param trainer: lightning trainer
+        :param pl_module: lightning module
+        :param dataloader: examples to visualize
+        :param prefix: prefix to add to the log tag
+        """
+        assert dataloader is not None, "Dataloaders have to be initialized before submitting visualizations"
+
+        # Check before taking the snapshot, copying the weights is wasted if the job is dropped
+        if self._jobs is not None and self._jobs.full():
+            self._drop(prefix)
+            return
+
+        if prefix not in self._batches:
+            self._batches[prefix] = self._collate_batches(dataloader)
+
+        model_state = pl_module.model.state_dict()
+        state_dict = {name: tensor.detach().to('cpu', copy=True) for name, tensor in model_state.items()}
+
+        if self._worker is None:
+            self._start(pl_module, state_dict)
+        assert self._jobs is not None, "Job queue has to be created before submitting visualizations"
+
+        job = VisualizationJob(
+            state_dict, self._batches[prefix], trainer.logger.experiment, trainer.global_step, prefix
+        )
+
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            self._drop(prefix)
+
+    @staticmethod
+    def _collate_batches(dataloader: torch.utils.data.DataLoader) -> List[Tuple[FeaturesType, TargetsType]]:
+        """
+        Load and collate all batches of a dataloader.
+
+        :param dataloader: examples to visualize
+        :return: batches of features and targets
+        """
+        return [(features, targets) for features, targets in dataloader]
+
+    def _drop(self, prefix: str) -> None:
+        """
+        Skip a visualization because rendering can not keep up.
+
+        :param prefix: prefix of the dropped visualization
+        """
+        self.num_dropped_jobs += 1
+        logger.warning(f'Skipping {prefix} visualization, {self._max_queued_jobs} visualizations are still pending')
+
+    def close(self) -> None:
+        """Wait for the pending visualizations and stop the background thread and render processes."""
+        if self._worker is None or self._jobs is None:
+            return
+
+        self._jobs.put(None)
+        self._worker.join(timeout=self._close_timeout)
+        if self._worker.is_alive():
+            logger.warning('Timed out waiting for pending visualizations')
+
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=not self._worker.is_alive())
+
+        self._worker = None
+        self._jobs = None
+        self._render_pool = None
+        self._inference_model = None
+
+    def teardown(self, trainer: pl.Trainer, pl_module: pl.LightningModule, stage: Optional[str] = None) -> None:
+        """
+        Called when fit, validate or test ends.
+
+        :param trainer: lightning trainer
+        :param pl_module: lightning module
+        :param stage: stage of training, can be "fit", "validate" or "test"
+        """
+        self.close()
+
+    def on_train_epoch_end(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        unused: Optional = None,  # type: ignore
+    ) -> None:
+        """
+        Queues the visualization of training examples at the end of the epoch.
+
+        :param trainer: lightning trainer
+        :param pl_module: lightning module
+        """
+        assert hasattr(trainer, 'datamodule'), "Trainer missing datamodule attribute"
+        assert hasattr(trainer, 'global_step'), "Trainer missing global_step attribute"
+
+        if self.train_dataloader is None:
+            self._initialize_dataloaders(trainer.datamodule)
+
+        self._submit(trainer, pl_module, self.train_dataloader, 'train')
+
+    def on_validation_epoch_end(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        unused: Optional = None,  # type: ignore
+    ) -> None:
+        """
+        Queues the visualization of validation examples at the end of the epoch.
+
+        :param trainer: lightning trainer
+        :param pl_module: lightning module
+        """
+        assert hasattr(trainer, 'datamodule'), "Trainer missing datamodule attribute"
+        assert hasattr(trainer, 'global_step'), "Trainer missing global_step attribute"
+
+        if self.val_dataloader is None:
+            self._initialize_dataloaders(trainer.datamodule)
+
+        self._submit(trainer, pl_module, self.val_dataloader, 'val')
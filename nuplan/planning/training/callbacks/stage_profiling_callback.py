@@ -0,0 +1,123 @@
+import logging
+import pathlib
+from typing import Any, List, Optional
+
+import pytorch_lightning as pl
+
+from nuplan.planning.training.data_loader.datamodule import DataModule
+from nuplan.planning.training.modeling.lightning_module_wrapper import LightningModuleWrapper
+from nuplan.planning.training.preprocessing.utils.stage_profiler import (
+    AUGMENTATION_STAGE,
+    COLLATE_STAGE,
+    TRAINING_STEP_STAGES,
+    StageProfiler,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StageProfilingCallback(pl.Callback):
+    """
+    Times every stage of the training pipeline, from computing each feature in the dataloader workers, including the
+    scenario queries it needs, to the forward pass, objectives and metrics, and reports the stages ranked by running
+    time every epoch.
+    """
+
+    def __init__(self, output_dir: pathlib.Path, synchronize_device: bool = False):
+        """
+        Initialize callback.
+        :param output_dir: directory where output should be stored. Note, "stage_profiling" sub-dir will be added
+        :param synchronize_device: whether to wait for pending CUDA kernels around the training step stages, which
+            times them accurately at the cost of stalling the GPU queue
+        """
+        self._output_dir = pathlib.Path(output_dir) / "stage_profiling"
+        self._synchronize_device = synchronize_device
+        self._profiler: Optional[StageProfiler] = None
+
+    @property
+    def profiler(self) -> Optional[StageProfiler]:
+        """
+        :return: profiler of the running stage, None before setup
+        """
+        return self._profiler
+
+    def setup(self, trainer: pl.Trainer, pl_module: pl.LightningModule, stage: Optional[str] = None) -> None:
+        """
+        Create the profiler and attach it to the datamodule and the lightning module.
+        The datamodule is set up before the callbacks, so its datasets already exist.
+        :param trainer: Lightning trainer.
+        :param pl_module: lightning model.
+        :param stage: stage of training, can be "fit" or "test".
+        """
+        datamodule = getattr(trainer, "datamodule", None)
+
+        stage_names: List[str] = []
+        num_workers = 0
+        if isinstance(datamodule, DataModule):
+            stage_names += datamodule.feature_and_targets_builder.get_stage_names()
+            stage_names += [AUGMENTATION_STAGE, COLLATE_STAGE]
+            num_workers = datamodule.num_workers
+        else:
+            logger.warning("Datamodule does not support stage profiling, only the training step is profiled")
+        stage_names += TRAINING_STEP_STAGES
+
+        self._profiler = StageProfiler(stage_names, num_workers, self._synchronize_device)
+
+        if isinstance(datamodule, DataModule):
+            datamodule.set_stage_profiler(self._profiler)
+        if isinstance(pl_module, LightningModuleWrapper):
+            pl_module.set_stage_profiler(self._profiler)
+
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Stage profiler will report into folder: {str(self._output_dir)}")
+
+    def teardown(self, trainer: pl.Trainer, pl_module: pl.LightningModule, stage: Optional[str] = None) -> None:
+        """
+        Detach the profiler from the datamodule and the lightning module.
+        :param trainer: Lightning trainer.
+        :param pl_module: lightning model.
+        :param stage: stage of training, can be "fit" or "test".
+        """
+        datamodule = getattr(trainer, "datamodule", None)
+        if isinstance(datamodule, DataModule):
+            datamodule.set_stage_profiler(None)
+        if isinstance(pl_module, LightningModuleWrapper):
+            pl_module.set_stage_profiler(None)
+
+        self._profiler = None
+
+    def on_train_epoch_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule) -> None:
+        """
+        Called at the start of each train epoch.
+        :param trainer: Lightning trainer.
+        :param pl_module: lightning model.
+        """
+        if self._profiler is not None:
+            self._profiler.reset()
+
+    def on_train_epoch_end(
+        self, trainer: pl.Trainer, pl_module: pl.LightningModule, unused: Optional[Any] = None
+    ) -> None:
+        """
+        Called at the end of each train epoch. Reports the stages of the training and validation steps of the epoch,
+        summed over all ranks in distributed training.
+        :param trainer: Lightning trainer.
+        :param pl_module: lightning model.
+        :param unused: Not required for stage profiling.
+        """
+        if self._profiler is None:
+            return
+
+        # Run by every rank, only the first one reports
+        self._profiler.reduce_across_ranks(pl_module.device)
+
+        if trainer.is_global_zero:
+            summary = self._profiler.summarize()
+            logger.info(f"Stage profile of epoch {trainer.current_epoch}:\n{summary}")
+            pl_module.log_dict(
+                {f"stage_time/{name}": total_time for name, total_time in self._profiler.to_dict().items()}
+            )
+
+            path = self._output_dir / f"epoch_{trainer.current_epoch}.txt"
+            with open(path, "w") as fp:
+                fp.write(summary + "\n")
@@ -0,0 +1,186 @@
+import threading
+import unittest
+from typing import List, Tuple
+from unittest.mock import Mock, patch
+
+import torch
+import torch.utils.data
+from torch.utils.tensorboard import SummaryWriter
+
+from nuplan.planning.training.callbacks.async_visualization_callback import (
+    AsyncVisualizationCallback,
+    VisualizationJob,
+)
+from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
+from nuplan.planning.training.preprocessing.feature_collate import FeatureCollate
+from nuplan.planning.training.preprocessing.features.raster import Raster
+from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
+
+
+class OffsetModel(torch.nn.Module):
+    """Model predicting a constant trajectory, given by its weights."""
+
+    def __init__(self) -> None:
+        """Initialize the model."""
+        super().__init__()
+        self.offset = torch.nn.Parameter(torch.zeros(4, 3))
+
+    def forward(self, features: FeaturesType) -> TargetsType:
+        """
+        :param features: Batch of raster features.
+        :return: Predicted trajectories.
+        """
+        batch_size = features['raster'].data.shape[0]
+        return {'trajectory': Trajectory(data=self.offset + torch.zeros(batch_size, 4, 3))}
+
+
+def _build_samples(num_samples: int) -> List[Tuple[FeaturesType, TargetsType]]:
+    """
+    :param num_samples: Number of samples.
+    :return: Samples of raster features and trajectory targets.
+    """
+    return [
+        ({'raster': Raster(data=torch.zeros(4, 32, 32))}, {'trajectory': Trajectory(data=torch.zeros(4, 3))})
+        for _ in range(num_samples)
+    ]
+
+
+class TestAsyncVisualizationCallback(unittest.TestCase):
+    """Test visualizing examples off the training loop."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.writer = Mock(spec=SummaryWriter)
+        self.trainer = Mock(global_step=7)
+        self.trainer.logger.experiment = [self.writer]
+
+        self.pl_module = Mock()
+        self.pl_module.model = OffsetModel()
+
+        self.dataloader = torch.utils.data.DataLoader(_build_samples(3), batch_size=2, collate_fn=FeatureCollate())
+
+    def _build_callback(self, num_render_workers: int, max_queued_jobs: int = 2) -> AsyncVisualizationCallback:
+        """
+        :param num_render_workers: Number of processes rendering images.
+        :param max_queued_jobs: Maximum number of visualizations waiting to be rendered.
+        :return: Callback with initialized dataloaders.
+        """
+        callback = AsyncVisualizationCallback(
+            images_per_tile=2,
+            num_train_tiles=2,
+            num_val_tiles=2,
+            pixel_size=0.5,
+            num_render_workers=num_render_workers,
+            max_queued_jobs=max_queued_jobs,
+        )
+        callback.train_dataloader = self.dataloader
+        callback.val_dataloader = self.dataloader
+        return callback
+
+    def _assert_logged(self, prefix: str) -> None:
+        """
+        Assert that all batches were logged.
+        :param prefix: Prefix of the log tags.
+        """
+        calls = self.writer.add_images.call_args_list
+        self.assertEqual([call.kwargs['tag'] for call in calls], [f'{prefix}_visualization_{i}' for i in range(2)])
+        self.assertEqual([call.kwargs['img_tensor'].shape for call in calls], [(2, 32, 32, 3), (1, 32, 32, 3)])
+        self.assertTrue(all(call.kwargs['global_step'] == 7 for call in calls))
+
+    def test_visualize_in_background(self) -> None:
+        """Test that images are rendered and logged by the background thread."""
+        callback = self._build_callback(num_render_workers=0)
+
+        callback.on_validation_epoch_end(self.trainer, self.pl_module)
+        callback.close()
+
+        self._assert_logged('val')
+
+    def test_visualize_in_process_pool(self) -> None:
+        """Test that images are rendered in worker processes."""
+        callback = self._build_callback(num_render_workers=1)
+
+        callback.on_train_epoch_end(self.trainer, self.pl_module)
+        callback.close()
+
+        self._assert_logged('train')
+
+    def test_weights_snapshot(self) -> None:
+        """Test that the model is run with the weights at the time of submission."""
+        callback = self._build_callback(num_render_workers=0)
+        predictions = []
+
+        def record_predictions(job: VisualizationJob) -> None:
+            """Record the predicted trajectory of the replica model."""
+            model = callback._inference_model
+            model.load_state_dict(job.state_dict)  # type: ignore
+            predictions.append(model({'raster': Raster(data=torch.zeros(1, 4, 32, 32))}))  # type: ignore
+
+        with patch.object(callback, '_run_job', side_effect=record_predictions):
+            callback.on_train_epoch_end(self.trainer, self.pl_module)
+            with torch.no_grad():
+                self.pl_module.model.offset.fill_(1.0)
+            callback.close()
+
+        self.assertEqual(float(predictions[0]['trajectory'].data.detach().sum()), 0.0)
+
+    def test_examples_collated_on_training_thread(self) -> None:
+        """Test that examples are loaded once, on the thread submitting the visualizations."""
+        samples = _build_samples(3)
+        loading_threads = []
+
+        def get_sample(index: int) -> Tuple[FeaturesType, TargetsType]:
+            """Record the thread loading a sample."""
+            loading_threads.append(threading.current_thread())
+            return samples[index]
+
+        dataset = Mock(__getitem__=Mock(side_effect=get_sample), __len__=Mock(return_value=len(samples)))
+        callback = self._build_callback(num_render_workers=0)
+        callback.train_dataloader = torch.utils.data.DataLoader(dataset, batch_size=2, collate_fn=FeatureCollate())
+
+        callback.on_train_epoch_end(self.trainer, self.pl_module)
+        callback.on_train_epoch_end(self.trainer, self.pl_module)
+        callback.close()
+
+        self.assertEqual(loading_threads, [threading.current_thread()] * len(samples))
+
+    def test_replica_built_from_snapshot(self) -> None:
+        """Test that the cpu replica of the model is built from the weights snapshot instead of a copy of the model."""
+        callback = self._build_callback(num_render_workers=0)
+        state_dict = {'offset': torch.ones(4, 3)}
+
+        callback._start(self.pl_module, state_dict)
+        replica = callback._inference_model
+        callback.close()
+
+        assert replica is not None
+        self.assertIsInstance(replica.offset, torch.nn.Parameter)
+        self.assertEqual(replica.offset.data_ptr(), state_dict['offset'].data_ptr())
+        self.assertEqual(float(self.pl_module.model.offset.detach().sum()), 0.0)
+
+    def test_drop_when_full(self) -> None:
+        """Test that visualizations are dropped instead of blocking training when rendering can not keep up."""
+        callback = self._build_callback(num_render_workers=0, max_queued_jobs=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block(job: VisualizationJob) -> None:
+            """Block the background thread until released."""
+            started.set()
+            release.wait()
+
+        with patch.object(callback, '_run_job', side_effect=block) as run_job:
+            callback.on_train_epoch_end(self.trainer, self.pl_module)
+            started.wait()
+            callback.on_train_epoch_end(self.trainer, self.pl_module)  # Queued
+            callback.on_validation_epoch_end(self.trainer, self.pl_module)  # Dropped
+
+            self.assertEqual(callback.num_dropped_jobs, 1)
+            release.set()
+            callback.close()
+
+        self.assertEqual([call.args[0].prefix for call in run_job.call_args_list], ['train', 'train'])
+
+
+if __name__ == '__main__':
+    unittest.main()
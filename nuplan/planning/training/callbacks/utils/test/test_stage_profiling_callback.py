@@ -0,0 +1,88 @@
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from nuplan.planning.training.callbacks.stage_profiling_callback import StageProfilingCallback
+from nuplan.planning.training.data_loader.datamodule import DataModule
+from nuplan.planning.training.modeling.lightning_module_wrapper import LightningModuleWrapper
+from nuplan.planning.training.preprocessing.feature_preprocessor import FeaturePreprocessor
+
+
+class TestStageProfilingCallback(unittest.TestCase):
+    """Test attaching the stage profiler and reporting the stages every epoch."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.callback = StageProfilingCallback(output_dir=pathlib.Path(self.output_dir.name))
+
+        feature_preprocessor = Mock(spec=FeaturePreprocessor)
+        feature_preprocessor.get_stage_names.return_value = ['builder/agents', 'builder/trajectory']
+        self.datamodule = Mock(spec=DataModule)
+        self.datamodule.feature_and_targets_builder = feature_preprocessor
+        self.datamodule.num_workers = 2
+
+        self.trainer = Mock(datamodule=self.datamodule, current_epoch=3, is_global_zero=True)
+        self.pl_module = Mock(spec=LightningModuleWrapper)
+
+    def tearDown(self) -> None:
+        """Clean up test case."""
+        self.output_dir.cleanup()
+
+    def test_setup_and_teardown(self) -> None:
+        """Test that the profiler covers all stages and is attached to the datamodule and model."""
+        self.callback.setup(self.trainer, self.pl_module, 'fit')
+
+        profiler = self.callback.profiler
+        self.assertIsNotNone(profiler)
+        self.assertEqual(
+            profiler.stage_names,  # type: ignore
+            [
+                'builder/agents',
+                'builder/trajectory',
+                'augmentation',
+                'collate',
+                'host_to_device',
+                'forward',
+                'objectives',
+                'metrics',
+            ],
+        )
+        self.datamodule.set_stage_profiler.assert_called_once_with(profiler)
+        self.pl_module.set_stage_profiler.assert_called_once_with(profiler)
+
+        self.callback.teardown(self.trainer, self.pl_module, 'fit')
+
+        self.assertIsNone(self.callback.profiler)
+        self.datamodule.set_stage_profiler.assert_called_with(None)
+        self.pl_module.set_stage_profiler.assert_called_with(None)
+
+    def test_epoch_report(self) -> None:
+        """Test that the timings of an epoch are logged and written to a report."""
+        self.callback.setup(self.trainer, self.pl_module, 'fit')
+        profiler = self.callback.profiler
+        profiler.add('forward', 5.0)  # type: ignore
+
+        self.callback.on_train_epoch_start(self.trainer, self.pl_module)
+        profiler.add('builder/agents', 2.0)  # type: ignore
+        self.callback.on_train_epoch_end(self.trainer, self.pl_module)
+
+        self.pl_module.log_dict.assert_called_once_with({'stage_time/builder/agents': 2.0})
+        report = (pathlib.Path(self.output_dir.name) / 'stage_profiling' / 'epoch_3.txt').read_text()
+        self.assertIn('builder/agents', report)
+        self.assertNotIn('forward', report)
+
+    def test_epoch_report_only_on_global_zero(self) -> None:
+        """Test that other ranks neither log nor write a report."""
+        self.trainer.is_global_zero = False
+        self.callback.setup(self.trainer, self.pl_module, 'fit')
+        self.callback.profiler.add('builder/agents', 2.0)  # type: ignore
+        self.callback.on_train_epoch_end(self.trainer, self.pl_module)
+
+        self.pl_module.log_dict.assert_not_called()
+        self.assertFalse((pathlib.Path(self.output_dir.name) / 'stage_profiling' / 'epoch_3.txt').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,6 +15,92 @@ from nuplan.planning.training.modeling.types import FeaturesType, TargetsType, m
 from nuplan.planning.training.preprocessing.feature_collate import FeatureCollate
 
 
+def get_images_from_raster_features(
+    features: FeaturesType, targets: TargetsType, predictions: TargetsType, pixel_size: float
+) -> npt.NDArray[np.uint8]:
+    """
+    Create a list of RGB raster images from a batch of model data of raster features.
+
+    :param features: tensor of model features
+    :param targets: tensor of model targets
+    :param predictions: tensor of model predictions
+    :param pixel_size: [m] size of pixel in meters
+    :return: list of raster images
+    """
+    images = list()
+
+    for raster, target_trajectory, predicted_trajectory in zip(
+        features['raster'].unpack(), targets['trajectory'].unpack(), predictions['trajectory'].unpack()
+    ):
+        image = get_raster_with_trajectories_as_rgb(
+            raster,
+            target_trajectory,
+            predicted_trajectory,
+            pixel_size=pixel_size,
+        )
+
+        images.append(image)
+
+    return np.asarray(images)
+
+
+def get_images_from_vector_features(
+    features: FeaturesType, targets: TargetsType, predictions: TargetsType, pixel_size: float
+) -> npt.NDArray[np.uint8]:
+    """
+    Create a list of RGB raster images from a batch of model data of vectormap and agent features.
+
+    :param features: tensor of model features
+    :param targets: tensor of model targets
+    :param predictions: tensor of model predictions
+    :param pixel_size: [m] size of pixel in meters
+    :return: list of raster images
+    """
+    images = list()
+
+    for vector_map, agents, target_trajectory, predicted_trajectory in zip(
+        features['vector_map'].unpack(),
+        features['agents'].unpack(),
+        targets['trajectory'].unpack(),
+        predictions['trajectory'].unpack(),
+    ):
+        image = get_raster_from_vector_map_with_agents(
+            vector_map,
+            agents,
+            target_trajectory,
+            predicted_trajectory,
+            pixel_size=pixel_size,
+        )
+
+        images.append(image)
+
+    return np.asarray(images)
+
+
+def get_images_from_batch(
+    features: FeaturesType, targets: TargetsType, predictions: TargetsType, pixel_size: float
+) -> Optional[npt.NDArray[np.uint8]]:
+    """
+    Create a list of RGB raster images from a batch of model data, depending on the available features.
+    This is a module level function so that batches can be rendered in worker processes.
+
+    :param features: tensor of model features
+    :param targets: tensor of model targets
+    :param predictions: tensor of model predictions
+    :param pixel_size: [m] size of pixel in meters
+    :return: list of raster images, None if the batch can not be visualized
+    """
+    if 'trajectory' not in targets or 'trajectory' not in predictions:
+        return None
+
+    if 'raster' in features:
+        return get_images_from_raster_features(features, targets, predictions, pixel_size)
+    elif 'vector_map' in features and 'agents' in features:
+        return get_images_from_vector_features(features, targets, predictions, pixel_size)
+    else:
+        return None
+
+
 class VisualizationCallback(pl.Callback):
     """
     Callback that visualizes planner model inputs/outputs and logs them in Tensorboard.
@@ -112,16 +198,29 @@ class VisualizationCallback(pl.Callback):
         :param training_step: global trainign step
         :param prefix: prefix to add to the log tag
         """
-        if 'trajectory' not in targets or 'trajectory' not in predictions:
+        image_batch = get_images_from_batch(features, targets, predictions, self.pixel_size)
+        if image_batch is None:
             return
 
-        if 'raster' in features:
-            image_batch = self._get_images_from_raster_features(features, targets, predictions)
-        elif 'vector_map' in features and 'agents' in features:
-            image_batch = self._get_images_from_vector_features(features, targets, predictions)
-        else:
-            return
+        self._log_images(loggers, image_batch, batch_idx, training_step, prefix)
 
+    def _log_images(
+        self,
+        loggers: List[Any],
+        image_batch: npt.NDArray[np.uint8],
+        batch_idx: int,
+        training_step: int,
+        prefix: str,
+    ) -> None:
+        """
+        Logs a batch of visualized images.
+
+        :param loggers: list of loggers from the trainer
+        :param image_batch: batch of RGB images
+        :param batch_idx: index of total batches to visualize
+        :param training_step: global trainign step
+        :param prefix: prefix to add to the log tag
+        """
         tag = f'{prefix}_visualization_{batch_idx}'
 
         for logger in loggers:
@@ -144,21 +243,7 @@ class VisualizationCallback(pl.Callback):
         :param predictions: tensor of model predictions
         :return: list of raster images
         """
-        images = list()
-
-        for raster, target_trajectory, predicted_trajectory in zip(
-            features['raster'].unpack(), targets['trajectory'].unpack(), predictions['trajectory'].unpack()
-        ):
-            image = get_raster_with_trajectories_as_rgb(
-                raster,
-                target_trajectory,
-                predicted_trajectory,
-                pixel_size=self.pixel_size,
-            )
-
-            images.append(image)
-
-        return np.asarray(images)
+        return get_images_from_raster_features(features, targets, predictions, self.pixel_size)
 
     def _get_images_from_vector_features(
         self, features: FeaturesType, targets: TargetsType, predictions: TargetsType
@@ -171,25 +256,7 @@ class VisualizationCallback(pl.Callback):
         :param predictions: tensor of model predictions
         :return: list of raster images
         """
-        images = list()
-
-        for vector_map, agents, target_trajectory, predicted_trajectory in zip(
-            features['vector_map'].unpack(),
-            features['agents'].unpack(),
-            targets['trajectory'].unpack(),
-            predictions['trajectory'].unpack(),
-        ):
-            image = get_raster_from_vector_map_with_agents(
-                vector_map,
-                agents,
-                target_trajectory,
-                predicted_trajectory,
-                pixel_size=self.pixel_size,
-            )
-
-            images.append(image)
-
-        return np.asarray(images)
+        return get_images_from_vector_features(features, targets, predictions, self.pixel_size)
 
     def _infer_model(self, pl_module: pl.LightningModule, features: FeaturesType) -> TargetsType:
         """
@@ -1,8 +1,9 @@
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import numpy.typing as npt
-from casadi import DM, Opti, OptiSol, cos, diff, sin, sumsqr, vertcat
+from casadi import DM, SX, Opti, OptiSol, cos, diff, nlpsol, reshape, sin, sumsqr, vertcat
 
 Pose = Tuple[float, float, float]  # (x, y, yaw)
 
@@ -198,6 +199,204 @@ class ConstrainedNonlinearSmoother:
             )
 
 
+class CompiledNonlinearSmoother:
+    """
+    Reusable form of ConstrainedNonlinearSmoother, with the same dynamics, constraints and objective.
+    The NLP is built symbolically once and only the reference trajectory and the current state change between solves.
+    The speed and control profile of the previous solution warm-start the next solve.
+
+    :param trajectory_len: trajectory length
+    :param dt: timestep (sec)
+    """
+
+    nx = 4  # state dim
+    nu = 2  # control dim
+
+    def __init__(self, trajectory_len: int, dt: float, warm_start: bool = True):
+        """
+        :param trajectory_len: the length of trajectory to be optimized.
+        :param dt: the time interval between trajectory points.
+        :param warm_start: whether to initialize the speed and controls with the previous solution.
+        """
+        self.dt = dt
+        self.trajectory_len = trajectory_len
+        self.warm_start = warm_start
+        self._previous_solution: Optional[npt.NDArray[np.float64]] = None
+        self._init_solver()
+
+    def _init_solver(self) -> None:
+        """
+        Build the NLP and the solver.
+        """
+        num_steps = self.trajectory_len
+        dt = self.dt
+
+        # Decision variables: state trajectory (x, y, yaw, speed) and control trajectory (curvature, accel)
+        state = SX.sym('state', self.nx, num_steps + 1)
+        control = SX.sym('control', self.nu, num_steps)
+        decision_variables = vertcat(reshape(state, -1, 1), reshape(control, -1, 1))
+
+        # Parameters: reference trajectory (x, y, yaw) and current state
+        ref_traj = SX.sym('ref_traj', 3, num_steps + 1)
+        x_curr = SX.sym('x_curr', self.nx, 1)
+        parameters = vertcat(reshape(ref_traj, -1, 1), x_curr)
+
+        position_x, position_y, yaw, speed = state[0, :], state[1, :], state[2, :], state[3, :]
+        curvature, accel = control[0, :], control[1, :]
+        curvature_rate = diff(curvature) / dt
+        jerk = diff(accel) / dt
+        lateral_accel = speed[:num_steps] ** 2 * curvature
+
+        def process(x: Any, u: Any) -> Any:
+            """Process for state propagation."""
+            return vertcat(x[3] * cos(x[2]), x[3] * sin(x[2]), x[3] * u[0], u[1])
+
+        # Dynamics constraints, Runge-Kutta 4 integration
+        dynamics = []
+        for k in range(num_steps):
+            k1 = process(state[:, k], control[:, k])
+            k2 = process(state[:, k] + dt / 2 * k1, control[:, k])
+            k3 = process(state[:, k] + dt / 2 * k2, control[:, k])
+            k4 = process(state[:, k] + dt * k3, control[:, k])
+            dynamics.append(state[:, k + 1] - (state[:, k] + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)))
+
+        max_yaw_rate = 1.75  # rad/s
+        max_lateral_accel = 4.0  # m/s^2, assumes circular motion acc_lat = speed^2 * curvature
+        constraints = vertcat(*dynamics, state[:, 0] - x_curr, (diff(yaw) / dt).T, lateral_accel.T)
+        num_equalities = self.nx * (num_steps + 1)
+        self._lbg = np.concatenate(
+            [np.zeros(num_equalities), np.full(num_steps, -max_yaw_rate), np.full(num_steps, -max_lateral_accel)]
+        )
+        self._ubg = -self._lbg
+
+        # Box constraints on the speed and the controls
+        max_speed = 35.0  # m/s
+        curvature_limit = 1.0 / 5.0  # 1/m
+        accel_limit = 4.0  # m/s^2
+        lower_state = np.tile([-np.inf, -np.inf, -np.inf, 0.0], num_steps + 1)
+        upper_state = np.tile([np.inf, np.inf, np.inf, max_speed], num_steps + 1)
+        self._lbx = np.concatenate([lower_state, np.tile([-curvature_limit, -accel_limit], num_steps)])
+        self._ubx = np.concatenate([upper_state, np.tile([curvature_limit, accel_limit], num_steps)])
+
+        # Objective, see ConstrainedNonlinearSmoother._set_objective
+        alpha_xy = 1.0
+        alpha_yaw = 0.1
+        alpha_rate = 0.08
+        alpha_abs = 0.08
+        alpha_lat_accel = 0.06
+        cost_stage = (
+            alpha_xy * sumsqr(ref_traj[:2, :] - vertcat(position_x, position_y))
+            + alpha_yaw * sumsqr(ref_traj[2, :] - yaw)
+            + alpha_rate * (sumsqr(curvature_rate) + sumsqr(jerk))
+            + alpha_abs * (sumsqr(curvature) + sumsqr(accel))
+            + alpha_lat_accel * sumsqr(lateral_accel)
+        )
+        alpha_terminal_xy = 1.0
+        alpha_terminal_yaw = 40.0
+        cost_terminal = alpha_terminal_xy * sumsqr(
+            ref_traj[:2, -1] - vertcat(position_x[-1], position_y[-1])
+        ) + alpha_terminal_yaw * sumsqr(ref_traj[2, -1] - yaw[-1])
+        objective = cost_stage + num_steps / 4.0 * cost_terminal
+
+        self._solver = nlpsol(
+            'smoother',
+            'ipopt',
+            {'x': decision_variables, 'p': parameters, 'f': objective, 'g': constraints},
+            {"ipopt.print_level": 0, "print_time": 0, "ipopt.sb": "yes"},
+        )
+
+    def _initial_guess(
+        self, x_curr: npt.NDArray[np.float64], reference_trajectory: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        """
+        Initialize the poses with the reference trajectory, and the speed and controls with the previous solution.
+        :param x_curr: current state of size nx (x, y, yaw, speed).
+        :param reference_trajectory: N+1 x 3 reference trajectory (x, y, yaw).
+        :return: Initial guess of the decision variables.
+        """
+        num_states = self.nx * (self.trajectory_len + 1)
+        if self.warm_start and self._previous_solution is not None:
+            initial_guess = self._previous_solution.copy()
+        else:
+            initial_guess = np.zeros(num_states + self.nu * self.trajectory_len)
+            initial_guess[3:num_states:4] = x_curr[3]
+
+        states = initial_guess[:num_states].reshape(self.trajectory_len + 1, self.nx)
+        states[:, :3] = reference_trajectory
+
+        return initial_guess
+
+    def solve(
+        self, x_curr: Sequence[float], reference_trajectory: Sequence[Pose]
+    ) -> Tuple[npt.NDArray[np.float64], bool]:
+        """
+        Smooth a reference trajectory.
+        :param x_curr: current state of size nx (x, y, yaw, speed), the boundary condition of the first state.
+        :param reference_trajectory: N+1 x 3 reference, where the second dim is for (x, y, yaw).
+        :return: N+1 x 3 smoothed trajectory (x, y, yaw) and whether the solver succeeded.
+        """
+        x_curr = np.asarray(x_curr, dtype=np.float64)
+        reference_trajectory = np.asarray(reference_trajectory, dtype=np.float64)
+        if x_curr.shape != (self.nx,):
+            raise ValueError(f"x_curr length {len(x_curr)} must be equal to state dim {self.nx}")
+        if reference_trajectory.shape != (self.trajectory_len + 1, 3):
+            raise ValueError(
+                f"reference traj length {len(reference_trajectory)} must be equal to {self.trajectory_len + 1}"
+            )
+
+        try:
+            solution = self._solver(
+                x0=self._initial_guess(x_curr, reference_trajectory),
+                p=np.concatenate([reference_trajectory.ravel(), x_curr]),
+                lbx=self._lbx,
+                ubx=self._ubx,
+                lbg=self._lbg,
+                ubg=self._ubg,
+            )
+        except RuntimeError:
+            return reference_trajectory, False
+
+        if not self._solver.stats()['success']:
+            return reference_trajectory, False
+
+        decision_variables = np.asarray(solution['x']).ravel()
+        self._previous_solution = decision_variables
+        states = decision_variables[: self.nx * (self.trajectory_len + 1)].reshape(self.trajectory_len + 1, self.nx)
+
+        return states[:, :3], True
+
+    def solve_batch(
+        self, x_curr: npt.NDArray[np.float64], reference_trajectories: npt.NDArray[np.float64]
+    ) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.bool_]]:
+        """
+        Smooth several reference trajectories, each solve warm-starts the next one.
+        :param x_curr: <batch, nx> current states (x, y, yaw, speed).
+        :param reference_trajectories: <batch, N+1, 3> reference trajectories (x, y, yaw).
+        :return: <batch, N+1, 3> smoothed trajectories, the reference where the solver failed,
+            and <batch> whether the solver succeeded.
+        """
+        if len(x_curr) != len(reference_trajectories):
+            raise ValueError(f"Got {len(x_curr)} current states for {len(reference_trajectories)} trajectories")
+
+        smoothed_trajectories = np.empty((len(reference_trajectories), self.trajectory_len + 1, 3), dtype=np.float64)
+        success = np.zeros(len(reference_trajectories), dtype=np.bool_)
+        for idx in range(len(reference_trajectories)):
+            smoothed_trajectories[idx], success[idx] = self.solve(x_curr[idx], reference_trajectories[idx])
+
+        return smoothed_trajectories, success
+
+
+@lru_cache(maxsize=None)
+def get_compiled_smoother(trajectory_len: int, dt: float) -> CompiledNonlinearSmoother:
+    """
+    Get the smoother of a trajectory length and timestep, built once per process.
+    :param trajectory_len: trajectory length
+    :param dt: timestep (sec)
+    :return: The smoother.
+    """
+    return CompiledNonlinearSmoother(trajectory_len, dt)
+
+
 class GaussianNoise:
     """
     GaussianNoise draws samples from a normal distribution with specified mean and standard deviation.
@@ -7,9 +7,9 @@ import numpy.typing as npt
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.training.data_augmentation.abstract_data_augmentation import AbstractAugmentor
 from nuplan.planning.training.data_augmentation.data_augmentation_util import (
-    ConstrainedNonlinearSmoother,
     GaussianNoise,
     UniformNoise,
+    get_compiled_smoother,
 )
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
 
@@ -49,7 +49,8 @@ class KinematicAgentAugmentor(AbstractAugmentor):
         """
         self._random_offset_generator = UniformNoise(low, high) if use_uniform_noise else GaussianNoise(mean, std)
         self._augment_prob = augment_prob
-        self._optimizer = ConstrainedNonlinearSmoother(trajectory_length, dt)
+        self._trajectory_length = trajectory_length
+        self._dt = dt
 
     def augment(
         self, features: FeaturesType, targets: TargetsType, scenario: Optional[AbstractScenario] = None
@@ -71,28 +72,12 @@ class KinematicAgentAugmentor(AbstractAugmentor):
         x_curr = [ego_x[0], ego_y[0], ego_yaw[0], ego_velocity[0]]
         ref_traj = ego_trajectory
 
-        # Set reference and solve
-        self._optimizer.set_reference_trajectory(x_curr, ref_traj)
-
-        try:
-            sol = self._optimizer.solve()
-        except RuntimeError:
-            logger.error("Smoothing failed with status %s! Use G.T. instead" % sol.stats()['return_status'])
-            return features, targets
-
-        if not sol.stats()['success']:
-            logger.warning("Smoothing failed with status %s! Use G.T. instead" % sol.stats()['return_status'])
+        # Solve with the smoother compiled once per trajectory length, warm-started from its previous solution
+        ego_perturb, success = get_compiled_smoother(self._trajectory_length, self._dt).solve(x_curr, ref_traj)
+        if not success:
+            logger.warning("Smoothing failed! Use G.T. instead")
             return features, targets
 
-        ego_perturb: npt.NDArray[np.float32] = np.vstack(
-            [
-                sol.value(self._optimizer.position_x),
-                sol.value(self._optimizer.position_y),
-                sol.value(self._optimizer.yaw),
-            ]
-        )
-        ego_perturb = ego_perturb.T
-
         features["agents"].ego[0][-1] = np.float32(ego_perturb[0])
         targets["trajectory"].data = np.float32(ego_perturb[1:])
 
@@ -7,9 +7,9 @@ import numpy.typing as npt
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.training.data_augmentation.abstract_data_augmentation import AbstractAugmentor
 from nuplan.planning.training.data_augmentation.data_augmentation_util import (
-    ConstrainedNonlinearSmoother,
     GaussianNoise,
     UniformNoise,
+    get_compiled_smoother,
 )
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
 
@@ -61,7 +61,6 @@ class KinematicHistoryAgentAugmentor(AbstractAugmentor):
 
         # Augment the history to match the distribution shift in close loop rollout
         trajectory_length = len(features['agents'].ego[0]) - 1
-        _optimizer = ConstrainedNonlinearSmoother(trajectory_length, self._dt)
 
         features['agents'].ego[0][-1] += self._random_offset_generator.sample()
         ego_trajectory: npt.NDArray[np.float32] = features['agents'].ego[0]
@@ -72,28 +71,12 @@ class KinematicHistoryAgentAugmentor(AbstractAugmentor):
         x_curr = [ego_x[0], ego_y[0], ego_yaw[0], ego_velocity[0]]
         ref_traj = ego_trajectory
 
-        # Set reference and solve
-        _optimizer.set_reference_trajectory(x_curr, ref_traj)
-
-        try:
-            sol = _optimizer.solve()
-        except RuntimeError:
-            logger.error("Smoothing failed with status %s! Use G.T. instead" % sol.stats()['return_status'])
-            return features, targets
-
-        if not sol.stats()['success']:
-            logger.warning("Smoothing failed with status %s! Use G.T. instead" % sol.stats()['return_status'])
+        # Solve with the smoother compiled once per trajectory length, warm-started from its previous solution
+        ego_perturb, success = get_compiled_smoother(trajectory_length, self._dt).solve(x_curr, ref_traj)
+        if not success:
+            logger.warning("Smoothing failed! Use G.T. instead")
             return features, targets
 
-        ego_perturb: npt.NDArray[np.float32] = np.vstack(
-            [
-                sol.value(_optimizer.position_x),
-                sol.value(_optimizer.position_y),
-                sol.value(_optimizer.yaw),
-            ]
-        )
-        ego_perturb = ego_perturb.T
-
         features["agents"].ego[0] = np.float32(ego_perturb)
 
         return features, targets
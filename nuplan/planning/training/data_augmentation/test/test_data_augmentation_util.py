@@ -0,0 +1,104 @@
+import unittest
+
+import numpy as np
+import numpy.typing as npt
+
+from nuplan.planning.training.data_augmentation.data_augmentation_util import (
+    CompiledNonlinearSmoother,
+    ConstrainedNonlinearSmoother,
+    get_compiled_smoother,
+)
+
+
+def _build_reference_trajectory(
+    num_poses: int, dt: float, speed: float, curvature: float, rng: np.random.Generator
+) -> npt.NDArray[np.float64]:
+    """
+    Build a noisy arc with a perturbed first pose, like the references of the kinematic augmentors.
+    :param num_poses: Number of poses.
+    :param dt: [s] Time interval between poses.
+    :param speed: [m/s] Speed along the arc.
+    :param curvature: [1/m] Curvature of the arc.
+    :param rng: Random generator.
+    :return: <num_poses, 3> poses (x, y, yaw).
+    """
+    yaw = curvature * speed * dt * np.arange(num_poses)
+    x = np.concatenate([[0.0], np.cumsum(speed * dt * np.cos(yaw[:-1]))])
+    y = np.concatenate([[0.0], np.cumsum(speed * dt * np.sin(yaw[:-1]))])
+    reference_trajectory = np.stack([x, y, yaw], axis=1) + rng.normal(0.0, 0.05, size=(num_poses, 3))
+    reference_trajectory[0] += [0.5, 0.3, 0.1]
+    return reference_trajectory
+
+
+def _current_state(reference_trajectory: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """
+    :param reference_trajectory: <num_poses, 3> poses (x, y, yaw).
+    :return: Current state (x, y, yaw, speed) as set by the kinematic augmentors.
+    """
+    speed = np.linalg.norm(reference_trajectory[1, :2] - reference_trajectory[0, :2])
+    return np.array([*reference_trajectory[0], speed])
+
+
+class TestCompiledNonlinearSmoother(unittest.TestCase):
+    """Test the compiled trajectory smoother."""
+
+    def setUp(self) -> None:
+        """Set up random reference trajectories."""
+        self.trajectory_len = 12
+        self.dt = 0.5
+        rng = np.random.default_rng(0)
+        self.reference_trajectories = np.stack(
+            [
+                _build_reference_trajectory(
+                    self.trajectory_len + 1, self.dt, rng.uniform(2.0, 10.0), rng.uniform(-0.05, 0.05), rng
+                )
+                for _ in range(4)
+            ]
+        )
+        self.x_currs = np.stack([_current_state(reference) for reference in self.reference_trajectories])
+
+    def test_matches_constrained_smoother(self) -> None:
+        """Test that the compiled smoother finds the same solutions as ConstrainedNonlinearSmoother."""
+        smoother = CompiledNonlinearSmoother(self.trajectory_len, self.dt)
+        for x_curr, reference_trajectory in zip(self.x_currs, self.reference_trajectories):
+            expected_smoother = ConstrainedNonlinearSmoother(self.trajectory_len, self.dt)
+            expected_smoother.set_reference_trajectory(x_curr, reference_trajectory)
+            solution = expected_smoother.solve()
+            expected_poses = np.stack(
+                [
+                    solution.value(expected_smoother.position_x),
+                    solution.value(expected_smoother.position_y),
+                    solution.value(expected_smoother.yaw),
+                ],
+                axis=1,
+            )
+
+            poses, success = smoother.solve(x_curr, reference_trajectory)
+            self.assertTrue(success)
+            np.testing.assert_allclose(poses, expected_poses, atol=1e-4)
+
+    def test_solve_batch(self) -> None:
+        """Test that solving a batch matches solving the trajectories one by one."""
+        smoother = CompiledNonlinearSmoother(self.trajectory_len, self.dt, warm_start=False)
+        poses, success = smoother.solve_batch(self.x_currs, self.reference_trajectories)
+        self.assertEqual(poses.shape, self.reference_trajectories.shape)
+        self.assertTrue(success.all())
+
+        for idx, (x_curr, reference_trajectory) in enumerate(zip(self.x_currs, self.reference_trajectories)):
+            expected_poses, _ = smoother.solve(x_curr, reference_trajectory)
+            np.testing.assert_allclose(poses[idx], expected_poses, atol=1e-6)
+
+    def test_invalid_inputs(self) -> None:
+        """Test that inputs of the wrong size raise."""
+        smoother = get_compiled_smoother(self.trajectory_len, self.dt)
+        self.assertIs(smoother, get_compiled_smoother(self.trajectory_len, self.dt))
+        with self.assertRaises(ValueError):
+            smoother.solve(self.x_currs[0][:3], self.reference_trajectories[0])
+        with self.assertRaises(ValueError):
+            smoother.solve(self.x_currs[0], self.reference_trajectories[0][:-1])
+        with self.assertRaises(ValueError):
+            smoother.solve_batch(self.x_currs[:2], self.reference_trajectories)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
+from nuplan.planning.training.data_loader.splitter import AbstractSplitter
+
+logger = logging.getLogger(__name__)
+
+SPLIT_NAMES = ('test', 'val', 'train')  # Splits in order of priority, a sample in several splits is kept in the first
+SPLIT_INDICES_VERSION = 1  # Version of the saved split indices, files of other versions are rebuilt
+SPLIT_INDICES_DIRNAME = 'log_splits'  # Directory of the saved split indices in the cache path
+LOG_ASSIGNMENTS_FILENAME = 'log_assignments.json'  # Splits of all the logs split in previous runs
+
+
+def get_hashed_split(log_name: str, split_fractions: Dict[str, float]) -> str:
+    """
+    Deterministically assign a log to a split by hashing its name, independently of the other logs and of the process.
+    :param log_name: Name of the log.
+    :param split_fractions: Fraction of logs in each split, summing to one.
+    :return: Name of the split of the log.
+    """
+    # Python's hash() of strings is salted per process, use a stable digest instead
+    digest = hashlib.sha256(log_name.encode('utf-8')).digest()
+    position = int.from_bytes(digest[:8], 'big') / 2**64
+
+    cumulative_fraction = 0.0
+    for split_name in SPLIT_NAMES:
+        cumulative_fraction += split_fractions.get(split_name, 0.0)
+        if position < cumulative_fraction:
+            return split_name
+
+    # Floating point rounding of the cumulative fraction
+    return [split_name for split_name in SPLIT_NAMES if split_fractions.get(split_name, 0.0) > 0.0][-1]
+
+
+def find_overlapping_logs(log_splits: Dict[str, FrozenSet[str]]) -> Dict[Tuple[str, str], FrozenSet[str]]:
+    """
+    Find the logs assigned to more than one split.
+    :param log_splits: Log names of each split.
+    :return: Mapping from pairs of split names to their common logs, only for pairs sharing logs.
+    """
+    split_names = [split_name for split_name in SPLIT_NAMES if split_name in log_splits]
+    overlaps = {}
+    for index, split_name in enumerate(split_names):
+        for other_split_name in split_names[index + 1 :]:
+            common_logs = log_splits[split_name] & log_splits[other_split_name]
+            if common_logs:
+                overlaps[(split_name, other_split_name)] = common_logs
+
+    return overlaps
+
+
+class CachedLogSplitter(AbstractSplitter):
+    """
+    Splitter that splits database to lists of samples for each of train/val/test sets based on log name, either from
+    explicit lists of logs or by hashing the log names.
+    Scenarios are split in a single pass and scenario tokens are deduplicated across splits. When a cache path is
+    given, the resulting split indices are saved beside the feature cache and reused by later runs on the same
+    scenarios, and the logs are checked against the splits they had in previous runs to detect leakage.
+    """
+
+    def __init__(
+        self,
+        log_splits: Optional[Dict[str, List[str]]] = None,
+        split_fractions: Optional[Dict[str, float]] = None,
+        cache_path: Optional[str] = None,
+        allow_leakage: bool = False,
+    ) -> None:
+        """
+        Initializes the class.
+
+        :param log_splits: dictionary containing 'train', 'val', 'test' keys mapped to lists of log names
+        :param split_fractions: dictionary containing 'train', 'val', 'test' keys mapped to the fraction of logs hashed
+            into each split, used when log_splits is not given
+        :param cache_path: local path to save the split indices in, None to split the scenarios on every run
+        :param allow_leakage: if true, logs in several splits or that changed split since a previous run are only
+            reported, otherwise an error is raised
+        """
+        if (log_splits is None) == (split_fractions is None):
+            raise ValueError('Exactly one of log_splits and split_fractions has to be set')
+
+        self._log_splits: Optional[Dict[str, FrozenSet[str]]] = None
+        self._split_fractions: Optional[Dict[str, float]] = None
+        self._log_to_split: Dict[str, str] = {}
+
+        if log_splits is not None:
+            unknown_splits = set(log_splits) - set(SPLIT_NAMES)
+            assert not unknown_splits, f'Unknown splits: {unknown_splits}'
+            self._log_splits = {split_name: frozenset(log_splits.get(split_name, [])) for split_name in SPLIT_NAMES}
+            _report_leakage(
+                [
+                    f'{len(logs)} logs in both {split_name} and {other_split_name}, e.g. {sorted(logs)[0]}'
+                    for (split_name, other_split_name), logs in find_overlapping_logs(self._log_splits).items()
+                ],
+                allow_leakage,
+            )
+
+            # Iterate in reverse priority such that logs in several splits are assigned to the first split
+            for split_name in reversed(SPLIT_NAMES):
+                self._log_to_split.update((log_name, split_name) for log_name in self._log_splits[split_name])
+        else:
+            assert split_fractions is not None
+            unknown_splits = set(split_fractions) - set(SPLIT_NAMES)
+            assert not unknown_splits, f'Unknown splits: {unknown_splits}'
+            assert all(fraction >= 0.0 for fraction in split_fractions.values()), 'Split fractions must be non-negative'
+            assert abs(sum(split_fractions.values()) - 1.0) < 1e-6, f'Split fractions must sum to 1: {split_fractions}'
+            self._split_fractions = dict(split_fractions)
+
+        self._cache_path = Path(cache_path) if cache_path is not None else None
+        self._allow_leakage = allow_leakage
+
+        if self._cache_path is not None and str(cache_path).startswith('s3://'):
+            logger.warning(f'Split indices can only be saved locally, ignoring cache path {cache_path}')
+            self._cache_path = None
+
+        # Splits of the last scenarios, such that the splits share a single splitting pass
+        self._split_scenarios: Optional[List[AbstractScenario]] = None
+        self._split_indices: Dict[str, List[int]] = {}
+
+    def get_train_samples(self, scenarios: List[AbstractScenario]) -> List[AbstractScenario]:
+        """Inherited, see superclass."""
+        return self._get_samples(scenarios, 'train')
+
+    def get_val_samples(self, scenarios: List[AbstractScenario]) -> List[AbstractScenario]:
+        """Inherited, see superclass."""
+        return self._get_samples(scenarios, 'val')
+
+    def get_test_samples(self, scenarios: List[AbstractScenario]) -> List[AbstractScenario]:
+        """Inherited, see superclass."""
+        return self._get_samples(scenarios, 'test')
+
+    def get_split_indices(self, scenarios: List[AbstractScenario]) -> Dict[str, List[int]]:
+        """
+        Split scenarios, reusing the saved split indices if the scenarios were already split in a previous run.
+        :param scenarios: candidate scenarios
+        :return: mapping from split name to the indices of the scenarios in the split
+        """
+        if self._split_scenarios is not scenarios:
+            self._split_indices = self._load_or_split(scenarios)
+            self._split_scenarios = scenarios
+
+        return self._split_indices
+
+    def _get_samples(self, scenarios: List[AbstractScenario], split_name: str) -> List[AbstractScenario]:
+        """
+        Extract the samples of a split.
+        :param scenarios: candidate scenarios
+        :param split_name: name of the split
+        :return: list of selected samples
+        """
+        return [scenarios[index] for index in self.get_split_indices(scenarios)[split_name]]
+
+    def _get_log_split(self, log_name: str) -> Optional[str]:
+        """
+        :param log_name: name of the log
+        :return: name of the split of the log, None if the log is in no split
+        """
+        if self._split_fractions is not None:
+            return get_hashed_split(log_name, self._split_fractions)
+
+        return self._log_to_split.get(log_name)
+
+    def _split(self, scenarios: List[AbstractScenario]) -> Dict[str, List[int]]:
+        """
+        Split scenarios in a single pass, keeping each scenario token in a single split.
+        :param scenarios: candidate scenarios
+        :return: mapping from split name to the indices of the scenarios in the split
+        """
+        # Token mapped to the split priority and index of the scenario kept for it
+        kept_samples: Dict[str, Tuple[int, int]] = {}
+        num_duplicates = 0
+
+        for index, scenario in enumerate(scenarios):
+            split_name = self._get_log_split(scenario.log_name)
+            if split_name is None:
+                continue
+
+            priority = SPLIT_NAMES.index(split_name)
+            kept_sample = kept_samples.get(scenario.token)
+            if kept_sample is not None:
+                num_duplicates += 1
+                if kept_sample[0] <= priority:
+                    continue
+            kept_samples[scenario.token] = (priority, index)
+
+        if num_duplicates > 0:
+            logger.warning(f'Removed {num_duplicates} scenarios with duplicated tokens from the splits')
+
+        split_indices: Dict[str, List[int]] = {split_name: [] for split_name in SPLIT_NAMES}
+        for priority, index in sorted(kept_samples.values(), key=lambda kept_sample: kept_sample[1]):
+            split_indices[SPLIT_NAMES[priority]].append(index)
+
+        return split_indices
+
+    def _get_fingerprint(self, scenarios: List[AbstractScenario]) -> str:
+        """
+        Fingerprint the splitting of scenarios, such that saved split indices are only reused for the same splitting.
+        :param scenarios: candidate scenarios
+        :return: hex digest of the split configuration and the ordered scenario tokens and log names
+        """
+        config: Dict[str, Any] = (
+            {'log_splits': {name: sorted(logs) for name, logs in self._log_splits.items()}}
+            if self._log_splits is not None
+            else {'split_fractions': self._split_fractions}
+        )
+
+        digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8'))
+        for scenario in scenarios:
+            digest.update(f'{scenario.log_name}/{scenario.token}\n'.encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def _load_or_split(self, scenarios: List[AbstractScenario]) -> Dict[str, List[int]]:
+        """
+        Load the split indices saved for the scenarios, splitting and saving them if missing.
+        :param scenarios: candidate scenarios
+        :return: mapping from split name to the indices of the scenarios in the split
+        """
+        if self._cache_path is None:
+            return self._split(scenarios)
+
+        split_dir = self._cache_path / SPLIT_INDICES_DIRNAME
+        split_file = split_dir / f'{self._get_fingerprint(scenarios)}.json'
+
+        saved = _load_json(split_file)
+        if saved is not None and saved.get('version') == SPLIT_INDICES_VERSION:
+            logger.info(f'Reusing split indices from {split_file}')
+            return {split_name: saved['splits'][split_name] for split_name in SPLIT_NAMES}
+
+        split_indices = self._split(scenarios)
+        log_assignments = {
+            scenarios[index].log_name: split_name for split_name, indices in split_indices.items() for index in indices
+        }
+        self._check_previous_assignments(split_dir / LOG_ASSIGNMENTS_FILENAME, log_assignments)
+
+        try:
+            _save_json(split_file, {'version': SPLIT_INDICES_VERSION, 'splits': split_indices})
+        except OSError as error:
+            logger.warning(f'Could not save split indices {split_file}: {error}')
+
+        return split_indices
+
+    def _check_previous_assignments(self, assignments_file: Path, log_assignments: Dict[str, str]) -> None:
+        """
+        Check that logs keep the split they had in previous runs, and record their splits for the next runs.
+        :param assignments_file: file recording the splits of the logs in previous runs
+        :param log_assignments: mapping from log name to split name in this run
+        """
+        previous_assignments: Dict[str, str] = _load_json(assignments_file) or {}
+
+        moved_logs: Dict[Tuple[str, str], List[str]] = {}
+        for log_name, split_name in log_assignments.items():
+            previous_split_name = previous_assignments.get(log_name, split_name)
+            if previous_split_name != split_name:
+                moved_logs.setdefault((previous_split_name, split_name), []).append(log_name)
+
+        _report_leakage(
+            [
+                f'{len(logs)} logs moved from {previous_split} to {split} since a previous run, e.g. {logs[0]}'
+                for (previous_split, split), logs in moved_logs.items()
+            ],
+            self._allow_leakage,
+        )
+
+        try:
+            _save_json(assignments_file, {**previous_assignments, **log_assignments})
+        except OSError as error:
+            logger.warning(f'Could not save log assignments {assignments_file}: {error}')
+
+
+def _report_leakage(leaks: List[str], allow_leakage: bool) -> None:
+    """
+    Report logs that are in several splits.
+    :param leaks: descriptions of the logs in several splits
+    :param allow_leakage: if true, only log a warning, otherwise raise an error
+    :raise ValueError: if there are leaks and leakage is not allowed
+    """
+    if not leaks:
+        return
+
+    message = f'Leakage between splits: {"; ".join(leaks)}'
+    if not allow_leakage:
+        raise ValueError(message)
+    logger.warning(message)
+
+
+def _load_json(filename: Path) -> Optional[Any]:
+    """
+    Load a json file.
+    :param filename: name of the file
+    :return: content of the file, None if the file is missing or unreadable
+    """
+    if not filename.is_file():
+        return None
+
+    try:
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as error:
+        logger.warning(f'Ignoring unreadable file {filename}: {error}')
+        return None
+
+
+def _save_json(filename: Path, content: Any) -> None:
+    """
+    Atomically save a json file, such that concurrent readers never see a partial file.
+    :param filename: name of the file
+    :param content: content to save
+    """
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=filename.parent, suffix='.tmp', delete=False) as f:
+        json.dump(content, f)
+    os.replace(f.name, filename)
@@ -8,11 +8,13 @@ import torch.utils.data
 
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.training.data_augmentation.abstract_data_augmentation import AbstractAugmentor
+from nuplan.planning.training.data_loader.locality_aware_sampler import LocalityAwareSampler
 from nuplan.planning.training.data_loader.scenario_dataset import ScenarioDataset
 from nuplan.planning.training.data_loader.splitter import AbstractSplitter
 from nuplan.planning.training.modeling.types import FeaturesType, move_features_type_to_device
 from nuplan.planning.training.preprocessing.feature_collate import FeatureCollate
 from nuplan.planning.training.preprocessing.feature_preprocessor import FeaturePreprocessor
+from nuplan.planning.training.preprocessing.utils.stage_profiler import HOST_TO_DEVICE_STAGE, StageProfiler, time_stage
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +64,8 @@ class DataModule(pl.LightningDataModule):
         test_fraction: float,
         dataloader_params: Dict[str, Any],
         augmentors: Optional[List[AbstractAugmentor]] = None,
+        padded_batches: bool = False,
+        locality_block_size: Optional[int] = None,
     ) -> None:
         """
         Initialize the class.
@@ -72,6 +76,9 @@ class DataModule(pl.LightningDataModule):
         :param test_fraction: Fraction of test examples to load.
         :param dataloader_params: Parameter dictionary passed to the dataloaders.
         :param augmentors: Augmentor object for providing data augmentation to data samples.
+        :param padded_batches: Whether to batch features that support it into padded tensors instead of lists.
+        :param locality_block_size: If set, samples are drawn in shuffled blocks of this many scenarios from the same
+            map and few logs, to improve I/O locality when features are computed. Otherwise samples are shuffled.
         """
         super().__init__()
 
@@ -105,11 +112,34 @@ class DataModule(pl.LightningDataModule):
         # Augmentation setup
         self._augmentors = augmentors
 
+        # Batching of features
+        self._padded_batches = padded_batches
+
+        # Sampling order
+        self._locality_block_size = locality_block_size
+
+        # Profiling of the data loading stages
+        self._stage_profiler: Optional[StageProfiler] = None
+
     @property
     def feature_and_targets_builder(self) -> FeaturePreprocessor:
         """Get feature and target builders."""
         return self._feature_preprocessor
 
+    @property
+    def num_workers(self) -> int:
+        """
+        :return: Number of worker processes of each dataloader.
+        """
+        return int(self._dataloader_params.get('num_workers', 0))
+
+    def set_stage_profiler(self, stage_profiler: Optional[StageProfiler]) -> None:
+        """
+        Time the data loading stages of the dataloaders created from now on, and the transfer of batches to devices.
+        :param stage_profiler: Profiler to time the stages with, None to disable profiling.
+        """
+        self._stage_profiler = stage_profiler
+
     def setup(self, stage: Optional[str] = None) -> None:
         """
         Set up the dataset for each target set depending on the training stage.
@@ -150,6 +180,41 @@ class DataModule(pl.LightningDataModule):
         """
         pass
 
+    def _create_dataloader(
+        self, dataset: torch.utils.data.Dataset, shuffle: bool, name: str
+    ) -> torch.utils.data.DataLoader:
+        """
+        Create a dataloader of a dataset.
+        :param dataset: Dataset of scenarios.
+        :param shuffle: Whether to shuffle the samples every epoch.
+        :param name: Name of the dataloader, one of "train", "val" or "test".
+        :return: The instantiated torch dataloader.
+        """
+        if isinstance(dataset, ScenarioDataset):
+            dataset.set_stage_profiler(self._stage_profiler)
+
+        # The workers of each dataloader write their stage timings to their own rows
+        profiling_params: Dict[str, Any] = {}
+        if self._stage_profiler is not None and self.num_workers > 0:
+            assert 'worker_init_fn' not in self._dataloader_params, 'Stage profiling sets the worker init function'
+            profiling_params['worker_init_fn'] = self._stage_profiler.get_worker_init_fn(name)
+
+        if self._locality_block_size is None:
+            sampling_params: Dict[str, Any] = {'shuffle': shuffle}
+        else:
+            assert isinstance(dataset, ScenarioDataset), 'Locality aware sampling requires a ScenarioDataset'
+            sampling_params = {
+                'sampler': LocalityAwareSampler(dataset.scenarios, self._locality_block_size, shuffle=shuffle)
+            }
+
+        return torch.utils.data.DataLoader(
+            dataset=dataset,
+            **self._dataloader_params,
+            **sampling_params,
+            **profiling_params,
+            collate_fn=FeatureCollate(padded=self._padded_batches, stage_profiler=self._stage_profiler),
+        )
+
     def train_dataloader(self) -> torch.utils.data.DataLoader:
         """
         Create the training dataloader.
@@ -159,9 +224,7 @@ class DataModule(pl.LightningDataModule):
         if self._train_set is None:
             raise DataModuleNotSetupError
 
-        return torch.utils.data.DataLoader(
-            dataset=self._train_set, **self._dataloader_params, shuffle=True, collate_fn=FeatureCollate()
-        )
+        return self._create_dataloader(self._train_set, shuffle=True, name='train')
 
     def val_dataloader(self) -> torch.utils.data.DataLoader:
         """
@@ -172,9 +235,7 @@ class DataModule(pl.LightningDataModule):
         if self._val_set is None:
             raise DataModuleNotSetupError
 
-        return torch.utils.data.DataLoader(
-            dataset=self._val_set, **self._dataloader_params, collate_fn=FeatureCollate()
-        )
+        return self._create_dataloader(self._val_set, shuffle=False, name='val')
 
     def test_dataloader(self) -> torch.utils.data.DataLoader:
         """
@@ -185,9 +246,7 @@ class DataModule(pl.LightningDataModule):
         if self._test_set is None:
             raise DataModuleNotSetupError
 
-        return torch.utils.data.DataLoader(
-            dataset=self._test_set, **self._dataloader_params, collate_fn=FeatureCollate()
-        )
+        return self._create_dataloader(self._test_set, shuffle=False, name='test')
 
     def transfer_batch_to_device(
         self, batch: Tuple[FeaturesType, ...], device: torch.device
@@ -198,4 +257,5 @@ class DataModule(pl.LightningDataModule):
         :param device: Desired device.
         :return: Batch in new device.
         """
-        return tuple(move_features_type_to_device(features, device) for features in batch)
+        with time_stage(self._stage_profiler, HOST_TO_DEVICE_STAGE):
+            return tuple(move_features_type_to_device(features, device) for features in batch)
@@ -0,0 +1,145 @@
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+import torch
+import torch.utils.data
+
+from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
+from nuplan.planning.scenario_builder.nuplan_db.nuplan_scenario import NuPlanScenario
+
+logger = logging.getLogger(__name__)
+
+
+def get_scenario_map_name(scenario: AbstractScenario) -> Optional[str]:
+    """
+    :param scenario: Scenario of a dataset.
+    :return: Name of the map of the scenario from its metadata, None if the scenario does not name its map without
+        loading it, e.g. scenarios loaded from the cache.
+    """
+    if isinstance(scenario, NuPlanScenario):
+        return scenario.map_name
+
+    return None
+
+
+class LocalityAwareSampler(torch.utils.data.DistributedSampler):
+    """
+    Sampler that draws dataset samples in blocks of scenarios from the same map and from as few logs as possible.
+    Scenarios are grouped by map and log, the logs of every map are concatenated and cut into blocks of consecutive
+    scenarios. The last block of every map is padded with the first scenarios of the map, such that all blocks are full
+    and every block starts at a multiple of the block size. Every epoch the order of logs and blocks is shuffled, and
+    optionally the order of samples in a block.
+    The data loader assigns every batch to a single worker, so with a block size that is a multiple of the batch size
+    each worker only opens the log databases and maps of a few logs at a time. This keeps the SQLite page cache and map
+    caches of the workers warm while features are computed, at the cost of randomness within a block and of drawing
+    up to block size - 1 scenarios of every map twice per epoch.
+
+    In distributed training the blocks are dealt to the ranks in turn, every rank drawing the same number of whole
+    blocks like the DistributedSampler it derives from, such that lightning does not replace it.
+    """
+
+    def __init__(
+        self,
+        scenarios: List[AbstractScenario],
+        block_size: int,
+        shuffle: bool = True,
+        shuffle_within_block: bool = True,
+        seed: int = 0,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+    ) -> None:
+        """
+        :param scenarios: Scenarios of the dataset, indexed as in the dataset.
+        :param block_size: Number of samples per block, preferably a multiple of the batch size.
+        :param shuffle: Whether to shuffle logs and blocks every epoch, otherwise they are sorted by map and log name.
+        :param shuffle_within_block: Whether to shuffle the samples of every block, only used if shuffle is enabled.
+        :param seed: Random seed, combined with the epoch.
+        :param num_replicas: Number of processes in distributed training, by default the world size of the initialized
+            process group or 1 without distributed training.
+        :param rank: Rank of the current process, by default the rank in the initialized process group or 0.
+        """
+        assert block_size > 0, f"Block size has to be positive, got {block_size}!"
+
+        is_distributed = torch.distributed.is_available() and torch.distributed.is_initialized()
+        if num_replicas is None:
+            num_replicas = torch.distributed.get_world_size() if is_distributed else 1
+        if rank is None:
+            rank = torch.distributed.get_rank() if is_distributed else 0
+        super().__init__(scenarios, num_replicas=num_replicas, rank=rank, shuffle=shuffle, seed=seed)
+
+        self._block_size = block_size
+        self._shuffle_within_block = shuffle_within_block
+
+        # Dataset indices by log, by map
+        self._log_indices: Dict[Optional[str], Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for index, scenario in enumerate(scenarios):
+            self._log_indices[get_scenario_map_name(scenario)][scenario.log_name].append(index)
+
+        # Every rank draws the same number of whole blocks, blocks are padded with the first blocks of the epoch
+        num_blocks = sum(
+            math.ceil(sum(len(indices) for indices in logs.values()) / block_size)
+            for logs in self._log_indices.values()
+        )
+        self.num_samples = math.ceil(num_blocks / self.num_replicas) * block_size
+        self.total_size = self.num_samples * self.num_replicas
+
+        num_logs = sum(len(logs) for logs in self._log_indices.values())
+        logger.info(
+            f'Sampling {self.num_samples} samples of {num_logs} logs in blocks of {block_size} on rank {self.rank}'
+        )
+
+    def _build_blocks(self, generator: Optional[torch.Generator]) -> List[List[int]]:
+        """
+        :param generator: Random generator, None to build the blocks in sorted order.
+        :return: Dataset indices of every block, the last block of every map is padded with its first indices.
+        """
+        blocks = []
+        for map_name in sorted(self._log_indices, key=str):
+            logs = self._log_indices[map_name]
+            log_names = sorted(logs)
+            if generator is not None:
+                log_names = [log_names[index] for index in torch.randperm(len(log_names), generator=generator)]
+
+            map_indices = [index for log_name in log_names for index in logs[log_name]]
+            padding_size = -len(map_indices) % self._block_size
+            map_indices += (map_indices * math.ceil(padding_size / len(map_indices)))[:padding_size]
+            blocks += [
+                map_indices[start : start + self._block_size] for start in range(0, len(map_indices), self._block_size)
+            ]
+
+        return blocks
+
+    def _get_epoch_blocks(self) -> List[List[int]]:
+        """
+        :return: Dataset indices of every block of the epoch over all ranks, in block order.
+        """
+        if not self.shuffle:
+            return self._build_blocks(None)
+
+        generator = torch.Generator()
+        generator.manual_seed(self.seed + self.epoch)
+        blocks = self._build_blocks(generator)
+
+        epoch_blocks = []
+        for block_index in torch.randperm(len(blocks), generator=generator).tolist():
+            block = blocks[block_index]
+            if self._shuffle_within_block:
+                block = [block[index] for index in torch.randperm(len(block), generator=generator)]
+            epoch_blocks.append(block)
+
+        return epoch_blocks
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Deal the blocks of the epoch to the ranks in turn. The blocks are padded by repeating the first ones, such
+        that every rank draws the same number of blocks.
+        :return: Dataset indices of the epoch for the current rank.
+        """
+        blocks = self._get_epoch_blocks()
+        num_blocks = self.total_size // self._block_size
+        if 0 < len(blocks) < num_blocks:
+            blocks += (blocks * math.ceil(num_blocks / len(blocks)))[len(blocks) : num_blocks]
+
+        return iter([index for block in blocks[self.rank :: self.num_replicas] for index in block])
@@ -1,17 +1,17 @@
-from typing import Dict, List
+from typing import AbstractSet, Dict, List
 
 from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.training.data_loader.splitter import AbstractSplitter
 
 
 def _filter_abstract_scenario_by_log_name(
-    scenarios: List[AbstractScenario], log_names: List[str]
+    scenarios: List[AbstractScenario], log_names: AbstractSet[str]
 ) -> List[AbstractScenario]:
     """
     Extracts all scenarios matching the input log names
 
     :param scenarios: list of candidate scenarios
-    :param log_names: list of log names to be filtered
+    :param log_names: set of log names to be filtered
     :return: matched AbstractScenario
     """
     return [scenario for scenario in scenarios if scenario.log_name in log_names]
@@ -28,9 +28,10 @@ class LogSplitter(AbstractSplitter):
 
         :param log_splits: dictionary containing 'train', 'val', 'test' keys mapped to lists of log names
         """
-        self.train_logs = log_splits['train']
-        self.val_logs = log_splits['val']
-        self.test_logs = log_splits['test']
+        # Sets, such that filtering is linear in the number of scenarios
+        self.train_logs = frozenset(log_splits['train'])
+        self.val_logs = frozenset(log_splits['val'])
+        self.test_logs = frozenset(log_splits['test'])
 
     def get_train_samples(self, scenarios: List[AbstractScenario]) -> List[AbstractScenario]:
         """Inherited, see superclass."""
@@ -7,6 +7,11 @@ from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
 from nuplan.planning.training.data_augmentation.abstract_data_augmentation import AbstractAugmentor
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
 from nuplan.planning.training.preprocessing.feature_preprocessor import FeaturePreprocessor
+from nuplan.planning.training.preprocessing.utils.stage_profiler import (
+    AUGMENTATION_STAGE,
+    StageProfiler,
+    time_stage,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +41,22 @@ class ScenarioDataset(torch.utils.data.Dataset):
         self._scenarios = scenarios
         self._feature_preprocessor = feature_preprocessor
         self._augmentors = augmentors
+        self._stage_profiler: Optional[StageProfiler] = None
+
+    @property
+    def scenarios(self) -> List[AbstractScenario]:
+        """
+        :return: Scenarios of the dataset, indexed as the dataset examples.
+        """
+        return self._scenarios
+
+    def set_stage_profiler(self, stage_profiler: Optional[StageProfiler]) -> None:
+        """
+        Time the stages of loading a sample with a profiler, including the feature and target builders.
+        :param stage_profiler: Profiler to time the stages with, None to disable profiling.
+        """
+        self._stage_profiler = stage_profiler
+        self._feature_preprocessor.set_stage_profiler(stage_profiler)
 
     def __getitem__(self, idx: int) -> Tuple[FeaturesType, TargetsType]:
         """
@@ -48,9 +69,10 @@ class ScenarioDataset(torch.utils.data.Dataset):
         features, targets, _ = self._feature_preprocessor.compute_features(scenario)
 
         if self._augmentors is not None:
-            for augmentor in self._augmentors:
-                augmentor.validate(features, targets)
-                features, targets = augmentor.augment(features, targets, scenario)
+            with time_stage(self._stage_profiler, AUGMENTATION_STAGE):
+                for augmentor in self._augmentors:
+                    augmentor.validate(features, targets)
+                    features, targets = augmentor.augment(features, targets, scenario)
 
         features = {key: value.to_feature_tensor() for key, value in features.items()}
         targets = {key: value.to_feature_tensor() for key, value in targets.items()}
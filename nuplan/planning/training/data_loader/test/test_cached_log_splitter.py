@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from nuplan.planning.training.data_loader.cached_log_splitter import CachedLogSplitter, get_hashed_split
+from nuplan.planning.training.data_loader.log_splitter import LogSplitter
+
+
+def _build_scenario(log_name: str, token: str) -> Mock:
+    """
+    :param log_name: Log of the scenario.
+    :param token: Token of the scenario.
+    :return: Mocked scenario.
+    """
+    scenario = Mock()
+    scenario.log_name = log_name
+    scenario.token = token
+    return scenario
+
+
+class TestCachedLogSplitter(unittest.TestCase):
+    """Test splitting scenarios by log once, deduplicating tokens and reusing the saved splits."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.log_splits = {'train': ['log_0', 'log_1'], 'val': ['log_2'], 'test': ['log_3']}
+        self.scenarios = [_build_scenario(f'log_{index % 5}', f'token_{index}') for index in range(20)]
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Clean up test case."""
+        self.tmp_dir.cleanup()
+
+    def test_equal_to_log_splitter(self) -> None:
+        """Test that splitting by log lists gives the samples of the log splitter."""
+        splitter = CachedLogSplitter(log_splits=self.log_splits)
+        log_splitter = LogSplitter(self.log_splits)
+
+        self.assertEqual(splitter.get_train_samples(self.scenarios), log_splitter.get_train_samples(self.scenarios))
+        self.assertEqual(splitter.get_val_samples(self.scenarios), log_splitter.get_val_samples(self.scenarios))
+        self.assertEqual(splitter.get_test_samples(self.scenarios), log_splitter.get_test_samples(self.scenarios))
+
+    def test_deduplicate_tokens(self) -> None:
+        """Test that a token in several splits is only kept in the evaluation split."""
+        scenarios = self.scenarios + [_build_scenario('log_0', 'token_2'), _build_scenario('log_2', 'token_2')]
+        splitter = CachedLogSplitter(log_splits=self.log_splits)
+
+        train_tokens = [scenario.token for scenario in splitter.get_train_samples(scenarios)]
+        val_tokens = [scenario.token for scenario in splitter.get_val_samples(scenarios)]
+
+        self.assertNotIn('token_2', train_tokens)
+        self.assertEqual(val_tokens.count('token_2'), 1)
+        self.assertEqual(len(set(train_tokens)), len(train_tokens))
+
+    def test_overlapping_log_splits(self) -> None:
+        """Test that logs listed in several splits are detected as leakage."""
+        log_splits = {**self.log_splits, 'val': ['log_2', 'log_1']}
+
+        with self.assertRaises(ValueError):
+            CachedLogSplitter(log_splits=log_splits)
+
+        splitter = CachedLogSplitter(log_splits=log_splits, allow_leakage=True)
+        self.assertEqual({scenario.log_name for scenario in splitter.get_train_samples(self.scenarios)}, {'log_0'})
+
+    def test_hashed_split(self) -> None:
+        """Test that hashing log names assigns every log to a split deterministically."""
+        split_fractions = {'train': 0.6, 'val': 0.2, 'test': 0.2}
+        splitter = CachedLogSplitter(split_fractions=split_fractions)
+
+        splits = [
+            splitter.get_train_samples(self.scenarios),
+            splitter.get_val_samples(self.scenarios),
+            splitter.get_test_samples(self.scenarios),
+        ]
+
+        split_tokens = sorted(scenario.token for split in splits for scenario in split)
+        self.assertEqual(split_tokens, sorted(scenario.token for scenario in self.scenarios))
+        for split, split_name in zip(splits, ['train', 'val', 'test']):
+            self.assertEqual({get_hashed_split(scenario.log_name, split_fractions) for scenario in split}, {split_name})
+        self.assertEqual(get_hashed_split('log_0', {'train': 1.0}), 'train')
+
+    def test_reuse_saved_splits(self) -> None:
+        """Test that a later run on the same scenarios loads the saved split indices instead of splitting."""
+        splitter = CachedLogSplitter(log_splits=self.log_splits, cache_path=str(self.cache_path))
+        train_samples = splitter.get_train_samples(self.scenarios)
+        self.assertEqual(len(list((self.cache_path / 'log_splits').glob('*.json'))), 2)
+
+        later_splitter = CachedLogSplitter(log_splits=self.log_splits, cache_path=str(self.cache_path))
+        with patch.object(later_splitter, '_split') as split:
+            self.assertEqual(later_splitter.get_train_samples(self.scenarios), train_samples)
+            later_splitter.get_val_samples(self.scenarios)
+
+        split.assert_not_called()
+
+    def test_leakage_across_runs(self) -> None:
+        """Test that a log moving to another split since a previous run is detected as leakage."""
+        CachedLogSplitter(log_splits=self.log_splits, cache_path=str(self.cache_path)).get_train_samples(self.scenarios)
+        moved_log_splits = {'train': ['log_0'], 'val': ['log_1', 'log_2'], 'test': ['log_3']}
+
+        with self.assertRaises(ValueError):
+            splitter = CachedLogSplitter(log_splits=moved_log_splits, cache_path=str(self.cache_path))
+            splitter.get_val_samples(self.scenarios)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from typing import List, Optional
+from unittest.mock import Mock
+
+from nuplan.planning.scenario_builder.abstract_scenario import AbstractScenario
+from nuplan.planning.scenario_builder.nuplan_db.nuplan_scenario import NuPlanScenario
+from nuplan.planning.training.data_loader.locality_aware_sampler import LocalityAwareSampler, get_scenario_map_name
+
+
+def _build_scenario(log_name: str, map_name: Optional[str]) -> Mock:
+    """
+    :param log_name: Log of the scenario.
+    :param map_name: Map of the scenario, None for scenarios that do not name their map.
+    :return: Mocked scenario, loading its map fails.
+    """
+    scenario = Mock(spec=NuPlanScenario if map_name is not None else AbstractScenario)
+    scenario.log_name = log_name
+    scenario.map_name = map_name
+    type(scenario).map_api = property(Mock(side_effect=AssertionError("Map must not be loaded!")))
+    return scenario
+
+
+class TestLocalityAwareSampler(unittest.TestCase):
+    """Test sampling scenarios in blocks of the same map and few logs."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        # Scenarios of logs interleaved as in a randomly sampled dataset
+        self.scenarios = [
+            _build_scenario(f'log_{index % 6}', 'map_a' if index % 6 < 4 else 'map_b') for index in range(60)
+        ]
+
+    def _get_blocks(self, indices: List[int], block_size: int) -> List[List[int]]:
+        """
+        :param indices: Sampled dataset indices.
+        :param block_size: Number of samples per block.
+        :return: Sampled indices split into consecutive blocks.
+        """
+        return [indices[start : start + block_size] for start in range(0, len(indices), block_size)]
+
+    def test_get_scenario_map_name(self) -> None:
+        """Test getting the map name of scenarios from their metadata, without loading the map."""
+        self.assertEqual(get_scenario_map_name(_build_scenario('log', 'map_a')), 'map_a')
+        self.assertIsNone(get_scenario_map_name(_build_scenario('log', None)))
+
+    def test_all_indices_once(self) -> None:
+        """Test that every sample is drawn once per epoch."""
+        sampler = LocalityAwareSampler(self.scenarios, block_size=4)
+
+        self.assertEqual(len(sampler), 60)
+        self.assertEqual(sorted(sampler), list(range(60)))
+
+    def test_block_locality(self) -> None:
+        """Test that every block holds scenarios of a single map and at most two logs."""
+        sampler = LocalityAwareSampler(self.scenarios, block_size=4)
+
+        for block in self._get_blocks(list(sampler), block_size=4):
+            self.assertEqual(len({self.scenarios[index].map_name for index in block}), 1)
+            self.assertLessEqual(len({self.scenarios[index].log_name for index in block}), 2)
+
+    def test_partial_blocks_padded(self) -> None:
+        """Test that the last block of every map is padded with scenarios of the map, keeping blocks aligned."""
+        sampler = LocalityAwareSampler(self.scenarios, block_size=8)
+
+        indices = list(sampler)
+        self.assertEqual(len(sampler), 64)
+        self.assertEqual(len(indices), 64)
+        self.assertEqual(set(indices), set(range(60)))
+        for block in self._get_blocks(indices, block_size=8):
+            self.assertEqual(len({self.scenarios[index].map_name for index in block}), 1)
+        repeated = [index for index in set(indices) if indices.count(index) > 1]
+        self.assertEqual(len(repeated), 4)
+        self.assertTrue(all(self.scenarios[index].map_name == 'map_b' for index in repeated))
+
+    def test_shuffle_per_epoch(self) -> None:
+        """Test that the order changes with the epoch and is reproducible for a seed."""
+        sampler = LocalityAwareSampler(self.scenarios, block_size=4, seed=3)
+
+        first_epoch = list(sampler)
+        self.assertEqual(list(sampler), first_epoch)
+        sampler.set_epoch(1)
+        self.assertNotEqual(list(sampler), first_epoch)
+        self.assertEqual(list(LocalityAwareSampler(self.scenarios, block_size=4, seed=3)), first_epoch)
+
+    def test_no_shuffle(self) -> None:
+        """Test that without shuffling scenarios are sorted by map and log."""
+        sampler = LocalityAwareSampler(self.scenarios, block_size=4, shuffle=False)
+
+        indices = list(sampler)
+        self.assertEqual(indices[:10], list(range(0, 60, 6)))
+        self.assertEqual([self.scenarios[index].log_name for index in indices[::10]], [f'log_{i}' for i in range(6)])
+
+    def test_scenarios_without_map(self) -> None:
+        """Test grouping scenarios without a map by log only."""
+        scenarios = [_build_scenario(f'log_{index % 3}', None) for index in range(9)]
+        sampler = LocalityAwareSampler(scenarios, block_size=3, shuffle_within_block=False)
+
+        for block in self._get_blocks(list(sampler), block_size=3):
+            self.assertEqual(len({scenarios[index].log_name for index in block}), 1)
+
+    def test_distributed_sharding(self) -> None:
+        """Test that ranks draw disjoint whole blocks of the same size and cover the dataset together."""
+        samplers = [LocalityAwareSampler(self.scenarios, block_size=4, num_replicas=3, rank=rank) for rank in range(3)]
+
+        rank_indices = [list(sampler) for sampler in samplers]
+        self.assertEqual([len(indices) for indices in rank_indices], [20, 20, 20])
+        self.assertEqual(sorted(index for indices in rank_indices for index in indices), list(range(60)))
+        for indices in rank_indices:
+            for block in self._get_blocks(indices, block_size=4):
+                self.assertEqual(len({self.scenarios[index].map_name for index in block}), 1)
+
+    def test_distributed_padding(self) -> None:
+        """Test that ranks draw the same number of whole blocks when the blocks do not split evenly."""
+        samplers = [LocalityAwareSampler(self.scenarios, block_size=8, num_replicas=7, rank=rank) for rank in range(7)]
+
+        rank_indices = [list(sampler) for sampler in samplers]
+        self.assertTrue(all(len(indices) == len(sampler) == 16 for indices, sampler in zip(rank_indices, samplers)))
+        self.assertEqual({index for indices in rank_indices for index in indices}, set(range(60)))
+        for indices in rank_indices:
+            for block in self._get_blocks(indices, block_size=8):
+                self.assertEqual(len({self.scenarios[index].map_name for index in block}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
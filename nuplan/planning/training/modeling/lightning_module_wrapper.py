@@ -12,7 +12,15 @@ from nuplan.planning.training.modeling.metrics.planning_metrics import AbstractT
 from nuplan.planning.training.modeling.objectives.abstract_objective import aggregate_objectives
 from nuplan.planning.training.modeling.objectives.imitation_objective import AbstractObjective
 from nuplan.planning.training.modeling.torch_module_wrapper import TorchModuleWrapper
+from nuplan.planning.training.modeling.trajectory_error_cache import TrajectoryErrorCache
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
+from nuplan.planning.training.preprocessing.utils.stage_profiler import (
+    FORWARD_STAGE,
+    METRICS_STAGE,
+    OBJECTIVES_STAGE,
+    StageProfiler,
+    time_stage,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +60,7 @@ class LightningModuleWrapper(pl.LightningModule):
         self.optimizer = optimizer
         self.lr_scheduler = lr_scheduler
         self.objective_aggregate_mode = objective_aggregate_mode
+        self._stage_profiler: Optional[StageProfiler] = None
 
         # Validate metrics objectives and model
         model_targets = {builder.get_feature_unique_name() for builder in model.get_list_of_computed_target()}
@@ -62,6 +71,23 @@ class LightningModuleWrapper(pl.LightningModule):
             for feature in metric.get_list_of_required_target_types():
                 assert feature in model_targets, f"Metric target: \"{feature}\" is not in model computed targets!"
 
+        # Intermediates shared by the objectives and metrics, computed once per step
+        self._required_intermediates: List[str] = []
+        for computation in [*self.objectives, *self.metrics]:
+            for intermediate in computation.get_list_of_required_intermediates():
+                assert (
+                    intermediate in TrajectoryErrorCache.get_list_of_intermediates()
+                ), f"Intermediate: \"{intermediate}\" of {computation.name()} is not computed by the trajectory cache!"
+                if intermediate not in self._required_intermediates:
+                    self._required_intermediates.append(intermediate)
+
+    def set_stage_profiler(self, stage_profiler: Optional[StageProfiler]) -> None:
+        """
+        Time the forward pass, objectives and metrics of every step with a profiler.
+        :param stage_profiler: profiler to time the stages with, None to disable profiling
+        """
+        self._stage_profiler = stage_profiler
+
     def _step(self, batch: Tuple[FeaturesType, TargetsType], prefix: str) -> torch.Tensor:
         """
         Propagates the model forward and backwards and computes/logs losses and metrics.
@@ -74,34 +100,52 @@ class LightningModuleWrapper(pl.LightningModule):
         """
         features, targets = batch
 
-        predictions = self.forward(features)
-        objectives = self._compute_objectives(predictions, targets)
-        metrics = self._compute_metrics(predictions, targets)
+        with time_stage(self._stage_profiler, FORWARD_STAGE):
+            predictions = self.forward(features)
+
+        cache = TrajectoryErrorCache(predictions, targets)
+        with time_stage(self._stage_profiler, OBJECTIVES_STAGE):
+            cache.precompute(self._required_intermediates)
+            objectives = self._compute_objectives(predictions, targets, cache)
+        with time_stage(self._stage_profiler, METRICS_STAGE):
+            metrics = self._compute_metrics(predictions, targets, cache)
         loss = aggregate_objectives(objectives, agg_mode=self.objective_aggregate_mode)
 
         self._log_step(loss, objectives, metrics, prefix)
 
         return loss
 
-    def _compute_objectives(self, predictions: TargetsType, targets: TargetsType) -> Dict[str, torch.Tensor]:
+    def _compute_objectives(
+        self, predictions: TargetsType, targets: TargetsType, cache: Optional[TrajectoryErrorCache] = None
+    ) -> Dict[str, torch.Tensor]:
         """
         Computes a set of learning objectives used for supervision given the model's predictions and targets.
 
         :param predictions: model's output signal
         :param targets: supervisory signal
+        :param cache: trajectory errors of the step shared with the metrics, created if not provided
         :return: dictionary of objective names and values
         """
-        return {objective.name(): objective.compute(predictions, targets) for objective in self.objectives}
-
-    def _compute_metrics(self, predictions: TargetsType, targets: TargetsType) -> Dict[str, torch.Tensor]:
+        if cache is None:
+            cache = TrajectoryErrorCache(predictions, targets)
+        return {
+            objective.name(): objective.compute_from_cache(predictions, targets, cache) for objective in self.objectives
+        }
+
+    def _compute_metrics(
+        self, predictions: TargetsType, targets: TargetsType, cache: Optional[TrajectoryErrorCache] = None
+    ) -> Dict[str, torch.Tensor]:
         """
         Computes a set of planning metrics given the model's predictions and targets.
 
         :param predictions: model's predictions
         :param targets: ground truth targets
+        :param cache: trajectory errors of the step shared with the objectives, created if not provided
         :return: dictionary of metrics names and values
         """
-        return {metric.name(): metric.compute(predictions, targets) for metric in self.metrics}
+        if cache is None:
+            cache = TrajectoryErrorCache(predictions, targets)
+        return {metric.name(): metric.compute_from_cache(predictions, targets, cache) for metric in self.metrics}
 
     def _log_step(
         self,
@@ -3,8 +3,12 @@ from typing import List
 import torch
 
 from nuplan.planning.training.modeling.metrics.abstract_training_metric import AbstractTrainingMetric
+from nuplan.planning.training.modeling.trajectory_error_cache import (
+    DISPLACEMENT_ERROR,
+    WRAPPED_HEADING_ERROR,
+    TrajectoryErrorCache,
+)
 from nuplan.planning.training.modeling.types import TargetsType
-from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
 
 
 class AverageDisplacementError(AbstractTrainingMetric):
@@ -30,6 +34,10 @@ class AverageDisplacementError(AbstractTrainingMetric):
         """Implemented. See interface."""
         return ["trajectory"]
 
+    def get_list_of_required_intermediates(self) -> List[str]:
+        """Implemented. See interface."""
+        return [DISPLACEMENT_ERROR]
+
     def compute(self, predictions: TargetsType, targets: TargetsType) -> torch.Tensor:
         """
         Computes the metric given the ground truth targets and the model's predictions.
@@ -38,10 +46,13 @@ class AverageDisplacementError(AbstractTrainingMetric):
         :param targets: ground truth targets from the dataset
         :return: metric scalar tensor
         """
-        predicted_trajectory: Trajectory = predictions["trajectory"]
-        targets_trajectory: Trajectory = targets["trajectory"]
+        return self.compute_from_cache(predictions, targets, TrajectoryErrorCache(predictions, targets))
 
-        return torch.norm(predicted_trajectory.xy - targets_trajectory.xy, dim=-1).mean()
+    def compute_from_cache(
+        self, predictions: TargetsType, targets: TargetsType, cache: TrajectoryErrorCache
+    ) -> torch.Tensor:
+        """Implemented. See interface."""
+        return cache.get(DISPLACEMENT_ERROR).mean()
 
 
 class FinalDisplacementError(AbstractTrainingMetric):
@@ -67,6 +78,10 @@ class FinalDisplacementError(AbstractTrainingMetric):
         """Implemented. See interface."""
         return ["trajectory"]
 
+    def get_list_of_required_intermediates(self) -> List[str]:
+        """Implemented. See interface."""
+        return [DISPLACEMENT_ERROR]
+
     def compute(self, predictions: TargetsType, targets: TargetsType) -> torch.Tensor:
         """
         Computes the metric given the ground truth targets and the model's predictions.
@@ -75,10 +90,13 @@ class FinalDisplacementError(AbstractTrainingMetric):
         :param targets: ground truth targets from the dataset
         :return: metric scalar tensor
         """
-        predicted_trajectory: Trajectory = predictions["trajectory"]
-        targets_trajectory: Trajectory = targets["trajectory"]
+        return self.compute_from_cache(predictions, targets, TrajectoryErrorCache(predictions, targets))
 
-        return torch.norm(predicted_trajectory.terminal_position - targets_trajectory.terminal_position, dim=-1).mean()
+    def compute_from_cache(
+        self, predictions: TargetsType, targets: TargetsType, cache: TrajectoryErrorCache
+    ) -> torch.Tensor:
+        """Implemented. See interface."""
+        return cache.get(DISPLACEMENT_ERROR)[..., -1].mean()
 
 
 class AverageHeadingError(AbstractTrainingMetric):
@@ -104,6 +122,10 @@ class AverageHeadingError(AbstractTrainingMetric):
         """Implemented. See interface."""
         return ["trajectory"]
 
+    def get_list_of_required_intermediates(self) -> List[str]:
+        """Implemented. See interface."""
+        return [WRAPPED_HEADING_ERROR]
+
     def compute(self, predictions: TargetsType, targets: TargetsType) -> torch.Tensor:
         """
         Computes the metric given the ground truth targets and the model's predictions.
@@ -112,11 +134,13 @@ class AverageHeadingError(AbstractTrainingMetric):
         :param targets: ground truth targets from the dataset
         :return: metric scalar tensor
         """
-        predicted_trajectory: Trajectory = predictions["trajectory"]
-        targets_trajectory: Trajectory = targets["trajectory"]
+        return self.compute_from_cache(predictions, targets, TrajectoryErrorCache(predictions, targets))
 
-        errors = torch.abs(predicted_trajectory.heading - targets_trajectory.heading)
-        return torch.atan2(torch.sin(errors), torch.cos(errors)).mean()
+    def compute_from_cache(
+        self, predictions: TargetsType, targets: TargetsType, cache: TrajectoryErrorCache
+    ) -> torch.Tensor:
+        """Implemented. See interface."""
+        return cache.get(WRAPPED_HEADING_ERROR).mean()
 
 
 class FinalHeadingError(AbstractTrainingMetric):
@@ -142,6 +166,10 @@ class FinalHeadingError(AbstractTrainingMetric):
         """Implemented. See interface."""
         return ["trajectory"]
 
+    def get_list_of_required_intermediates(self) -> List[str]:
+        """Implemented. See interface."""
+        return [WRAPPED_HEADING_ERROR]
+
     def compute(self, predictions: TargetsType, targets: TargetsType) -> torch.Tensor:
         """
         Computes the metric given the ground truth targets and the model's predictions.
@@ -150,8 +178,10 @@ class FinalHeadingError(AbstractTrainingMetric):
         :param targets: ground truth targets from the dataset
         :return: metric scalar tensor
         """
-        predicted_trajectory: Trajectory = predictions["trajectory"]
-        targets_trajectory: Trajectory = targets["trajectory"]
+        return self.compute_from_cache(predictions, targets, TrajectoryErrorCache(predictions, targets))
 
-        errors = torch.abs(predicted_trajectory.terminal_heading - targets_trajectory.terminal_heading)
-        return torch.atan2(torch.sin(errors), torch.cos(errors)).mean()
+    def compute_from_cache(
+        self, predictions: TargetsType, targets: TargetsType, cache: TrajectoryErrorCache
+    ) -> torch.Tensor:
+        """Implemented. See interface."""
+        return cache.get(WRAPPED_HEADING_ERROR)[..., -1].mean()
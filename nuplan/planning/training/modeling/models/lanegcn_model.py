@@ -59,6 +59,8 @@ class LaneGCN(TorchModuleWrapper):
         vector_map_connection_scales: Optional[List[int]],
         past_trajectory_sampling: TrajectorySampling,
         future_trajectory_sampling: TrajectorySampling,
+        use_spatial_index: bool = False,
+        columnar_agents_preprocessing: bool = False,
     ):
         """
         :param map_net_scales: Number of scales to extend the predecessor and successor lane nodes.
@@ -72,6 +74,10 @@ class LaneGCN(TorchModuleWrapper):
         :param vector_map_connection_scales: The hops of lane neighbors to extract, default 1 hop
         :param past_trajectory_sampling: Sampling parameters for past trajectory
         :param future_trajectory_sampling: Sampling parameters for future trajectory
+        :param use_spatial_index: Whether the attention layers find their edges with a spatial index instead of dense
+            pairwise distances, which needs memory linear instead of quadratic in the number of nodes
+        :param columnar_agents_preprocessing: Whether the agents feature builder computes the features from a single
+            tensor of all frames instead of per-frame tensors
         """
         super().__init__(
             feature_builders=[
@@ -79,7 +85,10 @@ class LaneGCN(TorchModuleWrapper):
                     radius=vector_map_feature_radius,
                     connection_scales=vector_map_connection_scales,
                 ),
-                AgentsFeatureBuilder(trajectory_sampling=past_trajectory_sampling),
+                AgentsFeatureBuilder(
+                    trajectory_sampling=past_trajectory_sampling,
+                    columnar_preprocessing=columnar_agents_preprocessing,
+                ),
             ],
             target_builders=[EgoTrajectoryTargetBuilder(future_trajectory_sampling=future_trajectory_sampling)],
             future_trajectory_sampling=future_trajectory_sampling,
@@ -119,17 +128,20 @@ class LaneGCN(TorchModuleWrapper):
             lane_feature_len=self.feature_dim,
             num_attention_layers=num_attention_layers,
             dist_threshold_m=l2a_dist_threshold,
+            use_spatial_index=use_spatial_index,
         )
         self.lane2actor_attention = Lane2ActorAttention(
             lane_feature_len=self.feature_dim,
             actor_feature_len=self.feature_dim,
             num_attention_layers=num_attention_layers,
             dist_threshold_m=l2a_dist_threshold,
+            use_spatial_index=use_spatial_index,
         )
         self.actor2actor_attention = Actor2ActorAttention(
             actor_feature_len=self.feature_dim,
             num_attention_layers=num_attention_layers,
             dist_threshold_m=a2a_dist_threshold,
+            use_spatial_index=use_spatial_index,
         )
         self._mlp = nn.Sequential(
             nn.Linear(self.feature_dim, self.feature_dim),
@@ -1,10 +1,57 @@
 from math import gcd
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import torch
 import torch.nn as nn
+from scipy.spatial import cKDTree
 from torch.nn import functional as F
 
+# [m] Margin of the spatial index query, candidate edges are filtered with the exact distance threshold afterwards
+SPATIAL_INDEX_QUERY_MARGIN = 1e-2
+
+
+def find_radius_graph_edges(
+    src_node_pos: torch.Tensor,
+    dst_node_pos: torch.Tensor,
+    dist_threshold: float,
+    use_spatial_index: bool = False,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Find (src, dst) node pairs that are within the distance threshold, and they form the edges of the graph.
+    The dense search computes the distances of all node pairs, which needs memory quadratic in the number of nodes.
+    The spatial index search queries KD-trees on the cpu for candidate pairs and only computes their distances, which
+    needs memory linear in the number of edges. Both return the same edges in the same order, sorted by source node
+    and then by destination node.
+    :param src_node_pos: <torch.FloatTensor: num_src_nodes, 2>. Source node (x, y) positions.
+    :param dst_node_pos: <torch.FloatTensor: num_dst_nodes, 2>. Destination node (x, y) positions.
+    :param dist_threshold: Distance threshold in meters.
+    :param use_spatial_index: Whether to search the edges with a spatial index instead of dense pairwise distances.
+    :return: <torch.LongTensor: num_edges>, <torch.LongTensor: num_edges>. Source and destination node indices of the
+        edges.
+    """
+    if not use_spatial_index:
+        # src_dst_dist.shape is (num_src_nodes, num_dst_nodes).
+        src_dst_dist = (src_node_pos.view(-1, 1, 2) - dst_node_pos.view(1, -1, 2)).norm(dim=-1)
+        src_dst_dist_mask = src_dst_dist <= dist_threshold
+
+        # The shape of edge_src_dist_pairs is (num_edges, 2).
+        edge_src_dist_pairs = src_dst_dist_mask.nonzero(as_tuple=False)
+        return edge_src_dist_pairs[:, 0], edge_src_dist_pairs[:, 1]
+
+    src_tree = cKDTree(src_node_pos.detach().cpu().numpy().astype(np.float64))
+    dst_tree = cKDTree(dst_node_pos.detach().cpu().numpy().astype(np.float64))
+    candidates = src_tree.sparse_distance_matrix(
+        dst_tree, dist_threshold + SPATIAL_INDEX_QUERY_MARGIN, output_type='ndarray'
+    )
+    order = np.lexsort((candidates['j'], candidates['i']))
+    edge_src_idx = torch.as_tensor(candidates['i'][order], dtype=torch.long, device=src_node_pos.device)
+    edge_dst_idx = torch.as_tensor(candidates['j'][order], dtype=torch.long, device=dst_node_pos.device)
+
+    # Filter the candidates with the same distance computation as the dense search
+    edge_mask = (src_node_pos[edge_src_idx] - dst_node_pos[edge_dst_idx]).norm(dim=-1) <= dist_threshold
+    return edge_src_idx[edge_mask], edge_dst_idx[edge_mask]
+
 
 class GraphAttention(nn.Module):
     """
@@ -66,6 +113,7 @@ class GraphAttention(nn.Module):
         src_node_pos: torch.Tensor,
         dst_node_features: torch.Tensor,
         dst_node_pos: torch.Tensor,
+        edges: Optional[Tuple[torch.Tensor, torch.Tensor]] = None,
     ) -> torch.Tensor:
         """
         Graph attention module to pool features from source nodes to destination nodes.
@@ -73,18 +121,13 @@ class GraphAttention(nn.Module):
         :param src_node_pos: <torch.FloatTensor: num_src_nodes, 2>. Source node (x, y) positions.
         :param dst_node_features: <torch.FloatTensor: num_dst_nodes, dst_node_feature_len>. Destination node features.
         :param dst_node_pos: <torch.FloatTensor: num_dst_nodes, 2>. Destination node (x, y) positions.
+        :param edges: Source and destination node indices of the edges, as found by find_radius_graph_edges with the
+            distance threshold of this module. Edges are found with dense pairwise distances if None.
         :return: <torch.FloatTensor: num_dst_nodes, dst_node_feature_len>. Output destination node features.
         """
-        # Find (src, dst) node pairs that are within the distance threshold,
-        # and they form the edges of the graph.
-        # src_dst_dist.shape is (num_src_nodes, num_dst_nodes).
-        src_dst_dist = (src_node_pos.view(-1, 1, 2) - dst_node_pos.view(1, -1, 2)).norm(dim=-1)
-        src_dst_dist_mask = src_dst_dist <= self.dist_threshold
-
-        # The shape of edge_src_dist_pairs is (num_edges, 2).
-        edge_src_dist_pairs = src_dst_dist_mask.nonzero(as_tuple=False)
-        edge_src_idx = edge_src_dist_pairs[:, 0]
-        edge_dst_idx = edge_src_dist_pairs[:, 1]
+        if edges is None:
+            edges = find_radius_graph_edges(src_node_pos, dst_node_pos, self.dist_threshold)
+        edge_src_idx, edge_dst_idx = edges
 
         src_node_encoded_features = self.src_encoder(src_node_features)
         dst_node_encoded_features = self.dst_encoder(dst_node_features)
@@ -129,6 +172,7 @@ class Actor2LaneAttention(nn.Module):
         num_attention_layers: int,
         dist_threshold_m: float,
         num_groups: int = 1,
+        use_spatial_index: bool = False,
     ) -> None:
         """
         :param actor_feature_len: Actor feature length.
@@ -138,9 +182,13 @@ class Actor2LaneAttention(nn.Module):
                                  actor nodes are within this distance threshold from the lane nodes. The value used
                                  in the LaneGCN paper is 100 meters.
         :param num_groups: Number of groups in groupnorm layer.
+        :param use_spatial_index: Whether to find the edges with a spatial index instead of dense pairwise distances.
         """
         super().__init__()
 
+        self.dist_threshold_m = dist_threshold_m
+        self.use_spatial_index = use_spatial_index
+
         # TODO: use VectorMap to replace the 6 below
         extra_lane_feature_dim = 6
         self.lane_meta = LinearWithGroupNorm(
@@ -177,12 +225,15 @@ class Actor2LaneAttention(nn.Module):
         lane_features = torch.cat((lane_features, lane_meta), dim=1)
         lane_features = self.lane_meta(lane_features)
 
+        # The graph is the same for all attention layers
+        edges = find_radius_graph_edges(actor_centers, lane_centers, self.dist_threshold_m, self.use_spatial_index)
         for attention_layer in self.attention_layers:
             lane_features = attention_layer(
                 actor_features,
                 actor_centers,
                 lane_features,
                 lane_centers,
+                edges,
             )
 
         return lane_features
@@ -194,7 +245,12 @@ class Lane2ActorAttention(nn.Module):
     """
 
     def __init__(
-        self, lane_feature_len: int, actor_feature_len: int, num_attention_layers: int, dist_threshold_m: float
+        self,
+        lane_feature_len: int,
+        actor_feature_len: int,
+        num_attention_layers: int,
+        dist_threshold_m: float,
+        use_spatial_index: bool = False,
     ) -> None:
         """
         :param lane_feature_len: Lane feature length.
@@ -205,9 +261,13 @@ class Lane2ActorAttention(nn.Module):
             We only aggregate map-to-actor node
             information if the actor nodes are within this distance threshold from the lane nodes.
             The value used in the LaneGCN paper is 100 meters.
+        :param use_spatial_index: Whether to find the edges with a spatial index instead of dense pairwise distances.
         """
         super().__init__()
 
+        self.dist_threshold_m = dist_threshold_m
+        self.use_spatial_index = use_spatial_index
+
         attention_layers = [
             GraphAttention(lane_feature_len, actor_feature_len, dist_threshold_m) for _ in range(num_attention_layers)
         ]
@@ -232,12 +292,15 @@ class Lane2ActorAttention(nn.Module):
         :return: <torch.FloatTensor: num_actors, actor_feature_len>. Actor features after
             aggregating the lane features.
         """
+        # The graph is the same for all attention layers
+        edges = find_radius_graph_edges(lane_centers, actor_centers, self.dist_threshold_m, self.use_spatial_index)
         for attention_layer in self.attention_layers:
             actor_features = attention_layer(
                 lane_features,
                 lane_centers,
                 actor_features,
                 actor_centers,
+                edges,
             )
 
         return actor_features
@@ -248,7 +311,13 @@ class Actor2ActorAttention(nn.Module):
     Actor-to-Actor attention module.
     """
 
-    def __init__(self, actor_feature_len: int, num_attention_layers: int, dist_threshold_m: float) -> None:
+    def __init__(
+        self,
+        actor_feature_len: int,
+        num_attention_layers: int,
+        dist_threshold_m: float,
+        use_spatial_index: bool = False,
+    ) -> None:
         """
         :param actor_feature_len: Actor feature length.
         :param num_attention_layers: Number of times to repeatedly apply the attention layer.
@@ -257,9 +326,13 @@ class Actor2ActorAttention(nn.Module):
             We only aggregate actor-to-actor node
             information if the actor nodes are within this distance threshold from the other actor nodes.
             The value used in the LaneGCN paper is 30 meters.
+        :param use_spatial_index: Whether to find the edges with a spatial index instead of dense pairwise distances.
         """
         super().__init__()
 
+        self.dist_threshold_m = dist_threshold_m
+        self.use_spatial_index = use_spatial_index
+
         attention_layers = [
             GraphAttention(actor_feature_len, actor_feature_len, dist_threshold_m) for _ in range(num_attention_layers)
         ]
@@ -278,12 +351,15 @@ class Actor2ActorAttention(nn.Module):
         :param actor_centers: <torch.FloatTensor: num_actors, 2>. (x, y) positions of the actors.
         :return: <torch.FloatTensor: num_actors, actor_feature_len>. Actor features after aggregating the lane features.
         """
+        # The graph is the same for all attention layers
+        edges = find_radius_graph_edges(actor_centers, actor_centers, self.dist_threshold_m, self.use_spatial_index)
         for attention_layer in self.attention_layers:
             actor_features = attention_layer(
                 actor_features,
                 actor_centers,
                 actor_features,
                 actor_centers,
+                edges,
             )
 
         return actor_features
@@ -52,6 +52,7 @@ class VectorMapSimpleMLP(ScriptableTorchModuleWrapper):
         vector_map_feature_radius: int,
         past_trajectory_sampling: TrajectorySampling,
         future_trajectory_sampling: TrajectorySampling,
+        columnar_agents_preprocessing: bool = False,
     ):
         """
         Initialize the simple vector map model.
@@ -60,11 +61,13 @@ class VectorMapSimpleMLP(ScriptableTorchModuleWrapper):
         :param vector_map_feature_radius: The query radius scope relative to the current ego-pose.
         :param past_trajectory_sampling: Sampling parameters for past trajectory
         :param future_trajectory_sampling: Sampling parameters for future trajectory
+        :param columnar_agents_preprocessing: Whether the agents feature builder computes the features from a single
+            tensor of all frames instead of per-frame tensors
         """
         super().__init__(
             feature_builders=[
                 VectorMapFeatureBuilder(radius=vector_map_feature_radius),
-                AgentsFeatureBuilder(past_trajectory_sampling),
+                AgentsFeatureBuilder(past_trajectory_sampling, columnar_preprocessing=columnar_agents_preprocessing),
             ],
             target_builders=[EgoTrajectoryTargetBuilder(future_trajectory_sampling)],
             future_trajectory_sampling=future_trajectory_sampling,
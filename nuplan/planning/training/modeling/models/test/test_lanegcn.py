@@ -15,11 +15,12 @@ from nuplan.planning.training.modeling.models.lanegcn_utils import (
     GraphAttention,
     Lane2ActorAttention,
     LaneNet,
+    find_radius_graph_edges,
 )
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
-from nuplan.planning.training.preprocessing.features.agents import Agents
+from nuplan.planning.training.preprocessing.features.agents import Agents, PaddedAgents
 from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
-from nuplan.planning.training.preprocessing.features.vector_map import VectorMap
+from nuplan.planning.training.preprocessing.features.vector_map import PaddedVectorMap, VectorMap
 
 
 class TestGraphAttention(unittest.TestCase):
@@ -52,6 +53,89 @@ class TestGraphAttention(unittest.TestCase):
         self.assertEqual(output.shape, (num_dst_nodes, self.dst_feature_len))
 
 
+class TestFindRadiusGraphEdges(unittest.TestCase):
+    """Test the dense and the spatial index search of graph edges."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        generator = torch.Generator().manual_seed(0)
+        self.src_node_pos = torch.rand((50, 2), generator=generator) * 100.0
+        self.dst_node_pos = torch.rand((70, 2), generator=generator) * 100.0
+        # Duplicated positions and positions exactly at the distance threshold
+        self.dst_node_pos[:3] = self.src_node_pos[:3]
+        self.dst_node_pos[3] = self.src_node_pos[3] + torch.tensor([6.0, 0.0])
+        self.dist_threshold = 6.0
+
+    def test_same_edges(self) -> None:
+        """Test that both searches find the same edges in the same order."""
+        dense_edges = find_radius_graph_edges(self.src_node_pos, self.dst_node_pos, self.dist_threshold)
+        sparse_edges = find_radius_graph_edges(
+            self.src_node_pos, self.dst_node_pos, self.dist_threshold, use_spatial_index=True
+        )
+
+        self.assertGreater(len(dense_edges[0]), 0)
+        for dense_idx, sparse_idx in zip(dense_edges, sparse_edges):
+            self.assertEqual(sparse_idx.dtype, torch.long)
+            torch.testing.assert_close(sparse_idx, dense_idx)
+
+    def test_no_nodes(self) -> None:
+        """Test that graphs without nodes have no edges."""
+        edge_src_idx, edge_dst_idx = find_radius_graph_edges(
+            self.src_node_pos[:0], self.dst_node_pos, self.dist_threshold, use_spatial_index=True
+        )
+        self.assertEqual(edge_src_idx.shape, (0,))
+        self.assertEqual(edge_dst_idx.shape, (0,))
+
+    def test_graph_attention(self) -> None:
+        """Test that graph attention outputs the same features with the edges of both searches."""
+        model = GraphAttention(4, 8, self.dist_threshold)
+        src_node_features = torch.rand((len(self.src_node_pos), 4))
+        dst_node_features = torch.rand((len(self.dst_node_pos), 8))
+        edges = find_radius_graph_edges(
+            self.src_node_pos, self.dst_node_pos, self.dist_threshold, use_spatial_index=True
+        )
+
+        dense_output = model(src_node_features, self.src_node_pos, dst_node_features, self.dst_node_pos)
+        sparse_output = model(src_node_features, self.src_node_pos, dst_node_features, self.dst_node_pos, edges)
+        torch.testing.assert_close(sparse_output, dense_output)
+
+    def test_attention_modules(self) -> None:
+        """Test that the attention modules output the same features with both searches."""
+        feature_len = 8
+        actor_features = torch.rand((len(self.src_node_pos), feature_len))
+        lane_features = torch.rand((len(self.dst_node_pos), feature_len))
+        lane_meta = torch.rand((len(self.dst_node_pos), 6))
+
+        modules_and_inputs = [
+            (
+                lambda use_spatial_index: Actor2LaneAttention(
+                    feature_len, feature_len, 2, self.dist_threshold, use_spatial_index=use_spatial_index
+                ),
+                (actor_features, self.src_node_pos, lane_features, lane_meta, self.dst_node_pos),
+            ),
+            (
+                lambda use_spatial_index: Lane2ActorAttention(
+                    feature_len, feature_len, 2, self.dist_threshold, use_spatial_index=use_spatial_index
+                ),
+                (lane_features, self.dst_node_pos, actor_features, self.src_node_pos),
+            ),
+            (
+                lambda use_spatial_index: Actor2ActorAttention(
+                    feature_len, 2, self.dist_threshold, use_spatial_index=use_spatial_index
+                ),
+                (actor_features, self.src_node_pos),
+            ),
+        ]
+        for build_module, inputs in modules_and_inputs:
+            dense_module = build_module(False)
+            sparse_module = build_module(True)
+            sparse_module.load_state_dict(dense_module.state_dict())
+
+            dense_output = dense_module(*[input.clone() for input in inputs])
+            sparse_output = sparse_module(*[input.clone() for input in inputs])
+            torch.testing.assert_close(sparse_output, dense_output)
+
+
 class TestActor2ActorAttention(unittest.TestCase):
     """Test actor-to-actor attention layer."""
 
@@ -319,6 +403,47 @@ class TestLaneGCN(unittest.TestCase):
         loss.backward()
         optimizer.step()
 
+    def test_padded_batch(self) -> None:
+        """
+        Tests that the LaneGCN model outputs the same predictions for padded and list based batches.
+        """
+        model = self._build_model().eval()
+        samples = []
+        for num_agents, num_segments in [(3, 40), (1, 25)]:
+            samples.append(
+                {
+                    "vector_map": VectorMap(
+                        coords=[torch.rand((num_segments, 2, 2)) * 20.0],
+                        lane_groupings=[[torch.arange(num_segments)]],
+                        multi_scale_connections=[
+                            {scale: torch.randint(num_segments, (num_segments, 2)) for scale in [1, 2, 3, 4]}
+                        ],
+                        on_route_status=[torch.rand((num_segments, VectorMap.on_route_status_encoding_dim()))],
+                        traffic_light_data=[torch.rand((num_segments, 4))],
+                    ),
+                    "agents": Agents(
+                        ego=[torch.rand((5, Agents.ego_state_dim()))],
+                        agents=[torch.rand((5, num_agents, Agents.agents_states_dim())) * 20.0],
+                    ),
+                }
+            )
+
+        with torch.no_grad():
+            list_predictions = model(
+                {
+                    "vector_map": VectorMap.collate([sample["vector_map"] for sample in samples]),
+                    "agents": Agents.collate([sample["agents"] for sample in samples]),
+                }
+            )
+            padded_predictions = model(
+                {
+                    "vector_map": PaddedVectorMap.collate([sample["vector_map"] for sample in samples]),
+                    "agents": PaddedAgents.collate([sample["agents"] for sample in samples]),
+                }
+            )
+
+        torch.testing.assert_close(padded_predictions["trajectory"].data, list_predictions["trajectory"].data)
+
     def test_backprop(self) -> None:
         """
         Tests that the LaneGCN model can train with DDP.
@@ -3,6 +3,7 @@ from typing import Dict, List
 
 import torch
 
+from nuplan.planning.training.modeling.trajectory_error_cache import TrajectoryErrorCache
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
 
 
@@ -53,3 +54,24 @@ class AbstractObjective(ABC):
         :return list of required targets for the computations
         """
         pass
+
+    def get_list_of_required_intermediates(self) -> List[str]:
+        """
+        :return list of trajectory error intermediates shared with other objectives and metrics, see
+            TrajectoryErrorCache. Only required intermediates are guaranteed to be computed ahead of time.
+        """
+        return []
+
+    def compute_from_cache(
+        self, predictions: FeaturesType, targets: TargetsType, cache: TrajectoryErrorCache
+    ) -> torch.Tensor:
+        """
+        Computes the objective's loss reusing the intermediates of the step shared with other objectives and metrics.
+        Defaults to computing it from scratch.
+
+        :param predictions: model's predictions
+        :param targets: ground truth targets from the dataset
+        :param cache: per-step cache of trajectory errors
+        :return: loss scalar tensor
+        """
+        return self.compute(predictions, targets)
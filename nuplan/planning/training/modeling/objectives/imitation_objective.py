@@ -1,10 +1,10 @@
-from typing import List, cast
+from typing import List
 
 import torch
 
 from nuplan.planning.training.modeling.objectives.abstract_objective import AbstractObjective
+from nuplan.planning.training.modeling.trajectory_error_cache import HEADING_ERROR, XY_ERROR, TrajectoryErrorCache
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
-from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
 
 
 class ImitationObjective(AbstractObjective):
@@ -21,8 +21,6 @@ class ImitationObjective(AbstractObjective):
         """
         self._name = 'imitation_objective'
         self._weight = weight
-        self._fn_xy = torch.nn.modules.loss.MSELoss(reduction='mean')
-        self._fn_heading = torch.nn.modules.loss.L1Loss(reduction='mean')
 
     def name(self) -> str:
         """
@@ -34,6 +32,10 @@ class ImitationObjective(AbstractObjective):
         """Implemented. See interface."""
         return ["trajectory"]
 
+    def get_list_of_required_intermediates(self) -> List[str]:
+        """Implemented. See interface."""
+        return [XY_ERROR, HEADING_ERROR]
+
     def compute(self, predictions: FeaturesType, targets: TargetsType) -> torch.Tensor:
         """
         Computes the objective's loss given the ground truth targets and the model's predictions
@@ -43,10 +45,11 @@ class ImitationObjective(AbstractObjective):
         :param targets: ground truth targets from the dataset
         :return: loss scalar tensor
         """
-        predicted_trajectory = cast(Trajectory, predictions["trajectory"])
-        targets_trajectory = cast(Trajectory, targets["trajectory"])
+        return self.compute_from_cache(predictions, targets, TrajectoryErrorCache(predictions, targets))
 
-        return self._weight * (
-            self._fn_xy(predicted_trajectory.xy, targets_trajectory.xy)
-            + self._fn_heading(predicted_trajectory.heading, targets_trajectory.heading)
-        )
+    def compute_from_cache(
+        self, predictions: FeaturesType, targets: TargetsType, cache: TrajectoryErrorCache
+    ) -> torch.Tensor:
+        """Implemented. See interface."""
+        # Mean squared position error and mean absolute heading error
+        return self._weight * (torch.mean(torch.square(cache.get(XY_ERROR))) + torch.mean(cache.get(HEADING_ERROR)))
@@ -1,10 +1,10 @@
-from typing import List, cast
+from typing import List
 
 import torch
 
 from nuplan.planning.training.modeling.objectives.abstract_objective import AbstractObjective
+from nuplan.planning.training.modeling.trajectory_error_cache import HEADING_ERROR, XY_ERROR, TrajectoryErrorCache
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
-from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
 
 
 class WeightDecayImitationObjective(AbstractObjective):
@@ -23,9 +23,6 @@ class WeightDecayImitationObjective(AbstractObjective):
         self._weight = weight
         self._decay = 1.0
 
-        self._fn_xy = torch.nn.modules.loss.L1Loss(reduction='none')
-        self._fn_heading = torch.nn.modules.loss.L1Loss(reduction='none')
-
     def name(self) -> str:
         """
         Name of the objective
@@ -36,6 +33,10 @@ class WeightDecayImitationObjective(AbstractObjective):
         """Implemented. See interface."""
         return ["trajectory"]
 
+    def get_list_of_required_intermediates(self) -> List[str]:
+        """Implemented. See interface."""
+        return [XY_ERROR, HEADING_ERROR]
+
     def compute(self, predictions: FeaturesType, targets: TargetsType) -> torch.Tensor:
         """
         Computes the objective's loss given the ground truth targets and the model's predictions
@@ -45,18 +46,20 @@ class WeightDecayImitationObjective(AbstractObjective):
         :param targets: ground truth targets from the dataset
         :return: loss scalar tensor
         """
-        predicted_trajectory = cast(Trajectory, predictions["trajectory"])
-        targets_trajectory = cast(Trajectory, targets["trajectory"])
+        return self.compute_from_cache(predictions, targets, TrajectoryErrorCache(predictions, targets))
+
+    def compute_from_cache(
+        self, predictions: FeaturesType, targets: TargetsType, cache: TrajectoryErrorCache
+    ) -> torch.Tensor:
+        """Implemented. See interface."""
+        xy_error = torch.abs(cache.get(XY_ERROR))
 
         # Add exponential decay of loss such that later error induce less penalty
-        planner_output_steps = predicted_trajectory.xy.shape[1]
-        decay_weight = torch.ones_like(predicted_trajectory.xy)
+        planner_output_steps = xy_error.shape[1]
+        decay_weight = torch.ones_like(xy_error)
         decay_value = torch.exp(-torch.Tensor(range(planner_output_steps)) / (planner_output_steps * self._decay))
         decay_weight[:, :] = decay_value.unsqueeze(1)
 
         return self._weight * (
-            torch.mean(self._fn_xy(predicted_trajectory.xy, targets_trajectory.xy) * decay_weight)
-            + torch.mean(
-                self._fn_heading(predicted_trajectory.heading, targets_trajectory.heading) * decay_weight[:, :, 0]
-            )
+            torch.mean(xy_error * decay_weight) + torch.mean(cache.get(HEADING_ERROR) * decay_weight[:, :, 0])
         )
@@ -0,0 +1,112 @@
+import unittest
+from typing import Callable, Dict
+from unittest.mock import patch
+
+import torch
+
+from nuplan.planning.training.modeling.metrics.planning_metrics import (
+    AverageDisplacementError,
+    AverageHeadingError,
+    FinalDisplacementError,
+    FinalHeadingError,
+)
+from nuplan.planning.training.modeling.objectives.imitation_objective import ImitationObjective
+from nuplan.planning.training.modeling.objectives.weight_decay_imitation_objective import WeightDecayImitationObjective
+from nuplan.planning.training.modeling.trajectory_error_cache import DISPLACEMENT_ERROR, XY_ERROR, TrajectoryErrorCache
+from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
+
+
+def _wrapped_mean(errors: torch.Tensor) -> torch.Tensor:
+    """
+    :param errors: absolute heading errors
+    :return: mean of the heading errors wrapped to [-pi, pi]
+    """
+    return torch.atan2(torch.sin(errors), torch.cos(errors)).mean()
+
+
+# Separate computation of every objective and metric, as done before sharing intermediates
+REFERENCE_FNS: Dict[str, Callable[[Trajectory, Trajectory], torch.Tensor]] = {
+    'imitation_objective': lambda pred, target: (
+        torch.nn.MSELoss()(pred.xy, target.xy) + torch.nn.L1Loss()(pred.heading, target.heading)
+    ),
+    'avg_displacement_error': lambda pred, target: torch.norm(pred.xy - target.xy, dim=-1).mean(),
+    'final_displacement_error': lambda pred, target: torch.norm(
+        pred.terminal_position - target.terminal_position, dim=-1
+    ).mean(),
+    'avg_heading_error': lambda pred, target: _wrapped_mean(torch.abs(pred.heading - target.heading)),
+    'final_heading_error': lambda pred, target: _wrapped_mean(
+        torch.abs(pred.terminal_heading - target.terminal_heading)
+    ),
+}
+
+
+class TestTrajectoryErrorCache(unittest.TestCase):
+    """Test sharing trajectory errors between objectives and metrics."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        generator = torch.Generator().manual_seed(0)
+        self.predictions = {'trajectory': Trajectory(data=4 * torch.rand(3, 8, 3, generator=generator) - 2)}
+        self.targets = {'trajectory': Trajectory(data=4 * torch.rand(3, 8, 3, generator=generator) - 2)}
+
+        self.computations = [
+            ImitationObjective(),
+            AverageDisplacementError(),
+            FinalDisplacementError(),
+            AverageHeadingError(),
+            FinalHeadingError(),
+        ]
+
+    def test_equal_to_separate_computation(self) -> None:
+        """Test that computing from a shared cache gives the values of the separate computations."""
+        cache = TrajectoryErrorCache(self.predictions, self.targets)
+        cache.precompute(TrajectoryErrorCache.get_list_of_intermediates())
+
+        for computation in self.computations:
+            expected = REFERENCE_FNS[computation.name()](self.predictions['trajectory'], self.targets['trajectory'])
+            torch.testing.assert_close(computation.compute_from_cache(self.predictions, self.targets, cache), expected)
+            torch.testing.assert_close(computation.compute(self.predictions, self.targets), expected)
+
+    def test_weight_decay_objective(self) -> None:
+        """Test that the weight decay objective gives the same value from a shared cache."""
+        objective = WeightDecayImitationObjective()
+        cache = TrajectoryErrorCache(self.predictions, self.targets)
+
+        torch.testing.assert_close(
+            objective.compute_from_cache(self.predictions, self.targets, cache),
+            objective.compute(self.predictions, self.targets),
+        )
+
+    def test_intermediates_computed_once(self) -> None:
+        """Test that each intermediate is computed once, whatever the number of objectives and metrics using it."""
+        cache = TrajectoryErrorCache(self.predictions, self.targets)
+
+        with patch.object(torch, 'norm', wraps=torch.norm) as norm:
+            for computation in self.computations:
+                computation.compute_from_cache(self.predictions, self.targets, cache)
+
+        norm.assert_called_once()
+        self.assertIs(cache.get(DISPLACEMENT_ERROR), cache.get(DISPLACEMENT_ERROR))
+        self.assertIs(cache.get(XY_ERROR), cache.get(XY_ERROR))
+
+    def test_gradients(self) -> None:
+        """Test that gradients flow through the shared intermediates."""
+        data = self.predictions['trajectory'].data.clone().requires_grad_()
+        predictions = {'trajectory': Trajectory(data=data)}
+        cache = TrajectoryErrorCache(predictions, self.targets)
+
+        losses = [computation.compute_from_cache(predictions, self.targets, cache) for computation in self.computations]
+        torch.stack(losses).sum().backward()
+
+        self.assertIsNotNone(data.grad)
+
+    def test_unknown_intermediate(self) -> None:
+        """Test that requesting an unknown intermediate fails."""
+        cache = TrajectoryErrorCache(self.predictions, self.targets)
+
+        with self.assertRaises(AssertionError):
+            cache.get('velocity_error')
+
+
+if __name__ == '__main__':
+    unittest.main()
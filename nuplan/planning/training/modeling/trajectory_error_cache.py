@@ -0,0 +1,108 @@
+from typing import Callable, Dict, Iterable, List
+
+import torch
+
+from nuplan.planning.training.modeling.types import TargetsType
+from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
+
+# Intermediates between predicted and target trajectories, shared by objectives and metrics of a step
+XY_ERROR = 'xy_error'  # [m] Position differences, shape [..., num_poses, 2]
+DISPLACEMENT_ERROR = 'displacement_error'  # [m] L2 norms of the position differences, shape [..., num_poses]
+HEADING_ERROR = 'heading_error'  # [rad] Absolute heading differences, shape [..., num_poses]
+WRAPPED_HEADING_ERROR = 'wrapped_heading_error'  # [rad] Heading differences wrapped to [-pi, pi], [..., num_poses]
+
+
+class TrajectoryErrorCache:
+    """
+    Per-step cache of the errors between the predicted and target trajectories.
+    Every intermediate is computed at most once per batch, on first request, such that objectives and metrics
+    requiring the same differences and norms share a single computation.
+    """
+
+    def __init__(self, predictions: TargetsType, targets: TargetsType, feature_name: str = 'trajectory') -> None:
+        """
+        Initializes the class.
+
+        :param predictions: model's predictions
+        :param targets: ground truth targets from the dataset
+        :param feature_name: name of the trajectory feature in the predictions and targets
+        """
+        self._predictions = predictions
+        self._targets = targets
+        self._feature_name = feature_name
+        self._intermediates: Dict[str, torch.Tensor] = {}
+        self._compute_fns: Dict[str, Callable[[], torch.Tensor]] = {
+            XY_ERROR: self._compute_xy_error,
+            DISPLACEMENT_ERROR: self._compute_displacement_error,
+            HEADING_ERROR: self._compute_heading_error,
+            WRAPPED_HEADING_ERROR: self._compute_wrapped_heading_error,
+        }
+
+    @staticmethod
+    def get_list_of_intermediates() -> List[str]:
+        """
+        :return: names of all the intermediates the cache can compute
+        """
+        return [XY_ERROR, DISPLACEMENT_ERROR, HEADING_ERROR, WRAPPED_HEADING_ERROR]
+
+    @property
+    def predicted_trajectory(self) -> Trajectory:
+        """
+        :return: predicted trajectory
+        """
+        return self._predictions[self._feature_name]  # type: ignore
+
+    @property
+    def target_trajectory(self) -> Trajectory:
+        """
+        :return: target trajectory
+        """
+        return self._targets[self._feature_name]  # type: ignore
+
+    def get(self, name: str) -> torch.Tensor:
+        """
+        Get an intermediate, computing it if it was not requested before.
+
+        :param name: name of the intermediate
+        :return: intermediate tensor
+        """
+        assert name in self._compute_fns, f"Unknown trajectory error intermediate: \"{name}\"!"
+
+        if name not in self._intermediates:
+            self._intermediates[name] = self._compute_fns[name]()
+
+        return self._intermediates[name]
+
+    def precompute(self, names: Iterable[str]) -> None:
+        """
+        Compute a set of intermediates ahead of their use.
+
+        :param names: names of the intermediates
+        """
+        for name in names:
+            self.get(name)
+
+    def _compute_xy_error(self) -> torch.Tensor:
+        """
+        :return: position differences between predicted and target trajectories
+        """
+        return self.predicted_trajectory.xy - self.target_trajectory.xy
+
+    def _compute_displacement_error(self) -> torch.Tensor:
+        """
+        :return: L2 norms of the position differences
+        """
+        return torch.norm(self.get(XY_ERROR), dim=-1)
+
+    def _compute_heading_error(self) -> torch.Tensor:
+        """
+        :return: absolute heading differences between predicted and target trajectories
+        """
+        return torch.abs(self.predicted_trajectory.heading - self.target_trajectory.heading)
+
+    def _compute_wrapped_heading_error(self) -> torch.Tensor:
+        """
+        :return: heading differences wrapped to [-pi, pi]
+        """
+        errors = self.get(HEADING_ERROR)
+        return torch.atan2(torch.sin(errors), torch.cos(errors))
@@ -15,13 +15,18 @@ from nuplan.planning.training.preprocessing.feature_builders.scriptable_feature_
 from nuplan.planning.training.preprocessing.features.agents import Agents
 from nuplan.planning.training.preprocessing.utils.agents_preprocessing import (
     build_ego_features_from_tensor,
+    compute_yaw_rate_from_state_array,
     compute_yaw_rate_from_state_tensors,
     convert_absolute_quantities_to_relative,
+    convert_absolute_quantities_to_relative_array,
     filter_agents_tensor,
+    pack_agents_array,
     pack_agents_tensor,
     pad_agent_states,
+    pad_agent_states_array,
     sampled_past_ego_states_to_tensor,
     sampled_past_timestamps_to_tensor,
+    sampled_tracked_objects_to_array,
     sampled_tracked_objects_to_tensor_list,
 )
 
@@ -29,16 +34,19 @@ from nuplan.planning.training.preprocessing.utils.agents_preprocessing import (
 class AgentsFeatureBuilder(ScriptableFeatureBuilder):
     """Builder for constructing agent features during training and simulation."""
 
-    def __init__(self, trajectory_sampling: TrajectorySampling) -> None:
+    def __init__(self, trajectory_sampling: TrajectorySampling, columnar_preprocessing: bool = False) -> None:
         """
         Initializes AgentsFeatureBuilder.
         :param trajectory_sampling: Parameters of the sampled trajectory of every agent
+        :param columnar_preprocessing: Whether to compute the features from a single
+            <num_frames, num_agents, num_fields> tensor instead of per-frame tensors. Only used outside of TorchScript.
         """
         super().__init__()
         self.num_past_poses = trajectory_sampling.num_poses
         self.past_time_horizon = trajectory_sampling.time_horizon
 
         self._agents_states_dim = Agents.agents_states_dim()
+        self._columnar_preprocessing = columnar_preprocessing
 
     @torch.jit.unused
     @classmethod
@@ -89,6 +97,11 @@ class AgentsFeatureBuilder(ScriptableFeatureBuilder):
                 "Trajectory of length of " f"{len(sampled_past_observations)} needs to be at least 3"
             )
 
+            if self._columnar_preprocessing:
+                return self._compute_feature_from_arrays(
+                    sampled_past_ego_states, time_stamps, sampled_past_observations
+                )
+
             tensors, list_tensors, list_list_tensors = self._pack_to_feature_tensor_dict(
                 sampled_past_ego_states, time_stamps, sampled_past_observations
             )
@@ -139,6 +152,11 @@ class AgentsFeatureBuilder(ScriptableFeatureBuilder):
             sampled_past_ego_states = sampled_past_ego_states + [present_ego_state]
             time_stamps = [state.time_point for state in sampled_past_ego_states]
 
+            if self._columnar_preprocessing:
+                return self._compute_feature_from_arrays(
+                    sampled_past_ego_states, time_stamps, sampled_past_observations
+                )
+
             tensors, list_tensors, list_list_tensors = self._pack_to_feature_tensor_dict(
                 sampled_past_ego_states, time_stamps, sampled_past_observations
             )
@@ -176,6 +194,40 @@ class AgentsFeatureBuilder(ScriptableFeatureBuilder):
             {},
         )
 
+    @torch.jit.unused
+    def _compute_feature_from_arrays(
+        self,
+        past_ego_states: List[EgoState],
+        past_time_stamps: List[TimePoint],
+        past_tracked_objects: List[TrackedObjects],
+    ) -> Agents:
+        """
+        Computes the features like scriptable_forward, from one columnar tensor of the agent states of all frames.
+        :param past_ego_states: The past states of the ego vehicle.
+        :param past_time_stamps: The past time stamps of the input data.
+        :param past_tracked_objects: The past tracked objects.
+        :return: The Agents feature.
+        """
+        ego_history = sampled_past_ego_states_to_tensor(past_ego_states)
+        time_stamps = sampled_past_timestamps_to_tensor(past_time_stamps)
+        agent_states, availability = sampled_tracked_objects_to_array(past_tracked_objects)
+
+        if agent_states.shape[1] == 0:
+            # Return zero array when there are no agents in the scene
+            agents_tensor = torch.zeros((agent_states.shape[0], 0, self._agents_states_dim)).float()
+        else:
+            anchor_ego_state = ego_history[-1, :].squeeze()
+            padded_agent_states = pad_agent_states_array(agent_states, availability)
+            local_coords_agent_states = convert_absolute_quantities_to_relative_array(
+                padded_agent_states, anchor_ego_state
+            )
+            yaw_rate_horizon = compute_yaw_rate_from_state_array(local_coords_agent_states, time_stamps)
+            agents_tensor = pack_agents_array(local_coords_agent_states, yaw_rate_horizon)
+
+        ego_tensor = build_ego_features_from_tensor(ego_history, reverse=True)
+
+        return Agents(ego=[ego_tensor.detach().numpy()], agents=[agents_tensor.detach().numpy()])
+
     @torch.jit.unused
     def _unpack_feature_from_tensor_dict(
         self,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Dict, Type
+from pathlib import Path
+from typing import Dict, Optional, Type
 
 import numpy as np
 import numpy.typing as npt
@@ -14,9 +15,11 @@ from nuplan.planning.training.preprocessing.feature_builders.abstract_feature_bu
     AbstractFeatureBuilder,
     AbstractModelFeature,
 )
+from nuplan.planning.training.preprocessing.features.map_raster_tiles import MapRasterTiles
 from nuplan.planning.training.preprocessing.features.raster import Raster
 from nuplan.planning.training.preprocessing.features.raster_utils import (
     get_agents_raster,
+    get_agents_raster_vectorized,
     get_baseline_paths_raster,
     get_ego_raster,
     get_roadmap_raster,
@@ -40,6 +43,9 @@ class RasterFeatureBuilder(AbstractFeatureBuilder):
         ego_rear_length: float,
         ego_longitudinal_offset: float,
         baseline_path_thickness: int,
+        use_map_raster_tiles: bool = False,
+        map_raster_tiles_dir: Optional[str] = None,
+        use_vectorized_agents_raster: bool = False,
     ) -> None:
         """
         Initializes the builder.
@@ -55,6 +61,10 @@ class RasterFeatureBuilder(AbstractFeatureBuilder):
                                         0.0 means place the ego at 1/2 from the bottom of the raster image.
                                         0.25 means place the ego at 1/4 from the bottom of the raster image.
         :param baseline_path_thickness: [pixels] the thickness of baseline paths in the baseline_paths_raster.
+        :param use_map_raster_tiles: whether to crop the roadmap raster from tiles rasterized once per map location
+                                     instead of rasterizing the map objects around ego for every sample.
+        :param map_raster_tiles_dir: folder in which map raster tiles are persisted, tiles are kept in memory if None.
+        :param use_vectorized_agents_raster: whether to transform and draw the boxes of all agents at once.
         """
         self.map_features = map_features
         self.num_input_channels = num_input_channels
@@ -76,6 +86,17 @@ class RasterFeatureBuilder(AbstractFeatureBuilder):
         self.ego_front_length_pixels = int(ego_front_length / self.target_pixel_size)
         self.ego_rear_length_pixels = int(ego_rear_length / self.target_pixel_size)
 
+        self.map_raster_tiles = (
+            MapRasterTiles(
+                map_features=self.map_features,
+                resolution=self.target_pixel_size,
+                cache_dir=Path(map_raster_tiles_dir) if map_raster_tiles_dir is not None else None,
+            )
+            if use_map_raster_tiles
+            else None
+        )
+        self.use_vectorized_agents_raster = use_vectorized_agents_raster
+
     @classmethod
     def get_feature_unique_name(cls) -> str:
         """Inherited, see superclass."""
@@ -114,17 +135,27 @@ class RasterFeatureBuilder(AbstractFeatureBuilder):
         map_api: AbstractMap,
     ) -> Raster:
         # Construct map, agents and ego layers
-        roadmap_raster = get_roadmap_raster(
-            ego_state.agent,
-            map_api,
-            self.map_features,
-            self.x_range,
-            self.y_range,
-            self.raster_shape,
-            self.target_pixel_size,
-        )
+        if self.map_raster_tiles is not None:
+            roadmap_raster = self.map_raster_tiles.get_roadmap_raster(
+                ego_state.agent,
+                map_api,
+                self.x_range,
+                self.y_range,
+                self.raster_shape,
+            )
+        else:
+            roadmap_raster = get_roadmap_raster(
+                ego_state.agent,
+                map_api,
+                self.map_features,
+                self.x_range,
+                self.y_range,
+                self.raster_shape,
+                self.target_pixel_size,
+            )
 
-        agents_raster = get_agents_raster(
+        agents_raster_fn = get_agents_raster_vectorized if self.use_vectorized_agents_raster else get_agents_raster
+        agents_raster = agents_raster_fn(
             ego_state,
             detections,
             self.x_range,
@@ -2,6 +2,7 @@ import copy
 import unittest
 from typing import Dict, List
 
+import numpy as np
 import torch
 
 from nuplan.common.actor_state.state_representation import StateSE2
@@ -119,6 +120,27 @@ class TestAgentsFeatureBuilder(unittest.TestCase):
         self.assertEqual(len(feature.agents[0][0]), self.num_agents)
         self.assertEqual(len(feature.agents[0][0][0]), Agents.agents_states_dim())
 
+    def test_columnar_preprocessing(self) -> None:
+        """
+        Test that the columnar preprocessing builds the same features
+        """
+        columnar_feature_builder = AgentsFeatureBuilder(
+            TrajectorySampling(num_poses=self.num_past_poses, time_horizon=self.past_time_horizon),
+            columnar_preprocessing=True,
+        )
+        for num_agents in [0, self.num_agents]:
+            scenario = MockAbstractScenario(number_of_past_iterations=10, number_of_detections=num_agents)
+            expected_feature = self.feature_builder.get_features_from_scenario(scenario)
+            feature = columnar_feature_builder.get_features_from_scenario(scenario)
+
+            self.assertEqual(type(feature), Agents)
+            np.testing.assert_allclose(feature.ego[0], expected_feature.ego[0])
+            self.assertEqual(feature.agents[0].shape, expected_feature.agents[0].shape)
+            np.testing.assert_allclose(feature.agents[0], expected_feature.agents[0], rtol=1e-5, atol=1e-4)
+
+        # The builder can still be scripted
+        torch.jit.script(columnar_feature_builder)
+
     def test_agents_feature_builder_scripts_properly(self) -> None:
         """
         Tests that the Agents Feature Builder scripts properly
@@ -1,21 +1,35 @@
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple, Type
 
 from nuplan.planning.training.modeling.types import FeaturesType, TargetsType
+from nuplan.planning.training.preprocessing.features.abstract_model_feature import AbstractModelFeature
+from nuplan.planning.training.preprocessing.features.agents import Agents, PaddedAgents
+from nuplan.planning.training.preprocessing.features.vector_map import PaddedVectorMap, VectorMap
+from nuplan.planning.training.preprocessing.utils.stage_profiler import COLLATE_STAGE, StageProfiler, time_stage
+
+# Features batched into padded tensors instead of lists of per-sample tensors, if padded batches are enabled
+PADDED_FEATURE_TYPES: Dict[Type[AbstractModelFeature], Type[AbstractModelFeature]] = {
+    Agents: PaddedAgents,
+    VectorMap: PaddedVectorMap,
+}
 
 
 def _batch_abstract_features(
-    initial_not_batched_features: FeaturesType, to_be_batched_features: List[FeaturesType]
+    initial_not_batched_features: FeaturesType, to_be_batched_features: List[FeaturesType], padded: bool = False
 ) -> FeaturesType:
     """
     Batch abstract feature with custom collate function
     :param initial_not_batched_features: features from initial batch which are used only for keys
     :param to_be_batched_features: list of features which should be batched
+    :param padded: whether to batch the features listed in PADDED_FEATURE_TYPES into padded tensors
     :return: batched features
     """
     output_features = {}
     for key in initial_not_batched_features.keys():
         list_features = [feature_single[key] for feature_single in to_be_batched_features]
-        output_features[key] = initial_not_batched_features[key].collate(list_features)
+        feature_type = type(initial_not_batched_features[key])
+        if padded:
+            feature_type = PADDED_FEATURE_TYPES.get(feature_type, feature_type)
+        output_features[key] = feature_type.collate(list_features)
 
     return output_features
 
@@ -23,6 +37,15 @@ def _batch_abstract_features(
 class FeatureCollate:
     """Wrapper class that collates together multiple samples into a batch."""
 
+    def __init__(self, padded: bool = False, stage_profiler: Optional[StageProfiler] = None) -> None:
+        """
+        :param padded: If true, features that support it are batched into contiguous padded tensors, which are moved
+            to devices and pinned memory at once. Otherwise they are batched into lists of per-sample tensors.
+        :param stage_profiler: If set, the collation of every batch is timed with this profiler.
+        """
+        self._padded = padded
+        self._stage_profiler = stage_profiler
+
     def __call__(self, batch: List[Tuple[FeaturesType, TargetsType]]) -> Tuple[FeaturesType, TargetsType]:
         """
         Collate list of [Features,Targets] into batch
@@ -31,12 +54,13 @@ class FeatureCollate:
         """
         assert len(batch) > 0, "Batch size has to be greater than 0!"
 
-        to_be_batched_features = [batch_i[0] for batch_i in batch]
-        to_be_batched_targets = [batch_i[1] for batch_i in batch]
+        with time_stage(self._stage_profiler, COLLATE_STAGE):
+            to_be_batched_features = [batch_i[0] for batch_i in batch]
+            to_be_batched_targets = [batch_i[1] for batch_i in batch]
 
-        initial_features, initial_targets = batch[0]
+            initial_features, initial_targets = batch[0]
 
-        out_features = _batch_abstract_features(initial_features, to_be_batched_features)
-        out_targets = _batch_abstract_features(initial_targets, to_be_batched_targets)
+            out_features = _batch_abstract_features(initial_features, to_be_batched_features, self._padded)
+            out_targets = _batch_abstract_features(initial_targets, to_be_batched_targets, self._padded)
 
         return out_features, out_targets
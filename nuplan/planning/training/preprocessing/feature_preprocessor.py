@@ -14,6 +14,11 @@ from nuplan.planning.training.preprocessing.feature_builders.abstract_feature_bu
 )
 from nuplan.planning.training.preprocessing.target_builders.abstract_target_builder import AbstractTargetBuilder
 from nuplan.planning.training.preprocessing.utils.feature_cache import FeatureCachePickle, FeatureCacheS3
+from nuplan.planning.training.preprocessing.utils.stage_profiler import (
+    StageProfiler,
+    get_feature_builder_stage_name,
+    time_stage,
+)
 from nuplan.planning.training.preprocessing.utils.utils_cache import compute_or_load_feature
 
 logger = logging.getLogger(__name__)
@@ -46,6 +51,7 @@ class FeaturePreprocessor:
         self._storing_mechanism = (
             FeatureCacheS3(cache_path) if str(cache_path).startswith('s3://') else FeatureCachePickle()
         )
+        self._stage_profiler: Optional[StageProfiler] = None
 
         assert len(feature_builders) != 0, "Number of feature builders has to be grater than 0!"
 
@@ -63,6 +69,20 @@ class FeaturePreprocessor:
         """
         return self._target_builders
 
+    def get_stage_names(self) -> List[str]:
+        """
+        :return: names of the profiling stages of all feature and target builders
+        """
+        builders = self._feature_builders + self._target_builders
+        return [get_feature_builder_stage_name(builder.get_feature_unique_name()) for builder in builders]
+
+    def set_stage_profiler(self, stage_profiler: Optional[StageProfiler]) -> None:
+        """
+        Time the computation of every feature and target with a profiler.
+        :param stage_profiler: profiler to time the builders with, None to disable profiling
+        """
+        self._stage_profiler = stage_profiler
+
     def get_list_of_feature_types(self) -> List[Type[AbstractModelFeature]]:
         """
         :return all features that are computed by the builders
@@ -119,9 +139,10 @@ class FeaturePreprocessor:
         all_features_metadata_entries: List[CacheMetadataEntry] = []
 
         for builder in builders:
-            feature, feature_metadata_entry = compute_or_load_feature(
-                scenario, self._cache_path, builder, self._storing_mechanism, self._force_feature_computation
-            )
+            with time_stage(self._stage_profiler, get_feature_builder_stage_name(builder.get_feature_unique_name())):
+                feature, feature_metadata_entry = compute_or_load_feature(
+                    scenario, self._cache_path, builder, self._storing_mechanism, self._force_feature_computation
+                )
             all_features[builder.get_feature_unique_name()] = feature
             all_features_metadata_entries.append(feature_metadata_entry)
 
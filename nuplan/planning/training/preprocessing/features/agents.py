@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 import torch
@@ -252,6 +252,102 @@ class Agents(AbstractModelFeature):
         )
 
 
+class PaddedAgents(Agents):
+    """
+    Agents feature of a batch, held in padded tensors instead of lists of per-sample tensors.
+
+    The padded tensors are:
+        padded_ego: <torch.Tensor: batch_size, num_frames, 3>.
+        padded_agents: <torch.Tensor: batch_size, num_frames, max_num_agents, 8>.
+            The agents of every sample are zero padded to the largest number of agents in the batch.
+        agents_mask: <torch.Tensor: batch_size, max_num_agents>. True for the agents of a sample, False for padding.
+        num_agents: <torch.Tensor: batch_size>. Number of agents of every sample, always kept on the host.
+
+    The per-sample lists ego and agents are views into the padded tensors, so that models written for Agents work
+    unchanged. Moving the batch to a device or into pinned memory copies a single tensor per field.
+    """
+
+    def __init__(
+        self,
+        padded_ego: torch.Tensor,
+        padded_agents: torch.Tensor,
+        num_agents: torch.Tensor,
+        agents_mask: Optional[torch.Tensor] = None,
+    ) -> None:
+        """
+        :param padded_ego: <torch.Tensor: batch_size, num_frames, 3>. Ego states of every sample.
+        :param padded_agents: <torch.Tensor: batch_size, num_frames, max_num_agents, 8>. Padded agent states.
+        :param num_agents: <torch.Tensor: batch_size>. Number of agents of every sample.
+        :param agents_mask: <torch.Tensor: batch_size, max_num_agents>. Validity mask, computed if None.
+        """
+        self.padded_ego = padded_ego
+        self.padded_agents = padded_agents
+        self.num_agents = num_agents
+        if agents_mask is None:
+            agent_indices = torch.arange(padded_agents.shape[2], device=num_agents.device)
+            agents_mask = agent_indices.unsqueeze(0) < num_agents.unsqueeze(1)
+        self.agents_mask = agents_mask
+
+        super().__init__(
+            ego=list(padded_ego.unbind(0)),
+            agents=[
+                agents[:, :sample_num_agents]
+                for agents, sample_num_agents in zip(padded_agents.unbind(0), num_agents.tolist())
+            ],
+        )
+
+    @classmethod
+    def collate(cls, batch: List[Agents]) -> PaddedAgents:
+        """
+        Collates a list of features that each have batch size of 1 into padded tensors.
+        :param batch: Features to be batched.
+        :return: Padded batch.
+        """
+        egos = [to_tensor(item.ego[0]) for item in batch]
+        agents = [to_tensor(item.agents[0]) for item in batch]
+        num_agents = [sample_agents.shape[1] for sample_agents in agents]
+        num_frames, _, state_dim = agents[0].shape
+
+        padded_agents = agents[0].new_zeros((len(batch), num_frames, max(num_agents), state_dim))
+        for sample_idx, sample_agents in enumerate(agents):
+            padded_agents[sample_idx, :, : num_agents[sample_idx]] = sample_agents
+
+        return PaddedAgents(torch.stack(egos), padded_agents, torch.tensor(num_agents, dtype=torch.int64))
+
+    def to_feature_tensor(self) -> PaddedAgents:
+        """Implemented. See interface."""
+        return self
+
+    def to_device(self, device: torch.device) -> PaddedAgents:
+        """Implemented. See interface."""
+        non_blocking = self.padded_agents.is_pinned()
+        return PaddedAgents(
+            padded_ego=self.padded_ego.to(device=device, non_blocking=non_blocking),
+            padded_agents=self.padded_agents.to(device=device, non_blocking=non_blocking),
+            num_agents=self.num_agents,
+            agents_mask=self.agents_mask.to(device=device, non_blocking=non_blocking),
+        )
+
+    def pin_memory(self) -> PaddedAgents:
+        """
+        Called by the data loader if pin_memory is enabled.
+        :return: Batch allocated in page-locked memory, for faster and asynchronous host-to-device transfer.
+        """
+        return PaddedAgents(
+            padded_ego=self.padded_ego.pin_memory(),
+            padded_agents=self.padded_agents.pin_memory(),
+            num_agents=self.num_agents,
+            agents_mask=self.agents_mask.pin_memory(),
+        )
+
+    def __reduce__(self) -> Any:
+        """
+        Pickle the padded tensors only, the per-sample views are rebuilt when unpickling.
+        :return: Constructor and its arguments.
+        """
+        return PaddedAgents, (self.padded_ego, self.padded_agents, self.num_agents, self.agents_mask)
+
+
 class EgoFeatureIndex:
     """
     A convenience class for assigning semantic meaning to the tensor index
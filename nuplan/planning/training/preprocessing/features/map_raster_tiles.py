@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+from cachetools import LRUCache
+
+from nuplan.common.actor_state.agent_state import AgentState
+from nuplan.common.actor_state.state_representation import Point2D
+from nuplan.common.maps.abstract_map import AbstractMap, SemanticMapLayer
+from nuplan.common.maps.nuplan_map.nuplan_map import get_map_version
+from nuplan.planning.training.preprocessing.features.raster_utils import _draw_polygon_image, _polygon_to_coords
+
+TileIndex = Tuple[int, int]
+
+# Bumped whenever the rasterization of tiles changes, persisted tiles of other versions are ignored
+MAP_RASTER_TILES_FORMAT_VERSION = '1'
+
+
+class MapRasterTiles:
+    """
+    Roadmap rasters of whole map locations, split in square tiles.
+    Tiles are rasterized once per map location at a fixed resolution, kept in memory and optionally persisted to disk.
+    The roadmap raster of a sample is cropped from the tiles with a single rotated affine warp, which replaces the map
+    queries, coordinate transforms and polygon filling that get_roadmap_raster runs for every sample.
+    """
+
+    def __init__(
+        self,
+        map_features: Dict[str, float],
+        resolution: float,
+        tile_size: int = 256,
+        cache_dir: Optional[Path] = None,
+        max_cached_tiles: int = 256,
+    ) -> None:
+        """
+        :param map_features: name of map features to be drawn and their color for encoding, drawn in this order.
+        :param resolution: [m] pixel size of the tiles in meters.
+        :param tile_size: [pixels] side length of a tile.
+        :param cache_dir: folder in which rasterized tiles are persisted, tiles are kept in memory only if None.
+        :param max_cached_tiles: maximum number of tiles kept in memory.
+        """
+        assert resolution > 0.0, f"Resolution has to be positive, got {resolution}!"
+        assert tile_size > 0, f"Tile size has to be positive, got {tile_size}!"
+
+        self._map_features = map_features
+        self._resolution = resolution
+        self._tile_size = tile_size
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._max_cached_tiles = max_cached_tiles
+        # Tiles by map name, map version and tile index
+        self._tiles: LRUCache[Tuple[str, str, TileIndex], npt.NDArray[np.float32]] = LRUCache(maxsize=max_cached_tiles)
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Tiles in memory and the lock are not pickled, workers rasterize or load the tiles they need themselves.
+        :return: State of the object.
+        """
+        state = self.__dict__.copy()
+        del state['_tiles']
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        :param state: State of the object.
+        """
+        self.__dict__.update(state)
+        self._tiles = LRUCache(maxsize=self._max_cached_tiles)
+        self._lock = threading.Lock()
+
+    @property
+    def resolution(self) -> float:
+        """:return: [m] pixel size of the tiles in meters."""
+        return self._resolution
+
+    @property
+    def num_tiles(self) -> int:
+        """:return: Number of tiles in memory."""
+        return len(self._tiles)
+
+    @property
+    def tile_extent(self) -> float:
+        """:return: [m] side length of a tile."""
+        return self._tile_size * self._resolution
+
+    def _tile_indices(self, x_min: float, y_min: float, x_max: float, y_max: float) -> Tuple[TileIndex, TileIndex]:
+        """
+        Get the range of tiles that cover an axis aligned box.
+        :param x_min: Minimum x of the box.
+        :param y_min: Minimum y of the box.
+        :param x_max: Maximum x of the box.
+        :param y_max: Maximum y of the box.
+        :return: Indices of the tiles in the minimum and in the maximum corner of the box.
+        """
+        return (
+            (math.floor(x_min / self.tile_extent), math.floor(y_min / self.tile_extent)),
+            (math.floor(x_max / self.tile_extent), math.floor(y_max / self.tile_extent)),
+        )
+
+    def _tile_path(self, map_name: str, map_version: str, tile_index: TileIndex) -> Optional[Path]:
+        """
+        :param map_name: Map name.
+        :param map_version: Version of the map data.
+        :param tile_index: Tile index.
+        :return: Path of a persisted tile, None if tiles are not persisted.
+        """
+        if self._cache_dir is None:
+            return None
+
+        features = ','.join(f'{name}:{color:g}' for name, color in self._map_features.items())
+        key = f'{MAP_RASTER_TILES_FORMAT_VERSION};{self._resolution:g};{self._tile_size};{features}'
+        features_key = hashlib.md5(key.encode()).hexdigest()[:12]
+        return self._cache_dir / map_name / map_version / features_key / f'{tile_index[0]}_{tile_index[1]}.npy'
+
+    def _rasterize_tile(self, map_api: AbstractMap, tile_index: TileIndex) -> npt.NDArray[np.float32]:
+        """
+        Rasterize the map features in a tile.
+        Pixel (row, col) of a tile covers the map position tile origin + (col, row) * resolution.
+        :param map_api: Map api.
+        :param tile_index: Tile index.
+        :return: <tile_size, tile_size> rasterized tile.
+        """
+        origin = np.array(tile_index, dtype=np.float64) * self.tile_extent
+        half_extent = self.tile_extent / 2
+        # Query a margin of one pixel, so that anti-aliased edges of objects right outside the tile are drawn
+        center = Point2D(x=origin[0] + half_extent, y=origin[1] + half_extent)
+        layers = [SemanticMapLayer[feature_name] for feature_name in self._map_features]
+        map_objects = map_api.get_proximal_map_objects(
+            layers=layers, point=center, radius=half_extent + self._resolution
+        )
+
+        tile: npt.NDArray[np.float32] = np.zeros((self._tile_size, self._tile_size), dtype=np.float32)
+        for layer, feature_color in zip(layers, self._map_features.values()):
+            object_coords = [np.vstack(coords).T - origin for coords in _polygon_to_coords(map_objects[layer])]
+            tile = _draw_polygon_image(tile, object_coords, 0.0, self._resolution, feature_color)
+
+        return tile
+
+    @staticmethod
+    def _save_tile(tile: npt.NDArray[np.float32], path: Path) -> None:
+        """
+        Persist a tile to disk.
+        :param tile: Rasterized tile.
+        :param path: Path of the persisted tile.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so that concurrent readers never see a partially written tile
+        tmp_path = path.with_name(f'{path.stem}.{threading.get_ident()}.tmp.npy')
+        np.save(tmp_path, tile)
+        tmp_path.replace(path)
+
+    def get_tile(self, map_api: AbstractMap, tile_index: TileIndex) -> npt.NDArray[np.float32]:
+        """
+        Get a rasterized tile, from memory, from disk or from the map api in this order.
+        :param map_api: Map api.
+        :param tile_index: Tile index.
+        :return: <tile_size, tile_size> rasterized tile.
+        """
+        map_version = get_map_version(map_api)
+        key = (map_api.map_name, map_version, tile_index)
+        with self._lock:
+            tile = self._tiles.get(key, None)
+            if tile is not None:
+                return tile
+
+            path = self._tile_path(map_name=map_api.map_name, map_version=map_version, tile_index=tile_index)
+            if path is not None and path.exists():
+                tile = np.load(path)
+            else:
+                tile = self._rasterize_tile(map_api=map_api, tile_index=tile_index)
+                if path is not None:
+                    self._save_tile(tile=tile, path=path)
+
+            self._tiles[key] = tile
+
+        return tile
+
+    def rasterize_map(self, map_api: AbstractMap, bounds: Tuple[float, float, float, float]) -> List[TileIndex]:
+        """
+        Rasterize all tiles of a map location ahead of time.
+        :param map_api: Map api.
+        :param bounds: [m] minimum x, minimum y, maximum x and maximum y of the map location.
+        :return: Indices of the rasterized tiles.
+        """
+        (i_min, j_min), (i_max, j_max) = self._tile_indices(*bounds)
+        tile_indices = [(i, j) for i in range(i_min, i_max + 1) for j in range(j_min, j_max + 1)]
+        for tile_index in tile_indices:
+            self.get_tile(map_api=map_api, tile_index=tile_index)
+
+        return tile_indices
+
+    def _get_mosaic(
+        self, map_api: AbstractMap, x_min: float, y_min: float, x_max: float, y_max: float
+    ) -> Tuple[npt.NDArray[np.float32], npt.NDArray[np.float64]]:
+        """
+        Stitch the tiles that cover an axis aligned box.
+        :param map_api: Map api.
+        :param x_min: Minimum x of the box.
+        :param y_min: Minimum y of the box.
+        :param x_max: Maximum x of the box.
+        :param y_max: Maximum y of the box.
+        :return: Stitched tiles and the [m] map position of their origin pixel.
+        """
+        (i_min, j_min), (i_max, j_max) = self._tile_indices(x_min=x_min, y_min=y_min, x_max=x_max, y_max=y_max)
+        mosaic: npt.NDArray[np.float32] = np.empty(
+            ((j_max - j_min + 1) * self._tile_size, (i_max - i_min + 1) * self._tile_size), dtype=np.float32
+        )
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                row, col = (j - j_min) * self._tile_size, (i - i_min) * self._tile_size
+                mosaic[row : row + self._tile_size, col : col + self._tile_size] = self.get_tile(map_api, (i, j))
+
+        return mosaic, np.array([i_min, j_min], dtype=np.float64) * self.tile_extent
+
+    def get_roadmap_raster(
+        self,
+        focus_agent: AgentState,
+        map_api: AbstractMap,
+        x_range: Tuple[float, float],
+        y_range: Tuple[float, float],
+        raster_shape: Tuple[int, int],
+    ) -> npt.NDArray[np.float32]:
+        """
+        Construct the map layer of the raster by cropping it from the rasterized tiles.
+        The result matches get_roadmap_raster up to the resampling of anti-aliased edges. Unlike the proximal map query
+        of get_roadmap_raster, the tiles also cover the corners of rasters that are not aligned with the map axes.
+        :param focus_agent: agent state representing ego.
+        :param map_api: map api.
+        :param x_range: [m] min and max range from the edges of the grid in x direction.
+        :param y_range: [m] min and max range from the edges of the grid in y direction.
+        :param raster_shape: shape of the target raster.
+        :return: the constructed map raster layer.
+        """
+        # Assume the raster has a square shape.
+        assert (x_range[1] - x_range[0]) == (
+            y_range[1] - y_range[0]
+        ), f'Raster shape is assumed to be square but got width: \
+                {y_range[1] - y_range[0]} and height: {x_range[1] - x_range[0]}'
+
+        radius = (x_range[1] - x_range[0]) / 2
+        height, width = raster_shape
+        center = focus_agent.center
+        cos_heading, sin_heading = math.cos(center.heading), math.sin(center.heading)
+
+        # Bounding box of the rotated raster, with a margin for the bilinear interpolation
+        half_extent = (abs(cos_heading) + abs(sin_heading)) * radius + 2 * self._resolution
+        mosaic, origin = self._get_mosaic(
+            map_api,
+            x_min=center.x - half_extent,
+            y_min=center.y - half_extent,
+            x_max=center.x + half_extent,
+            y_max=center.y + half_extent,
+        )
+
+        # Map raster pixel (col, row) to mosaic pixel (col, row). The raster is top-oriented and flipped vertically,
+        # i.e. pixel (col, row) is at x = (height - 1 - row) * resolution - radius forward and
+        # y = radius - col * resolution to the left of the agent.
+        radius_pixels = radius / self._resolution
+        mosaic_center = (np.array([center.x, center.y]) - origin) / self._resolution
+        transform = np.array(
+            [
+                [
+                    sin_heading,
+                    -cos_heading,
+                    mosaic_center[0] + cos_heading * (height - 1 - radius_pixels) - sin_heading * radius_pixels,
+                ],
+                [
+                    -cos_heading,
+                    -sin_heading,
+                    mosaic_center[1] + sin_heading * (height - 1 - radius_pixels) + cos_heading * radius_pixels,
+                ],
+            ],
+            dtype=np.float64,
+        )
+
+        roadmap_raster: npt.NDArray[np.float32] = cv2.warpAffine(
+            mosaic,
+            transform,
+            (width, height),
+            flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=0.0,
+        )
+
+        return np.ascontiguousarray(roadmap_raster, dtype=np.float32)
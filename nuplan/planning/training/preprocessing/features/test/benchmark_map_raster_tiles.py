@@ -0,0 +1,89 @@
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+from unittest.mock import Mock
+
+import numpy as np
+import numpy.typing as npt
+
+from nuplan.common.actor_state.agent_state import AgentState
+from nuplan.planning.training.preprocessing.features.map_raster_tiles import MapRasterTiles
+from nuplan.planning.training.preprocessing.features.raster_utils import get_roadmap_raster
+from nuplan.planning.training.preprocessing.features.test.map_raster_tiles_test_utils import (
+    MAP_FEATURES,
+    SyntheticRoadMap,
+    build_random_agents,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run_rasterization(rasterize: Callable[[AgentState], npt.NDArray[np.float32]], agents: List[Mock]) -> float:
+    """
+    Rasterize the roadmap around every agent and measure the running time.
+    :param rasterize: Function that builds the roadmap raster of an agent.
+    :param agents: Agents with a center pose.
+    :return: Elapsed time in seconds.
+    """
+    start_time = time.perf_counter()
+    for agent in agents:
+        rasterize(agent)
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    """Benchmark cropping roadmap rasters from map raster tiles against rasterizing the map objects per sample."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--num_objects', type=int, default=5000, help='Number of map objects per layer.')
+    parser.add_argument('--extent', type=float, default=2000.0, help='[m] Side length of the map.')
+    parser.add_argument('--num_samples', type=int, default=500, help='Number of rasterized samples.')
+    parser.add_argument('--raster_size', type=int, default=224, help='[pixels] Side length of the raster.')
+    parser.add_argument('--resolution', type=float, default=0.5, help='[m] Pixel size of the raster.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rng = np.random.default_rng(0)
+    map_api = SyntheticRoadMap(num_objects=args.num_objects, extent=args.extent, rng=rng)
+    agents = build_random_agents(num_agents=args.num_samples, extent=args.extent, rng=rng)
+    half_size = args.raster_size * args.resolution / 2
+    raster_range = (-half_size, half_size)
+    raster_shape = (args.raster_size, args.raster_size)
+
+    elapsed_time = run_rasterization(
+        lambda agent: get_roadmap_raster(
+            agent, map_api, MAP_FEATURES, raster_range, raster_range, raster_shape, args.resolution  # type: ignore
+        ),
+        agents,
+    )
+    logger.info(f'get_roadmap_raster: {elapsed_time:.2f} seconds for {args.num_samples} samples')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        map_raster_tiles = MapRasterTiles(
+            map_features=MAP_FEATURES, resolution=args.resolution, cache_dir=Path(tmp_dir)
+        )
+        bounds = (-args.extent / 2, -args.extent / 2, args.extent / 2, args.extent / 2)
+        start_time = time.perf_counter()
+        tile_indices = map_raster_tiles.rasterize_map(map_api, bounds)  # type: ignore
+        logger.info(f'Rasterized {len(tile_indices)} tiles in {time.perf_counter() - start_time:.2f} seconds')
+
+        # Load the persisted tiles in a fresh instance, as a worker process would
+        map_raster_tiles = MapRasterTiles(
+            map_features=MAP_FEATURES,
+            resolution=args.resolution,
+            cache_dir=Path(tmp_dir),
+            max_cached_tiles=len(tile_indices),
+        )
+        elapsed_time = run_rasterization(
+            lambda agent: map_raster_tiles.get_roadmap_raster(
+                agent, map_api, raster_range, raster_range, raster_shape  # type: ignore
+            ),
+            agents,
+        )
+        logger.info(f'MapRasterTiles: {elapsed_time:.2f} seconds for {args.num_samples} samples')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional
+from unittest.mock import Mock
+
+import numpy as np
+from shapely.geometry import LineString, box
+from shapely.strtree import STRtree
+
+from nuplan.common.actor_state.agent_state import AgentState
+from nuplan.common.actor_state.state_representation import Point2D, StateSE2
+from nuplan.common.maps.abstract_map import SemanticMapLayer
+
+MAP_FEATURES = {'LANE': 1.0, 'INTERSECTION': 1.0, 'STOP_LINE': 0.5, 'CROSSWALK': 0.5}
+
+
+class SyntheticRoadMap:
+    """Map api with random polygon map objects, queried through an STR tree like the vector layers of NuPlanMap."""
+
+    def __init__(self, num_objects: int, extent: float, rng: Optional[np.random.Generator] = None) -> None:
+        """
+        :param num_objects: Number of map objects per layer.
+        :param extent: [m] Side length of the square map, centered at the origin.
+        :param rng: Random generator.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        self.map_name = 'synthetic_road_map'
+        self.extent = extent
+        self._map_objects: Dict[SemanticMapLayer, List[Mock]] = {}
+        self._trees: Dict[SemanticMapLayer, STRtree] = {}
+        for layer_index, feature_name in enumerate(MAP_FEATURES):
+            layer = SemanticMapLayer[feature_name]
+            starts = (rng.random((num_objects, 2)) - 0.5) * extent
+            ends = starts + (rng.random((num_objects, 2)) - 0.5) * 60.0
+            map_objects = []
+            for object_index, (start, end) in enumerate(zip(starts, ends)):
+                map_object = Mock()
+                map_object.id = f'{layer_index}_{object_index}'
+                map_object.polygon = LineString([start, end]).buffer(1.0 + 2.0 * (layer_index % 2), cap_style=2)
+                map_objects.append(map_object)
+            self._map_objects[layer] = map_objects
+            self._trees[layer] = STRtree([map_object.polygon for map_object in map_objects])
+
+    def get_proximal_map_objects(
+        self, point: Point2D, radius: float, layers: List[SemanticMapLayer]
+    ) -> Dict[SemanticMapLayer, List[Mock]]:
+        """See AbstractMap."""
+        patch = box(point.x - radius, point.y - radius, point.x + radius, point.y + radius)
+        return {
+            layer: [
+                self._map_objects[layer][index]
+                for index in sorted(self._trees[layer].query(patch, predicate='intersects'))
+            ]
+            for layer in layers
+        }
+
+
+def build_random_agents(num_agents: int, extent: float, rng: Optional[np.random.Generator] = None) -> List[Mock]:
+    """
+    Build agents with random poses on a map.
+    :param num_agents: Number of agents.
+    :param extent: [m] Side length of the square map, centered at the origin.
+    :param rng: Random generator.
+    :return: Agents with a center pose.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    positions = (rng.random((num_agents, 2)) - 0.5) * extent * 0.8
+    headings = rng.uniform(-np.pi, np.pi, num_agents)
+    agents = []
+    for (x, y), heading in zip(positions, headings):
+        agent = Mock(spec=AgentState)
+        agent.center = StateSE2(x, y, heading)
+        agents.append(agent)
+
+    return agents
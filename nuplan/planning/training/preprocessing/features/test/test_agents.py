@@ -1,3 +1,4 @@
+import pickle
 import unittest
 from typing import List
 
@@ -5,7 +6,7 @@ import numpy as np
 import numpy.typing as npt
 import torch
 
-from nuplan.planning.training.preprocessing.features.agents import Agents
+from nuplan.planning.training.preprocessing.features.agents import Agents, PaddedAgents
 
 
 class TestAgents(unittest.TestCase):
@@ -53,6 +54,51 @@ class TestAgents(unittest.TestCase):
         self.assertIsInstance(feature.ego[0], torch.Tensor)
         self.assertIsInstance(feature.agents[0], torch.Tensor)
 
+    def test_padded_agents(self) -> None:
+        """
+        Test collating agents with different numbers of agents into padded tensors
+        """
+        samples = [Agents(ego=[torch.rand(2, 3)], agents=[torch.rand(2, num_agents, 8)]) for num_agents in [2, 1, 3]]
+        feature = PaddedAgents.collate(samples)
+
+        self.assertEqual(feature.batch_size, 3)
+        self.assertEqual(feature.padded_ego.shape, (3, 2, 3))
+        self.assertEqual(feature.padded_agents.shape, (3, 2, 3, 8))
+        self.assertEqual(feature.num_agents.tolist(), [2, 1, 3])
+        self.assertEqual(feature.agents_mask.tolist(), [[True, True, False], [True, False, False], [True] * 3])
+        self.assertEqual(feature.padded_agents[0, :, 2].abs().sum(), 0.0)
+
+        # Per-sample views behave as the list based batch
+        reference = Agents.collate(samples)
+        for sample_idx in range(3):
+            torch.testing.assert_close(feature.ego[sample_idx], reference.ego[sample_idx])
+            torch.testing.assert_close(feature.agents[sample_idx], reference.agents[sample_idx])
+            torch.testing.assert_close(
+                feature.get_flatten_agents_features_in_sample(sample_idx),
+                reference.get_flatten_agents_features_in_sample(sample_idx),
+            )
+            self.assertEqual(feature.agents[sample_idx].data_ptr(), feature.padded_agents[sample_idx].data_ptr())
+
+        for moved_feature in [feature.to_device(torch.device('cpu')), pickle.loads(pickle.dumps(feature))]:
+            self.assertIsInstance(moved_feature, PaddedAgents)
+            torch.testing.assert_close(moved_feature.padded_agents, feature.padded_agents)
+            self.assertEqual(moved_feature.agents_mask.tolist(), feature.agents_mask.tolist())
+            self.assertEqual([agents.shape for agents in moved_feature.agents], [(2, 2, 8), (2, 1, 8), (2, 3, 8)])
+
+        unpacked = feature.unpack()
+        self.assertEqual(len(unpacked), 3)
+        torch.testing.assert_close(unpacked[2].agents[0], samples[2].agents[0])
+
+    @unittest.skipIf(not torch.cuda.is_available(), "Pinned memory requires CUDA")
+    def test_padded_agents_pin_memory(self) -> None:
+        """
+        Test allocating padded agents in pinned memory
+        """
+        feature = PaddedAgents.collate([Agents(ego=[torch.rand(2, 3)], agents=[torch.rand(2, 2, 8)])]).pin_memory()
+
+        self.assertTrue(feature.padded_agents.is_pinned())
+        self.assertTrue(feature.agents[0].is_pinned())
+
     def test_incorrect_dimension(self) -> None:
         """
         Test when inputs dimension are incorrect
@@ -0,0 +1,98 @@
+import unittest
+from typing import List
+
+import numpy as np
+
+from nuplan.common.actor_state.agent import Agent
+from nuplan.common.actor_state.oriented_box import OrientedBox
+from nuplan.common.actor_state.scene_object import SceneObjectMetadata
+from nuplan.common.actor_state.state_representation import StateSE2, StateVector2D
+from nuplan.common.actor_state.test.test_utils import get_sample_ego_state
+from nuplan.common.actor_state.tracked_objects import TrackedObjects
+from nuplan.common.actor_state.tracked_objects_types import TrackedObjectType
+from nuplan.planning.simulation.observation.observation_type import DetectionsTracks
+from nuplan.planning.training.preprocessing.features.raster_utils import (
+    get_agents_raster,
+    get_agents_raster_vectorized,
+)
+
+
+def _build_detections(boxes: List[OrientedBox]) -> DetectionsTracks:
+    """
+    Build detections of vehicles.
+    :param boxes: Boxes of the vehicles.
+    :return: Detections of the vehicles.
+    """
+    agents = [
+        Agent(
+            TrackedObjectType.VEHICLE,
+            box,
+            metadata=SceneObjectMetadata(timestamp_us=0, track_token=str(index), track_id=index, token=str(index)),
+            velocity=StateVector2D(0.0, 0.0),
+        )
+        for index, box in enumerate(boxes)
+    ]
+    return DetectionsTracks(TrackedObjects(agents))  # type: ignore
+
+
+def _build_random_detections(num_agents: int, rng: np.random.Generator) -> DetectionsTracks:
+    """
+    Build detections with randomly placed vehicles, many of them overlapping in crowded scenes.
+    :param num_agents: Number of vehicles.
+    :param rng: Random generator.
+    :return: Detections of the vehicles.
+    """
+    boxes = [
+        OrientedBox(
+            StateSE2(*rng.uniform(-70.0, 70.0, size=2), rng.uniform(-np.pi, np.pi)),
+            length=rng.uniform(0.5, 8.0),
+            width=rng.uniform(0.5, 3.0),
+            height=1.5,
+        )
+        for _ in range(num_agents)
+    ]
+    return _build_detections(boxes)
+
+
+class TestAgentsRaster(unittest.TestCase):
+    """Test the vectorized agents raster."""
+
+    def setUp(self) -> None:
+        """Set up the raster configuration."""
+        self.x_range = (-56.0, 56.0)
+        self.y_range = (-56.0, 56.0)
+        self.raster_shape = (224, 224)
+
+    def test_matches_reference(self) -> None:
+        """Test that the vectorized raster is identical to the reference raster."""
+        rng = np.random.default_rng(0)
+        for num_agents in [0, 1, 10, 300]:
+            detections = _build_random_detections(num_agents, rng)
+            ego_state = get_sample_ego_state(StateSE2(*rng.uniform(-5.0, 5.0, size=2), rng.uniform(-np.pi, np.pi)))
+
+            expected_raster = get_agents_raster(ego_state, detections, self.x_range, self.y_range, self.raster_shape)
+            raster = get_agents_raster_vectorized(ego_state, detections, self.x_range, self.y_range, self.raster_shape)
+
+            self.assertEqual(raster.dtype, np.float32)
+            self.assertTrue(raster.flags['C_CONTIGUOUS'])
+            np.testing.assert_array_equal(raster, expected_raster)
+
+    def test_overlapping_boxes(self) -> None:
+        """Test that overlapping boxes are filled completely."""
+        detections = _build_detections(
+            [
+                OrientedBox(StateSE2(10.0, 10.0, 0.0), length=8.0, width=4.0, height=1.5),
+                OrientedBox(StateSE2(12.0, 11.0, 0.3), length=8.0, width=4.0, height=1.5),
+            ]
+        )
+        ego_state = get_sample_ego_state(StateSE2(0.0, 0.0, 0.0))
+
+        raster = get_agents_raster_vectorized(ego_state, detections, self.x_range, self.y_range, self.raster_shape)
+        expected_raster = get_agents_raster(ego_state, detections, self.x_range, self.y_range, self.raster_shape)
+
+        self.assertGreater(raster.sum(), 0.0)
+        np.testing.assert_array_equal(raster, expected_raster)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+from nuplan.planning.training.preprocessing.features.map_raster_tiles import MapRasterTiles
+from nuplan.planning.training.preprocessing.features.raster_utils import get_roadmap_raster
+from nuplan.planning.training.preprocessing.features.test.map_raster_tiles_test_utils import (
+    MAP_FEATURES,
+    SyntheticRoadMap,
+    build_random_agents,
+)
+
+MAP_RASTER_TILES_MODULE = 'nuplan.planning.training.preprocessing.features.map_raster_tiles'
+
+
+def _edge_mask(raster: npt.NDArray[np.float32]) -> npt.NDArray[np.bool_]:
+    """
+    :param raster: Roadmap raster.
+    :return: Mask of the pixels within one pixel of an edge between map features.
+    """
+    kernel = np.ones((3, 3), dtype=np.uint8)
+    return cv2.dilate(raster, kernel) != cv2.erode(raster, kernel)  # type: ignore
+
+
+class TestMapRasterTiles(unittest.TestCase):
+    """Test cropping roadmap rasters from map raster tiles."""
+
+    def setUp(self) -> None:
+        """Set up a synthetic map and a raster configuration."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.map_api = SyntheticRoadMap(num_objects=200, extent=400.0, rng=np.random.default_rng(0))
+        self.agents = build_random_agents(num_agents=10, extent=400.0, rng=np.random.default_rng(1))
+        self.resolution = 0.5
+        self.raster_range = (-28.0, 28.0)
+        self.raster_shape = (112, 112)
+
+    def tearDown(self) -> None:
+        """Clean up temporary folder."""
+        self.tmp_dir.cleanup()
+
+    def _get_roadmap_rasters(self, map_raster_tiles: MapRasterTiles) -> npt.NDArray[np.float32]:
+        """
+        :param map_raster_tiles: Map raster tiles.
+        :return: <num_agents, height, width> roadmap rasters of all agents cropped from the tiles.
+        """
+        return np.stack(
+            [
+                map_raster_tiles.get_roadmap_raster(
+                    agent, self.map_api, self.raster_range, self.raster_range, self.raster_shape  # type: ignore
+                )
+                for agent in self.agents
+            ]
+        )
+
+    def test_matches_rasterization(self) -> None:
+        """Test that cropped rasters match the rasters of get_roadmap_raster except for pixels on edges."""
+        map_raster_tiles = MapRasterTiles(map_features=MAP_FEATURES, resolution=self.resolution, tile_size=64)
+
+        # The proximal map query of get_roadmap_raster does not cover the corners of rotated rasters, compare the
+        # inscribed circle of the raster only
+        radius_pixels = (self.raster_range[1] - self.raster_range[0]) / 2 / self.resolution
+        rows, cols = np.indices(self.raster_shape)
+        inscribed = (
+            np.hypot(cols - radius_pixels, rows - (self.raster_shape[0] - 1 - radius_pixels)) < radius_pixels - 1
+        )
+
+        for agent, raster in zip(self.agents, self._get_roadmap_rasters(map_raster_tiles)):
+            expected_raster = get_roadmap_raster(
+                agent,
+                self.map_api,  # type: ignore
+                MAP_FEATURES,
+                self.raster_range,
+                self.raster_range,
+                self.raster_shape,
+                self.resolution,
+            )
+            self.assertEqual(raster.shape, expected_raster.shape)
+            self.assertEqual(raster.dtype, np.float32)
+
+            # Away from the edges of map objects, the cropped rasters match exactly
+            compared = inscribed & ~_edge_mask(raster) & ~_edge_mask(expected_raster)
+            self.assertGreater(compared.sum(), inscribed.sum() / 2)
+            np.testing.assert_array_equal(raster[compared], expected_raster[compared])
+
+    def test_persisted_tiles(self) -> None:
+        """Test that persisted tiles are reused by another instance, also after pickling."""
+        cache_dir = Path(self.tmp_dir.name)
+        map_raster_tiles = MapRasterTiles(map_features=MAP_FEATURES, resolution=self.resolution, cache_dir=cache_dir)
+        tile_indices = map_raster_tiles.rasterize_map(self.map_api, (-50.0, -50.0, 50.0, 50.0))  # type: ignore
+        self.assertEqual(len(tile_indices), 4)
+        self.assertEqual(len(list(cache_dir.rglob('*.npy'))), 4)
+        rasters = self._get_roadmap_rasters(map_raster_tiles)
+
+        persisted_map_raster_tiles = pickle.loads(pickle.dumps(map_raster_tiles))
+        self.assertEqual(persisted_map_raster_tiles.num_tiles, 0)
+        np.testing.assert_array_equal(self._get_roadmap_rasters(persisted_map_raster_tiles), rasters)
+
+        # Tiles of other map features are rasterized separately
+        num_tiles = len(list(cache_dir.rglob('*.npy')))
+        other_map_raster_tiles = MapRasterTiles(
+            map_features={'LANE': 1.0}, resolution=self.resolution, cache_dir=cache_dir
+        )
+        other_map_raster_tiles.get_tile(self.map_api, tile_indices[0])  # type: ignore
+        self.assertEqual(len(list(cache_dir.rglob('*.npy'))), num_tiles + 1)
+
+    def test_tiles_of_other_map_version(self) -> None:
+        """Test that tiles of another version of a map are neither reused from memory nor from disk."""
+        cache_dir = Path(self.tmp_dir.name)
+        map_raster_tiles = MapRasterTiles(map_features=MAP_FEATURES, resolution=self.resolution, cache_dir=cache_dir)
+        with patch(f'{MAP_RASTER_TILES_MODULE}.get_map_version', return_value='1.0'):
+            map_raster_tiles.get_tile(self.map_api, (0, 0))  # type: ignore
+        with patch(f'{MAP_RASTER_TILES_MODULE}.get_map_version', return_value='2.0'):
+            map_raster_tiles.get_tile(self.map_api, (0, 0))  # type: ignore
+
+        self.assertEqual(map_raster_tiles.num_tiles, 2)
+        self.assertEqual(len(list(cache_dir.rglob('*.npy'))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import pickle
+import unittest
+from typing import List
+
+import torch
+
+from nuplan.planning.training.preprocessing.features.vector_map import PaddedVectorMap, VectorMap
+
+
+def _build_vector_map(num_segments: int, lane_lengths: List[int], num_connections: int) -> VectorMap:
+    """
+    Build a random vector map of a single sample.
+    :param num_segments: Number of lane segments.
+    :param lane_lengths: Number of segments of every lane.
+    :param num_connections: Number of connections per scale.
+    :return: Vector map feature.
+    """
+    return VectorMap(
+        coords=[torch.rand(num_segments, 2, 2)],
+        lane_groupings=[[torch.randint(num_segments, (length,)) for length in lane_lengths]],
+        multi_scale_connections=[{scale: torch.randint(num_segments, (num_connections, 2)) for scale in [1, 2]}],
+        on_route_status=[torch.rand(num_segments, 2)],
+        traffic_light_data=[torch.rand(num_segments, 4)],
+    )
+
+
+class TestPaddedVectorMap(unittest.TestCase):
+    """Test the padded batch representation of the vector map feature."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.samples = [
+            _build_vector_map(num_segments=5, lane_lengths=[2, 3], num_connections=4),
+            _build_vector_map(num_segments=3, lane_lengths=[], num_connections=0),
+            _build_vector_map(num_segments=7, lane_lengths=[1, 4, 2], num_connections=6),
+        ]
+
+    def _assert_same_samples(self, feature: VectorMap, reference: VectorMap) -> None:
+        """
+        Assert that two batches hold the same samples.
+        :param feature: Batch to check.
+        :param reference: Reference batch.
+        """
+        self.assertEqual(feature.num_of_batches, reference.num_of_batches)
+        for sample_idx in range(reference.num_of_batches):
+            torch.testing.assert_close(feature.coords[sample_idx], reference.coords[sample_idx])
+            torch.testing.assert_close(feature.on_route_status[sample_idx], reference.on_route_status[sample_idx])
+            torch.testing.assert_close(feature.traffic_light_data[sample_idx], reference.traffic_light_data[sample_idx])
+            self.assertEqual(feature.num_lanes_in_sample(sample_idx), reference.num_lanes_in_sample(sample_idx))
+            for lane, reference_lane in zip(feature.lane_groupings[sample_idx], reference.lane_groupings[sample_idx]):
+                torch.testing.assert_close(lane, reference_lane)
+            for scale, connections in reference.multi_scale_connections[sample_idx].items():
+                torch.testing.assert_close(feature.multi_scale_connections[sample_idx][scale], connections)
+
+    def test_collate(self) -> None:
+        """Test that the padded batch holds the same samples as the list based batch."""
+        feature = PaddedVectorMap.collate(self.samples)
+
+        self.assertEqual(feature.padded_coords.shape, (3, 7, 2, 2))
+        self.assertEqual(feature.padded_traffic_light_data.shape, (3, 7, 4))
+        self.assertEqual(feature.num_segments.tolist(), [5, 3, 7])
+        self.assertEqual(feature.segments_mask.sum(dim=1).tolist(), [5, 3, 7])
+        self.assertEqual(feature.lane_offsets.tolist(), [0, 2, 5, 6, 10, 12])
+        self.assertEqual(feature.lane_sample_offsets.tolist(), [0, 2, 2, 5])
+        self.assertEqual(feature.connection_offsets[1].tolist(), [0, 4, 4, 10])
+        self.assertEqual(feature.padded_coords[1, 3:].abs().sum(), 0.0)
+        self._assert_same_samples(feature, VectorMap.collate(self.samples))
+
+    def test_views(self) -> None:
+        """Test that the per-sample tensors are views into the padded tensors."""
+        feature = PaddedVectorMap.collate(self.samples)
+
+        self.assertEqual(feature.coords[2].data_ptr(), feature.padded_coords[2].data_ptr())
+        first_lane_start = int(feature.lane_offsets[feature.lane_sample_offsets[2]])
+        self.assertEqual(
+            feature.lane_groupings[2][0].data_ptr(), feature.lane_segment_indices[first_lane_start:].data_ptr()
+        )
+
+    def test_to_device_and_pickle(self) -> None:
+        """Test that moving and pickling a padded batch keeps its samples and representation."""
+        feature = PaddedVectorMap.collate(self.samples)
+
+        for moved_feature in [feature.to_device(torch.device('cpu')), pickle.loads(pickle.dumps(feature))]:
+            self.assertIsInstance(moved_feature, PaddedVectorMap)
+            self._assert_same_samples(moved_feature, feature)
+
+    def test_unpack(self) -> None:
+        """Test unpacking a padded batch into samples."""
+        unpacked = PaddedVectorMap.collate(self.samples).unpack()
+
+        self.assertEqual(len(unpacked), 3)
+        for sample, reference in zip(unpacked, self.samples):
+            self._assert_same_samples(sample, reference)
+
+    @unittest.skipIf(not torch.cuda.is_available(), "Pinned memory requires CUDA")
+    def test_pin_memory(self) -> None:
+        """Test allocating a padded batch in pinned memory."""
+        feature = PaddedVectorMap.collate(self.samples).pin_memory()
+
+        self.assertTrue(feature.padded_coords.is_pinned())
+        self.assertTrue(feature.connections[1].is_pinned())
+        self.assertFalse(feature.lane_offsets.is_pinned())
+
+
+if __name__ == '__main__':
+    unittest.main()
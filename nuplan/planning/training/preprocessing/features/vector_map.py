@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 import numpy as np
 import torch
@@ -289,3 +289,195 @@ class VectorMap(AbstractModelFeature):
         """
         lane_grouping = self.lane_groupings[sample_idx][lane_idx]
         return self.coords[sample_idx][lane_grouping, 0]
+
+
+class PaddedVectorMap(VectorMap):
+    """
+    Vector map feature of a batch, held in padded and concatenated tensors instead of lists of per-sample tensors.
+
+    The per-segment data is zero padded to the largest number of lane segments in the batch:
+        padded_coords: <torch.Tensor: batch_size, max_num_lane_segments, 2, 2>.
+        padded_on_route_status: <torch.Tensor: batch_size, max_num_lane_segments, 2>.
+        padded_traffic_light_data: <torch.Tensor: batch_size, max_num_lane_segments, 4>.
+        segments_mask: <torch.Tensor: batch_size, max_num_lane_segments>. True for lane segments, False for padding.
+        num_segments: <torch.Tensor: batch_size>. Number of lane segments of every sample.
+    The variable sized data is concatenated over the batch and indexed by offset arrays:
+        lane_segment_indices: <torch.Tensor: total_num_lane_segments_in_lanes>. Segment indices of all lanes.
+        lane_offsets: <torch.Tensor: total_num_lanes + 1>. Start of every lane in lane_segment_indices.
+        lane_sample_offsets: <torch.Tensor: batch_size + 1>. Index of the first lane of every sample.
+        connections: Dict of {scale: <torch.Tensor: total_num_connections, 2>}. Connections of all samples.
+        connection_offsets: Dict of {scale: <torch.Tensor: batch_size + 1>}. Start of every sample in connections.
+    Counts and offsets are always kept on the host. Indices are local to their sample, as in VectorMap.
+
+    The per-sample lists of VectorMap are views into these tensors, so that models written for VectorMap work
+    unchanged. Moving the batch to a device or into pinned memory copies a single tensor per field.
+    """
+
+    def __init__(
+        self,
+        padded_coords: torch.Tensor,
+        padded_on_route_status: torch.Tensor,
+        padded_traffic_light_data: torch.Tensor,
+        num_segments: torch.Tensor,
+        lane_segment_indices: torch.Tensor,
+        lane_offsets: torch.Tensor,
+        lane_sample_offsets: torch.Tensor,
+        connections: Dict[int, torch.Tensor],
+        connection_offsets: Dict[int, torch.Tensor],
+        segments_mask: Optional[torch.Tensor] = None,
+    ) -> None:
+        """
+        :param padded_coords: Padded lane segment coordinates, see class description.
+        :param padded_on_route_status: Padded on route status, see class description.
+        :param padded_traffic_light_data: Padded traffic light data, see class description.
+        :param num_segments: Number of lane segments of every sample.
+        :param lane_segment_indices: Concatenated segment indices of all lanes.
+        :param lane_offsets: Start of every lane in lane_segment_indices, followed by the total length.
+        :param lane_sample_offsets: Index of the first lane of every sample, followed by the total number of lanes.
+        :param connections: Concatenated connections of all samples, by scale.
+        :param connection_offsets: Start of every sample in connections followed by their total number, by scale.
+        :param segments_mask: Validity mask of the padded lane segments, computed if None.
+        """
+        self.padded_coords = padded_coords
+        self.padded_on_route_status = padded_on_route_status
+        self.padded_traffic_light_data = padded_traffic_light_data
+        self.num_segments = num_segments
+        self.lane_segment_indices = lane_segment_indices
+        self.lane_offsets = lane_offsets
+        self.lane_sample_offsets = lane_sample_offsets
+        self.connections = connections
+        self.connection_offsets = connection_offsets
+        if segments_mask is None:
+            segment_indices = torch.arange(padded_coords.shape[1], device=num_segments.device)
+            segments_mask = segment_indices.unsqueeze(0) < num_segments.unsqueeze(1)
+        self.segments_mask = segments_mask
+
+        num_segments_list = num_segments.tolist()
+        lane_offsets_list = lane_offsets.tolist()
+        lane_sample_offsets_list = lane_sample_offsets.tolist()
+        connection_offsets_lists = {scale: offsets.tolist() for scale, offsets in connection_offsets.items()}
+        lanes = [lane_segment_indices[start:end] for start, end in zip(lane_offsets_list[:-1], lane_offsets_list[1:])]
+
+        super().__init__(
+            coords=[coords[:num] for coords, num in zip(padded_coords.unbind(0), num_segments_list)],
+            lane_groupings=[
+                lanes[start:end] for start, end in zip(lane_sample_offsets_list[:-1], lane_sample_offsets_list[1:])
+            ],
+            multi_scale_connections=[
+                {
+                    scale: connections[scale][offsets[sample_idx] : offsets[sample_idx + 1]]
+                    for scale, offsets in connection_offsets_lists.items()
+                }
+                for sample_idx in range(len(num_segments_list))
+            ],
+            on_route_status=[status[:num] for status, num in zip(padded_on_route_status.unbind(0), num_segments_list)],
+            traffic_light_data=[
+                data[:num] for data, num in zip(padded_traffic_light_data.unbind(0), num_segments_list)
+            ],
+        )
+
+    @staticmethod
+    def _pad(samples: List[torch.Tensor]) -> torch.Tensor:
+        """
+        Zero pad per-sample tensors along their first dimension and stack them.
+        :param samples: <num_i, ...> tensors of every sample.
+        :return: <batch_size, max_num, ...> padded tensor.
+        """
+        return torch.nn.utils.rnn.pad_sequence(samples, batch_first=True)
+
+    @staticmethod
+    def _offsets(counts: List[int]) -> torch.Tensor:
+        """
+        :param counts: Number of elements of every group.
+        :return: <num_groups + 1> start of every group in the concatenation, followed by the total number.
+        """
+        return torch.tensor([0] + counts, dtype=torch.int64).cumsum(0)
+
+    @classmethod
+    def collate(cls, batch: List[VectorMap]) -> PaddedVectorMap:
+        """
+        Collates a list of features into padded and concatenated tensors.
+        :param batch: Features to be batched.
+        :return: Padded batch.
+        """
+        coords = [to_tensor(data) for sample in batch for data in sample.coords]
+        lane_groupings = [[to_tensor(lane) for lane in lanes] for sample in batch for lanes in sample.lane_groupings]
+        multi_scale_connections = [data for sample in batch for data in sample.multi_scale_connections]
+        scales = list(multi_scale_connections[0].keys())
+        assert all(
+            list(connections.keys()) == scales for connections in multi_scale_connections
+        ), "All samples must have connections of the same scales"
+
+        lanes = [lane.to(torch.int64) for lanes in lane_groupings for lane in lanes]
+        return PaddedVectorMap(
+            padded_coords=cls._pad(coords),
+            padded_on_route_status=cls._pad([to_tensor(data) for sample in batch for data in sample.on_route_status]),
+            padded_traffic_light_data=cls._pad(
+                [to_tensor(data) for sample in batch for data in sample.traffic_light_data]
+            ),
+            num_segments=torch.tensor([len(data) for data in coords], dtype=torch.int64),
+            lane_segment_indices=torch.cat(lanes) if lanes else torch.zeros(0, dtype=torch.int64),
+            lane_offsets=cls._offsets([len(lane) for lane in lanes]),
+            lane_sample_offsets=cls._offsets([len(lanes) for lanes in lane_groupings]),
+            connections={
+                scale: torch.cat([to_tensor(connections[scale]) for connections in multi_scale_connections])
+                for scale in scales
+            },
+            connection_offsets={
+                scale: cls._offsets([len(connections[scale]) for connections in multi_scale_connections])
+                for scale in scales
+            },
+        )
+
+    def to_feature_tensor(self) -> PaddedVectorMap:
+        """Implemented. See interface."""
+        return self
+
+    def _map_tensors(self, fn: Callable[[torch.Tensor], torch.Tensor]) -> PaddedVectorMap:
+        """
+        Apply a function to all tensors of the batch, except for counts and offsets which stay on the host.
+        :param fn: Function that maps a tensor, e.g. moves it to a device.
+        :return: Batch of mapped tensors.
+        """
+        return PaddedVectorMap(
+            padded_coords=fn(self.padded_coords),
+            padded_on_route_status=fn(self.padded_on_route_status),
+            padded_traffic_light_data=fn(self.padded_traffic_light_data),
+            num_segments=self.num_segments,
+            lane_segment_indices=fn(self.lane_segment_indices),
+            lane_offsets=self.lane_offsets,
+            lane_sample_offsets=self.lane_sample_offsets,
+            connections={scale: fn(connections) for scale, connections in self.connections.items()},
+            connection_offsets=self.connection_offsets,
+            segments_mask=fn(self.segments_mask),
+        )
+
+    def to_device(self, device: torch.device) -> PaddedVectorMap:
+        """Implemented. See interface."""
+        non_blocking = self.padded_coords.is_pinned()
+        return self._map_tensors(lambda tensor: tensor.to(device=device, non_blocking=non_blocking))
+
+    def pin_memory(self) -> PaddedVectorMap:
+        """
+        Called by the data loader if pin_memory is enabled.
+        :return: Batch allocated in page-locked memory, for faster and asynchronous host-to-device transfer.
+        """
+        return self._map_tensors(lambda tensor: tensor.pin_memory())
+
+    def __reduce__(self) -> Any:
+        """
+        Pickle the padded and concatenated tensors only, the per-sample views are rebuilt when unpickling.
+        :return: Constructor and its arguments.
+        """
+        return PaddedVectorMap, (
+            self.padded_coords,
+            self.padded_on_route_status,
+            self.padded_traffic_light_data,
+            self.num_segments,
+            self.lane_segment_indices,
+            self.lane_offsets,
+            self.lane_sample_offsets,
+            self.connections,
+            self.connection_offsets,
+            self.segments_mask,
+        )
@@ -4,6 +4,7 @@ import torch
 
 from nuplan.planning.training.modeling.types import FeaturesType
 from nuplan.planning.training.preprocessing.feature_collate import FeatureCollate
+from nuplan.planning.training.preprocessing.features.agents import Agents, PaddedAgents
 from nuplan.planning.training.preprocessing.features.raster import Raster
 from nuplan.planning.training.preprocessing.features.trajectory import Trajectory
 from nuplan.planning.training.preprocessing.test.dummy_vectormap_builder import DummyVectorMapFeature
@@ -92,6 +93,32 @@ class TestCollate(unittest.TestCase):
         self.assertEqual(features["DummyVectorMapFeature"].num_of_batches, 3)
         self.assertEqual(targets["Trajectory"].data.shape, (3, 12, 3))
 
+    def test_padded_collate(self) -> None:
+        """
+        Test collating features into padded batches
+        """
+        to_be_batched = [
+            (
+                {
+                    "Agents": Agents(ego=[torch.zeros((5, 3))], agents=[torch.zeros((5, num_agents, 8))]),
+                    "Trajectory": Trajectory(data=torch.zeros((12, 3))),
+                },
+                {"Trajectory": Trajectory(data=torch.zeros((12, 3)))},
+            )
+            for num_agents in [2, 4]
+        ]
+
+        features, targets = FeatureCollate()(to_be_batched)
+        self.assertNotIsInstance(features["Agents"], PaddedAgents)
+
+        features, targets = FeatureCollate(padded=True)(to_be_batched)
+        agents: PaddedAgents = features["Agents"]
+        self.assertIsInstance(agents, PaddedAgents)
+        self.assertEqual(agents.padded_agents.shape, (2, 5, 4, 8))
+        self.assertEqual(agents.num_agents_in_sample(0), 2)
+        self.assertEqual(features["Trajectory"].data.shape, (2, 12, 3))
+        self.assertEqual(targets["Trajectory"].data.shape, (2, 12, 3))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -12,7 +12,10 @@ from nuplan.planning.metrics.utils.state_extractors import approximate_derivativ
 from nuplan.planning.training.preprocessing.features.abstract_model_feature import FeatureDataType
 from nuplan.planning.training.preprocessing.features.agents import AgentFeatureIndex, EgoFeatureIndex
 from nuplan.planning.training.preprocessing.features.trajectory_utils import convert_absolute_to_relative_poses
-from nuplan.planning.training.preprocessing.utils.torch_geometry import global_state_se2_tensor_to_local
+from nuplan.planning.training.preprocessing.utils.torch_geometry import (
+    global_state_se2_tensor_to_local,
+    global_state_se2_tensor_to_local_batched,
+)
 from nuplan.planning.training.preprocessing.utils.torch_math import approximate_derivatives_tensor
 
 
@@ -743,3 +746,166 @@ def pack_agents_tensor(padded_agents_tensors: List[torch.Tensor], yaw_rates: tor
         ].squeeze()
 
     return agents_tensor
+
+
+def sampled_tracked_objects_to_array(past_tracked_objects: List[TrackedObjects]) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Tensorizes the vehicles of the provided past detections into a single columnar tensor.
+    Track tokens are remapped to integer columns in the order the vehicles appear in the last (present) detection,
+    and only vehicles present in the last detection are kept, as filter_agents_tensor(reverse=True) does.
+    :param past_tracked_objects: The tracked objects to tensorize, the last one being the present detection.
+    :return:
+        agent_states: <num_frames, num_agents, AgentInternalIndex.dim()> agent states, zero where unavailable.
+        availability: <num_frames, num_agents> True where the agent is present in a frame.
+    """
+    num_frames = len(past_tracked_objects)
+    present_agents = past_tracked_objects[-1].get_tracked_objects_of_type(TrackedObjectType.VEHICLE)
+    track_token_ids = {agent.track_token: idx for idx, agent in enumerate(present_agents)}
+
+    frame_indices: List[int] = []
+    agent_indices: List[int] = []
+    rows: List[Tuple[float, float, float, float, float, float, float]] = []
+    for frame_idx, tracked_objects in enumerate(past_tracked_objects):
+        for agent in tracked_objects.get_tracked_objects_of_type(TrackedObjectType.VEHICLE):
+            agent_idx = track_token_ids.get(agent.track_token)
+            if agent_idx is None:
+                continue
+            frame_indices.append(frame_idx)
+            agent_indices.append(agent_idx)
+            rows.append(
+                (
+                    agent.velocity.x,
+                    agent.velocity.y,
+                    agent.center.heading,
+                    agent.box.width,
+                    agent.box.length,
+                    agent.center.x,
+                    agent.center.y,
+                )
+            )
+
+    agent_states = torch.zeros((num_frames, len(track_token_ids), AgentInternalIndex.dim()), dtype=torch.float32)
+    availability = torch.zeros((num_frames, len(track_token_ids)), dtype=torch.bool)
+    if rows:
+        frames = torch.tensor(frame_indices, dtype=torch.int64)
+        agents = torch.tensor(agent_indices, dtype=torch.int64)
+        columns = torch.tensor(
+            [
+                AgentInternalIndex.vx(),
+                AgentInternalIndex.vy(),
+                AgentInternalIndex.heading(),
+                AgentInternalIndex.width(),
+                AgentInternalIndex.length(),
+                AgentInternalIndex.x(),
+                AgentInternalIndex.y(),
+            ],
+            dtype=torch.int64,
+        )
+        agent_states[frames, agents, AgentInternalIndex.track_token()] = agents.float()
+        agent_states[frames.unsqueeze(1), agents.unsqueeze(1), columns] = torch.tensor(rows, dtype=torch.float32)
+        availability[frames, agents] = True
+
+    return agent_states, availability
+
+
+def pad_agent_states_array(agent_states: torch.Tensor, availability: torch.Tensor) -> torch.Tensor:
+    """
+    Pads the columnar agent states with the closest available future state, like pad_agent_states(reverse=True).
+    :param agent_states: <num_frames, num_agents, AgentInternalIndex.dim()> agent states.
+    :param availability: <num_frames, num_agents> True where the agent is present in a frame.
+        Every agent has to be present in the last frame.
+    :return: <num_frames, num_agents, AgentInternalIndex.dim()> padded agent states.
+    """
+    if agent_states.shape[:2] != availability.shape or agent_states.shape[2] != AgentInternalIndex.dim():
+        raise ValueError(f"Unexpected agent states shape: {agent_states.shape}, availability: {availability.shape}")
+    if not bool(availability[-1].all()):
+        raise ValueError("All agents have to be present in the last frame.")
+
+    num_frames = agent_states.shape[0]
+    frame_indices = torch.arange(num_frames, dtype=torch.int64).unsqueeze(1).expand_as(availability)
+    # Index of the closest frame at or after each frame in which the agent is available
+    source_frames = torch.where(availability, frame_indices, torch.full_like(frame_indices, num_frames))
+    source_frames = torch.flip(torch.cummin(torch.flip(source_frames, dims=[0]), dim=0).values, dims=[0])
+    agent_indices = torch.arange(agent_states.shape[1], dtype=torch.int64).unsqueeze(0).expand_as(availability)
+
+    return agent_states[source_frames, agent_indices]
+
+
+def convert_absolute_quantities_to_relative_array(agent_states: torch.Tensor, ego_state: torch.Tensor) -> torch.Tensor:
+    """
+    Converts the agents' poses and relative velocities of all frames from absolute to ego-relative coordinates,
+        like convert_absolute_quantities_to_relative.
+    :param agent_states: <num_frames, num_agents, AgentInternalIndex.dim()> agent states.
+    :param ego_state: The ego state to convert, in the EgoInternalIndex schema.
+    :return: The converted states, in AgentInternalIndex schema.
+    """
+    _validate_ego_internal_shape(ego_state, expected_first_dim=1)
+
+    ego_pose = ego_state[[EgoInternalIndex.x(), EgoInternalIndex.y(), EgoInternalIndex.heading()]].double()
+    ego_velocity = ego_state[[EgoInternalIndex.vx(), EgoInternalIndex.vy(), EgoInternalIndex.heading()]].double()
+
+    agent_global_poses = agent_states[
+        ..., [AgentInternalIndex.x(), AgentInternalIndex.y(), AgentInternalIndex.heading()]
+    ].double()
+    agent_global_velocities = agent_states[
+        ..., [AgentInternalIndex.vx(), AgentInternalIndex.vy(), AgentInternalIndex.heading()]
+    ].double()
+
+    transformed_poses = global_state_se2_tensor_to_local_batched(agent_global_poses, ego_pose)
+    transformed_velocities = global_state_se2_tensor_to_local_batched(agent_global_velocities, ego_velocity)
+
+    output = agent_states.clone()
+    output[..., AgentInternalIndex.x()] = transformed_poses[..., 0].float()
+    output[..., AgentInternalIndex.y()] = transformed_poses[..., 1].float()
+    output[..., AgentInternalIndex.heading()] = transformed_poses[..., 2].float()
+    output[..., AgentInternalIndex.vx()] = transformed_velocities[..., 0].float()
+    output[..., AgentInternalIndex.vy()] = transformed_velocities[..., 1].float()
+
+    return output
+
+
+def compute_yaw_rate_from_state_array(agent_states: torch.Tensor, time_stamps: torch.Tensor) -> torch.Tensor:
+    """
+    Computes the yaw rate of all agents over the trajectory from heading, like compute_yaw_rate_from_state_tensors.
+    :param agent_states: <num_frames, num_agents, AgentInternalIndex.dim()> agent states.
+    :param time_stamps: The time stamps of each frame.
+    :return: <torch.Tensor: num_frames, num_agents> of yaw rates
+    """
+    if len(time_stamps.shape) != 1:
+        raise ValueError(f"Unexpected timestamps shape: {time_stamps.shape}")
+
+    # Shift the min timestamp to 0 to avoid loss of precision
+    time_stamps_s = (time_stamps - int(torch.min(time_stamps).item())).float() * 1e-6
+    yaws = agent_states[..., AgentInternalIndex.heading()].transpose(0, 1)
+    yaw_rate_horizon = approximate_derivatives_tensor(yaws, time_stamps_s, window_length=3)
+
+    return yaw_rate_horizon.transpose(0, 1)
+
+
+def pack_agents_array(agent_states: torch.Tensor, yaw_rates: torch.Tensor) -> torch.Tensor:
+    """
+    Combines the local padded agents states and the computed yaw rates into the final output feature tensor,
+        like pack_agents_tensor.
+    :param agent_states: <num_frames, num_agents, AgentInternalIndex.dim()> local padded agent states.
+    :param yaw_rates: <num_frames, num_agents> yaw rates.
+    :return: The final feature, a tensor of shape [num_frames, num_agents, AgentFeatureIndex.dim()].
+    """
+    if yaw_rates.shape != agent_states.shape[:2]:
+        raise ValueError(f"Unexpected yaw_rates tensor shape: {yaw_rates.shape}")
+
+    agents_tensor = torch.zeros((agent_states.shape[0], agent_states.shape[1], AgentFeatureIndex.dim()))
+    feature_to_internal_index = [
+        (AgentFeatureIndex.x(), AgentInternalIndex.x()),
+        (AgentFeatureIndex.y(), AgentInternalIndex.y()),
+        (AgentFeatureIndex.heading(), AgentInternalIndex.heading()),
+        (AgentFeatureIndex.vx(), AgentInternalIndex.vx()),
+        (AgentFeatureIndex.vy(), AgentInternalIndex.vy()),
+        (AgentFeatureIndex.width(), AgentInternalIndex.width()),
+        (AgentFeatureIndex.length(), AgentInternalIndex.length()),
+    ]
+    feature_indices = [feature_idx for feature_idx, _ in feature_to_internal_index]
+    internal_indices = [internal_idx for _, internal_idx in feature_to_internal_index]
+    agents_tensor[..., feature_indices] = agent_states[..., internal_indices]
+    agents_tensor[..., AgentFeatureIndex.yaw_rate()] = yaw_rates
+
+    return agents_tensor
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import time
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional
+
+import torch
+import torch.utils.data
+
+# Stages of a training sample, in pipeline order. Feature and target builders add one stage each, see
+# get_feature_builder_stage_name. Scenarios load their data lazily, such that database queries are timed in the
+# stages of the builders issuing them.
+AUGMENTATION_STAGE = 'augmentation'
+COLLATE_STAGE = 'collate'
+HOST_TO_DEVICE_STAGE = 'host_to_device'
+FORWARD_STAGE = 'forward'
+OBJECTIVES_STAGE = 'objectives'
+METRICS_STAGE = 'metrics'
+
+# Stages run in the training process, all other stages run in the dataloader workers
+TRAINING_STEP_STAGES = [HOST_TO_DEVICE_STAGE, FORWARD_STAGE, OBJECTIVES_STAGE, METRICS_STAGE]
+
+# Dataloaders whose workers write to separate rows of the timings, see StageProfiler.get_worker_init_fn
+PROFILED_DATALOADERS = ['train', 'val', 'test']
+
+# Index in PROFILED_DATALOADERS of the dataloader the current worker process belongs to, None outside of workers
+_worker_dataloader_index: Optional[int] = None
+
+
+def _set_worker_dataloader_index(dataloader_index: int, worker_id: int) -> None:
+    """
+    Record the dataloader of the current worker process, run by the worker on startup.
+    :param dataloader_index: Index of the dataloader in PROFILED_DATALOADERS.
+    :param worker_id: Id of the worker in its dataloader.
+    """
+    global _worker_dataloader_index
+    _worker_dataloader_index = dataloader_index
+
+
+def get_feature_builder_stage_name(feature_unique_name: str) -> str:
+    """
+    :param feature_unique_name: Unique name of the feature computed by a feature or target builder.
+    :return: Name of the stage computing or loading the feature.
+    """
+    return f'builder/{feature_unique_name}'
+
+
+@dataclass(frozen=True)
+class StageStatistics:
+    """Accumulated running time of a stage."""
+
+    name: str  # Name of the stage
+    total_time: float  # [s] Summed running time of the stage over all processes of all ranks
+    num_calls: int  # Number of times the stage was run
+    in_dataloader: bool  # Whether the stage runs in the dataloader workers
+
+    @property
+    def mean_time(self) -> float:
+        """
+        :return: [s] Mean running time per call.
+        """
+        return self.total_time / self.num_calls if self.num_calls else 0.0
+
+
+class StageProfiler:
+    """
+    Accumulates the running time of the stages of the training pipeline, from loading scenarios in the dataloader
+    workers to the forward pass and the objectives in the training process.
+    The timings are accumulated in a tensor in shared memory with one row per process, so dataloader workers, which
+    each get a copy of the profiler, write their timings where the training process reads them without any locking.
+    Every dataloader has its own block of rows, such that the workers of different dataloaders never share a row.
+    In distributed training, every rank accumulates its own timings, which are summed with reduce_across_ranks.
+    """
+
+    def __init__(self, stage_names: List[str], num_workers: int, synchronize_device: bool = False) -> None:
+        """
+        :param stage_names: Names of all stages that are timed.
+        :param num_workers: Number of dataloader workers.
+        :param synchronize_device: Whether to wait for pending CUDA kernels before and after timing a stage in the
+            training process. Otherwise stages on GPU are timed by their asynchronous launch time only.
+        """
+        assert len(set(stage_names)) == len(stage_names), f"Stage names have to be unique, got {stage_names}!"
+        assert num_workers >= 0, f"Number of workers has to be non-negative, got {num_workers}!"
+
+        self._stage_indices = {name: index for index, name in enumerate(stage_names)}
+        self._num_workers = num_workers
+        self._synchronize_device = synchronize_device and torch.cuda.is_available()
+
+        # Total time and number of calls per process and stage. Row 0 is the training process, followed by a block of
+        # num_workers rows for each dataloader in PROFILED_DATALOADERS
+        num_rows = 1 + len(PROFILED_DATALOADERS) * num_workers
+        self._timings = torch.zeros(num_rows, len(stage_names), 2, dtype=torch.float64).share_memory_()
+
+        # Total time and number of calls per stage summed over all ranks, None until reduced
+        self._reduced_timings: Optional[torch.Tensor] = None
+        self._num_ranks = 1
+
+    @property
+    def stage_names(self) -> List[str]:
+        """
+        :return: Names of all timed stages.
+        """
+        return list(self._stage_indices)
+
+    @staticmethod
+    def get_worker_init_fn(dataloader_name: str) -> Callable[[int], None]:
+        """
+        :param dataloader_name: Name of the dataloader, one of PROFILED_DATALOADERS.
+        :return: Worker init function of the dataloader, which selects the block of rows its workers write to.
+        """
+        assert (
+            dataloader_name in PROFILED_DATALOADERS
+        ), f"Unknown dataloader: {dataloader_name}, expected one of {PROFILED_DATALOADERS}!"
+        return functools.partial(_set_worker_dataloader_index, PROFILED_DATALOADERS.index(dataloader_name))
+
+    def _get_process_row(self) -> int:
+        """
+        :return: Row of the timings that is written by the current process.
+        """
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is None:
+            return 0
+
+        assert (
+            worker_info.id < self._num_workers
+        ), f"Profiler was created for {self._num_workers} dataloader workers, got worker {worker_info.id}!"
+        assert (
+            _worker_dataloader_index is not None
+        ), "Dataloader workers have to be initialized with StageProfiler.get_worker_init_fn!"
+        return 1 + _worker_dataloader_index * self._num_workers + worker_info.id
+
+    def add(self, name: str, duration: float) -> None:
+        """
+        Add a run of a stage.
+        :param name: Name of the stage.
+        :param duration: [s] Running time of the stage.
+        """
+        assert name in self._stage_indices, f"Unknown stage: {name}, expected one of {self.stage_names}!"
+
+        timings = self._timings[self._get_process_row(), self._stage_indices[name]]
+        timings[0] += duration
+        timings[1] += 1
+
+    @contextlib.contextmanager
+    def time_stage(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed code as a run of a stage.
+        :param name: Name of the stage.
+        """
+        synchronize = self._synchronize_device and torch.utils.data.get_worker_info() is None
+        if synchronize:
+            torch.cuda.synchronize()
+
+        start_time = time.perf_counter()
+        yield
+        if synchronize:
+            torch.cuda.synchronize()
+        self.add(name, time.perf_counter() - start_time)
+
+    def reset(self) -> None:
+        """Clear the timings of all processes."""
+        self._timings.zero_()
+        self._reduced_timings = None
+        self._num_ranks = 1
+
+    def reduce_across_ranks(self, device: torch.device) -> None:
+        """
+        Sum the timings of all distributed ranks, such that statistics and reports cover all ranks until the next reset.
+        It has to be called by every rank, and does nothing without distributed training.
+        :param device: Device the rank communicates from, e.g. its GPU with the NCCL backend.
+        """
+        if not (torch.distributed.is_available() and torch.distributed.is_initialized()):
+            return
+
+        timings = self._timings.sum(dim=0).to(device)
+        torch.distributed.all_reduce(timings)
+        self._reduced_timings = timings.cpu()
+        self._num_ranks = torch.distributed.get_world_size()
+
+    def get_statistics(self) -> List[StageStatistics]:
+        """
+        :return: Accumulated statistics of every stage that was run, ranked by total running time.
+        """
+        timings = self._reduced_timings if self._reduced_timings is not None else self._timings.sum(dim=0)
+        statistics = [
+            StageStatistics(
+                name=name,
+                total_time=float(timings[index, 0]),
+                num_calls=int(timings[index, 1]),
+                in_dataloader=name not in TRAINING_STEP_STAGES,
+            )
+            for name, index in self._stage_indices.items()
+            if timings[index, 1] > 0
+        ]
+
+        return sorted(statistics, key=lambda stage: stage.total_time, reverse=True)
+
+    def summarize(self) -> str:
+        """
+        Build a report of the stages ranked by their running time. Dataloader stages run in parallel over all workers
+        and training step stages over all ranks, so running times are divided by the number of parallel processes to
+        compare them.
+        :return: Report of the stage bottlenecks.
+        """
+        statistics = self.get_statistics()
+        if not statistics:
+            return 'No stages were timed'
+
+        num_parallel = max(self._num_workers, 1) * self._num_ranks
+        dataloader_time = sum(stage.total_time for stage in statistics if stage.in_dataloader) / num_parallel
+        training_time = sum(stage.total_time for stage in statistics if not stage.in_dataloader) / self._num_ranks
+
+        lines = [
+            f"Stages summed over {self._num_ranks} rank(s):",
+            f"{'rank':>4}  {'stage':<40} {'process':<10} {'calls':>8} {'total [s]':>10} {'mean [ms]':>10}",
+        ]
+        for rank, stage in enumerate(statistics, start=1):
+            process = 'dataloader' if stage.in_dataloader else 'training'
+            lines.append(
+                f"{rank:>4}  {stage.name:<40} {process:<10} {stage.num_calls:>8} "
+                f"{stage.total_time:>10.3f} {1000.0 * stage.mean_time:>10.3f}"
+            )
+
+        bottleneck = 'dataloader' if dataloader_time > training_time else 'training step'
+        lines.append(
+            f"Dataloader time per worker: {dataloader_time:.3f} s ({num_parallel} workers), "
+            f"training process time per rank: {training_time:.3f} s, bottleneck: {bottleneck}"
+        )
+
+        return '\n'.join(lines)
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        :return: Total running time of every stage that was run, keyed by stage name.
+        """
+        return {stage.name: stage.total_time for stage in self.get_statistics()}
+
+
+def time_stage(profiler: Optional[StageProfiler], name: str) -> ContextManager[None]:
+    """
+    Time the enclosed code as a run of a stage, if profiling is enabled.
+    :param profiler: Profiler to accumulate the running time in, None if profiling is disabled.
+    :param name: Name of the stage.
+    :return: Context manager timing the stage.
+    """
+    return profiler.time_stage(name) if profiler is not None else contextlib.nullcontext()
@@ -21,18 +21,23 @@ from nuplan.planning.training.preprocessing.utils.agents_preprocessing import (
     EgoInternalIndex,
     build_ego_features,
     build_ego_features_from_tensor,
+    compute_yaw_rate_from_state_array,
     compute_yaw_rate_from_state_tensors,
     compute_yaw_rate_from_states,
     convert_absolute_quantities_to_relative,
+    convert_absolute_quantities_to_relative_array,
     extract_and_pad_agent_poses,
     extract_and_pad_agent_sizes,
     extract_and_pad_agent_velocities,
     filter_agents,
     filter_agents_tensor,
+    pack_agents_array,
     pack_agents_tensor,
     pad_agent_states,
+    pad_agent_states_array,
     sampled_past_ego_states_to_tensor,
     sampled_past_timestamps_to_tensor,
+    sampled_tracked_objects_to_array,
     sampled_tracked_objects_to_tensor_list,
 )
 
@@ -86,6 +91,39 @@ def _create_tracked_objects(
     ]
 
 
+def _create_random_tracked_objects(num_frames: int, num_tracks: int, seed: int = 0) -> List[TrackedObjects]:
+    """
+    Generates tracked objects of vehicles that appear and disappear randomly, mixed with other objects.
+    :param num_frames: The number of frames for which to generate the objects.
+    :param num_tracks: The number of tracks of every object type.
+    :param seed: Random seed.
+    :return: The generated objects.
+    """
+    rng = np.random.default_rng(seed)
+    tracked_objects = []
+    for _ in range(num_frames):
+        objects_in_frame: List[TrackedObject] = []
+        for object_type in [TrackedObjectType.VEHICLE, TrackedObjectType.PEDESTRIAN]:
+            for track in rng.permutation(num_tracks)[: rng.integers(1, num_tracks + 1)]:
+                x, y, heading, vx, vy = rng.uniform(-50.0, 50.0, size=5)
+                objects_in_frame.append(
+                    Agent(
+                        tracked_object_type=object_type,
+                        oriented_box=OrientedBox(StateSE2(x, y, heading), *rng.uniform(1.0, 5.0, size=3)),
+                        velocity=StateVector2D(vx, vy),
+                        metadata=SceneObjectMetadata(
+                            timestamp_us=0,
+                            token=f"{object_type.name}_{track}",
+                            track_id=None,
+                            track_token=f"{object_type.name}_{track}",
+                        ),
+                    )
+                )
+        tracked_objects.append(TrackedObjects(objects_in_frame))
+
+    return tracked_objects
+
+
 def _create_ego_trajectory_tensor(num_frames: int) -> torch.Tensor:
     """
     Generate a dummy ego trajectory
@@ -584,6 +622,49 @@ class TestAgentsFeatureBuilder(unittest.TestCase):
                     else:
                         self.assertEqual(agent, packed[ts, agent, col])
 
+    def test_agents_array_matches_tensors(self) -> None:
+        """
+        Test that the columnar agent pipeline computes the same features as the per-frame tensors.
+        """
+        num_frames = 6
+        ego_history = sampled_past_ego_states_to_tensor(_create_ego_trajectory(num_frames))
+        anchor_ego_state = ego_history[-1, :].squeeze()
+        time_stamps = torch.arange(num_frames, dtype=torch.int64) * 500000
+
+        for seed in range(5):
+            tracked_objects = _create_random_tracked_objects(num_frames, num_tracks=12, seed=seed)
+
+            agent_history = filter_agents_tensor(sampled_tracked_objects_to_tensor_list(tracked_objects), reverse=True)
+            padded_agent_states = pad_agent_states(agent_history, reverse=True)
+
+            agent_states, availability = sampled_tracked_objects_to_array(tracked_objects)
+            self.assertEqual(agent_states.shape, (num_frames, len(agent_history[-1]), AgentInternalIndex.dim()))
+            self.assertTrue(availability[-1].all())
+
+            padded_agent_states_array = pad_agent_states_array(agent_states, availability)
+            for frame in range(num_frames):
+                # Track tokens are remapped differently, all other fields are identical
+                self.assertTrue(
+                    torch.equal(
+                        padded_agent_states_array[frame, :, AgentInternalIndex.vx() :],
+                        padded_agent_states[frame][:, AgentInternalIndex.vx() :],
+                    )
+                )
+
+            # The reference conversion works in place
+            local_agent_states = convert_absolute_quantities_to_relative(padded_agent_states, anchor_ego_state)
+            yaw_rates = compute_yaw_rate_from_state_tensors(local_agent_states, time_stamps)
+            expected_agents = pack_agents_tensor(local_agent_states, yaw_rates)
+
+            local_agent_states_array = convert_absolute_quantities_to_relative_array(
+                padded_agent_states_array, anchor_ego_state
+            )
+            yaw_rates_array = compute_yaw_rate_from_state_array(local_agent_states_array, time_stamps)
+            agents = pack_agents_array(local_agent_states_array, yaw_rates_array)
+
+            self.assertEqual(agents.shape, expected_agents.shape)
+            torch.testing.assert_close(agents, expected_agents, rtol=1e-5, atol=1e-4)
+
 
 if __name__ == '__main__':
     unittest.main()
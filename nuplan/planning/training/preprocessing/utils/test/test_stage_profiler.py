@@ -0,0 +1,160 @@
+import pickle
+import tempfile
+import time
+import unittest
+from typing import List
+
+import torch
+import torch.utils.data
+
+from nuplan.planning.training.preprocessing.utils.stage_profiler import (
+    AUGMENTATION_STAGE,
+    COLLATE_STAGE,
+    FORWARD_STAGE,
+    StageProfiler,
+    time_stage,
+)
+
+
+class ProfiledDataset(torch.utils.data.Dataset):
+    """Dataset that times the loading of every sample."""
+
+    def __init__(self, profiler: StageProfiler, num_samples: int) -> None:
+        """
+        :param profiler: Profiler to time the samples with.
+        :param num_samples: Number of samples.
+        """
+        self._profiler = profiler
+        self._num_samples = num_samples
+
+    def __getitem__(self, idx: int) -> int:
+        """
+        :param idx: Sample index.
+        :return: The sample index.
+        """
+        self._profiler.add(AUGMENTATION_STAGE, 0.5)
+        return idx
+
+    def __len__(self) -> int:
+        """
+        :return: Number of samples.
+        """
+        return self._num_samples
+
+
+class TestStageProfiler(unittest.TestCase):
+    """Test timing stages of the training pipeline."""
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.stage_names = [AUGMENTATION_STAGE, COLLATE_STAGE, FORWARD_STAGE]
+
+    def test_time_stage(self) -> None:
+        """Test accumulating the running time and calls of stages."""
+        profiler = StageProfiler(self.stage_names, num_workers=0)
+
+        for _ in range(2):
+            with profiler.time_stage(FORWARD_STAGE):
+                time.sleep(0.01)
+        with time_stage(profiler, AUGMENTATION_STAGE):
+            pass
+        with time_stage(None, COLLATE_STAGE):
+            pass
+
+        statistics = profiler.get_statistics()
+        self.assertEqual([stage.name for stage in statistics], [FORWARD_STAGE, AUGMENTATION_STAGE])
+        self.assertEqual(statistics[0].num_calls, 2)
+        self.assertGreaterEqual(statistics[0].mean_time, 0.01)
+        self.assertFalse(statistics[0].in_dataloader)
+        self.assertTrue(statistics[1].in_dataloader)
+
+        profiler.reset()
+        self.assertEqual(profiler.get_statistics(), [])
+
+    def test_unknown_stage(self) -> None:
+        """Test that only registered stages can be timed."""
+        profiler = StageProfiler(self.stage_names, num_workers=0)
+
+        with self.assertRaises(AssertionError):
+            profiler.add('unknown', 1.0)
+
+    def test_aggregate_workers(self) -> None:
+        """Test that timings of dataloader workers are aggregated through shared memory."""
+        profiler = StageProfiler(self.stage_names, num_workers=2)
+
+        def collate(batch: List[int]) -> List[int]:
+            """Time the collation of a batch."""
+            profiler.add(COLLATE_STAGE, 1.0)
+            return batch
+
+        dataloader = torch.utils.data.DataLoader(
+            ProfiledDataset(profiler, num_samples=8),
+            batch_size=2,
+            num_workers=2,
+            collate_fn=collate,
+            worker_init_fn=profiler.get_worker_init_fn('train'),
+        )
+        self.assertEqual(sorted(index for batch in dataloader for index in batch), list(range(8)))
+
+        self.assertEqual(profiler.to_dict(), {COLLATE_STAGE: 4.0, AUGMENTATION_STAGE: 4.0})
+        num_calls = {stage.name: stage.num_calls for stage in profiler.get_statistics()}
+        self.assertEqual(num_calls, {COLLATE_STAGE: 4, AUGMENTATION_STAGE: 8})
+
+    def test_separate_rows_per_dataloader(self) -> None:
+        """Test that the workers of different dataloaders write to different rows."""
+        profiler = StageProfiler(self.stage_names, num_workers=1)
+        for dataloader_name, num_samples in [('train', 2), ('val', 3)]:
+            dataloader = torch.utils.data.DataLoader(
+                ProfiledDataset(profiler, num_samples=num_samples),
+                num_workers=1,
+                worker_init_fn=profiler.get_worker_init_fn(dataloader_name),
+            )
+            _ = list(dataloader)
+
+        augmentation_calls = profiler._timings[:, self.stage_names.index(AUGMENTATION_STAGE), 1]
+        self.assertEqual(augmentation_calls.tolist(), [0.0, 2.0, 3.0, 0.0])
+
+    def test_reduce_across_ranks(self) -> None:
+        """Test that the timings of all ranks are summed, and that it does nothing without distributed training."""
+        profiler = StageProfiler(self.stage_names, num_workers=0)
+        profiler.add(FORWARD_STAGE, 1.0)
+        profiler.reduce_across_ranks(torch.device('cpu'))
+        self.assertEqual(profiler.to_dict(), {FORWARD_STAGE: 1.0})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            init_method = f'file://{tmp_dir}/store'
+            torch.distributed.init_process_group('gloo', init_method=init_method, rank=0, world_size=1)
+            try:
+                profiler.reduce_across_ranks(torch.device('cpu'))
+            finally:
+                torch.distributed.destroy_process_group()
+
+        self.assertEqual(profiler.to_dict(), {FORWARD_STAGE: 1.0})
+        self.assertTrue(profiler.summarize().startswith('Stages summed over 1 rank(s)'))
+        profiler.reset()
+        self.assertEqual(profiler.to_dict(), {})
+
+    def test_summarize(self) -> None:
+        """Test reporting the stages ranked by running time."""
+        profiler = StageProfiler(self.stage_names, num_workers=2)
+        self.assertEqual(profiler.summarize(), 'No stages were timed')
+
+        profiler.add(AUGMENTATION_STAGE, 1.0)
+        profiler.add(FORWARD_STAGE, 3.0)
+
+        lines = profiler.summarize().split('\n')
+        self.assertEqual(len(lines), 5)
+        self.assertIn(FORWARD_STAGE, lines[2])
+        self.assertIn(AUGMENTATION_STAGE, lines[3])
+        self.assertTrue(lines[4].endswith('bottleneck: training step'))
+
+    def test_pickle(self) -> None:
+        """Test that a pickled profiler, as sent to spawned workers, keeps its stages."""
+        profiler = StageProfiler(self.stage_names, num_workers=1)
+        profiler.add(FORWARD_STAGE, 1.0)
+
+        self.assertEqual(pickle.loads(pickle.dumps(profiler)).to_dict(), {FORWARD_STAGE: 1.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ import torch
 from nuplan.planning.training.preprocessing.utils.torch_geometry import (
     coordinates_to_local_frame,
     global_state_se2_tensor_to_local,
+    global_state_se2_tensor_to_local_batched,
     state_se2_tensor_to_transform_matrix,
     transform_matrix_to_state_se2_tensor,
     vector_set_coordinates_to_local_frame,
@@ -96,6 +97,24 @@ class TestTorchGeometry(unittest.TestCase):
 
         torch.testing.assert_allclose(expected_transformed_states, actual_transformed_states)
 
+    def test_global_state_se2_tensor_to_local_batched_functionality(self) -> None:
+        """
+        Tests that global_state_se2_tensor_to_local_batched matches global_state_se2_tensor_to_local for batches.
+        """
+        generator = torch.Generator().manual_seed(0)
+        global_states = (torch.rand((4, 6, 3), generator=generator, dtype=torch.float64) - 0.5) * 20
+        local_state = torch.tensor([5, -3, 2.5], dtype=torch.float64)
+
+        actual_transformed_states = global_state_se2_tensor_to_local_batched(global_states, local_state)
+        self.assertEqual(global_states.shape, actual_transformed_states.shape)
+
+        for batch_idx in range(global_states.shape[0]):
+            expected_transformed_states = global_state_se2_tensor_to_local(global_states[batch_idx], local_state)
+            torch.testing.assert_close(actual_transformed_states[batch_idx], expected_transformed_states)
+
+        with self.assertRaises(ValueError):
+            global_state_se2_tensor_to_local_batched(torch.zeros((4, 2)), local_state.float())
+
     def test_global_state_se2_tensor_to_local_scriptability(self) -> None:
         """
         Tests that global_state_se2_tensor_to_local scripts properly.
@@ -121,6 +121,46 @@ def global_state_se2_tensor_to_local(
     return output
 
 
+def global_state_se2_tensor_to_local_batched(
+    global_states: torch.Tensor, local_state: torch.Tensor, precision: Optional[torch.dtype] = None
+) -> torch.Tensor:
+    """
+    Transforms the StateSE2 in tensor from to the frame of reference in local_frame, like
+        global_state_se2_tensor_to_local, with one set of tensor operations for all states.
+
+    :param global_states: A tensor of <..., 3>, where the last dimension is [x, y, heading].
+    :param local_state: A tensor of [x, y, h] of the frame to which to transform.
+    :param precision: The precision with which to compute the transform. If None, then it will be inferred from the input precisions.
+    :return: The transformed states, of the same shape and precision as global_states.
+    """
+    if len(global_states.shape) == 0 or global_states.shape[-1] != 3:
+        raise ValueError(f"Improper se2 tensor shape: {global_states.shape}")
+    _validate_state_se2_tensor_shape(local_state, expected_first_dim=1)
+
+    if precision is None:
+        if global_states.dtype != local_state.dtype:
+            raise ValueError("Mixed datatypes provided to coordinates_to_local_frame without precision specifier.")
+        precision = global_states.dtype
+
+    states = global_states.to(precision)
+    local = local_state.to(precision)
+    local_cos = torch.cos(local[2])
+    local_sin = torch.sin(local[2])
+
+    dx = states[..., 0] - local[0]
+    dy = states[..., 1] - local[1]
+    cos_heading = torch.cos(states[..., 2])
+    sin_heading = torch.sin(states[..., 2])
+
+    x = local_cos * dx + local_sin * dy
+    y = local_cos * dy - local_sin * dx
+    heading = torch.atan2(
+        local_cos * sin_heading - local_sin * cos_heading, local_cos * cos_heading + local_sin * sin_heading
+    )
+
+    return torch.stack([x, y, heading], dim=-1).to(global_states.dtype)
+
+
 def coordinates_to_local_frame(
     coords: torch.Tensor, anchor_state: torch.Tensor, precision: Optional[torch.dtype] = None
 ) -> torch.Tensor:
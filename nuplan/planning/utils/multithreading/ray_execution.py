@@ -2,7 +2,7 @@ import logging
 import traceback
 from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, cast
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, cast
 from uuid import uuid1
 
 import ray
@@ -10,26 +10,10 @@ from ray.exceptions import RayTaskError
 from ray.remote_function import RemoteFunction
 from tqdm import tqdm
 
+from nuplan.planning.utils.multithreading.task_scheduler import ChunkedTaskScheduler, TaskBackend, run_chunk
 from nuplan.planning.utils.multithreading.worker_pool import Task
 
 
-def _ray_object_iterator(initial_ids: List[ray.ObjectRef]) -> Iterator[Tuple[ray.ObjectRef, Any]]:
-    """
-    Iterator that waits for each ray object in the input object list to be completed and fetches the result.
-    :param initial_ids: list of ray object ids
-    :yield: result of worker
-    """
-    next_ids = initial_ids
-
-    while next_ids:
-        ready_ids, not_ready_ids = ray.wait(next_ids)
-        next_id = ready_ids[0]
-
-        yield next_id, ray.get(next_id)
-
-        next_ids = not_ready_ids
-
-
 def wrap_function(fn: Callable[..., Any], log_dir: Optional[Path] = None) -> Callable[..., Any]:
     """
     Wraps a function to save its logs to a unique file inside the log directory.
@@ -67,12 +51,71 @@ def wrap_function(fn: Callable[..., Any], log_dir: Optional[Path] = None) -> Cal
     return wrapped_fn
 
 
-def _ray_map_items(task: Task, *item_lists: Iterable[List[Any]], log_dir: Optional[Path] = None) -> List[Any]:
+class RayTaskBackend(TaskBackend[ray.ObjectRef]):
+    """Runs chunks of items as ray tasks."""
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        num_cpus: Optional[int] = None,
+        num_gpus: Optional[float] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        :param fn: Function to be run on every item.
+        :param num_cpus: Number of CPUs required by a chunk.
+        :param num_gpus: Fraction of GPUs required by a chunk.
+        :param kwargs: Keyword arguments shared by all calls.
+        """
+        self._remote_fn: RemoteFunction = ray.remote(run_chunk).options(num_gpus=num_gpus, num_cpus=num_cpus)
+        # Put the function and shared arguments into the object store once, instead of serializing them per chunk
+        self._fn_ref = ray.put(fn)
+        self._kwargs_refs = {name: ray.put(value) for name, value in (kwargs or {}).items()}
+
+    def submit(self, chunk: List[Tuple[Any, ...]]) -> ray.ObjectRef:
+        """Inherited, see superclass."""
+        return self._remote_fn.remote(self._fn_ref, chunk, **self._kwargs_refs)
+
+    def wait(
+        self, handles: List[ray.ObjectRef], num_returns: int, timeout: Optional[float]
+    ) -> Tuple[List[ray.ObjectRef], List[ray.ObjectRef]]:
+        """Inherited, see superclass."""
+        return ray.wait(handles, num_returns=num_returns, timeout=timeout)  # type: ignore
+
+    def get(self, handle: ray.ObjectRef) -> Tuple[List[Any], float]:
+        """Inherited, see superclass."""
+        return ray.get(handle)  # type: ignore
+
+
+def _get_max_in_flight_tasks(task: Task) -> int:
+    """
+    Default number of in-flight chunks, twice the number of chunks the cluster can run at once.
+    :param task: Task with resource requirements.
+    :return: Maximum number of in-flight chunks.
+    """
+    resources = ray.cluster_resources()
+    num_parallel_tasks = resources.get('CPU', 1.0) / (task.num_cpus or 1)
+    if task.num_gpus:
+        num_parallel_tasks = min(num_parallel_tasks, resources.get('GPU', 0.0) / task.num_gpus)
+
+    return max(1, 2 * int(num_parallel_tasks))
+
+
+def _ray_map_items(
+    task: Task,
+    *item_lists: Iterable[List[Any]],
+    log_dir: Optional[Path] = None,
+    max_in_flight_tasks: Optional[int] = None,
+    target_chunk_duration: float = 1.0,
+) -> List[Any]:
     """
     Map each item of a list of arguments to a callable and executes in parallel.
+    Items are submitted in chunks sized from the measured running time, with a bounded number of chunks in flight.
     :param fn: callable to be run
     :param item_list: items to be parallelized
     :param log_dir: directory to store worker logs
+    :param max_in_flight_tasks: maximum number of submitted chunks, twice the cluster parallelism if None
+    :param target_chunk_duration: [s] running time a chunk is sized for
     :return: list of outputs
     """
     assert len(item_lists) > 0, 'No map arguments received for mapping'
@@ -81,40 +124,54 @@ def _ray_map_items(task: Task, *item_lists: Iterable[List[Any]], log_dir: Option
         len(cast(List, items)) == len(item_lists[0]) for items in item_lists  # type: ignore
     ), 'All lists must have equal size'
     fn = task.fn
-    # Wrap function in remote decorator and create ray objects
+    kwargs: Dict[str, Any] = {}
+    # Unpack partial functions, so that their arguments are put into the object store once
     if isinstance(fn, partial):
         _, _, pack = fn.__reduce__()  # type: ignore
-        fn, _, args, _ = pack
-        fn = wrap_function(fn, log_dir=log_dir)
-        remote_fn: RemoteFunction = ray.remote(fn).options(num_gpus=task.num_gpus, num_cpus=task.num_cpus)
-        object_ids = [remote_fn.remote(*items, **args) for items in zip(*item_lists)]
-    else:
-        fn = wrap_function(fn, log_dir=log_dir)
-        remote_fn = ray.remote(fn).options(num_gpus=task.num_gpus, num_cpus=task.num_cpus)
-        object_ids = [remote_fn.remote(*items) for items in zip(*item_lists)]
-
-    # Create ordered map to track order of objects inserted in the queue
-    object_result_map = dict.fromkeys(object_ids, None)
-
-    # Asynchronously iterate through the object and track progress
-    for object_id, output in tqdm(_ray_object_iterator(object_ids), total=len(object_ids), desc='Ray objects'):
-        object_result_map[object_id] = output
-
-    results = list(object_result_map.values())
+        fn, _, kwargs, _ = pack
+        kwargs = kwargs or {}
+    fn = wrap_function(fn, log_dir=log_dir)
+
+    backend = RayTaskBackend(fn, num_cpus=task.num_cpus, num_gpus=task.num_gpus, kwargs=kwargs)
+    scheduler = ChunkedTaskScheduler(
+        backend,
+        max_in_flight=max_in_flight_tasks or _get_max_in_flight_tasks(task),
+        target_chunk_duration=target_chunk_duration,
+    )
+    items = list(zip(*item_lists))
+    results: List[Any] = [None] * len(items)
+
+    # Asynchronously iterate through the outputs and track progress
+    for index, output in tqdm(scheduler.run(items), total=len(items), desc='Ray objects'):
+        results[index] = output
 
     return results
 
 
-def ray_map(task: Task, *item_lists: Iterable[List[Any]], log_dir: Optional[Path] = None) -> List[Any]:
+def ray_map(
+    task: Task,
+    *item_lists: Iterable[List[Any]],
+    log_dir: Optional[Path] = None,
+    max_in_flight_tasks: Optional[int] = None,
+    target_chunk_duration: float = 1.0,
+) -> List[Any]:
     """
     Initialize ray, align item lists and map each item of a list of arguments to a callable and executes in parallel.
     :param task: callable to be run
     :param item_lists: items to be parallelized
     :param log_dir: directory to store worker logs
+    :param max_in_flight_tasks: maximum number of submitted chunks, twice the cluster parallelism if None
+    :param target_chunk_duration: [s] running time a chunk is sized for
     :return: list of outputs
     """
     try:
-        results = _ray_map_items(task, *item_lists, log_dir=log_dir)
+        results = _ray_map_items(
+            task,
+            *item_lists,
+            log_dir=log_dir,
+            max_in_flight_tasks=max_in_flight_tasks,
+            target_chunk_duration=target_chunk_duration,
+        )
         return results
     except (RayTaskError, Exception) as exc:
         ray.shutdown()
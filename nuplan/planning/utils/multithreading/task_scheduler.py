@@ -0,0 +1,159 @@
+import abc
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Handle of a submitted chunk, e.g. a ray object reference
+HandleType = TypeVar('HandleType')
+
+
+def run_chunk(fn: Callable[..., Any], chunk: List[Tuple[Any, ...]], **kwargs: Any) -> Tuple[List[Any], float]:
+    """
+    Run a function on every item of a chunk and measure the running time.
+    :param fn: Function to be run.
+    :param chunk: Positional arguments of every call.
+    :param kwargs: Keyword arguments shared by all calls.
+    :return: Outputs of every call and the elapsed time of the chunk in seconds.
+    """
+    start_time = time.perf_counter()
+    outputs = [fn(*items, **kwargs) for items in chunk]
+    return outputs, time.perf_counter() - start_time
+
+
+class TaskBackend(abc.ABC, Generic[HandleType]):
+    """Backend that runs chunks of items remotely, the interface follows the ray api."""
+
+    @abc.abstractmethod
+    def submit(self, chunk: List[Tuple[Any, ...]]) -> HandleType:
+        """
+        Submit a chunk of items to be run with run_chunk.
+        :param chunk: Positional arguments of every call.
+        :return: Handle of the submitted chunk.
+        """
+        pass
+
+    @abc.abstractmethod
+    def wait(
+        self, handles: List[HandleType], num_returns: int, timeout: Optional[float]
+    ) -> Tuple[List[HandleType], List[HandleType]]:
+        """
+        Wait until num_returns of the chunks finished or the timeout expired, whichever comes first.
+        :param handles: Handles of submitted chunks.
+        :param num_returns: Maximum number of finished chunks to return.
+        :param timeout: [s] Maximum time to wait, None to wait without limit.
+        :return: Handles of finished and of unfinished chunks.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get(self, handle: HandleType) -> Tuple[List[Any], float]:
+        """
+        Fetch the result of a finished chunk, errors of the chunk are raised here.
+        :param handle: Handle of a finished chunk.
+        :return: Outputs of every item of the chunk and the elapsed time of the chunk in seconds.
+        """
+        pass
+
+
+class ChunkedTaskScheduler(Generic[HandleType]):
+    """
+    Streams items through a task backend in chunks, with a bounded number of chunks in flight.
+    Chunks are sized from the measured running time per item, such that a chunk runs for about the target chunk
+    duration. Short tasks are thus batched to amortize the scheduling overhead, while long tasks are submitted one by
+    one. Towards the end chunks are shrunk, so that the remaining items are spread over all in-flight slots.
+    Finished chunks are drained all at once and their outputs yielded right away, so the driver never holds more than
+    the in-flight chunks.
+    """
+
+    def __init__(
+        self,
+        backend: TaskBackend[HandleType],
+        max_in_flight: int,
+        target_chunk_duration: float = 1.0,
+        initial_chunk_size: int = 1,
+        max_chunk_size: int = 256,
+        wait_timeout: float = 1.0,
+    ) -> None:
+        """
+        :param backend: Backend that runs the chunks.
+        :param max_in_flight: Maximum number of chunks submitted and not yet drained.
+        :param target_chunk_duration: [s] Running time a chunk is sized for.
+        :param initial_chunk_size: Number of items per chunk until the first chunk finished.
+        :param max_chunk_size: Maximum number of items per chunk.
+        :param wait_timeout: [s] Time after which waiting for finished chunks is logged and retried.
+        """
+        assert max_in_flight > 0, f"Number of in-flight chunks has to be positive, got {max_in_flight}!"
+        assert target_chunk_duration > 0.0, f"Chunk duration has to be positive, got {target_chunk_duration}!"
+        assert 0 < initial_chunk_size <= max_chunk_size, "Initial chunk size has to be in [1, max_chunk_size]!"
+        assert wait_timeout > 0.0, f"Wait timeout has to be positive, got {wait_timeout}!"
+
+        self._backend = backend
+        self._max_in_flight = max_in_flight
+        self._target_chunk_duration = target_chunk_duration
+        self._initial_chunk_size = initial_chunk_size
+        self._max_chunk_size = max_chunk_size
+        self._wait_timeout = wait_timeout
+
+        # Total running time and number of items of all finished chunks
+        self._measured_duration = 0.0
+        self._measured_items = 0
+
+    @property
+    def item_duration(self) -> Optional[float]:
+        """:return: [s] Mean running time per item of all finished chunks, None before the first chunk finished."""
+        return self._measured_duration / self._measured_items if self._measured_items > 0 else None
+
+    def _next_chunk_size(self, num_remaining_items: int) -> int:
+        """
+        :param num_remaining_items: Number of items not yet submitted.
+        :return: Number of items of the next chunk.
+        """
+        item_duration = self.item_duration
+        if item_duration is None:
+            chunk_size = self._initial_chunk_size
+        elif item_duration > 0.0:
+            chunk_size = int(self._target_chunk_duration / item_duration)
+        else:
+            chunk_size = self._max_chunk_size
+
+        # Spread the remaining items over all slots, such that the last chunks finish at about the same time
+        balanced_chunk_size = math.ceil(num_remaining_items / self._max_in_flight)
+
+        return max(1, min(chunk_size, self._max_chunk_size, balanced_chunk_size))
+
+    def run(self, items: Sequence[Tuple[Any, ...]]) -> Iterator[Tuple[int, Any]]:
+        """
+        Run all items and yield their outputs as soon as their chunk finished.
+        :param items: Positional arguments of every call.
+        :yield: Index of an item and its output, in the order in which chunks finish.
+        """
+        next_index = 0
+        # Index of the first item of every in-flight chunk
+        in_flight: Dict[HandleType, int] = {}
+
+        while next_index < len(items) or in_flight:
+            while next_index < len(items) and len(in_flight) < self._max_in_flight:
+                chunk_size = self._next_chunk_size(len(items) - next_index)
+                handle = self._backend.submit(list(items[next_index : next_index + chunk_size]))
+                in_flight[handle] = next_index
+                next_index += chunk_size
+
+            # Block until a chunk finished, then drain all other finished chunks without waiting
+            handles = list(in_flight)
+            ready, _ = self._backend.wait(handles, num_returns=1, timeout=self._wait_timeout)
+            if not ready:
+                logger.debug(f'Waiting for {len(handles)} in-flight chunks')
+                continue
+            if len(handles) > 1:
+                ready, _ = self._backend.wait(handles, num_returns=len(handles), timeout=0)
+
+            for handle in ready:
+                start_index = in_flight.pop(handle)
+                outputs, duration = self._backend.get(handle)
+                self._measured_duration += duration
+                self._measured_items += len(outputs)
+                for offset, output in enumerate(outputs):
+                    yield start_index + offset, output
@@ -0,0 +1,125 @@
+import unittest
+from typing import Any, Dict, List, Optional, Tuple
+
+from nuplan.planning.utils.multithreading.task_scheduler import ChunkedTaskScheduler, TaskBackend, run_chunk
+
+
+def square(value: int, offset: int = 0) -> int:
+    """
+    :param value: Input value.
+    :param offset: Offset added to the square.
+    :return: Squared value plus offset.
+    """
+    if value < 0:
+        raise ValueError("Negative value")
+    return value * value + offset
+
+
+class FakeTaskBackend(TaskBackend[int]):
+    """Backend that runs chunks synchronously on submission, with a fixed simulated running time per item."""
+
+    def __init__(self, item_duration: float, offset: int = 0) -> None:
+        """
+        :param item_duration: [s] Simulated running time per item.
+        :param offset: Keyword argument shared by all calls.
+        """
+        self.item_duration = item_duration
+        self.offset = offset
+        self.chunk_sizes: List[int] = []
+        self.in_flight: Dict[int, Tuple[List[Any], float]] = {}
+        self.max_in_flight = 0
+        self.wait_calls: List[Tuple[int, int, Optional[float]]] = []
+
+    def submit(self, chunk: List[Tuple[Any, ...]]) -> int:
+        """Inherited, see superclass."""
+        handle = len(self.chunk_sizes)
+        outputs, _ = run_chunk(square, chunk, offset=self.offset)
+        self.chunk_sizes.append(len(chunk))
+        self.in_flight[handle] = (outputs, self.item_duration * len(chunk))
+        self.max_in_flight = max(self.max_in_flight, len(self.in_flight))
+        return handle
+
+    def wait(self, handles: List[int], num_returns: int, timeout: Optional[float]) -> Tuple[List[int], List[int]]:
+        """Inherited, see superclass. All chunks are finished right away."""
+        self.wait_calls.append((len(handles), num_returns, timeout))
+        return handles[:num_returns], handles[num_returns:]
+
+    def get(self, handle: int) -> Tuple[List[Any], float]:
+        """Inherited, see superclass."""
+        return self.in_flight.pop(handle)
+
+
+class TestChunkedTaskScheduler(unittest.TestCase):
+    """Test scheduling of chunked tasks."""
+
+    def test_run_chunk(self) -> None:
+        """Test running a function on a chunk of items."""
+        outputs, duration = run_chunk(square, [(1,), (2,), (3,)], offset=1)
+
+        self.assertEqual(outputs, [2, 5, 10])
+        self.assertGreaterEqual(duration, 0.0)
+
+    def test_run_all_items(self) -> None:
+        """Test that every item is run once and in-flight chunks are bounded."""
+        backend = FakeTaskBackend(item_duration=0.01, offset=3)
+        scheduler = ChunkedTaskScheduler(backend, max_in_flight=4, target_chunk_duration=0.1)
+        items = [(value,) for value in range(1000)]
+
+        outputs = list(scheduler.run(items))
+
+        self.assertEqual(sorted(outputs), [(value, value * value + 3) for value in range(1000)])
+        self.assertEqual(sum(backend.chunk_sizes), len(items))
+        self.assertLessEqual(backend.max_in_flight, 4)
+        self.assertAlmostEqual(scheduler.item_duration, 0.01)  # type: ignore
+
+    def test_chunk_size_from_measured_duration(self) -> None:
+        """Test that chunks are sized from the measured running time and shrunk towards the end."""
+        backend = FakeTaskBackend(item_duration=0.01)
+        scheduler = ChunkedTaskScheduler(backend, max_in_flight=2, target_chunk_duration=0.1, initial_chunk_size=1)
+
+        list(scheduler.run([(value,) for value in range(100)]))
+
+        # Uncalibrated chunks until the first chunk finished, target sized chunks and balanced chunks at the end
+        self.assertEqual(backend.chunk_sizes[:2], [1, 1])
+        self.assertEqual(backend.chunk_sizes[2], 10)
+        self.assertEqual(backend.chunk_sizes[-2:], [1, 1])
+        self.assertLessEqual(max(backend.chunk_sizes), 10)
+
+    def test_max_chunk_size(self) -> None:
+        """Test that chunks of very short tasks are limited to the maximum chunk size."""
+        backend = FakeTaskBackend(item_duration=0.0)
+        scheduler = ChunkedTaskScheduler(backend, max_in_flight=1, max_chunk_size=16)
+
+        list(scheduler.run([(value,) for value in range(100)]))
+
+        self.assertEqual(backend.chunk_sizes, [1] + [16] * 6 + [3])
+
+    def test_drain_finished_chunks(self) -> None:
+        """Test that all finished chunks are drained with a single wait after blocking for the first one."""
+        backend = FakeTaskBackend(item_duration=1.0)
+        scheduler = ChunkedTaskScheduler(backend, max_in_flight=3, target_chunk_duration=1.0, wait_timeout=0.5)
+
+        list(scheduler.run([(value,) for value in range(6)]))
+
+        self.assertEqual(backend.wait_calls, [(3, 1, 0.5), (3, 3, 0), (3, 1, 0.5), (3, 3, 0)])
+
+    def test_streaming(self) -> None:
+        """Test that outputs are yielded before all items are submitted."""
+        backend = FakeTaskBackend(item_duration=1.0)
+        scheduler = ChunkedTaskScheduler(backend, max_in_flight=2, target_chunk_duration=1.0)
+
+        outputs = scheduler.run([(value,) for value in range(100)])
+        next(outputs)
+
+        self.assertEqual(sum(backend.chunk_sizes), 2)
+
+    def test_error(self) -> None:
+        """Test that errors of a chunk are raised when fetching its result."""
+        scheduler = ChunkedTaskScheduler(FakeTaskBackend(item_duration=0.1), max_in_flight=2)
+
+        with self.assertRaises(ValueError):
+            list(scheduler.run([(1,), (-1,), (2,)]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import threading
+import time
+import unittest
+from typing import List
+
+from nuplan.planning.utils.multithreading.worker_parallel import (
+    SingleMachineParallelExecutor,
+    build_strided_batches,
+    compute_tail_idle_time,
+)
+from nuplan.planning.utils.multithreading.worker_pool import Task
+from nuplan.planning.utils.multithreading.worker_sequential import Sequential
+
+
+def sleep_and_return(duration: float, value: int) -> int:
+    """
+    :param duration: [s] Time to sleep.
+    :param value: Value to return.
+    :return: The value.
+    """
+    time.sleep(duration)
+    return value
+
+
+class TestSingleMachineParallelExecutor(unittest.TestCase):
+    """Test dynamic batch dispatching of SingleMachineParallelExecutor."""
+
+    def test_compute_tail_idle_time(self) -> None:
+        """Test replaying batches on workers that take them from a shared queue."""
+        self.assertEqual(compute_tail_idle_time([], num_workers=2), 0.0)
+        self.assertEqual(compute_tail_idle_time([1.0, 1.0, 1.0, 1.0], num_workers=2), 0.0)
+        # The first worker takes the long batch, the second one all short batches and then idles
+        self.assertEqual(compute_tail_idle_time([4.0, 1.0, 1.0], num_workers=2), 2.0)
+        # A long batch dispatched last keeps the other worker idle for longer
+        self.assertEqual(compute_tail_idle_time([1.0, 1.0, 4.0], num_workers=2), 4.0)
+
+    def test_build_strided_batches(self) -> None:
+        """Test that batches take every n-th call."""
+        self.assertEqual(build_strided_batches(0, batch_size=4), [])
+        self.assertEqual(build_strided_batches(8, batch_size=4), [[0, 2, 4, 6], [1, 3, 5, 7]])
+        self.assertEqual(build_strided_batches(5, batch_size=2), [[0, 3], [1, 4], [2]])
+
+    def test_map(self) -> None:
+        """Test that outputs are returned in order, with calls dispatched in small batches."""
+        worker = SingleMachineParallelExecutor(max_workers=2, max_batch_size=4, batches_per_worker=2)
+        num_items = 50
+
+        outputs = worker.map(Task(fn=sleep_and_return), 0.0, list(range(num_items)))
+
+        self.assertEqual(outputs, list(range(num_items)))
+        statistics = worker.last_map_statistics
+        self.assertIsNotNone(statistics)
+        self.assertEqual(statistics.num_items, num_items)  # type: ignore
+        self.assertEqual(statistics.num_batches, 13)  # type: ignore
+
+    def test_recovered_tail_idle_time(self) -> None:
+        """Test that slow calls at the start do not leave the other worker idle, unlike equal-count chunks."""
+        worker = SingleMachineParallelExecutor(max_workers=2, max_batch_size=1)
+        durations = [0.1, 0.1] + [0.0] * 18
+
+        outputs = worker.map(Task(fn=sleep_and_return), durations, list(range(len(durations))))
+
+        self.assertEqual(outputs, list(range(len(durations))))
+        statistics = worker.last_map_statistics
+        self.assertGreaterEqual(statistics.busy_time, 0.2)  # type: ignore
+        self.assertLess(statistics.tail_idle_time, 0.05)  # type: ignore
+        self.assertGreater(statistics.static_tail_idle_time, 0.15)  # type: ignore
+        self.assertGreater(statistics.recovered_tail_idle_time, 0.1)  # type: ignore
+
+    def test_map_process_pool(self) -> None:
+        """Test dispatching batches to a process pool."""
+        worker = SingleMachineParallelExecutor(use_process_pool=True, max_workers=2)
+
+        outputs = worker.map(Task(fn=sleep_and_return), 0.0, list(range(10)))
+
+        self.assertEqual(outputs, list(range(10)))
+
+    def test_item_costs(self) -> None:
+        """Test that the most expensive calls are dispatched first and outputs are returned in input order."""
+        calls: List[int] = []
+        lock = threading.Lock()
+
+        def record(value: int) -> int:
+            """Record the call order."""
+            with lock:
+                calls.append(value)
+            return 2 * value
+
+        item_costs = [1.0, 5.0, 3.0, 0.0]
+        for worker in [Sequential(), SingleMachineParallelExecutor(max_workers=1)]:
+            calls.clear()
+            outputs = worker.map(Task(fn=record), [0, 1, 2, 3], item_costs=item_costs)
+
+            self.assertEqual(outputs, [0, 2, 4, 6])
+            self.assertEqual(calls, [1, 2, 0, 3])
+
+        with self.assertRaises(RuntimeError):
+            Sequential().map(Task(fn=record), [0, 1], item_costs=[1.0])
+
+    def test_item_costs_spread_over_batches(self) -> None:
+        """Test that the most expensive calls run in parallel rather than in the same batch."""
+        worker = SingleMachineParallelExecutor(max_workers=2, max_batch_size=4, batches_per_worker=1)
+        durations = [0.0] * 6 + [0.1, 0.1]
+
+        outputs = worker.map(Task(fn=sleep_and_return), durations, list(range(len(durations))), item_costs=durations)
+
+        self.assertEqual(outputs, list(range(len(durations))))
+        statistics = worker.last_map_statistics
+        self.assertEqual(statistics.num_batches, 2)  # type: ignore
+        self.assertLess(statistics.tail_idle_time, 0.05)  # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,32 +1,111 @@
 import concurrent
 import concurrent.futures
+import heapq
 import logging
+import time
 from concurrent.futures import Future
-from typing import Any, Iterable, List, Optional
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
+import numpy.typing as npt
 from tqdm import tqdm
 
 from nuplan.planning.utils.multithreading.worker_pool import (
     Task,
     WorkerPool,
     WorkerResources,
-    get_max_size_of_arguments,
 )
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class MapStatistics:
+    """Running time statistics of a map of SingleMachineParallelExecutor."""
+
+    num_items: int  # Number of calls
+    num_batches: int  # Number of batches the calls were dispatched in
+    busy_time: float  # [s] Summed running time of all calls
+    tail_idle_time: float  # [s] Summed time workers idled while the last batches ran
+    static_tail_idle_time: float  # [s] Same for one equal-count chunk per worker, estimated from the running times
+
+    @property
+    def recovered_tail_idle_time(self) -> float:
+        """:return: [s] Idle time saved by dispatching batches dynamically instead of equal-count chunks."""
+        return self.static_tail_idle_time - self.tail_idle_time
+
+
+def _run_timed_batch(fn: Callable[..., Any], batch: List[Tuple[Any, ...]]) -> Tuple[List[Any], List[float]]:
+    """
+    Run a function on every item of a batch and measure the running time of every call.
+    :param fn: Function to be run.
+    :param batch: Arguments of every call.
+    :return: Outputs and running times in seconds of every call.
+    """
+    outputs, durations = [], []
+    for args in batch:
+        start_time = time.perf_counter()
+        outputs.append(fn(*args))
+        durations.append(time.perf_counter() - start_time)
+
+    return outputs, durations
+
+
+def build_strided_batches(num_items: int, batch_size: int) -> List[List[int]]:
+    """
+    Split calls into batches that take every n-th call, rather than consecutive calls. Calls dispatched in order of
+    decreasing cost are thereby spread over the first calls of all batches, instead of the most expensive ones being
+    serialized in the first batch.
+    :param num_items: Number of calls.
+    :param batch_size: Maximum number of calls per batch.
+    :return: Indices of the calls of every batch, in dispatch order.
+    """
+    num_batches = -(-num_items // batch_size)
+    return [list(range(start, num_items, num_batches)) for start in range(num_batches)]
+
+
+def compute_tail_idle_time(batch_durations: Sequence[float], num_workers: int) -> float:
+    """
+    Compute the idle time of workers that take batches from a shared queue in order, until all batches finished.
+    :param batch_durations: [s] Running time of every batch, in dispatch order.
+    :param num_workers: Number of workers.
+    :return: [s] Summed idle time of all workers between finishing their last batch and the end of the last batch.
+    """
+    worker_end_times = [0.0] * num_workers
+    for duration in batch_durations:
+        heapq.heappush(worker_end_times, heapq.heappop(worker_end_times) + duration)
+
+    return num_workers * max(worker_end_times) - sum(worker_end_times)  # type: ignore
+
+
 class SingleMachineParallelExecutor(WorkerPool):
     """
     This worker distributes all tasks across multiple threads on this machine.
     """
 
-    def __init__(self, use_process_pool: bool = False, max_workers: Optional[int] = None):
+    def __init__(
+        self,
+        use_process_pool: bool = False,
+        max_workers: Optional[int] = None,
+        max_batch_size: int = 8,
+        batches_per_worker: int = 4,
+    ):
         """
         Create worker with limited threads.
+        Calls of a map are dispatched in small batches through the shared queue of the executor, so that idle workers
+        keep taking work until the queue is empty, instead of each worker running an equal share of the calls.
         :param use_process_pool: if true, ProcessPoolExecutor will be used as executor, otherwise ThreadPoolExecutor.
         :param max_workers: if available, use this number as used number of threads.
+        :param max_batch_size: maximum number of calls per batch, larger batches amortize the dispatch overhead.
+        :param batches_per_worker: minimum number of batches per worker, if there are enough calls.
         """
+        assert max_batch_size > 0, f"Batch size has to be positive, got {max_batch_size}!"
+        assert batches_per_worker > 0, f"Number of batches per worker has to be positive, got {batches_per_worker}!"
+        self._max_batch_size = max_batch_size
+        self._batches_per_worker = batches_per_worker
+        self.last_map_statistics: Optional[MapStatistics] = None
+
         # Set the number of available threads
         number_of_cpus_per_node = max_workers if max_workers else WorkerResources.current_node_cpu_count()
 
@@ -45,13 +124,50 @@ class SingleMachineParallelExecutor(WorkerPool):
 
     def _map(self, task: Task, *item_lists: Iterable[List[Any]]) -> List[Any]:
         """Inherited, see superclass."""
-        return list(
-            tqdm(
-                self._executor.map(task.fn, *item_lists),
-                leave=False,
-                total=get_max_size_of_arguments(*item_lists),
-                desc='SingleMachineParallelExecutor',
-            )
+        items = list(zip(*item_lists))
+        num_items = len(items)
+        batch_size = max(1, min(self._max_batch_size, num_items // (self.number_of_threads * self._batches_per_worker)))
+        batches = build_strided_batches(num_items, batch_size)
+        futures = {
+            self._executor.submit(_run_timed_batch, task.fn, [items[index] for index in batch]): batch
+            for batch in batches
+        }
+
+        outputs: List[Any] = [None] * num_items
+        durations = np.zeros(num_items)
+        with tqdm(leave=False, total=num_items, desc='SingleMachineParallelExecutor') as pbar:
+            for future in concurrent.futures.as_completed(futures):
+                batch_outputs, batch_durations = future.result()
+                batch = futures[future]
+                for index, output, duration in zip(batch, batch_outputs, batch_durations):
+                    outputs[index] = output
+                    durations[index] = duration
+                pbar.update(len(batch_outputs))
+
+        self.last_map_statistics = self._compute_map_statistics(durations, batches)
+        logger.info(
+            f'Dispatched {num_items} calls in {self.last_map_statistics.num_batches} batches, recovered '
+            f'{self.last_map_statistics.recovered_tail_idle_time:.2f}s of tail idle time compared to equal chunks'
+        )
+
+        return outputs
+
+    def _compute_map_statistics(self, durations: npt.NDArray[np.float64], batches: List[List[int]]) -> MapStatistics:
+        """
+        Compute running time statistics of a map, by replaying the measured running times of its calls.
+        :param durations: [s] Running time of every call, in input order.
+        :param batches: Indices of the calls of every batch, in dispatch order.
+        :return: Statistics of the map.
+        """
+        batch_durations = [durations[batch].sum() for batch in batches]
+        static_chunk_durations = [chunk.sum() for chunk in np.array_split(durations, self.number_of_threads)]
+
+        return MapStatistics(
+            num_items=len(durations),
+            num_batches=len(batch_durations),
+            busy_time=float(durations.sum()),
+            tail_idle_time=compute_tail_idle_time(batch_durations, self.number_of_threads),
+            static_tail_idle_time=compute_tail_idle_time(static_chunk_durations, self.number_of_threads),
         )
 
     def submit(self, task: Task, *args: Any, **kwargs: Any) -> Future[Any]:
@@ -101,13 +101,21 @@ class WorkerPool(abc.ABC):
         logger.info(f'Worker: {self.__class__.__name__}')
         logger.info(f'{self}')
 
-    def map(self, task: Task, *item_lists: Iterable[List[Any]], verbose: bool = False) -> List[Any]:
+    def map(
+        self,
+        task: Task,
+        *item_lists: Iterable[List[Any]],
+        verbose: bool = False,
+        item_costs: Optional[List[float]] = None,
+    ) -> List[Any]:
         """
         Run function with arguments from item_lists, this function will make sure all arguments have the same
         number of elements.
         :param task: function to be run.
         :param item_lists: arguments to the function.
         :param verbose: Whether to increase logger verbosity.
+        :param item_costs: Optional estimated cost of every call, e.g. its expected running time. If available, the
+            most expensive calls are dispatched first, so that no long call is started at the end of the map.
         :return: type from the fn.
         """
         max_size, aligned_item_lists = align_size_of_arguments(*item_lists)
@@ -115,7 +123,21 @@ class WorkerPool(abc.ABC):
         if verbose:
             logger.info(f'Submitting {max_size} tasks!')
 
-        return self._map(task, *aligned_item_lists)
+        if item_costs is None:
+            return self._map(task, *aligned_item_lists)
+
+        if len(item_costs) != max_size:
+            raise RuntimeError(f'Expected {max_size} item costs, got {len(item_costs)}!')
+
+        # Dispatch in order of decreasing cost and restore the order of the outputs afterwards
+        order = sorted(range(max_size), key=lambda index: -item_costs[index])  # type: ignore
+        sorted_item_lists = [[items[index] for index in order] for items in aligned_item_lists]  # type: ignore
+        sorted_outputs = self._map(task, *sorted_item_lists)
+        outputs: List[Any] = [None] * max_size
+        for index, output in zip(order, sorted_outputs):
+            outputs[index] = output
+
+        return outputs
 
     @abc.abstractmethod
     def _map(self, task: Task, *item_lists: Iterable[List[Any]]) -> List[Any]:
@@ -100,6 +100,8 @@ class RayDistributed(WorkerPool):
         log_to_driver: bool = True,
         output_dir: Optional[Union[str, Path]] = None,
         logs_subdir: Optional[str] = 'logs',
+        max_in_flight_tasks: Optional[int] = None,
+        target_chunk_duration: float = 1.0,
     ):
         """
         Initialize ray worker.
@@ -111,12 +113,16 @@ class RayDistributed(WorkerPool):
                 processes on all nodes will be directed to the driver.
         :param output_dir: Experiment output directory.
         :param logs_subdir: Subdirectory inside experiment dir to store worker logs.
+        :param max_in_flight_tasks: Maximum number of submitted chunks of a map, twice the cluster parallelism if None.
+        :param target_chunk_duration: [s] Running time the chunks of a map are sized for.
         """
         self._master_node_ip = master_node_ip
         self._threads_per_node = threads_per_node
         self._local_mode = debug_mode
         self._log_to_driver = log_to_driver
         self._log_dir: Optional[Path] = Path(output_dir) / (logs_subdir or '') if output_dir is not None else None
+        self._max_in_flight_tasks = max_in_flight_tasks
+        self._target_chunk_duration = target_chunk_duration
         super().__init__(self.initialize())
 
     def initialize(self) -> WorkerResources:
@@ -144,7 +150,13 @@ class RayDistributed(WorkerPool):
 
     def _map(self, task: Task, *item_lists: Iterable[List[Any]]) -> List[Any]:
         """Inherited, see superclass."""
-        return ray_map(task, *item_lists, log_dir=self._log_dir)  # type: ignore
+        return ray_map(  # type: ignore
+            task,
+            *item_lists,
+            log_dir=self._log_dir,
+            max_in_flight_tasks=self._max_in_flight_tasks,
+            target_chunk_duration=self._target_chunk_duration,
+        )
 
     def submit(self, task: Task, *args: Any, **kwargs: Any) -> Future[Any]:
         """Inherited, see superclass."""